@@ -1,18 +1,39 @@
+import asyncio
 import uvicorn
 import sqlite3
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from pathlib import Path
 
 # Configurações
-from util.config import APP_NAME, SECRET_KEY, HOST, PORT, RELOAD, VERSION
+from util.config import (
+    APP_NAME, SECRET_KEY, HOST, PORT, RELOAD, VERSION,
+    DB_WAL_CHECKPOINT_SEGUNDOS, VISUALIZACOES_FLUSH_SEGUNDOS,
+    BACKUP_AUTOMATICO_HORARIO, BACKUP_AUTOMATICO_INTERVALO_HORAS,
+    CONFIG_SINCRONIZACAO_SEGUNDOS, CACHE_PAGINAS_TTL_SEGUNDOS, CACHE_PAGINAS_SINCRONIZACAO_SEGUNDOS
+)
 
 # Logger
 from util.logger_config import logger
 
+# Banco de dados
+from util.db_util import obter_estatisticas_pool, tarefa_checkpoint_wal, fechar_pool, executor_repositorios
+from util.visualizacoes_util import contador_visualizacoes, tarefa_gravar_visualizacoes
+from util.cache_paginas import cache_paginas
+from util.config_cache import config, tarefa_sincronizar_configuracoes
+from util.security import servico_hash_senha
+from util.foto_util import encerrar_processamento_fotos
+from util.rate_limit_armazenamento import fechar_pools as fechar_pools_rate_limit
+from util.cache_http import ArquivosEstaticos, tarefa_sincronizar_paginas
+from util.backup_util import tarefa_backup_agendado, obter_estatisticas_backup_agendado
+from util.auth_decorator import requer_autenticacao
+from util.perfis import Perfil
+from model.usuario_logado_model import UsuarioLogado
+
 # Exception Handlers
 from util.exception_handlers import (
     http_exception_handler,
@@ -52,8 +73,53 @@ from util.seed_data import inicializar_dados
 # CSRF Protection
 from util.csrf_protection import MiddlewareProtecaoCSRF
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Inicia tarefas em segundo plano no startup e as encerra no shutdown"""
+    tarefas = []
+
+    if DB_WAL_CHECKPOINT_SEGUNDOS > 0:
+        tarefas.append(asyncio.create_task(tarefa_checkpoint_wal(DB_WAL_CHECKPOINT_SEGUNDOS)))
+        logger.info(f"Checkpoint periódico do WAL a cada {DB_WAL_CHECKPOINT_SEGUNDOS}s")
+
+    if VISUALIZACOES_FLUSH_SEGUNDOS > 0:
+        tarefas.append(asyncio.create_task(tarefa_gravar_visualizacoes(VISUALIZACOES_FLUSH_SEGUNDOS)))
+        logger.info(f"Visualizações de artigos gravadas a cada {VISUALIZACOES_FLUSH_SEGUNDOS}s")
+
+    if CONFIG_SINCRONIZACAO_SEGUNDOS > 0:
+        tarefas.append(asyncio.create_task(tarefa_sincronizar_configuracoes(CONFIG_SINCRONIZACAO_SEGUNDOS)))
+        logger.info(f"Configurações sincronizadas com o banco a cada {CONFIG_SINCRONIZACAO_SEGUNDOS}s")
+
+    if CACHE_PAGINAS_TTL_SEGUNDOS > 0 and CACHE_PAGINAS_SINCRONIZACAO_SEGUNDOS > 0:
+        tarefas.append(asyncio.create_task(tarefa_sincronizar_paginas(CACHE_PAGINAS_SINCRONIZACAO_SEGUNDOS)))
+        logger.info(f"Cache de páginas sincronizado com o banco a cada {CACHE_PAGINAS_SINCRONIZACAO_SEGUNDOS}s")
+
+    if BACKUP_AUTOMATICO_INTERVALO_HORAS > 0:
+        tarefas.append(asyncio.create_task(
+            tarefa_backup_agendado(BACKUP_AUTOMATICO_HORARIO, BACKUP_AUTOMATICO_INTERVALO_HORAS)
+        ))
+        logger.info(
+            f"Backup automático a partir de {BACKUP_AUTOMATICO_HORARIO}, "
+            f"a cada {BACKUP_AUTOMATICO_INTERVALO_HORAS}h"
+        )
+
+    yield
+
+    for tarefa in tarefas:
+        tarefa.cancel()
+    await asyncio.gather(*tarefas, return_exceptions=True)
+    # Gravar visualizações ainda em memória antes de fechar as conexões
+    contador_visualizacoes.gravar()
+    servico_hash_senha.encerrar()
+    executor_repositorios.encerrar()
+    encerrar_processamento_fotos()
+    fechar_pools_rate_limit()
+    fechar_pool()
+
+
 # Criar aplicação FastAPI
-app = FastAPI(title=APP_NAME, version=VERSION)
+app = FastAPI(title=APP_NAME, version=VERSION, lifespan=lifespan)
 
 # Configurar SessionMiddleware
 app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY)
@@ -72,7 +138,7 @@ logger.info("Exception handlers registrados")
 # Montar arquivos estáticos
 static_path = Path("static")
 if static_path.exists():
-    app.mount("/static", StaticFiles(directory="static"), name="static")
+    app.mount("/static", ArquivosEstaticos(directory="static"), name="static")
     logger.info("Arquivos estáticos montados em /static")
 
 # Definir repositórios e nomes das tabelas
@@ -116,6 +182,9 @@ try:
 except sqlite3.Error as e:
     logger.error(f"Erro ao migrar configurações para banco: {e}", exc_info=True)
 
+# Pré-carregar configurações (leituras seguintes não consultam o banco)
+logger.info(f"{config.carregar_todas()} configurações carregadas no cache")
+
 # Definir routers e suas configurações
 # IMPORTANTE: public_router e examples_router devem ser incluídos por último
 ROUTERS = [
@@ -141,10 +210,25 @@ for router, tags, nome in ROUTERS:
 
 @app.get("/health")
 async def health_check():
-    """Endpoint de health check"""
+    """Endpoint de health check (liveness, público)"""
     return {"status": "healthy"}
 
 
+@app.get("/health/detalhes")
+@requer_autenticacao([Perfil.ADMIN.value])
+async def health_detalhes(request: Request, usuario_logado: Optional[UsuarioLogado] = None):
+    """Métricas do pool, dos caches e do backup agendado (apenas administradores)"""
+    return {
+        "status": "healthy",
+        "banco": obter_estatisticas_pool(),
+        "consultas": executor_repositorios.obter_estatisticas(),
+        "cache_paginas": cache_paginas.obter_estatisticas(),
+        "cache_configuracoes": config.obter_estatisticas(),
+        "hash_senha": servico_hash_senha.obter_estatisticas(),
+        "backup_agendado": obter_estatisticas_backup_agendado(),
+    }
+
+
 if __name__ == "__main__":
     logger.info("=" * 60)
     logger.info(f"Iniciando {APP_NAME} v{VERSION}")
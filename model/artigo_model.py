@@ -27,3 +27,5 @@ class Artigo:
     # Campos do JOIN (para exibição)
     usuario_nome: Optional[str] = None
     categoria_nome: Optional[str] = None
+    # Trecho destacado (HTML) retornado pela busca textual
+    trecho: Optional[str] = None
@@ -0,0 +1,31 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from model.chat_mensagem_model import ChatMensagem
+
+
+@dataclass
+class ChatConversa:
+    """
+    Representa uma conversa na listagem do chat, do ponto de vista de um usuário.
+
+    Agrega dados da sala, do outro participante, da última mensagem
+    e do contador de mensagens não lidas.
+
+    Attributes:
+        sala_id: ID da sala de chat
+        ultima_atividade: Timestamp da última atividade na sala
+        outro_usuario_id: ID do outro participante da sala
+        outro_usuario_nome: Nome do outro participante
+        outro_usuario_email: Email do outro participante
+        nao_lidas: Número de mensagens não lidas pelo usuário
+        ultima_mensagem: Última mensagem enviada na sala (None se não houver)
+    """
+    sala_id: str
+    ultima_atividade: Optional[datetime]
+    outro_usuario_id: int
+    outro_usuario_nome: str
+    outro_usuario_email: str
+    nao_lidas: int = 0
+    ultima_mensagem: Optional[ChatMensagem] = None
@@ -12,7 +12,9 @@ class ChatParticipante:
         sala_id: ID da sala de chat
         usuario_id: ID do usuário participante
         ultima_leitura: Timestamp da última vez que o usuário leu mensagens
+        qtde_nao_lidas: Contador desnormalizado de mensagens não lidas na sala
     """
     sala_id: str
     usuario_id: int
     ultima_leitura: Optional[datetime] = None
+    qtde_nao_lidas: int = 0
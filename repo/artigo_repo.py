@@ -1,7 +1,20 @@
+import re
+from datetime import datetime
 from typing import Optional
+
+from markupsafe import escape
+
 from model.artigo_model import Artigo
 from sql.artigo_sql import *
-from util.db_util import obter_conexao
+from util.cache_paginas import cache_paginas
+from util.db_util import obter_conexao, adaptar_datetime
+
+# Tamanho máximo de página aceito pelas listagens paginadas
+LIMITE_MAXIMO_PAGINA = 50
+
+# Marcadores de destaque usados em snippet() (ver BUSCAR_TEXTO)
+_MARCADOR_INICIO = "\x02"
+_MARCADOR_FIM = "\x03"
 
 
 def _row_to_artigo(row) -> Artigo:
@@ -22,60 +35,168 @@ def _row_to_artigo(row) -> Artigo:
         data_publicacao=row["data_publicacao"],
         usuario_nome=row["usuario_nome"],
         categoria_nome=row["categoria_nome"],
+        trecho=_formatar_trecho(row["trecho"]) if "trecho" in row.keys() else None,
     )
 
 
+def _formatar_trecho(trecho: Optional[str]) -> Optional[str]:
+    """
+    Escapa o trecho retornado pela busca e converte os marcadores em <mark>.
+    """
+    if not trecho:
+        return None
+    html = str(escape(trecho))
+    return html.replace(_MARCADOR_INICIO, "<mark>").replace(_MARCADOR_FIM, "</mark>")
+
+
+def _montar_consulta_busca(termo: str) -> Optional[str]:
+    """
+    Converte o termo digitado em uma consulta FTS5 segura.
+
+    Cada palavra vira um prefixo entre aspas ("palavra"*), todas obrigatórias.
+    Operadores e aspas do usuário são descartados para evitar erros de sintaxe.
+
+    Returns:
+        Consulta MATCH ou None se o termo não tiver palavras
+    """
+    palavras = re.findall(r"\w+", termo or "")
+    if not palavras:
+        return None
+    return " ".join(f'"{palavra}"*' for palavra in palavras)
+
+
+def _gerar_cursor(artigo: Artigo) -> str:
+    """
+    Gera o cursor de paginação (data_publicacao|id) a partir do último artigo da página.
+
+    A data volta ao formato armazenado no banco (UTC) para a comparação no SQL.
+    """
+    data = artigo.data_publicacao
+    if isinstance(data, datetime):
+        data = adaptar_datetime(data)
+    return f"{data}|{artigo.id}"
+
+
+def _ler_cursor(cursor: str) -> Optional[tuple[str, int]]:
+    """
+    Lê um cursor gerado por _gerar_cursor.
+
+    Returns:
+        Tupla (data_publicacao, id) ou None se o cursor for inválido
+    """
+    try:
+        data, id_texto = cursor.rsplit("|", 1)
+        datetime.fromisoformat(data)
+        return data, int(id_texto)
+    except (ValueError, AttributeError):
+        return None
+
+
+def _paginar(rows, limite: int) -> tuple[list[Artigo], Optional[str]]:
+    """
+    Converte as linhas de uma página (buscadas com limite + 1) em artigos.
+
+    Returns:
+        Tupla (artigos, cursor da próxima página ou None se for a última)
+    """
+    artigos = [_row_to_artigo(row) for row in rows[:limite]]
+    proximo = _gerar_cursor(artigos[-1]) if len(rows) > limite else None
+    return artigos, proximo
+
+
 def criar_tabela() -> bool:
-    """Cria a tabela de artigos se não existir."""
+    """
+    Cria a tabela de artigos, o índice de busca textual e a versão do
+    conteúdo público (com seus gatilhos) se não existirem.
+
+    Quando o índice é criado em um banco que já tem artigos, ele é populado.
+    Deve ser chamada depois da criação das tabelas usuario e categoria.
+    """
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
+
+        cursor.execute(VERIFICAR_TABELA_BUSCA_EXISTE)
+        indice_existia = cursor.fetchone() is not None
+        cursor.execute(CRIAR_TABELA_BUSCA)
+        cursor.execute(CRIAR_TRIGGER_BUSCA_INSERIR)
+        cursor.execute(CRIAR_TRIGGER_BUSCA_EXCLUIR)
+        cursor.execute(CRIAR_TRIGGER_BUSCA_ALTERAR)
+        if not indice_existia:
+            cursor.execute(RECONSTRUIR_INDICE_BUSCA)
+
+        cursor.execute(PREENCHER_DATA_PUBLICACAO)
+
+        cursor.execute(CRIAR_TABELA_VERSAO_CONTEUDO)
+        cursor.execute(INICIALIZAR_VERSAO_CONTEUDO)
+        for gatilho in CRIAR_GATILHOS_VERSAO_CONTEUDO:
+            cursor.execute(gatilho)
         return True
 
 
+def reconstruir_indice_busca() -> bool:
+    """Reconstrói o índice de busca textual a partir da tabela artigo."""
+    try:
+        with obter_conexao() as conn:
+            cursor = conn.cursor()
+            cursor.execute(RECONSTRUIR_INDICE_BUSCA)
+            return True
+    except Exception as e:
+        print(f"Erro ao reconstruir índice de busca: {e}")
+        return False
+
+
 def inserir(artigo: Artigo) -> Optional[int]:
-    """Insere um novo artigo e retorna o ID gerado."""
+    """Insere um novo artigo e retorna o ID gerado. Invalida o cache de páginas."""
     try:
         with obter_conexao() as conn:
             cursor = conn.cursor()
             cursor.execute(INSERIR, (artigo.titulo, artigo.resumo, artigo.conteudo, artigo.status, artigo.usuario_id, artigo.categoria_id))
-            return cursor.lastrowid
+            artigo_id = cursor.lastrowid
+        cache_paginas.invalidar()
+        return artigo_id
     except Exception as e:
         print(f"Erro ao inserir artigo: {e}")
         return None
 
 
 def alterar(artigo: Artigo) -> bool:
-    """Atualiza um artigo existente."""
+    """Atualiza um artigo existente. Invalida o cache de páginas."""
     try:
         with obter_conexao() as conn:
             cursor = conn.cursor()
             cursor.execute(ALTERAR, (artigo.titulo, artigo.resumo, artigo.conteudo, artigo.status, artigo.categoria_id, artigo.id))
-            return cursor.rowcount > 0
+            alterado = cursor.rowcount > 0
+        cache_paginas.invalidar()
+        return alterado
     except Exception as e:
         print(f"Erro ao alterar artigo: {e}")
         return False
 
 
 def alterar_status(id: int, status: str) -> bool:
-    """Atualiza apenas o status de um artigo."""
+    """Atualiza apenas o status de um artigo. Invalida o cache de páginas."""
     try:
         with obter_conexao() as conn:
             cursor = conn.cursor()
             cursor.execute(ALTERAR_STATUS, (status, id))
-            return cursor.rowcount > 0
+            alterado = cursor.rowcount > 0
+        cache_paginas.invalidar()
+        return alterado
     except Exception as e:
         print(f"Erro ao alterar status do artigo: {e}")
         return False
 
 
 def excluir(id: int) -> bool:
-    """Exclui um artigo pelo ID."""
+    """Exclui um artigo pelo ID. Invalida o cache de páginas."""
     try:
         with obter_conexao() as conn:
             cursor = conn.cursor()
             cursor.execute(EXCLUIR, (id,))
-            return cursor.rowcount > 0
+            excluido = cursor.rowcount > 0
+        cache_paginas.invalidar()
+        return excluido
     except Exception as e:
         print(f"Erro ao excluir artigo: {e}")
         return False
@@ -122,17 +243,36 @@ def obter_por_usuario(usuario_id: int) -> list[Artigo]:
         return []
 
 
-def obter_publicados() -> list[Artigo]:
-    """Retorna todos os artigos publicados."""
+def obter_publicados_paginado(
+    limite: int = 10,
+    cursor: Optional[str] = None
+) -> tuple[list[Artigo], Optional[str]]:
+    """
+    Retorna uma página de artigos publicados, dos mais recentes para os mais antigos.
+
+    Usa paginação por cursor em (data_publicacao, id): o custo não cresce
+    com o número da página. Os artigos trazem só um trecho do conteúdo.
+
+    Args:
+        limite: Artigos por página (limitado a LIMITE_MAXIMO_PAGINA)
+        cursor: Cursor devolvido pela página anterior (None para a primeira)
+
+    Returns:
+        Tupla (artigos, cursor da próxima página ou None se for a última)
+    """
+    limite = max(1, min(limite, LIMITE_MAXIMO_PAGINA))
+    posicao = _ler_cursor(cursor) if cursor else None
     try:
         with obter_conexao() as conn:
-            cursor = conn.cursor()
-            cursor.execute(OBTER_PUBLICADOS)
-            rows = cursor.fetchall()
-            return [_row_to_artigo(row) for row in rows]
+            cursor_db = conn.cursor()
+            if posicao:
+                cursor_db.execute(OBTER_PUBLICADOS_PAGINA_APOS, (*posicao, limite + 1))
+            else:
+                cursor_db.execute(OBTER_PUBLICADOS_PAGINA, (limite + 1,))
+            return _paginar(cursor_db.fetchall(), limite)
     except Exception as e:
         print(f"Erro ao obter artigos publicados: {e}")
-        return []
+        return [], None
 
 
 def obter_ultimos_publicados(limite: int = 6) -> list[Artigo]:
@@ -148,30 +288,69 @@ def obter_ultimos_publicados(limite: int = 6) -> list[Artigo]:
         return []
 
 
-def buscar_por_titulo(termo: str) -> list[Artigo]:
-    """Busca artigos publicados pelo título."""
+def buscar(termo: str, limite: int = 10, offset: int = 0) -> list[Artigo]:
+    """
+    Busca artigos publicados por titulo, resumo e conteudo.
+
+    Os resultados vêm ordenados por relevância e trazem o trecho
+    com os termos encontrados destacados em Artigo.trecho.
+    """
+    consulta = _montar_consulta_busca(termo)
+    if not consulta:
+        return []
     try:
         with obter_conexao() as conn:
             cursor = conn.cursor()
-            cursor.execute(BUSCAR_POR_TITULO, (f"%{termo}%",))
+            cursor.execute(BUSCAR_TEXTO, (consulta, limite, offset))
             rows = cursor.fetchall()
             return [_row_to_artigo(row) for row in rows]
     except Exception as e:
-        print(f"Erro ao buscar artigos por título: {e}")
+        print(f"Erro ao buscar artigos: {e}")
         return []
 
 
-def obter_por_categoria(categoria_id: int) -> list[Artigo]:
-    """Retorna artigos publicados de uma categoria específica."""
+def contar_busca(termo: str) -> int:
+    """Retorna a quantidade de artigos publicados encontrados para o termo."""
+    consulta = _montar_consulta_busca(termo)
+    if not consulta:
+        return 0
     try:
         with obter_conexao() as conn:
             cursor = conn.cursor()
-            cursor.execute(OBTER_POR_CATEGORIA, (categoria_id,))
-            rows = cursor.fetchall()
-            return [_row_to_artigo(row) for row in rows]
+            cursor.execute(CONTAR_BUSCA_TEXTO, (consulta,))
+            row = cursor.fetchone()
+            return row["quantidade"] if row else 0
+    except Exception as e:
+        print(f"Erro ao contar resultados da busca: {e}")
+        return 0
+
+
+def obter_por_categoria_paginado(
+    categoria_id: int,
+    limite: int = 10,
+    cursor: Optional[str] = None
+) -> tuple[list[Artigo], Optional[str]]:
+    """
+    Retorna uma página de artigos publicados de uma categoria.
+
+    Mesma paginação por cursor de obter_publicados_paginado.
+
+    Returns:
+        Tupla (artigos, cursor da próxima página ou None se for a última)
+    """
+    limite = max(1, min(limite, LIMITE_MAXIMO_PAGINA))
+    posicao = _ler_cursor(cursor) if cursor else None
+    try:
+        with obter_conexao() as conn:
+            cursor_db = conn.cursor()
+            if posicao:
+                cursor_db.execute(OBTER_POR_CATEGORIA_PAGINA_APOS, (categoria_id, *posicao, limite + 1))
+            else:
+                cursor_db.execute(OBTER_POR_CATEGORIA_PAGINA, (categoria_id, limite + 1))
+            return _paginar(cursor_db.fetchall(), limite)
     except Exception as e:
         print(f"Erro ao obter artigos por categoria: {e}")
-        return []
+        return [], None
 
 
 def incrementar_visualizacoes(id: int) -> bool:
@@ -186,6 +365,87 @@ def incrementar_visualizacoes(id: int) -> bool:
         return False
 
 
+def somar_visualizacoes(contagens: dict[int, int]) -> bool:
+    """
+    Soma visualizações de vários artigos em uma única transação.
+
+    Args:
+        contagens: Dicionário artigo_id -> visualizações a somar
+
+    Returns:
+        True se gravado com sucesso, False caso contrário
+    """
+    try:
+        with obter_conexao() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                SOMAR_VISUALIZACOES,
+                [(quantidade, artigo_id) for artigo_id, quantidade in contagens.items()]
+            )
+            return True
+    except Exception as e:
+        print(f"Erro ao somar visualizações: {e}")
+        return False
+
+
+def obter_versao_publicado(id: int) -> Optional[tuple[datetime, Optional[datetime], Optional[datetime]]]:
+    """
+    Retorna a versão de um artigo publicado, usada nos validadores HTTP.
+
+    Além do artigo, a página exibe o nome do autor e da categoria, então as
+    datas de modificação deles também fazem parte da versão.
+
+    Returns:
+        Tupla (última modificação do artigo, do autor, da categoria) ou None
+        se o artigo não existe ou não está publicado
+    """
+    try:
+        with obter_conexao() as conn:
+            cursor = conn.cursor()
+            cursor.execute(OBTER_VERSAO_PUBLICADO, (id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            return row["ultima_modificacao"], row["modificacao_autor"], row["modificacao_categoria"]
+    except Exception as e:
+        print(f"Erro ao obter versão do artigo: {e}")
+        return None
+
+
+def obter_versao() -> tuple[Optional[datetime], int]:
+    """
+    Retorna a versão do conjunto de artigos: (data da última modificação, quantidade).
+
+    Muda sempre que um artigo é inserido, alterado, publicado/pausado ou excluído.
+    """
+    try:
+        with obter_conexao() as conn:
+            cursor = conn.cursor()
+            cursor.execute(OBTER_VERSAO_ARTIGOS)
+            row = cursor.fetchone()
+            return row["ultima_modificacao"], row["quantidade"]
+    except Exception as e:
+        print(f"Erro ao obter versão dos artigos: {e}")
+        return None, 0
+
+
+def obter_versao_conteudo() -> int:
+    """
+    Obtém a versão atual do conteúdo público no banco.
+
+    A versão é incrementada por gatilhos a cada alteração em artigos,
+    categorias ou nomes de autores, inclusive por outros processos (workers).
+
+    Returns:
+        Número da versão (0 se a tabela de versão não foi inicializada)
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_VERSAO_CONTEUDO)
+        row = cursor.fetchone()
+        return row["versao"] if row else 0
+
+
 def obter_quantidade() -> int:
     """Retorna a quantidade total de artigos."""
     try:
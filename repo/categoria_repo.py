@@ -1,6 +1,8 @@
+from datetime import datetime
 from typing import Optional
 from model.categoria_model import Categoria
 from sql.categoria_sql import *
+from util.cache_paginas import cache_paginas
 from util.db_util import obter_conexao
 
 
@@ -30,6 +32,7 @@ def criar_tabela():
 def inserir(categoria: Categoria) -> Optional[Categoria]:
     """
     Insere uma nova categoria no banco de dados.
+    Invalida o cache de páginas públicas.
 
     Returns:
         Categoria com ID preenchido se sucesso, None se erro
@@ -39,7 +42,8 @@ def inserir(categoria: Categoria) -> Optional[Categoria]:
             cursor = conn.cursor()
             cursor.execute(INSERIR, (categoria.nome, categoria.descricao))
             categoria.id = cursor.lastrowid
-            return categoria
+        cache_paginas.invalidar()
+        return categoria
     except Exception as e:
         print(f"Erro ao inserir categoria: {e}")
         return None
@@ -48,12 +52,15 @@ def inserir(categoria: Categoria) -> Optional[Categoria]:
 def alterar(categoria: Categoria) -> bool:
     """
     Atualiza uma categoria existente.
+    Invalida o cache de páginas públicas.
     """
     try:
         with obter_conexao() as conn:
             cursor = conn.cursor()
             cursor.execute(ALTERAR, (categoria.nome, categoria.descricao, categoria.id))
-            return cursor.rowcount > 0
+            alterado = cursor.rowcount > 0
+        cache_paginas.invalidar()
+        return alterado
     except Exception as e:
         print(f"Erro ao alterar categoria: {e}")
         return False
@@ -62,12 +69,15 @@ def alterar(categoria: Categoria) -> bool:
 def excluir(id: int) -> bool:
     """
     Exclui uma categoria do banco de dados.
+    Invalida o cache de páginas públicas.
     """
     try:
         with obter_conexao() as conn:
             cursor = conn.cursor()
             cursor.execute(EXCLUIR, (id,))
-            return cursor.rowcount > 0
+            excluido = cursor.rowcount > 0
+        cache_paginas.invalidar()
+        return excluido
 
     except Exception as e:
         print(f"Erro ao excluir categoria: {e}")
@@ -121,3 +131,18 @@ def obter_por_nome(nome: str) -> Optional[Categoria]:
     except Exception as e:
         print(f"Erro ao obter categoria por nome: {e}")
         return None
+
+
+def obter_versao() -> tuple[Optional[datetime], int]:
+    """
+    Retorna a versão do conjunto de categorias: (data da última modificação, quantidade).
+    """
+    try:
+        with obter_conexao() as conn:
+            cursor = conn.cursor()
+            cursor.execute(OBTER_VERSAO)
+            row = cursor.fetchone()
+            return row["ultima_modificacao"], row["quantidade"]
+    except Exception as e:
+        print(f"Erro ao obter versão das categorias: {e}")
+        return None, 0
@@ -13,8 +13,13 @@ from sql.chat_mensagem_sql import (
     CONTAR_POR_SALA,
     MARCAR_COMO_LIDAS,
     OBTER_ULTIMA_MENSAGEM_SALA,
+    LISTAR_APOS_ID_POR_USUARIO,
     EXCLUIR
 )
+from sql.chat_participante_sql import (
+    INCREMENTAR_NAO_LIDAS,
+    DECREMENTAR_NAO_LIDAS_MENSAGEM
+)
 from util.db_util import obter_conexao
 from util.datetime_util import agora
 
@@ -51,6 +56,8 @@ def inserir(sala_id: str, usuario_id: int, mensagem: str) -> ChatMensagem:
     """
     Insere uma nova mensagem em uma sala.
 
+    Incrementa, na mesma transação, o contador de não lidas dos demais participantes.
+
     Args:
         sala_id: ID da sala
         usuario_id: ID do usuário que enviou
@@ -65,6 +72,7 @@ def inserir(sala_id: str, usuario_id: int, mensagem: str) -> ChatMensagem:
         cursor = conn.cursor()
         cursor.execute(INSERIR, (sala_id, usuario_id, mensagem, data_envio, None))
         mensagem_id = cursor.lastrowid
+        cursor.execute(INCREMENTAR_NAO_LIDAS, (sala_id, usuario_id))
 
     return ChatMensagem(
         id=mensagem_id,
@@ -171,10 +179,34 @@ def obter_ultima_mensagem_sala(sala_id: str) -> Optional[ChatMensagem]:
         return None
 
 
+def listar_apos_id_por_usuario(usuario_id: int, ultimo_id: int, limite: int = 200) -> List[ChatMensagem]:
+    """
+    Lista mensagens de todas as salas do usuário com id maior que ultimo_id.
+
+    Usado para reenviar mensagens perdidas quando o stream SSE reconecta.
+
+    Args:
+        usuario_id: ID do usuário
+        ultimo_id: ID da última mensagem recebida pelo cliente
+        limite: Quantidade máxima de mensagens
+
+    Returns:
+        Lista de mensagens em ordem crescente de id
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LISTAR_APOS_ID_POR_USUARIO, (usuario_id, ultimo_id, limite))
+        rows = cursor.fetchall()
+        return [_row_to_mensagem(row) for row in rows]
+
+
 def excluir(mensagem_id: int) -> bool:
     """
     Exclui uma mensagem.
 
+    Se a mensagem ainda não havia sido lida por algum participante,
+    o contador de não lidas dele é decrementado.
+
     Args:
         mensagem_id: ID da mensagem
 
@@ -183,5 +215,6 @@ def excluir(mensagem_id: int) -> bool:
     """
     with obter_conexao() as conn:
         cursor = conn.cursor()
+        cursor.execute(DECREMENTAR_NAO_LIDAS_MENSAGEM, (mensagem_id,))
         cursor.execute(EXCLUIR, (mensagem_id,))
         return cursor.rowcount > 0
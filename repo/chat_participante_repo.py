@@ -7,16 +7,22 @@ from sqlite3 import Row
 from model.chat_participante_model import ChatParticipante
 from sql.chat_participante_sql import (
     CRIAR_TABELA,
+    OBTER_COLUNAS,
+    ADICIONAR_COLUNA_QTDE_NAO_LIDAS,
     INSERIR,
     OBTER_POR_SALA_E_USUARIO,
     LISTAR_POR_SALA,
     LISTAR_POR_USUARIO,
     ATUALIZAR_ULTIMA_LEITURA,
     CONTAR_MENSAGENS_NAO_LIDAS,
+    CONTAR_NAO_LIDAS_TOTAL,
+    RECONSTRUIR_NAO_LIDAS,
+    LISTAR_NAO_LIDAS_INCONSISTENTES,
     EXCLUIR
 )
 from util.db_util import obter_conexao
 from util.datetime_util import agora
+from util.logger_config import logger
 
 
 def _row_to_participante(row: Row) -> ChatParticipante:
@@ -29,16 +35,29 @@ def _row_to_participante(row: Row) -> ChatParticipante:
     return ChatParticipante(
         sala_id=row["sala_id"],
         usuario_id=row["usuario_id"],
-        ultima_leitura=ultima_leitura
+        ultima_leitura=ultima_leitura,
+        qtde_nao_lidas=row["qtde_nao_lidas"] if "qtde_nao_lidas" in row.keys() else 0
     )
 
 
 def criar_tabela():
-    """Cria a tabela chat_participante se não existir."""
+    """
+    Cria a tabela chat_participante se não existir.
+
+    Em bancos criados antes do contador desnormalizado de não lidas,
+    adiciona a coluna qtde_nao_lidas e reconstrói os contadores.
+    """
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
 
+        cursor.execute(OBTER_COLUNAS)
+        colunas = [row["name"] for row in cursor.fetchall()]
+        if "qtde_nao_lidas" not in colunas:
+            cursor.execute(ADICIONAR_COLUNA_QTDE_NAO_LIDAS)
+            cursor.execute(RECONSTRUIR_NAO_LIDAS)
+            logger.info("Coluna chat_participante.qtde_nao_lidas adicionada e contadores reconstruídos")
+
 
 def adicionar_participante(sala_id: str, usuario_id: int) -> ChatParticipante:
     """
@@ -140,6 +159,8 @@ def contar_mensagens_nao_lidas(sala_id: str, usuario_id: int) -> int:
     """
     Conta quantas mensagens não lidas existem para um usuário em uma sala.
 
+    Lê o contador desnormalizado mantido em chat_participante.
+
     Args:
         sala_id: ID da sala
         usuario_id: ID do usuário
@@ -149,13 +170,64 @@ def contar_mensagens_nao_lidas(sala_id: str, usuario_id: int) -> int:
     """
     with obter_conexao() as conn:
         cursor = conn.cursor()
-        # Passar usuario_id 3 vezes: para sala_id, usuario_id != ?, e duas vezes na subquery
-        cursor.execute(CONTAR_MENSAGENS_NAO_LIDAS, (sala_id, usuario_id, usuario_id, usuario_id))
+        cursor.execute(CONTAR_MENSAGENS_NAO_LIDAS, (sala_id, usuario_id))
+        row = cursor.fetchone()
+
+        return row["total"] if row else 0
+
+
+def contar_nao_lidas_total(usuario_id: int) -> int:
+    """
+    Soma as mensagens não lidas de um usuário em todas as suas salas.
+
+    Args:
+        usuario_id: ID do usuário
+
+    Returns:
+        Total de mensagens não lidas
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CONTAR_NAO_LIDAS_TOTAL, (usuario_id,))
         row = cursor.fetchone()
 
         return row["total"] if row else 0
 
 
+def listar_nao_lidas_inconsistentes() -> List[dict]:
+    """
+    Verifica a consistência dos contadores de não lidas.
+
+    Compara o contador armazenado com o valor recalculado a partir das mensagens.
+
+    Returns:
+        Lista de dicts {sala_id, usuario_id, qtde_nao_lidas, qtde_calculada}
+        para cada participante com contador divergente
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LISTAR_NAO_LIDAS_INCONSISTENTES)
+        rows = cursor.fetchall()
+
+        return [dict(row) for row in rows]
+
+
+def reconstruir_contadores_nao_lidas() -> int:
+    """
+    Recalcula todos os contadores de não lidas a partir das mensagens.
+
+    Returns:
+        Número de participantes cujo contador estava divergente
+    """
+    inconsistentes = listar_nao_lidas_inconsistentes()
+
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(RECONSTRUIR_NAO_LIDAS)
+
+    return len(inconsistentes)
+
+
 def excluir(sala_id: str, usuario_id: int) -> bool:
     """
     Remove um participante de uma sala.
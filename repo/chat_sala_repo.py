@@ -1,15 +1,18 @@
 """
 Repositório para operações com a tabela chat_sala.
 """
-from typing import Optional
+from typing import Optional, List
 from sqlite3 import Row
 
 from model.chat_sala_model import ChatSala
+from model.chat_conversa_model import ChatConversa
+from model.chat_mensagem_model import ChatMensagem
 from sql.chat_sala_sql import (
     CRIAR_TABELA,
     INSERIR,
     OBTER_POR_ID,
     ATUALIZAR_ULTIMA_ATIVIDADE,
+    LISTAR_CONVERSAS_POR_USUARIO,
     EXCLUIR
 )
 from util.db_util import obter_conexao
@@ -34,6 +37,30 @@ def _row_to_sala(row: Row) -> ChatSala:
     )
 
 
+def _row_to_conversa(row: Row) -> ChatConversa:
+    """Converte uma row da listagem de conversas em objeto ChatConversa."""
+    ultima_mensagem = None
+    if row["mensagem_id"] is not None:
+        ultima_mensagem = ChatMensagem(
+            id=row["mensagem_id"],
+            sala_id=row["sala_id"],
+            usuario_id=row["mensagem_usuario_id"],
+            mensagem=row["mensagem"],
+            data_envio=row["data_envio"],
+            lida_em=row["lida_em"]
+        )
+
+    return ChatConversa(
+        sala_id=row["sala_id"],
+        ultima_atividade=row["ultima_atividade"],
+        outro_usuario_id=row["outro_usuario_id"],
+        outro_usuario_nome=row["outro_usuario_nome"],
+        outro_usuario_email=row["outro_usuario_email"],
+        nao_lidas=row["nao_lidas"],
+        ultima_mensagem=ultima_mensagem
+    )
+
+
 def criar_tabela():
     """Cria a tabela chat_sala se não existir."""
     with obter_conexao() as conn:
@@ -133,6 +160,29 @@ def atualizar_ultima_atividade(sala_id: str) -> bool:
         return cursor.rowcount > 0
 
 
+def listar_conversas_por_usuario(usuario_id: int, limit: int = 12, offset: int = 0) -> List[ChatConversa]:
+    """
+    Lista as conversas de um usuário com paginação, em uma única query.
+
+    Cada conversa traz o outro participante, a última mensagem e o número
+    de mensagens não lidas. Salas sem outro participante são ignoradas.
+
+    Args:
+        usuario_id: ID do usuário
+        limit: Número máximo de conversas a retornar
+        offset: Número de conversas a pular (para paginação)
+
+    Returns:
+        Lista de objetos ChatConversa (ordenadas por última atividade - mais recentes primeiro)
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LISTAR_CONVERSAS_POR_USUARIO, (usuario_id, limit, offset))
+        rows = cursor.fetchall()
+
+        return [_row_to_conversa(row) for row in rows]
+
+
 def excluir(sala_id: str) -> bool:
     """
     Exclui uma sala (cascade deleta participantes e mensagens).
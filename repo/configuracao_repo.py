@@ -1,3 +1,4 @@
+import json
 import sqlite3
 from typing import Optional
 from model.configuracao_model import Configuracao
@@ -6,7 +7,14 @@ from sql.configuracao_sql import (
     INSERIR,
     OBTER_POR_CHAVE,
     OBTER_TODOS,
+    OBTER_POR_CHAVES,
     ATUALIZAR,
+    CRIAR_TABELA_VERSAO,
+    INICIALIZAR_VERSAO,
+    CRIAR_GATILHO_VERSAO_INSERIR,
+    CRIAR_GATILHO_VERSAO_ATUALIZAR,
+    CRIAR_GATILHO_VERSAO_EXCLUIR,
+    OBTER_VERSAO,
 )
 from util.db_util import obter_conexao
 from util.logger_config import logger
@@ -34,9 +42,31 @@ def criar_tabela() -> bool:
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
+        cursor.execute(CRIAR_TABELA_VERSAO)
+        cursor.execute(INICIALIZAR_VERSAO)
+        cursor.execute(CRIAR_GATILHO_VERSAO_INSERIR)
+        cursor.execute(CRIAR_GATILHO_VERSAO_ATUALIZAR)
+        cursor.execute(CRIAR_GATILHO_VERSAO_EXCLUIR)
         return True
 
 
+def obter_versao() -> int:
+    """
+    Obtém a versão atual das configurações no banco.
+
+    A versão é incrementada por gatilhos a cada alteração na tabela
+    configuracao, inclusive por outros processos (workers).
+
+    Returns:
+        Número da versão (0 se a tabela de versão não foi inicializada)
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_VERSAO)
+        row = cursor.fetchone()
+        return row["versao"] if row else 0
+
+
 def obter_por_chave(chave: str) -> Optional[Configuracao]:
     with obter_conexao() as conn:
         cursor = conn.cursor()
@@ -94,7 +124,7 @@ def obter_por_categoria() -> dict[str, list[Configuracao]]:
 
 def obter_multiplas(chaves: list[str]) -> dict[str, Optional[Configuracao]]:
     """
-    Obtém múltiplas configurações de uma vez.
+    Obtém múltiplas configurações de uma vez (em uma única query).
 
     Args:
         chaves: Lista de chaves a buscar
@@ -102,9 +132,14 @@ def obter_multiplas(chaves: list[str]) -> dict[str, Optional[Configuracao]]:
     Returns:
         Dicionário {chave: Configuracao ou None}
     """
-    resultado = {}
-    for chave in chaves:
-        resultado[chave] = obter_por_chave(chave)
+    resultado: dict[str, Optional[Configuracao]] = dict.fromkeys(chaves)
+    if not chaves:
+        return resultado
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_POR_CHAVES, (json.dumps(list(chaves)),))
+        for row in cursor.fetchall():
+            resultado[row["chave"]] = _row_to_configuracao(row)
     return resultado
 
 
@@ -19,7 +19,7 @@ from sql.usuario_sql import (
     BUSCAR_POR_TERMO,
 )
 from util.db_util import obter_conexao
-from util.foto_util import criar_foto_padrao_usuario
+from util.foto_util import remover_foto_usuario
 
 
 def _row_to_usuario(row: sqlite3.Row) -> Usuario:
@@ -61,13 +61,8 @@ def inserir(usuario: Usuario) -> Optional[int]:
             usuario.senha,
             usuario.perfil
         ))
-        usuario_id = cursor.lastrowid
-
-        # Criar foto padrão para o novo usuário
-        if usuario_id:
-            criar_foto_padrao_usuario(usuario_id)
-
-        return usuario_id
+        # Sem foto própria, o usuário exibe a foto padrão compartilhada
+        return cursor.lastrowid
 
 
 def alterar(usuario: Usuario) -> bool:
@@ -93,7 +88,11 @@ def excluir(id: int) -> bool:
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(EXCLUIR, (id,))
-        return cursor.rowcount > 0
+        excluido = cursor.rowcount > 0
+
+    if excluido:
+        remover_foto_usuario(id)
+    return excluido
 
 
 def obter_por_id(id: int) -> Optional[Usuario]:
@@ -3,6 +3,7 @@ Rotas administrativas para gerenciamento de backups do banco de dados.
 
 Permite ao administrador criar, listar, restaurar e excluir backups do banco SQLite.
 """
+import asyncio
 from typing import Optional
 from fastapi import APIRouter, Request, status
 from fastapi.responses import RedirectResponse, FileResponse
@@ -71,19 +72,20 @@ async def post_criar(request: Request, usuario_logado: Optional[UsuarioLogado] =
     """
     Cria um novo backup do banco de dados
 
-    Copia o arquivo database.db para backups/ com timestamp no nome.
+    Copia o banco em uso para backups/ com timestamp no nome. A cópia roda em
+    thread separada para não bloquear as demais requisições.
     """
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_backups_limiter.verificar(ip):
+    if not await admin_backups_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações de backup. Aguarde alguns minutos e tente novamente.")
         return RedirectResponse("/admin/backups/listar", status_code=status.HTTP_303_SEE_OTHER)
 
-    # Criar backup
-    sucesso, mensagem = backup_util.criar_backup()
+    # Criar backup (fora do event loop)
+    sucesso, mensagem = await asyncio.to_thread(backup_util.criar_backup)
 
     if sucesso:
         logger.info(f"Backup criado por admin {usuario_logado.id}: {mensagem}")
@@ -109,7 +111,7 @@ async def post_restaurar(
     Restaura um backup do banco de dados
 
     IMPORTANTE: Esta operação sobrescreve o banco de dados atual!
-    Um backup automático do estado atual é criado antes da restauração.
+    Um backup de segurança do estado atual é criado antes da restauração.
 
     Args:
         nome_arquivo: Nome do arquivo de backup a restaurar
@@ -119,7 +121,7 @@ async def post_restaurar(
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_backups_limiter.verificar(ip):
+    if not await admin_backups_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações de backup. Aguarde alguns minutos e tente novamente.")
         return RedirectResponse("/admin/backups/listar", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -128,8 +130,9 @@ async def post_restaurar(
         f"Admin {usuario_logado.id} iniciou restauração de backup: {nome_arquivo}"
     )
 
-    # Restaurar backup (com backup automático do estado atual)
-    sucesso, mensagem, nome_backup_automatico = backup_util.restaurar_backup(
+    # Restaurar backup (com backup de segurança do estado atual)
+    sucesso, mensagem, nome_backup_automatico = await asyncio.to_thread(
+        backup_util.restaurar_backup,
         nome_arquivo,
         criar_backup_antes=True
     )
@@ -179,7 +182,7 @@ async def post_excluir(
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_backups_limiter.verificar(ip):
+    if not await admin_backups_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações de backup. Aguarde alguns minutos e tente novamente.")
         return RedirectResponse("/admin/backups/listar", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -220,7 +223,7 @@ async def get_download(
 
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not backup_download_limiter.verificar(ip):
+    if not await backup_download_limiter.verificar_async(ip):
         informar_erro(
             request,
             "Muitas tentativas de download. Aguarde alguns minutos.",
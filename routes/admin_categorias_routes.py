@@ -11,6 +11,7 @@ from model.usuario_logado_model import UsuarioLogado
 
 # Repositório
 from repo import categoria_repo
+from util.db_util import executar_repo
 
 # Utilitários
 from util.auth_decorator import requer_autenticacao
@@ -63,7 +64,7 @@ async def listar(
     """
     Lista todas as categorias.
     """
-    categorias = categoria_repo.obter_todos()
+    categorias = await executar_repo(categoria_repo.obter_todos)
 
     return templates.TemplateResponse(
         "admin/categorias/listar.html",
@@ -99,14 +100,14 @@ async def post_cadastrar(
     """
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_categorias_limiter.verificar(ip):
+    if not await admin_categorias_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações. Aguarde um momento e tente novamente.")
         return RedirectResponse("/admin/categorias/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     try:
         dto = CriarCategoriaDTO(nome=nome, descricao=descricao)
         categoria = Categoria(nome=dto.nome, descricao=dto.descricao)
-        resultado = categoria_repo.inserir(categoria)
+        resultado = await executar_repo(categoria_repo.inserir, categoria)
         if not resultado:
             informar_erro(request, "Erro ao salvar categoria.")
             return templates.TemplateResponse(
@@ -136,7 +137,7 @@ async def get_editar(
     """
     Exibe o formulário de edição de uma categoria.
     """
-    categoria = categoria_repo.obter_por_id(id)
+    categoria = await executar_repo(categoria_repo.obter_por_id, id)
 
     if not categoria:
         informar_erro(request, "Categoria não encontrada.")
@@ -162,11 +163,11 @@ async def post_editar(
     """
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_categorias_limiter.verificar(ip):
+    if not await admin_categorias_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações. Aguarde um momento e tente novamente.")
         return RedirectResponse("/admin/categorias/listar", status_code=status.HTTP_303_SEE_OTHER)
 
-    categoria = categoria_repo.obter_por_id(id)
+    categoria = await executar_repo(categoria_repo.obter_por_id, id)
     if not categoria:
         informar_erro(request, "Categoria não encontrada.")
         return RedirectResponse("/admin/categorias/listar", status_code=status.HTTP_303_SEE_OTHER)
@@ -175,7 +176,7 @@ async def post_editar(
         dto = AlterarCategoriaDTO(nome=nome, descricao=descricao)
         categoria.nome = dto.nome
         categoria.descricao = dto.descricao
-        sucesso = categoria_repo.alterar(categoria)
+        sucesso = await executar_repo(categoria_repo.alterar, categoria)
         if not sucesso:
             informar_erro(request, "Erro ao alterar categoria.")
             return templates.TemplateResponse(
@@ -207,11 +208,11 @@ async def post_excluir(
     """
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_categorias_limiter.verificar(ip):
+    if not await admin_categorias_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações. Aguarde um momento e tente novamente.")
         return RedirectResponse("/admin/categorias/listar", status_code=status.HTTP_303_SEE_OTHER)
 
-    sucesso = categoria_repo.excluir(id)
+    sucesso = await executar_repo(categoria_repo.excluir, id)
     if sucesso:
         informar_sucesso(request, "Categoria excluída com sucesso.")
     else:
@@ -31,6 +31,7 @@ from model.usuario_logado_model import UsuarioLogado
 
 # Repositories
 from repo import chamado_repo, chamado_interacao_repo
+from util.db_util import executar_repo
 
 # Utilities
 from util.auth_decorator import requer_autenticacao
@@ -70,7 +71,7 @@ async def listar(request: Request, usuario_logado: Optional[UsuarioLogado] = Non
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
     # Passa ID do admin para contar apenas mensagens de OUTROS usuários
-    chamados = chamado_repo.obter_todos(usuario_logado.id)
+    chamados = await executar_repo(chamado_repo.obter_todos, usuario_logado.id)
     return templates.TemplateResponse(
         "admin/chamados/listar.html",
         {"request": request, "chamados": chamados, "usuario_logado": usuario_logado}
@@ -86,7 +87,7 @@ async def get_responder(request: Request, id: int, usuario_logado: Optional[Usua
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await executar_repo(chamado_repo.obter_por_id, id),
         request,
         "Chamado não encontrado",
         "/admin/chamados/listar"
@@ -95,10 +96,10 @@ async def get_responder(request: Request, id: int, usuario_logado: Optional[Usua
         return chamado
 
     # Marcar mensagens como lidas (apenas as de outros usuários)
-    chamado_interacao_repo.marcar_como_lidas(id, usuario_logado.id)
+    await executar_repo(chamado_interacao_repo.marcar_como_lidas, id, usuario_logado.id)
 
     # Obter histórico de interações
-    interacoes = chamado_interacao_repo.obter_por_chamado(id)
+    interacoes = await executar_repo(chamado_interacao_repo.obter_por_chamado, id)
 
     return templates.TemplateResponse(
         "admin/chamados/responder.html",
@@ -121,7 +122,7 @@ async def post_responder(
 
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not admin_chamado_responder_limiter.verificar(ip):
+    if not await admin_chamado_responder_limiter.verificar_async(ip):
         informar_erro(
             request,
             "Muitas tentativas de resposta. Aguarde alguns minutos.",
@@ -131,7 +132,7 @@ async def post_responder(
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await executar_repo(chamado_repo.obter_por_id, id),
         request,
         "Chamado não encontrado",
         "/admin/chamados/listar"
@@ -140,7 +141,7 @@ async def post_responder(
         return chamado
 
     # Obter interações para reexibir em caso de erro
-    interacoes = chamado_interacao_repo.obter_por_chamado(id)
+    interacoes = await executar_repo(chamado_interacao_repo.obter_por_chamado, id)
 
     # Armazena os dados do formulário para reexibição em caso de erro
     dados_formulario: dict = {
@@ -165,11 +166,12 @@ async def post_responder(
             data_interacao=agora(),
             status_resultante=dto_status.status
         )
-        chamado_interacao_repo.inserir(interacao)
+        await executar_repo(chamado_interacao_repo.inserir, interacao)
 
         # Atualizar status do chamado
         fechar = (dto_status.status == StatusChamado.FECHADO.value)
-        sucesso = chamado_repo.atualizar_status(
+        sucesso = await executar_repo(
+            chamado_repo.atualizar_status,
             id=id,
             status=dto_status.status,
             fechar=fechar
@@ -203,7 +205,7 @@ async def fechar(request: Request, id: int, usuario_logado: Optional[UsuarioLoga
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await executar_repo(chamado_repo.obter_por_id, id),
         request,
         "Chamado não encontrado",
         "/admin/chamados/listar"
@@ -211,7 +213,8 @@ async def fechar(request: Request, id: int, usuario_logado: Optional[UsuarioLoga
     if isinstance(chamado, RedirectResponse):
         return chamado
 
-    sucesso = chamado_repo.atualizar_status(
+    sucesso = await executar_repo(
+        chamado_repo.atualizar_status,
         id=id,
         status=StatusChamado.FECHADO.value,
         fechar=True
@@ -235,7 +238,7 @@ async def reabrir(request: Request, id: int, usuario_logado: Optional[UsuarioLog
 
     # Obter chamado ou retornar 404
     chamado = obter_ou_404(
-        chamado_repo.obter_por_id(id),
+        await executar_repo(chamado_repo.obter_por_id, id),
         request,
         "Chamado não encontrado",
         "/admin/chamados/listar"
@@ -248,7 +251,8 @@ async def reabrir(request: Request, id: int, usuario_logado: Optional[UsuarioLog
         informar_erro(request, "Apenas chamados fechados podem ser reabertos")
         return RedirectResponse("/admin/chamados/listar", status_code=status.HTTP_303_SEE_OTHER)
 
-    sucesso = chamado_repo.atualizar_status(
+    sucesso = await executar_repo(
+        chamado_repo.atualizar_status,
         id=id,
         status=StatusChamado.EM_ANALISE.value,
         fechar=False
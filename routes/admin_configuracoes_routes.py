@@ -3,8 +3,10 @@
 # =============================================================================
 
 # Standard library
+import asyncio
 import shutil
 import sqlite3
+from datetime import date, timedelta
 from pathlib import Path
 from typing import Optional
 
@@ -21,12 +23,14 @@ from model.usuario_logado_model import UsuarioLogado
 
 # Repositories
 from repo import configuracao_repo
+from util.db_util import executar_repo
 
 # Utilities
 from util.auth_decorator import requer_autenticacao
 from util.config_cache import config
 from util.datetime_util import agora
 from util.flash_messages import informar_sucesso, informar_erro, informar_aviso
+from util.log_busca import FiltroLog, MAX_DIAS_BUSCA, NIVEIS_LOG, buscar_logs
 from util.logger_config import logger
 from util.perfis import Perfil
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
@@ -74,7 +78,7 @@ async def get_listar_configuracoes(request: Request, usuario_logado: Optional[Us
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
     try:
         # Obter configurações agrupadas por categoria
-        configs_por_categoria = configuracao_repo.obter_por_categoria()
+        configs_por_categoria = await executar_repo(configuracao_repo.obter_por_categoria)
 
         # Calcular total de configurações
         total_configs = sum(len(configs) for configs in configs_por_categoria.values())
@@ -125,7 +129,7 @@ async def post_salvar_lote_configuracoes(
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_config_limiter.verificar(ip):
+    if not await admin_config_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações. Aguarde um momento e tente novamente.")
         return RedirectResponse("/admin/configuracoes", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -147,7 +151,9 @@ async def post_salvar_lote_configuracoes(
         dto = SalvarConfiguracaoLoteDTO(configs=configs)
 
         # Atualizar configurações no banco
-        quantidade_atualizada, chaves_nao_encontradas = configuracao_repo.atualizar_multiplas(dto.configs)
+        quantidade_atualizada, chaves_nao_encontradas = await executar_repo(
+            configuracao_repo.atualizar_multiplas, dto.configs
+        )
 
         # Limpar cache de configurações
         config.limpar()
@@ -214,7 +220,7 @@ async def get_tema(request: Request, usuario_logado: Optional[UsuarioLogado] = N
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
     # Obter tema atual do banco de dados
-    config_tema = configuracao_repo.obter_por_chave("theme")
+    config_tema = await executar_repo(configuracao_repo.obter_por_chave, "theme")
     tema_atual = config_tema.valor if config_tema else "original"
 
     # Listar todos os arquivos PNG na pasta de imagens dos temas
@@ -263,13 +269,13 @@ async def post_aplicar_tema(
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_config_limiter.verificar(ip):
+    if not await admin_config_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações. Aguarde um momento e tente novamente.")
         return RedirectResponse("/admin/tema", status_code=status.HTTP_303_SEE_OTHER)
 
     try:
         # Obter tema anterior para o log
-        config_existente = configuracao_repo.obter_por_chave("theme")
+        config_existente = await executar_repo(configuracao_repo.obter_por_chave, "theme")
 
         # Validar tema contra whitelist (prevenção de Path Traversal)
         tema_normalizado = tema.lower().strip()
@@ -293,7 +299,8 @@ async def post_aplicar_tema(
         shutil.copy2(css_origem, css_destino)
 
         # Atualizar ou inserir configuração no banco (upsert)
-        sucesso = configuracao_repo.inserir_ou_atualizar(
+        sucesso = await executar_repo(
+            configuracao_repo.inserir_ou_atualizar,
             chave="theme",
             valor=tema_normalizado,
             descricao="Tema visual da aplicação (Bootswatch)"
@@ -309,7 +316,8 @@ async def post_aplicar_tema(
             )
             informar_sucesso(
                 request,
-                f"Tema '{tema_normalizado.capitalize()}' aplicado com sucesso! Recarregue a página para ver as mudanças."
+                f"Tema '{tema_normalizado.capitalize()}' aplicado com sucesso! "
+                "Recarregue a página para ver as mudanças."
             )
         else:
             logger.error(f"Erro ao salvar configuração de tema '{tema_normalizado}' no banco de dados")
@@ -323,54 +331,54 @@ async def post_aplicar_tema(
     return RedirectResponse("/admin/tema", status_code=status.HTTP_303_SEE_OTHER)
 
 
-def _ler_log_arquivo(data: str, nivel: str) -> tuple[str, int, Optional[str]]:
+def _montar_filtro_log(
+    data: str,
+    data_fim: str,
+    nivel: str,
+    hora_inicio: str,
+    hora_fim: str,
+    texto: str,
+    usuario_id: str,
+) -> tuple[Optional[FiltroLog], Optional[str]]:
     """
-    Lê arquivo de log e filtra por nível
-
-    Args:
-        data: Data no formato YYYY-MM-DD
-        nivel: Nível de log (INFO, WARNING, ERROR, DEBUG, CRITICAL, TODOS)
+    Valida os campos do formulário de auditoria e monta o filtro de busca
 
     Returns:
-        Tupla (conteúdo_filtrado, total_linhas, mensagem_erro)
+        Tupla (filtro, mensagem_erro)
     """
     try:
-        # Converter data para formato do arquivo (YYYY.MM.DD)
-        data_formatada = data.replace('-', '.')
-        arquivo_log = Path(f"logs/app.{data_formatada}.log")
-
-        # Verificar se arquivo existe
-        if not arquivo_log.exists():
-            return "", 0, f"Nenhum arquivo de log encontrado para a data {data}."
-
-        # Verificar tamanho do arquivo (limite de 10MB para performance)
-        tamanho_mb = arquivo_log.stat().st_size / (1024 * 1024)
-        if tamanho_mb > 10:
-            logger.warning(f"Arquivo de log muito grande ({tamanho_mb:.2f} MB): {arquivo_log}")
-            msg = f"Arquivo de log muito grande ({tamanho_mb:.2f} MB). Use ferramentas externas."
-            return "", 0, msg
-
-        # Ler arquivo
-        with open(arquivo_log, 'r', encoding='utf-8') as f:
-            linhas = f.readlines()
-
-        # Filtrar por nível se não for "TODOS"
-        if nivel != "TODOS":
-            linhas_filtradas = [
-                linha for linha in linhas
-                if f" - {nivel} - " in linha
-            ]
-        else:
-            linhas_filtradas = linhas
+        data_inicio = date.fromisoformat(data)
+        data_final = date.fromisoformat(data_fim) if data_fim else data_inicio
+    except ValueError:
+        return None, "Data inválida. Use o formato AAAA-MM-DD."
 
-        conteudo = ''.join(linhas_filtradas)
-        total = len(linhas_filtradas)
+    if data_final < data_inicio:
+        return None, "A data final deve ser igual ou posterior à data inicial."
+    if data_final - data_inicio >= timedelta(days=MAX_DIAS_BUSCA):
+        return None, f"O período de busca deve ter no máximo {MAX_DIAS_BUSCA} dias."
 
-        return conteudo, total, None
+    if nivel != "TODOS" and nivel not in NIVEIS_LOG:
+        return None, "Nível de log inválido."
 
-    except OSError as e:
-        logger.error(f"Erro ao ler arquivo de log: {str(e)}")
-        return "", 0, f"Erro ao ler arquivo de log: {str(e)}"
+    try:
+        hora_ini = int(hora_inicio) if hora_inicio else 0
+        hora_fin = int(hora_fim) if hora_fim else 23
+        usuario = int(usuario_id) if usuario_id else None
+    except ValueError:
+        return None, "Hora e ID de usuário devem ser números inteiros."
+
+    if not (0 <= hora_ini <= hora_fin <= 23):
+        return None, "Intervalo de horas inválido (0 a 23)."
+
+    return FiltroLog(
+        data_inicio=data_inicio,
+        data_fim=data_final,
+        nivel=nivel,
+        hora_inicio=hora_ini,
+        hora_fim=hora_fin,
+        texto=texto.strip(),
+        usuario_id=usuario,
+    ), None
 
 
 @router.get("/auditoria")
@@ -399,31 +407,55 @@ async def post_filtrar_auditoria(
     request: Request,
     data: str = Form(...),
     nivel: str = Form(...),
+    data_fim: str = Form(""),
+    hora_inicio: str = Form(""),
+    hora_fim: str = Form(""),
+    texto: str = Form(""),
+    usuario_id: str = Form(""),
+    cursor: str = Form(""),
     usuario_logado: Optional[UsuarioLogado] = None
 ):
     """
-    Filtra logs do sistema por data e nível
+    Busca nos logs do sistema por período, nível, horário, texto e usuário
+
+    A leitura dos arquivos é feita em fluxo e paginada (ver util/log_busca.py).
 
     Args:
-        data: Data no formato YYYY-MM-DD
+        data: Data inicial no formato YYYY-MM-DD
         nivel: Nível de log (INFO, WARNING, ERROR, DEBUG, CRITICAL, TODOS)
+        data_fim: Data final (opcional, padrão: data inicial)
+        hora_inicio: Hora inicial 0-23 (opcional)
+        hora_fim: Hora final 0-23 (opcional)
+        texto: Trecho a procurar, sem diferenciar maiúsculas (opcional)
+        usuario_id: ID do usuário mencionado na entrada (opcional)
+        cursor: Posição da próxima página (opcional)
     """
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_config_limiter.verificar(ip):
+    if not await admin_config_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações. Aguarde um momento e tente novamente.")
         return RedirectResponse("/admin/auditoria", status_code=status.HTTP_303_SEE_OTHER)
 
-    # Ler e filtrar logs
-    logs, total_linhas, mensagem_erro = _ler_log_arquivo(data, nivel)
+    filtro, mensagem_erro = _montar_filtro_log(data, data_fim, nivel, hora_inicio, hora_fim, texto, usuario_id)
+
+    logs = ""
+    total_linhas = 0
+    proximo_cursor = None
+    if filtro:
+        # Ler e filtrar logs (I/O em thread separada)
+        resultado = await asyncio.to_thread(buscar_logs, filtro, cursor or None)
+        logs = "".join(resultado.entradas)
+        total_linhas = len(resultado.entradas)
+        proximo_cursor = resultado.proximo_cursor
+        mensagem_erro = resultado.mensagem_erro
 
     # Log da ação de auditoria
     logger.info(
         f"Auditoria de logs realizada por admin {usuario_logado.id} - "
-        f"Data: {data}, Nível: {nivel}, Linhas encontradas: {total_linhas}"
+        f"Data: {data} a {data_fim or data}, Nível: {nivel}, Entradas encontradas: {total_linhas}"
     )
 
     return templates.TemplateResponse(
@@ -431,9 +463,16 @@ async def post_filtrar_auditoria(
         {
             "request": request,
             "data_selecionada": data,
+            "data_fim_selecionada": data_fim,
             "nivel_selecionado": nivel,
+            "hora_inicio": hora_inicio,
+            "hora_fim": hora_fim,
+            "texto": texto,
+            "usuario_id": usuario_id,
             "logs": logs,
             "total_linhas": total_linhas,
+            "proximo_cursor": proximo_cursor,
+            "pagina_seguinte": bool(cursor),
             "mensagem_erro": mensagem_erro,
             "usuario_logado": usuario_logado,
         }
@@ -19,6 +19,7 @@ from model.usuario_logado_model import UsuarioLogado
 
 # Repositories
 from repo import usuario_repo
+from util.db_util import executar_repo
 
 # Utilities
 from util.auth_decorator import requer_autenticacao
@@ -28,7 +29,7 @@ from util.logger_config import logger
 from util.perfis import Perfil
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 from util.repository_helpers import obter_ou_404
-from util.security import criar_hash_senha
+from util.security import criar_hash_senha_async
 from util.template_util import criar_templates
 from util.validation_helpers import verificar_email_disponivel
 
@@ -67,7 +68,7 @@ async def listar(request: Request, usuario_logado: Optional[UsuarioLogado] = Non
     """Lista todos os usuários do sistema"""
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
-    usuarios = usuario_repo.obter_todos()
+    usuarios = await executar_repo(usuario_repo.obter_todos)
     return templates.TemplateResponse(
         "admin/usuarios/listar.html",
         {"request": request, "usuarios": usuarios, "usuario_logado": usuario_logado}
@@ -103,7 +104,7 @@ async def post_cadastrar(
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_usuarios_limiter.verificar(ip):
+    if not await admin_usuarios_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações. Aguarde um momento e tente novamente.")
         return RedirectResponse("/admin/usuarios/listar", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -135,7 +136,7 @@ async def post_cadastrar(
             )
 
         # Criar hash da senha
-        senha_hash = criar_hash_senha(dto.senha)
+        senha_hash = await criar_hash_senha_async(dto.senha)
 
         # Criar usuário
         usuario = Usuario(
@@ -146,7 +147,7 @@ async def post_cadastrar(
             perfil=dto.perfil
         )
 
-        usuario_repo.inserir(usuario)
+        await executar_repo(usuario_repo.inserir, usuario)
         logger.info(f"Usuário '{dto.email}' cadastrado por admin {usuario_logado.id}")
 
         informar_sucesso(request, "Usuário cadastrado com sucesso!")
@@ -171,7 +172,7 @@ async def get_editar(request: Request, id: int, usuario_logado: Optional[Usuario
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
     # Obter usuário ou retornar 404
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(id),
+        await executar_repo(usuario_repo.obter_por_id, id),
         request,
         "Usuário não encontrado",
         "/admin/usuarios/listar"
@@ -212,13 +213,13 @@ async def post_editar(
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_usuarios_limiter.verificar(ip):
+    if not await admin_usuarios_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações. Aguarde um momento e tente novamente.")
         return RedirectResponse("/admin/usuarios/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     # Obter usuário ou retornar 404
     usuario_atual = obter_ou_404(
-        usuario_repo.obter_por_id(id),
+        await executar_repo(usuario_repo.obter_por_id, id),
         request,
         "Usuário não encontrado",
         "/admin/usuarios/listar"
@@ -263,7 +264,7 @@ async def post_editar(
             perfil=dto.perfil
         )
 
-        usuario_repo.alterar(usuario_atualizado)
+        await executar_repo(usuario_repo.alterar, usuario_atualizado)
         logger.info(f"Usuário {id} alterado por admin {usuario_logado.id}")
 
         informar_sucesso(request, "Usuário alterado com sucesso!")
@@ -272,7 +273,7 @@ async def post_editar(
     except ValidationError as e:
         # Adicionar perfis e usuario aos dados para renderizar o template
         dados_formulario["perfis"] = Perfil.valores()
-        dados_formulario["usuario"] = usuario_repo.obter_por_id(id)
+        dados_formulario["usuario"] = await executar_repo(usuario_repo.obter_por_id, id)
         raise ErroValidacaoFormulario(
             validation_error=e,
             template_path="admin/usuarios/editar.html",
@@ -290,13 +291,13 @@ async def post_excluir(request: Request, id: int, usuario_logado: Optional[Usuar
 
     # Rate limiting
     ip = obter_identificador_cliente(request)
-    if not admin_usuarios_limiter.verificar(ip):
+    if not await admin_usuarios_limiter.verificar_async(ip):
         informar_erro(request, "Muitas operações. Aguarde um momento e tente novamente.")
         return RedirectResponse("/admin/usuarios/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     # Obter usuário ou retornar 404
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(id),
+        await executar_repo(usuario_repo.obter_por_id, id),
         request,
         "Usuário não encontrado",
         "/admin/usuarios/listar"
@@ -310,7 +311,7 @@ async def post_excluir(request: Request, id: int, usuario_logado: Optional[Usuar
         logger.warning(f"Admin {usuario_logado.id} tentou excluir a si mesmo")
         return RedirectResponse("/admin/usuarios/listar", status_code=status.HTTP_303_SEE_OTHER)
 
-    usuario_repo.excluir(id)
+    await executar_repo(usuario_repo.excluir, id)
     logger.info(f"Usuário {id} ({usuario.email}) excluído por admin {usuario_logado.id}")
     informar_sucesso(request, "Usuário excluído com sucesso!")
     return RedirectResponse("/admin/usuarios/listar", status_code=status.HTTP_303_SEE_OTHER)
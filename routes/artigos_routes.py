@@ -12,13 +12,24 @@ from model.usuario_logado_model import UsuarioLogado
 
 # Repositórios
 from repo import artigo_repo, categoria_repo
+from util.db_util import executar_repo
 
 # Utilitários
 from util.auth_decorator import requer_autenticacao
+from util.config import VISUALIZACOES_DEDUP_SESSAO
 from util.flash_messages import informar_sucesso, informar_erro
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 from util.perfis import Perfil
 from util.template_util import criar_templates
+from util.visualizacoes_util import contador_visualizacoes, marcar_visto_na_sessao
+from util.cache_paginas import cache_paginas
+from util.cache_http import (
+    criar_validadores,
+    criar_validadores_listagem,
+    responder_nao_modificado,
+    aplicar_validadores,
+    obter_etag,
+)
 
 # ----------------------------------------------------------------------
 # Configurações do router e dos templates
@@ -35,6 +46,9 @@ artigos_limiter = DynamicRateLimiter(
     nome="artigos"
 )
 
+# Quantidade de resultados por página na busca textual
+RESULTADOS_POR_PAGINA = 10
+
 # ----------------------------------------------------------------------
 # Rotas PRIVADAS (Autores e Administradores)
 # ----------------------------------------------------------------------
@@ -50,12 +64,12 @@ async def meus_artigos(
     """
     # Verificar identificador para rate limiting
     identificador = obter_identificador_cliente(request)
-    if not artigos_limiter.verificar(identificador):
+    if not await artigos_limiter.verificar_async(identificador):
         informar_erro(request, "Muitas requisições. Tente novamente em alguns momentos.")
         return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
 
     # Obter artigos do usuário
-    artigos = artigo_repo.obter_por_usuario(usuario_logado.id)
+    artigos = await executar_repo(artigo_repo.obter_por_usuario, usuario_logado.id)
     
     return templates.TemplateResponse(
         request=request,
@@ -77,7 +91,7 @@ async def cadastrar_get(
     Formulário para criar novo artigo.
     """
     # Obter categorias para o select
-    categorias = categoria_repo.obter_todos()
+    categorias = await executar_repo(categoria_repo.obter_todos)
     
     return templates.TemplateResponse(
         request=request,
@@ -112,9 +126,9 @@ async def cadastrar_post(
         )
 
         # Verificar se o título já existe
-        if artigo_repo.titulo_existe(dto.titulo):
+        if await executar_repo(artigo_repo.titulo_existe, dto.titulo):
             informar_erro(request, "Este título já existe. Use um título diferente.")
-            categorias = categoria_repo.obter_todos()
+            categorias = await executar_repo(categoria_repo.obter_todos)
             return templates.TemplateResponse(
                 request=request,
                 name="artigos/cadastrar.html",
@@ -146,10 +160,10 @@ async def cadastrar_post(
         )
 
         # Inserir no banco
-        artigo_id = artigo_repo.inserir(artigo)
+        artigo_id = await executar_repo(artigo_repo.inserir, artigo)
         if not artigo_id:
             informar_erro(request, "Erro ao criar o artigo. Tente novamente.")
-            categorias = categoria_repo.obter_todos()
+            categorias = await executar_repo(categoria_repo.obter_todos)
             return templates.TemplateResponse(
                 request=request,
                 name="artigos/cadastrar.html",
@@ -169,7 +183,7 @@ async def cadastrar_post(
     except ValidationError as e:
         erros = "; ".join([f"{erro['loc'][0]}: {erro['msg']}" for erro in e.errors()])
         informar_erro(request, f"Erro na validação: {erros}")
-        categorias = categoria_repo.obter_todos()
+        categorias = await executar_repo(categoria_repo.obter_todos)
         return templates.TemplateResponse(
             request=request,
             name="artigos/cadastrar.html",
@@ -195,7 +209,7 @@ async def editar_get(
     Formulário para editar um artigo.
     """
     # Obter artigo
-    artigo = artigo_repo.obter_por_id(id)
+    artigo = await executar_repo(artigo_repo.obter_por_id, id)
     if not artigo:
         informar_erro(request, "Artigo não encontrado.")
         return RedirectResponse(url="/artigos/meus", status_code=status.HTTP_303_SEE_OTHER)
@@ -206,7 +220,7 @@ async def editar_get(
         return RedirectResponse(url="/artigos/meus", status_code=status.HTTP_303_SEE_OTHER)
 
     # Obter categorias
-    categorias = categoria_repo.obter_todos()
+    categorias = await executar_repo(categoria_repo.obter_todos)
 
     return templates.TemplateResponse(
         request=request,
@@ -236,7 +250,7 @@ async def editar_post(
     """
     try:
         # Obter artigo
-        artigo = artigo_repo.obter_por_id(id)
+        artigo = await executar_repo(artigo_repo.obter_por_id, id)
         if not artigo:
             raise ErroValidacaoFormulario("Artigo não encontrado.")
 
@@ -254,7 +268,7 @@ async def editar_post(
         )
 
         # Verificar se o título já existe (excluindo este artigo)
-        if artigo_repo.titulo_existe(dto.titulo, excluir_id=id):
+        if await executar_repo(artigo_repo.titulo_existe, dto.titulo, excluir_id=id):
             raise ErroValidacaoFormulario("Este título já existe. Use um título diferente.")
 
         # Atualizar artigo
@@ -265,7 +279,7 @@ async def editar_post(
         artigo.status = dto.status
         artigo.data_atualizacao = datetime.now().isoformat()
 
-        if not artigo_repo.alterar(artigo):
+        if not await executar_repo(artigo_repo.alterar, artigo):
             raise ErroValidacaoFormulario("Erro ao atualizar o artigo. Tente novamente.")
 
         informar_sucesso(request, "Artigo atualizado com sucesso!")
@@ -274,8 +288,8 @@ async def editar_post(
     except ValidationError as e:
         erros = "; ".join([f"{erro['loc'][0]}: {erro['msg']}" for erro in e.errors()])
         informar_erro(request, f"Erro na validação: {erros}")
-        artigo = artigo_repo.obter_por_id(id)
-        categorias = categoria_repo.obter_todos()
+        artigo = await executar_repo(artigo_repo.obter_por_id, id)
+        categorias = await executar_repo(categoria_repo.obter_todos)
         return templates.TemplateResponse(
             request=request,
             name="artigos/editar.html",
@@ -291,8 +305,8 @@ async def editar_post(
         )
     except ErroValidacaoFormulario as e:
         informar_erro(request, str(e))
-        artigo = artigo_repo.obter_por_id(id)
-        categorias = categoria_repo.obter_todos()
+        artigo = await executar_repo(artigo_repo.obter_por_id, id)
+        categorias = await executar_repo(categoria_repo.obter_todos)
         return templates.TemplateResponse(
             request=request,
             name="artigos/editar.html",
@@ -316,7 +330,7 @@ async def excluir(
     Exclui um artigo.
     """
     # Obter artigo
-    artigo = artigo_repo.obter_por_id(id)
+    artigo = await executar_repo(artigo_repo.obter_por_id, id)
     if not artigo:
         informar_erro(request, "Artigo não encontrado.")
         return RedirectResponse(url="/artigos/meus", status_code=status.HTTP_303_SEE_OTHER)
@@ -327,7 +341,7 @@ async def excluir(
         return RedirectResponse(url="/artigos/meus", status_code=status.HTTP_303_SEE_OTHER)
 
     # Excluir
-    if not artigo_repo.excluir(id):
+    if not await executar_repo(artigo_repo.excluir, id):
         informar_erro(request, "Erro ao excluir o artigo. Tente novamente.")
         return RedirectResponse(url="/artigos/meus", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -346,7 +360,7 @@ async def publicar(
     Publica um artigo (muda status para 'Publicado' e define data_publicacao).
     """
     # Obter artigo
-    artigo = artigo_repo.obter_por_id(id)
+    artigo = await executar_repo(artigo_repo.obter_por_id, id)
     if not artigo:
         informar_erro(request, "Artigo não encontrado.")
         return RedirectResponse(url="/artigos/meus", status_code=status.HTTP_303_SEE_OTHER)
@@ -357,7 +371,7 @@ async def publicar(
         return RedirectResponse(url="/artigos/meus", status_code=status.HTTP_303_SEE_OTHER)
 
     # Atualizar status
-    if not artigo_repo.alterar_status(id, StatusArtigo.PUBLICADO.value):
+    if not await executar_repo(artigo_repo.alterar_status, id, StatusArtigo.PUBLICADO.value):
         informar_erro(request, "Erro ao publicar o artigo. Tente novamente.")
         return RedirectResponse(url="/artigos/meus", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -376,7 +390,7 @@ async def pausar(
     Pausa um artigo publicado (muda status para 'Pausado').
     """
     # Obter artigo
-    artigo = artigo_repo.obter_por_id(id)
+    artigo = await executar_repo(artigo_repo.obter_por_id, id)
     if not artigo:
         informar_erro(request, "Artigo não encontrado.")
         return RedirectResponse(url="/artigos/meus", status_code=status.HTTP_303_SEE_OTHER)
@@ -387,7 +401,7 @@ async def pausar(
         return RedirectResponse(url="/artigos/meus", status_code=status.HTTP_303_SEE_OTHER)
 
     # Atualizar status
-    if not artigo_repo.alterar_status(id, StatusArtigo.PAUSADO.value):
+    if not await executar_repo(artigo_repo.alterar_status, id, StatusArtigo.PAUSADO.value):
         informar_erro(request, "Erro ao pausar o artigo. Tente novamente.")
         return RedirectResponse(url="/artigos/meus", status_code=status.HTTP_303_SEE_OTHER)
 
@@ -403,36 +417,79 @@ async def pausar(
 async def buscar(
     request: Request,
     termo: Optional[str] = None,
+    pagina: int = 1,
+    categoria: Optional[int] = None,
+    cursor: Optional[str] = None,
     usuario_logado: Optional[UsuarioLogado] = None,
 ):
     """
     Busca e lista artigos publicados (com busca opcional).
+
+    A busca usa o índice textual de titulo/resumo/conteudo, ordena por
+    relevância e é paginada por número de página. A listagem (geral ou por
+    categoria) é paginada por cursor.
     """
     # Verificar identificador para rate limiting
     identificador = obter_identificador_cliente(request)
-    if not artigos_limiter.verificar(identificador):
+    if not await artigos_limiter.verificar_async(identificador):
         informar_erro(request, "Muitas requisições. Tente novamente em alguns momentos.")
         return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
 
+    # GET condicional: 304 se o navegador já tem a versão atual
+    validadores = await criar_validadores_listagem(request)
+    nao_modificado = responder_nao_modificado(request, validadores)
+    if nao_modificado:
+        return nao_modificado
+
+    # Visitantes anônimos recebem a página em cache
+    resposta = cache_paginas.obter_resposta(request, obter_etag(validadores))
+    if resposta:
+        return aplicar_validadores(resposta, validadores)
+
     # Buscar artigos
+    pagina = max(pagina, 1)
+    total_paginas = 1
+    proximo_cursor = None
     if termo:
-        artigos = artigo_repo.buscar_por_titulo(termo)
+        total = await executar_repo(artigo_repo.contar_busca, termo)
+        total_paginas = max((total + RESULTADOS_POR_PAGINA - 1) // RESULTADOS_POR_PAGINA, 1)
+        artigos = await executar_repo(
+            artigo_repo.buscar,
+            termo,
+            limite=RESULTADOS_POR_PAGINA,
+            offset=(pagina - 1) * RESULTADOS_POR_PAGINA,
+        )
+    elif categoria:
+        artigos, proximo_cursor = await executar_repo(
+            artigo_repo.obter_por_categoria_paginado,
+            categoria, limite=RESULTADOS_POR_PAGINA, cursor=cursor
+        )
     else:
-        artigos = artigo_repo.obter_publicados()
+        artigos, proximo_cursor = await executar_repo(
+            artigo_repo.obter_publicados_paginado,
+            limite=RESULTADOS_POR_PAGINA, cursor=cursor
+        )
 
     # Obter categorias para filtro
-    categorias = categoria_repo.obter_todos()
+    categorias = await executar_repo(categoria_repo.obter_todos)
 
-    return templates.TemplateResponse(
+    resposta = templates.TemplateResponse(
         request=request,
         name="artigos/buscar.html",
         context={
             "artigos": artigos,
             "categorias": categorias,
             "termo": termo or "",
+            "pagina": pagina,
+            "total_paginas": total_paginas,
+            "categoria_id": categoria,
+            "proximo_cursor": proximo_cursor,
+            "primeira_pagina": not cursor,
             "usuario_logado": usuario_logado,
         },
     )
+    cache_paginas.guardar_resposta(request, resposta, obter_etag(validadores))
+    return aplicar_validadores(resposta, validadores)
 
 
 @router.get("/ler/{id}")
@@ -443,17 +500,36 @@ async def ler(
 ):
     """
     Exibe um artigo publicado e incrementa visualizações.
+
+    Responde 304 quando o navegador já tem a versão atual do artigo e, para
+    visitantes anônimos, serve a página do cache. Em ambos os casos a
+    visualização é contada (o número exibido pode ficar defasado).
     """
+    versao = await executar_repo(artigo_repo.obter_versao_publicado, id)
+    ultima_modificacao, modificacao_autor, modificacao_categoria = versao or (None, None, None)
+    validadores = criar_validadores(
+        request, ultima_modificacao, "artigo", id, modificacao_autor, modificacao_categoria
+    )
+    nao_modificado = responder_nao_modificado(request, validadores)
+    if nao_modificado:
+        _registrar_visualizacao(request, id)
+        return nao_modificado
+
+    resposta = cache_paginas.obter_resposta(request, obter_etag(validadores))
+    if resposta:
+        _registrar_visualizacao(request, id)
+        return aplicar_validadores(resposta, validadores)
+
     # Obter artigo
-    artigo = artigo_repo.obter_por_id(id)
+    artigo = await executar_repo(artigo_repo.obter_por_id, id)
     if not artigo or artigo.status != StatusArtigo.PUBLICADO.value:
         informar_erro(request, "Artigo não encontrado ou não está publicado.")
         return RedirectResponse(url="/artigos/", status_code=status.HTTP_303_SEE_OTHER)
 
-    # Incrementar visualizações
-    artigo_repo.incrementar_visualizacoes(id)
+    _registrar_visualizacao(request, id)
+    artigo.qtde_visualizacoes += contador_visualizacoes.pendentes(id)
 
-    return templates.TemplateResponse(
+    resposta = templates.TemplateResponse(
         request=request,
         name="artigos/ler.html",
         context={
@@ -461,3 +537,11 @@ async def ler(
             "usuario_logado": usuario_logado,
         },
     )
+    cache_paginas.guardar_resposta(request, resposta, obter_etag(validadores))
+    return aplicar_validadores(resposta, validadores)
+
+
+def _registrar_visualizacao(request: Request, id: int) -> None:
+    """Registra a visualização no contador em lote (sem escrita no banco aqui)."""
+    if not VISUALIZACOES_DEDUP_SESSAO or marcar_visto_na_sessao(request.session, id):
+        contador_visualizacoes.registrar(id)
@@ -18,6 +18,7 @@ from model.usuario_model import Usuario
 
 # Repositories
 from repo import usuario_repo
+from util.db_util import executar_repo
 
 # Utilities
 from util.auth_decorator import criar_sessao
@@ -28,8 +29,8 @@ from util.flash_messages import informar_sucesso, informar_erro
 from util.logger_config import logger
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 from util.security import (
-    criar_hash_senha,
-    verificar_senha,
+    criar_hash_senha_async,
+    verificar_senha_async,
     gerar_token_redefinicao,
     obter_data_expiracao_token,
 )
@@ -147,7 +148,7 @@ async def post_login(
     try:
         # Rate limiting por IP
         ip = obter_identificador_cliente(request)
-        if not login_limiter.verificar(ip):
+        if not await login_limiter.verificar_async(ip):
             informar_erro(
                 request, "Muitas tentativas de login. Aguarde alguns minutos."
             )
@@ -172,10 +173,10 @@ async def post_login(
         dto = LoginDTO(email=email, senha=senha)
 
         # Buscar usuário
-        usuario = usuario_repo.obter_por_email(dto.email)
+        usuario = await executar_repo(usuario_repo.obter_por_email, dto.email)
 
         # Verificar credenciais
-        if not usuario or not verificar_senha(dto.senha, usuario.senha):
+        if not usuario or not await verificar_senha_async(dto.senha, usuario.senha):
             informar_erro(request, "E-mail ou senha inválidos")
             logger.warning(f"Tentativa de login falhou para: {dto.email}")
             erros = {"geral": "E-mail ou senha inválidos"}
@@ -239,7 +240,7 @@ async def post_cadastrar(
     try:
         # Rate limiting por IP
         ip = obter_identificador_cliente(request)
-        if not cadastro_limiter.verificar(ip):
+        if not await cadastro_limiter.verificar_async(ip):
             informar_erro(
                 request,
                 f"Muitas tentativas de cadastro. Aguarde {cadastro_limiter.janela_minutos} minuto(s).",
@@ -272,12 +273,12 @@ async def post_cadastrar(
             id=0,
             nome=dto.nome,
             email=dto.email,
-            senha=criar_hash_senha(dto.senha),
+            senha=await criar_hash_senha_async(dto.senha),
             perfil=dto.perfil,
         )
 
         # Inserir no banco
-        usuario_id = usuario_repo.inserir(usuario)
+        usuario_id = await executar_repo(usuario_repo.inserir, usuario)
 
         if usuario_id:
             logger.info(f"Novo usuário cadastrado: {usuario.email}")
@@ -316,7 +317,7 @@ async def post_esqueci_senha(request: Request, email: str = Form()):
     try:
         # Rate limiting por IP
         ip = obter_identificador_cliente(request)
-        if not esqueci_senha_limiter.verificar(ip):
+        if not await esqueci_senha_limiter.verificar_async(ip):
             informar_erro(
                 request,
                 f"Muitas tentativas de recuperação de senha. Aguarde {esqueci_senha_limiter.janela_minutos} minuto(s).",
@@ -333,7 +334,7 @@ async def post_esqueci_senha(request: Request, email: str = Form()):
         dto = EsqueciSenhaDTO(email=email)
 
         # Buscar usuário
-        usuario = usuario_repo.obter_por_email(dto.email)
+        usuario = await executar_repo(usuario_repo.obter_por_email, dto.email)
 
         if usuario:
             # Gerar token de redefinição
@@ -341,7 +342,7 @@ async def post_esqueci_senha(request: Request, email: str = Form()):
             data_expiracao = obter_data_expiracao_token(horas=TOKEN_EXPIRACAO_HORAS)
 
             # Salvar token no banco
-            usuario_repo.atualizar_token(usuario.email, token, data_expiracao)
+            await executar_repo(usuario_repo.atualizar_token, usuario.email, token, data_expiracao)
 
             # Enviar e-mail com link de recuperação
             email_enviado = servico_email.enviar_recuperacao_senha(
@@ -375,7 +376,7 @@ async def post_esqueci_senha(request: Request, email: str = Form()):
 async def get_redefinir_senha(request: Request, token: str):
     """Exibe formulário de redefinição de senha"""
     # Validar token
-    usuario = usuario_repo.obter_por_token(token)
+    usuario = await executar_repo(usuario_repo.obter_por_token, token)
 
     if not usuario or not usuario.data_token:
         informar_erro(request, "Token inválido ou expirado")
@@ -420,7 +421,7 @@ async def post_redefinir_senha(
         )
 
         # Validar token e expiração
-        usuario = usuario_repo.obter_por_token(dto.token)
+        usuario = await executar_repo(usuario_repo.obter_por_token, dto.token)
 
         if not usuario or not usuario.data_token:
             informar_erro(request, "Token inválido")
@@ -444,11 +445,11 @@ async def post_redefinir_senha(
             )
 
         # Atualizar senha
-        senha_hash = criar_hash_senha(dto.senha)
-        usuario_repo.atualizar_senha(usuario.id, senha_hash)
+        senha_hash = await criar_hash_senha_async(dto.senha)
+        await executar_repo(usuario_repo.atualizar_senha, usuario.id, senha_hash)
 
         # Limpar token
-        usuario_repo.limpar_token(usuario.id)
+        await executar_repo(usuario_repo.limpar_token, usuario.id)
 
         logger.info(f"Senha redefinida com sucesso para usuário: {usuario.email}")
         informar_sucesso(
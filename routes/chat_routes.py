@@ -20,26 +20,35 @@ from pydantic import ValidationError
 from dtos.chat_dto import CriarSalaDTO, EnviarMensagemDTO
 
 # Models
+from model.chat_mensagem_model import ChatMensagem
 from model.usuario_logado_model import UsuarioLogado
 
 # Repositories
 from repo import chat_sala_repo, chat_participante_repo, chat_mensagem_repo, usuario_repo
+from util.db_util import executar_repo
 
 # Utilities
 from util.auth_decorator import requer_autenticacao
 from util.chat_manager import gerenciador_chat
+from util.config import CHAT_SSE_HEARTBEAT_SEGUNDOS, CHAT_SSE_MAX_REENVIO
 from util.datetime_util import agora
-from util.foto_util import obter_caminho_foto_usuario
-from util.logger_config import logger
+from util.foto_util import obter_caminho_avatar_usuario
+from util.logger_config import obter_logger
 from util.perfis import Perfil
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 
+logger = obter_logger(__name__)
+
 # =============================================================================
 # Configuração do Router
 # =============================================================================
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
+# Lado (px) com que o widget de chat exibe as fotos (static/js/widget-chat.js)
+TAMANHO_AVATAR_CONVERSA = 40
+TAMANHO_AVATAR_BUSCA = 32
+
 # =============================================================================
 # Rate Limiters
 # =============================================================================
@@ -74,39 +83,109 @@ chat_listagem_limiter = DynamicRateLimiter(
 )
 
 
+def _evento_nova_mensagem(mensagem: ChatMensagem) -> dict:
+    """Monta o evento SSE 'nova_mensagem' a partir de uma mensagem."""
+    return {
+        "tipo": "nova_mensagem",
+        "sala_id": mensagem.sala_id,
+        "mensagem": {
+            "id": mensagem.id,
+            "sala_id": mensagem.sala_id,
+            "usuario_id": mensagem.usuario_id,
+            "mensagem": mensagem.mensagem,
+            "data_envio": mensagem.data_envio.isoformat() if mensagem.data_envio else None,
+            "lida_em": None
+        }
+    }
+
+
+def _formatar_evento_sse(evento: dict) -> str:
+    """
+    Formata um evento como frame SSE.
+
+    Eventos de nova mensagem levam o id da mensagem no campo 'id', que o
+    navegador devolve no cabeçalho Last-Event-ID ao reconectar.
+    """
+    linhas = ""
+    if evento.get("tipo") == "nova_mensagem":
+        linhas += f"id: {evento['mensagem']['id']}\n"
+    return linhas + f"data: {json.dumps(evento)}\n\n"
+
+
+def _ler_last_event_id(request: Request) -> Optional[int]:
+    """Lê o cabeçalho Last-Event-ID (None se ausente ou inválido)."""
+    valor = request.headers.get("last-event-id")
+    try:
+        return int(valor) if valor else None
+    except ValueError:
+        return None
+
+
+async def _gerar_eventos_sse(request: Request, usuario_id: int, ultimo_id: Optional[int]):
+    """
+    Gerador do stream SSE de um usuário.
+
+    - Ao reconectar com Last-Event-ID, reenvia as mensagens perdidas.
+    - Cada escrita leva todos os eventos já disponíveis na fila.
+    - Em períodos sem eventos envia um comentário de heartbeat e encerra
+      se o cliente tiver desconectado.
+    """
+    # Conectar antes do reenvio: mensagens que chegarem durante a consulta ficam na fila
+    queue = await gerenciador_chat.conectar(usuario_id)
+    ids_reenviados: set[int] = set()
+    try:
+        if ultimo_id is not None:
+            perdidas = await executar_repo(
+                chat_mensagem_repo.listar_apos_id_por_usuario,
+                usuario_id, ultimo_id, CHAT_SSE_MAX_REENVIO
+            )
+            if perdidas:
+                ids_reenviados = {mensagem.id for mensagem in perdidas}
+                yield "".join(
+                    _formatar_evento_sse(_evento_nova_mensagem(mensagem)) for mensagem in perdidas
+                )
+
+        while True:
+            try:
+                evento = await asyncio.wait_for(queue.get(), timeout=CHAT_SSE_HEARTBEAT_SEGUNDOS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": heartbeat\n\n"
+                continue
+
+            # Drenar o que já estiver na fila para enviar tudo em uma escrita
+            eventos = [evento]
+            while not queue.empty():
+                eventos.append(queue.get_nowait())
+
+            frames = []
+            for evento in eventos:
+                if evento.get("tipo") == "nova_mensagem" and evento["mensagem"]["id"] in ids_reenviados:
+                    continue
+                frames.append(_formatar_evento_sse(evento))
+            if frames:
+                yield "".join(frames)
+    except asyncio.CancelledError:
+        logger.info("[SSE] Conexão cancelada para usuário %s", usuario_id)
+    finally:
+        # Desconectar ao fechar stream
+        await gerenciador_chat.desconectar(usuario_id)
+
+
 @router.get("/stream")
 @requer_autenticacao()
 async def stream_mensagens(request: Request, usuario_logado: Optional[UsuarioLogado] = None):
     """
     Endpoint SSE para receber mensagens em tempo real.
     Cada usuário mantém UMA conexão que recebe mensagens de TODAS as suas salas.
+    Suporta retomada via cabeçalho Last-Event-ID (id da última mensagem recebida).
     """
     if not usuario_logado:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Não autenticado")
-    usuario_id = usuario_logado.id
-
-    async def event_generator():
-        # Conectar usuário ao GerenciadorChat
-        queue = await gerenciador_chat.conectar(usuario_id)
-        try:
-            while True:
-                # Aguardar mensagem na fila
-                evento = await queue.get()
-
-                # Formatar como SSE
-                sse_data = f"data: {json.dumps(evento)}\n\n"
-                yield sse_data
-
-                # Pequeno delay para não sobrecarregar
-                await asyncio.sleep(0.1)
-        except asyncio.CancelledError:
-            logger.info(f"[SSE] Conexão cancelada para usuário {usuario_id}")
-        finally:
-            # Desconectar ao fechar stream
-            await gerenciador_chat.desconectar(usuario_id)
 
     return StreamingResponse(
-        event_generator(),
+        _gerar_eventos_sse(request, usuario_logado.id, _ler_last_event_id(request)),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -131,8 +210,8 @@ async def criar_ou_obter_sala(
 
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not chat_sala_limiter.verificar(ip):
-        logger.warning(f"Rate limit excedido para criação de sala de chat - IP: {ip}")
+    if not await chat_sala_limiter.verificar_async(ip):
+        logger.warning("Rate limit excedido para criação de sala de chat - IP: %s", ip)
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Muitas tentativas de criação de salas. Aguarde alguns minutos."
@@ -150,7 +229,7 @@ async def criar_ou_obter_sala(
             )
 
         # Verificar se outro usuário existe
-        outro_usuario = usuario_repo.obter_por_id(dto.outro_usuario_id)
+        outro_usuario = await executar_repo(usuario_repo.obter_por_id, dto.outro_usuario_id)
         if not outro_usuario:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -158,16 +237,18 @@ async def criar_ou_obter_sala(
             )
 
         # Criar ou obter sala
-        sala = chat_sala_repo.criar_ou_obter_sala(usuario_logado.id, dto.outro_usuario_id)
+        sala = await executar_repo(chat_sala_repo.criar_ou_obter_sala, usuario_logado.id, dto.outro_usuario_id)
 
         # Adicionar participantes se sala foi recém-criada
-        participante1 = chat_participante_repo.obter_por_sala_e_usuario(sala.id, usuario_logado.id)
+        participante1 = await executar_repo(chat_participante_repo.obter_por_sala_e_usuario, sala.id, usuario_logado.id)
         if not participante1:
-            chat_participante_repo.adicionar_participante(sala.id, usuario_logado.id)
+            await executar_repo(chat_participante_repo.adicionar_participante, sala.id, usuario_logado.id)
 
-        participante2 = chat_participante_repo.obter_por_sala_e_usuario(sala.id, dto.outro_usuario_id)
+        participante2 = await executar_repo(
+            chat_participante_repo.obter_por_sala_e_usuario, sala.id, dto.outro_usuario_id
+        )
         if not participante2:
-            chat_participante_repo.adicionar_participante(sala.id, dto.outro_usuario_id)
+            await executar_repo(chat_participante_repo.adicionar_participante, sala.id, dto.outro_usuario_id)
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -197,72 +278,42 @@ async def listar_conversas(
 
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not chat_listagem_limiter.verificar(ip):
-        logger.warning(f"Rate limit excedido para listagem de conversas - IP: {ip}")
+    if not await chat_listagem_limiter.verificar_async(ip):
+        logger.warning("Rate limit excedido para listagem de conversas - IP: %s", ip)
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Muitas requisições de listagem. Aguarde alguns minutos."
         )
 
-    usuario_id = usuario_logado.id
-
-    # Obter todas as participações do usuário
-    participacoes = chat_participante_repo.listar_por_usuario(usuario_id)
-
-    conversas = []
-    for participacao in participacoes:
-        sala = chat_sala_repo.obter_por_id(participacao.sala_id)
-        if not sala:
-            continue
-
-        # Obter o outro participante da sala
-        participantes = chat_participante_repo.listar_por_sala(sala.id)
-        outro_participante = next(
-            (p for p in participantes if p.usuario_id != usuario_id),
-            None
-        )
-
-        if not outro_participante:
-            continue
-
-        # Obter dados do outro usuário
-        outro_usuario = usuario_repo.obter_por_id(outro_participante.usuario_id)
-        if not outro_usuario:
-            continue
+    # Conversas já paginadas e ordenadas por última atividade (uma única query)
+    conversas = await executar_repo(chat_sala_repo.listar_conversas_por_usuario, usuario_logado.id, limit, offset)
 
-        # Obter última mensagem
-        ultima_mensagem = chat_mensagem_repo.obter_ultima_mensagem_sala(sala.id)
-
-        # Contar não lidas
-        nao_lidas = chat_participante_repo.contar_mensagens_nao_lidas(sala.id, usuario_id)
-
-        conversa = {
-            "sala_id": sala.id,
+    conversas_json = [
+        {
+            "sala_id": conversa.sala_id,
             "outro_usuario": {
-                "id": outro_usuario.id,
-                "nome": outro_usuario.nome,
-                "email": outro_usuario.email,
-                "foto_url": obter_caminho_foto_usuario(outro_usuario.id)
+                "id": conversa.outro_usuario_id,
+                "nome": conversa.outro_usuario_nome,
+                "email": conversa.outro_usuario_email,
+                "foto_url": obter_caminho_avatar_usuario(conversa.outro_usuario_id, TAMANHO_AVATAR_CONVERSA)
             },
             "ultima_mensagem": {
-                "mensagem": ultima_mensagem.mensagem,
-                "data_envio": ultima_mensagem.data_envio.isoformat() if ultima_mensagem.data_envio else None,
-                "usuario_id": ultima_mensagem.usuario_id
-            } if ultima_mensagem else None,
-            "nao_lidas": nao_lidas,
-            "ultima_atividade": sala.ultima_atividade.isoformat() if sala.ultima_atividade else ""
+                "mensagem": conversa.ultima_mensagem.mensagem,
+                "data_envio": (
+                    conversa.ultima_mensagem.data_envio.isoformat()
+                    if conversa.ultima_mensagem.data_envio else None
+                ),
+                "usuario_id": conversa.ultima_mensagem.usuario_id
+            } if conversa.ultima_mensagem else None,
+            "nao_lidas": conversa.nao_lidas,
+            "ultima_atividade": conversa.ultima_atividade.isoformat() if conversa.ultima_atividade else ""
         }
-        conversas.append(conversa)
-
-    # Ordenar por última atividade (mais recente primeiro)
-    conversas.sort(key=lambda c: c["ultima_atividade"], reverse=True)
-
-    # Aplicar paginação
-    conversas_paginadas = conversas[offset:offset + limit]
+        for conversa in conversas
+    ]
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
-        content=conversas_paginadas
+        content=conversas_json
     )
 
 
@@ -283,8 +334,8 @@ async def listar_mensagens(
 
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not chat_listagem_limiter.verificar(ip):
-        logger.warning(f"Rate limit excedido para listagem de mensagens - IP: {ip}")
+    if not await chat_listagem_limiter.verificar_async(ip):
+        logger.warning("Rate limit excedido para listagem de mensagens - IP: %s", ip)
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Muitas requisições de listagem. Aguarde alguns minutos."
@@ -293,7 +344,7 @@ async def listar_mensagens(
     usuario_id = usuario_logado.id
 
     # Verificar se usuário participa da sala
-    participante = chat_participante_repo.obter_por_sala_e_usuario(sala_id, usuario_id)
+    participante = await executar_repo(chat_participante_repo.obter_por_sala_e_usuario, sala_id, usuario_id)
     if not participante:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -301,7 +352,7 @@ async def listar_mensagens(
         )
 
     # Obter mensagens
-    mensagens = chat_mensagem_repo.listar_por_sala(sala_id, limit, offset)
+    mensagens = await executar_repo(chat_mensagem_repo.listar_por_sala, sala_id, limit, offset)
 
     mensagens_json = [
         {
@@ -337,8 +388,8 @@ async def enviar_mensagem(
 
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not chat_mensagem_limiter.verificar(ip):
-        logger.warning(f"Rate limit excedido para envio de mensagem no chat - IP: {ip}")
+    if not await chat_mensagem_limiter.verificar_async(ip):
+        logger.warning("Rate limit excedido para envio de mensagem no chat - IP: %s", ip)
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Muitas mensagens enviadas. Aguarde alguns minutos."
@@ -351,7 +402,7 @@ async def enviar_mensagem(
         usuario_id = usuario_logado.id
 
         # Verificar se usuário participa da sala
-        participante = chat_participante_repo.obter_por_sala_e_usuario(dto.sala_id, usuario_id)
+        participante = await executar_repo(chat_participante_repo.obter_por_sala_e_usuario, dto.sala_id, usuario_id)
         if not participante:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -359,7 +410,7 @@ async def enviar_mensagem(
             )
 
         # Verificar se sala existe
-        sala = chat_sala_repo.obter_por_id(dto.sala_id)
+        sala = await executar_repo(chat_sala_repo.obter_por_id, dto.sala_id)
         if not sala:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -367,25 +418,13 @@ async def enviar_mensagem(
             )
 
         # Inserir mensagem
-        nova_mensagem = chat_mensagem_repo.inserir(dto.sala_id, usuario_id, dto.mensagem)
+        nova_mensagem = await executar_repo(chat_mensagem_repo.inserir, dto.sala_id, usuario_id, dto.mensagem)
 
         # Atualizar última atividade da sala
-        chat_sala_repo.atualizar_ultima_atividade(dto.sala_id)
+        await executar_repo(chat_sala_repo.atualizar_ultima_atividade, dto.sala_id)
 
         # Broadcast via SSE para ambos participantes
-        mensagem_sse = {
-            "tipo": "nova_mensagem",
-            "sala_id": nova_mensagem.sala_id,
-            "mensagem": {
-                "id": nova_mensagem.id,
-                "sala_id": nova_mensagem.sala_id,
-                "usuario_id": nova_mensagem.usuario_id,
-                "mensagem": nova_mensagem.mensagem,
-                "data_envio": nova_mensagem.data_envio.isoformat() if nova_mensagem.data_envio else None,
-                "lida_em": None
-            }
-        }
-        await gerenciador_chat.broadcast_para_sala(dto.sala_id, mensagem_sse)
+        await gerenciador_chat.broadcast_para_sala(dto.sala_id, _evento_nova_mensagem(nova_mensagem))
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -421,7 +460,7 @@ async def marcar_como_lidas(
     usuario_id = usuario_logado.id
 
     # Verificar se usuário participa da sala
-    participante = chat_participante_repo.obter_por_sala_e_usuario(sala_id, usuario_id)
+    participante = await executar_repo(chat_participante_repo.obter_por_sala_e_usuario, sala_id, usuario_id)
     if not participante:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -429,10 +468,10 @@ async def marcar_como_lidas(
         )
 
     # Marcar mensagens como lidas
-    chat_mensagem_repo.marcar_como_lidas(sala_id, usuario_id)
+    await executar_repo(chat_mensagem_repo.marcar_como_lidas, sala_id, usuario_id)
 
     # Atualizar última leitura do participante
-    chat_participante_repo.atualizar_ultima_leitura(sala_id, usuario_id)
+    await executar_repo(chat_participante_repo.atualizar_ultima_leitura, sala_id, usuario_id)
 
     # Notificar via SSE para atualizar contador
     await gerenciador_chat.broadcast_para_sala(sala_id, {
@@ -463,8 +502,8 @@ async def buscar_usuarios(
 
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not busca_usuarios_limiter.verificar(ip):
-        logger.warning(f"Rate limit excedido para busca de usuários - IP: {ip}")
+    if not await busca_usuarios_limiter.verificar_async(ip):
+        logger.warning("Rate limit excedido para busca de usuários - IP: %s", ip)
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Muitas buscas. Aguarde alguns minutos."
@@ -477,7 +516,7 @@ async def buscar_usuarios(
         )
 
     # Buscar usuários
-    usuarios = usuario_repo.buscar_por_termo(q, limit=10)
+    usuarios = await executar_repo(usuario_repo.buscar_por_termo, q, limit=10)
 
     # Excluir o próprio usuário e administradores dos resultados
     usuarios_filtrados = [
@@ -490,7 +529,7 @@ async def buscar_usuarios(
             "id": u.id,
             "nome": u.nome,
             "email": u.email,
-            "foto_url": obter_caminho_foto_usuario(u.id)
+            "foto_url": obter_caminho_avatar_usuario(u.id, TAMANHO_AVATAR_BUSCA)
         }
         for u in usuarios_filtrados
     ]
@@ -512,18 +551,8 @@ async def contar_nao_lidas_total(
     """
     if not usuario_logado:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Não autenticado")
-    usuario_id = usuario_logado.id
-
-    # Obter todas as participações do usuário
-    participacoes = chat_participante_repo.listar_por_usuario(usuario_id)
-
-    total_nao_lidas = 0
-    for participacao in participacoes:
-        nao_lidas = chat_participante_repo.contar_mensagens_nao_lidas(
-            participacao.sala_id,
-            usuario_id
-        )
-        total_nao_lidas += nao_lidas
+    # Soma dos contadores desnormalizados de cada sala
+    total_nao_lidas = await executar_repo(chat_participante_repo.contar_nao_lidas_total, usuario_logado.id)
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
@@ -25,7 +25,7 @@ async def index(request: Request):
     """
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
+    if not await examples_limiter.verificar_async(ip):
         informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
         logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
         return templates_public.TemplateResponse(
@@ -47,7 +47,7 @@ async def form_fields_demo(request: Request):
     """
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
+    if not await examples_limiter.verificar_async(ip):
         informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
         logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
         return templates_public.TemplateResponse(
@@ -69,7 +69,7 @@ async def cards_grid_demo(request: Request):
     """
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
+    if not await examples_limiter.verificar_async(ip):
         informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
         logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
         return templates_public.TemplateResponse(
@@ -91,7 +91,7 @@ async def bootswatch_demo(request: Request):
     """
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
+    if not await examples_limiter.verificar_async(ip):
         informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
         logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
         return templates_public.TemplateResponse(
@@ -113,7 +113,7 @@ async def product_detail_demo(request: Request):
     """
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
+    if not await examples_limiter.verificar_async(ip):
         informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
         logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
         return templates_public.TemplateResponse(
@@ -135,7 +135,7 @@ async def service_detail_demo(request: Request):
     """
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
+    if not await examples_limiter.verificar_async(ip):
         informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
         logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
         return templates_public.TemplateResponse(
@@ -157,7 +157,7 @@ async def profile_detail_demo(request: Request):
     """
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
+    if not await examples_limiter.verificar_async(ip):
         informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
         logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
         return templates_public.TemplateResponse(
@@ -179,7 +179,7 @@ async def property_detail_demo(request: Request):
     """
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
+    if not await examples_limiter.verificar_async(ip):
         informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
         logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
         return templates_public.TemplateResponse(
@@ -201,7 +201,7 @@ async def table_list_demo(request: Request):
     """
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
+    if not await examples_limiter.verificar_async(ip):
         informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
         logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
         return templates_public.TemplateResponse(
@@ -6,7 +6,15 @@ from util.auth_decorator import obter_usuario_logado
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 from util.flash_messages import informar_erro
 from util.logger_config import logger
+from util.cache_paginas import cache_paginas
+from util.cache_http import (
+    criar_validadores_listagem,
+    responder_nao_modificado,
+    aplicar_validadores,
+    obter_etag,
+)
 from repo import artigo_repo, categoria_repo
+from util.db_util import executar_repo
 
 router = APIRouter()
 templates_public = criar_templates()
@@ -28,7 +36,7 @@ async def home(request: Request):
     """
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not public_limiter.verificar(ip):
+    if not await public_limiter.verificar_async(ip):
         informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
         logger.warning(f"Rate limit excedido para página pública - IP: {ip}")
         return templates_public.TemplateResponse(
@@ -37,12 +45,23 @@ async def home(request: Request):
             status_code=status.HTTP_429_TOO_MANY_REQUESTS
         )
 
+    # GET condicional: 304 se o navegador já tem a versão atual
+    validadores = await criar_validadores_listagem(request)
+    nao_modificado = responder_nao_modificado(request, validadores)
+    if nao_modificado:
+        return nao_modificado
+
+    # Visitantes anônimos recebem a página em cache
+    resposta = cache_paginas.obter_resposta(request, obter_etag(validadores))
+    if resposta:
+        return aplicar_validadores(resposta, validadores)
+
     # Obtém os 6 últimos artigos publicados
-    ultimos_artigos = artigo_repo.obter_ultimos_publicados(6)
-    categorias = categoria_repo.obter_todos()
+    ultimos_artigos = await executar_repo(artigo_repo.obter_ultimos_publicados, 6)
+    categorias = await executar_repo(categoria_repo.obter_todos)
     usuario_logado = obter_usuario_logado(request)
 
-    return templates_public.TemplateResponse(
+    resposta = templates_public.TemplateResponse(
         "index.html",
         {
             "request": request,
@@ -51,6 +70,8 @@ async def home(request: Request):
             "usuario_logado": usuario_logado,
         }
     )
+    cache_paginas.guardar_resposta(request, resposta, obter_etag(validadores))
+    return aplicar_validadores(resposta, validadores)
 
 
 @router.get("/index")
@@ -61,7 +82,7 @@ async def index(request: Request):
     """
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not public_limiter.verificar(ip):
+    if not await public_limiter.verificar_async(ip):
         informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
         logger.warning(f"Rate limit excedido para página pública - IP: {ip}")
         return templates_public.TemplateResponse(
@@ -70,12 +91,23 @@ async def index(request: Request):
             status_code=status.HTTP_429_TOO_MANY_REQUESTS
         )
 
+    # GET condicional: 304 se o navegador já tem a versão atual
+    validadores = await criar_validadores_listagem(request)
+    nao_modificado = responder_nao_modificado(request, validadores)
+    if nao_modificado:
+        return nao_modificado
+
+    # Visitantes anônimos recebem a página em cache
+    resposta = cache_paginas.obter_resposta(request, obter_etag(validadores))
+    if resposta:
+        return aplicar_validadores(resposta, validadores)
+
     # Obtém os 6 últimos artigos publicados
-    ultimos_artigos = artigo_repo.obter_ultimos_publicados(6)
-    categorias = categoria_repo.obter_todos()
+    ultimos_artigos = await executar_repo(artigo_repo.obter_ultimos_publicados, 6)
+    categorias = await executar_repo(categoria_repo.obter_todos)
     usuario_logado = obter_usuario_logado(request)
 
-    return templates_public.TemplateResponse(
+    resposta = templates_public.TemplateResponse(
         "index.html",
         {
             "request": request,
@@ -84,6 +116,8 @@ async def index(request: Request):
             "usuario_logado": usuario_logado,
         }
     )
+    cache_paginas.guardar_resposta(request, resposta, obter_etag(validadores))
+    return aplicar_validadores(resposta, validadores)
 
 
 @router.get("/sobre")
@@ -93,7 +127,7 @@ async def sobre(request: Request):
     """
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not public_limiter.verificar(ip):
+    if not await public_limiter.verificar_async(ip):
         informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
         logger.warning(f"Rate limit excedido para página pública - IP: {ip}")
         return templates_public.TemplateResponse(
@@ -102,7 +136,12 @@ async def sobre(request: Request):
             status_code=status.HTTP_429_TOO_MANY_REQUESTS
         )
 
-    return templates_public.TemplateResponse(
+    resposta = cache_paginas.obter_resposta(request)
+    if resposta:
+        return resposta
+
+    resposta = templates_public.TemplateResponse(
         "sobre.html",
         {"request": request}
     )
+    return cache_paginas.guardar_resposta(request, resposta)
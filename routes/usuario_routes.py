@@ -18,16 +18,19 @@ from model.usuario_logado_model import UsuarioLogado
 
 # Repositories
 from repo import usuario_repo, chamado_repo
+from util.db_util import executar_repo
 
 # Utilities
 from util.auth_decorator import requer_autenticacao
+from util.config import FOTO_MAX_UPLOAD_BYTES
+from util.config_cache import config
 from util.exceptions import ErroValidacaoFormulario
 from util.flash_messages import informar_sucesso, informar_erro
-from util.foto_util import salvar_foto_cropada_usuario
+from util.foto_util import salvar_foto_cropada_usuario, executar_processamento_foto
 from util.logger_config import logger
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 from util.repository_helpers import obter_ou_404
-from util.security import criar_hash_senha, verificar_senha
+from util.security import criar_hash_senha_async, verificar_senha_async
 from util.template_util import criar_templates
 from util.validation_helpers import verificar_email_disponivel
 
@@ -84,10 +87,10 @@ async def dashboard(request: Request, usuario_logado: Optional[UsuarioLogado] =
     # Adicionar contador de chamados conforme perfil
     if usuario_logado.is_admin():
         # Admin vê total de chamados pendentes no sistema
-        context["chamados_pendentes"] = chamado_repo.contar_pendentes()
+        context["chamados_pendentes"] = await executar_repo(chamado_repo.contar_pendentes)
     else:
         # Usuário comum vê seus próprios chamados em aberto
-        context["chamados_abertos"] = chamado_repo.contar_abertos_por_usuario(usuario_logado.id)
+        context["chamados_abertos"] = await executar_repo(chamado_repo.contar_abertos_por_usuario, usuario_logado.id)
 
     return templates_usuario.TemplateResponse("dashboard.html", context)
 
@@ -101,7 +104,7 @@ async def get_visualizar_perfil(request: Request, usuario_logado: Optional[Usuar
 
     # Obter usuário ou redirecionar para logout
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(usuario_logado.id),
+        await executar_repo(usuario_repo.obter_por_id, usuario_logado.id),
         request,
         "Usuário não encontrado!",
         "/logout"
@@ -123,14 +126,14 @@ async def get_editar_perfil(request: Request, usuario_logado: Optional[UsuarioLo
 
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not form_get_limiter.verificar(ip):
+    if not await form_get_limiter.verificar_async(ip):
         informar_erro(request, f"Muitas requisições. Aguarde {form_get_limiter.janela_minutos} minuto(s).")
         logger.warning(f"Rate limit excedido para formulário GET - IP: {ip}")
         return RedirectResponse("/usuario", status_code=status.HTTP_303_SEE_OTHER)
 
     # Obter usuário ou redirecionar para logout
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(usuario_logado.id),
+        await executar_repo(usuario_repo.obter_por_id, usuario_logado.id),
         request,
         "Usuário não encontrado!",
         "/logout"
@@ -157,7 +160,7 @@ async def post_editar_perfil(
 
     # Obter usuário ou redirecionar para logout
     usuario = obter_ou_404(
-        usuario_repo.obter_por_id(usuario_logado.id),
+        await executar_repo(usuario_repo.obter_por_id, usuario_logado.id),
         request,
         "Usuário não encontrado!",
         "/logout"
@@ -192,7 +195,7 @@ async def post_editar_perfil(
         usuario.email = dto.email
 
         # Salvar no banco
-        if usuario_repo.alterar(usuario):
+        if await executar_repo(usuario_repo.alterar, usuario):
             # Atualizar sessão
             request.session["usuario_logado"]["nome"] = usuario.nome
             request.session["usuario_logado"]["email"] = usuario.email
@@ -239,7 +242,7 @@ async def get_alterar_senha(request: Request, usuario_logado: Optional[UsuarioLo
 
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not form_get_limiter.verificar(ip):
+    if not await form_get_limiter.verificar_async(ip):
         informar_erro(request, f"Muitas requisições. Aguarde {form_get_limiter.janela_minutos} minuto(s).")
         logger.warning(f"Rate limit excedido para formulário GET - IP: {ip}")
         return RedirectResponse("/usuario", status_code=status.HTTP_303_SEE_OTHER)
@@ -262,7 +265,7 @@ async def post_alterar_senha(
 
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not alterar_senha_limiter.verificar(ip):
+    if not await alterar_senha_limiter.verificar_async(ip):
         informar_erro(
             request,
             f"Muitas tentativas de alteração de senha. Aguarde {alterar_senha_limiter.janela_minutos} minuto(s).",
@@ -287,7 +290,7 @@ async def post_alterar_senha(
 
         # Obter usuário ou redirecionar para logout
         usuario = obter_ou_404(
-            usuario_repo.obter_por_id(usuario_logado.id),
+            await executar_repo(usuario_repo.obter_por_id, usuario_logado.id),
             request,
             "Usuário não encontrado!",
             "/logout"
@@ -296,7 +299,7 @@ async def post_alterar_senha(
             return usuario
 
         # Validar senha atual
-        if not verificar_senha(dto.senha_atual, usuario.senha):
+        if not await verificar_senha_async(dto.senha_atual, usuario.senha):
             informar_erro(request, "Senha atual está incorreta")
             logger.warning(
                 f"Tentativa de alteração de senha com senha atual incorreta - Usuário ID: {usuario.id}"
@@ -311,7 +314,7 @@ async def post_alterar_senha(
             )
 
         # Verificar se a nova senha é diferente da atual
-        if verificar_senha(dto.senha_nova, usuario.senha):
+        if await verificar_senha_async(dto.senha_nova, usuario.senha):
             informar_erro(request, "A nova senha deve ser diferente da senha atual.")
             return templates_usuario.TemplateResponse(
                 "perfil/alterar-senha.html",
@@ -325,8 +328,8 @@ async def post_alterar_senha(
             )
 
         # Atualizar senha
-        senha_hash = criar_hash_senha(dto.senha_nova)
-        if usuario_repo.atualizar_senha(usuario.id, senha_hash):
+        senha_hash = await criar_hash_senha_async(dto.senha_nova)
+        if await executar_repo(usuario_repo.atualizar_senha, usuario.id, senha_hash):
             logger.info(f"Senha alterada com sucesso - Usuário ID: {usuario.id}")
             informar_sucesso(request, "Senha alterada com sucesso!")
             return RedirectResponse(
@@ -371,7 +374,7 @@ async def post_atualizar_foto(
 
     # Rate limiting por IP
     ip = obter_identificador_cliente(request)
-    if not upload_foto_limiter.verificar(ip):
+    if not await upload_foto_limiter.verificar_async(ip):
         informar_erro(
             request,
             f"Muitas tentativas de upload de foto. Aguarde {upload_foto_limiter.janela_minutos} minuto(s).",
@@ -389,17 +392,19 @@ async def post_atualizar_foto(
                 "/usuario/perfil/visualizar", status_code=status.HTTP_303_SEE_OTHER
             )
 
-        # Validar tamanho aproximado (base64 é ~33% maior que binário)
+        # Validar tamanho aproximado antes de decodificar (base64 é ~33% maior que binário)
         tamanho_aproximado = len(foto_base64) * 3 / 4
-        max_size = 10 * 1024 * 1024  # 10MB
+        max_size = config.obter_int("foto_max_upload_bytes", FOTO_MAX_UPLOAD_BYTES)
         if tamanho_aproximado > max_size:
-            informar_erro(request, "Imagem muito grande. O tamanho máximo é 10MB.")
+            informar_erro(
+                request, f"Imagem muito grande. O tamanho máximo é {max_size / (1024 * 1024):.0f}MB."
+            )
             return RedirectResponse(
                 "/usuario/perfil/visualizar", status_code=status.HTTP_303_SEE_OTHER
             )
 
-        # Salvar foto cropada
-        if salvar_foto_cropada_usuario(usuario_id, foto_base64):
+        # Processar e salvar foto cropada fora do event loop
+        if await executar_processamento_foto(salvar_foto_cropada_usuario, usuario_id, foto_base64):
             logger.info(f"Foto de perfil atualizada - Usuário ID: {usuario_id}")
             informar_sucesso(request, "Foto de perfil atualizada com sucesso!")
         else:
@@ -0,0 +1,38 @@
+"""
+Gera as variantes de tamanho/formato das fotos de perfil já existentes.
+
+Fotos enviadas a partir de agora já são salvas com as variantes; use este
+script para as fotos anteriores ou após alterar FOTO_VARIANTES_TAMANHOS ou
+FOTO_WEBP. A foto completa ({id:06d}.jpg) não é alterada.
+
+Uso (na raiz do projeto):
+    python scripts/gerar_variantes_fotos.py
+    python scripts/gerar_variantes_fotos.py --forcar
+"""
+import argparse
+import pathlib
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from util.foto_util import gerar_variantes_fotos_existentes  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Gera as variantes das fotos de perfil existentes")
+    parser.add_argument(
+        "--forcar",
+        action="store_true",
+        help="Regera também as fotos que já têm todas as variantes"
+    )
+    args = parser.parse_args()
+
+    processadas, erros = gerar_variantes_fotos_existentes(forcar=args.forcar)
+    print("Fotos processadas:", processadas)
+    print("Fotos com erro:", erros)
+    return 1 if erros else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+"""
+Reconstrói o índice de busca textual (FTS5) dos artigos.
+
+Normalmente o índice é mantido pelos triggers da tabela artigo; use este
+script após importações diretas no banco ou se a busca parecer desatualizada.
+
+Uso:
+    python scripts/reindexar_busca_artigos.py
+"""
+import pathlib
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from repo import artigo_repo  # noqa: E402
+
+
+def main() -> int:
+    artigo_repo.criar_tabela()
+    if not artigo_repo.reconstruir_indice_busca():
+        print("Falha ao reconstruir o índice de busca.")
+        return 1
+    print("Índice de busca reconstruído. Artigos:", artigo_repo.obter_quantidade())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""
+Remove as cópias da foto padrão (user.jpg) criadas no cadastro de usuários.
+
+Versões anteriores copiavam static/img/user.jpg para cada novo usuário. Hoje
+usuários sem foto própria usam a foto padrão compartilhada, então essas
+cópias podem ser apagadas. Execute antes de scripts/gerar_variantes_fotos.py.
+
+Uso (na raiz do projeto):
+    python scripts/remover_copias_foto_padrao.py
+"""
+import pathlib
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from util.foto_util import remover_copias_foto_padrao  # noqa: E402
+
+
+def main() -> int:
+    print("Cópias da foto padrão removidas:", remover_copias_foto_padrao())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
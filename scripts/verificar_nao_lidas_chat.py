@@ -0,0 +1,48 @@
+"""
+Verifica (e opcionalmente corrige) os contadores de mensagens não lidas do chat.
+
+O contador chat_participante.qtde_nao_lidas é mantido pelos repositórios a cada
+mensagem enviada, lida ou excluída. Este script recalcula os valores a partir
+de chat_mensagem e aponta divergências.
+
+Uso:
+    python scripts/verificar_nao_lidas_chat.py
+    python scripts/verificar_nao_lidas_chat.py --corrigir
+"""
+import argparse
+import pathlib
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from repo import chat_participante_repo  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Verifica os contadores de não lidas do chat")
+    parser.add_argument(
+        "--corrigir",
+        action="store_true",
+        help="Reconstrói os contadores divergentes"
+    )
+    args = parser.parse_args()
+
+    inconsistentes = chat_participante_repo.listar_nao_lidas_inconsistentes()
+    for item in inconsistentes:
+        print(
+            f"Sala {item['sala_id']} / usuário {item['usuario_id']}: "
+            f"armazenado={item['qtde_nao_lidas']} calculado={item['qtde_calculada']}"
+        )
+    print("Contadores divergentes:", len(inconsistentes))
+
+    if inconsistentes and args.corrigir:
+        corrigidos = chat_participante_repo.reconstruir_contadores_nao_lidas()
+        print("Contadores corrigidos:", corrigidos)
+        return 0
+
+    return 1 if inconsistentes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
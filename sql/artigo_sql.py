@@ -20,18 +20,28 @@ CRIAR_TABELA = """
 """
 
 # Insere um novo artigo
+# (artigos já criados como publicados recebem data_publicacao, usada na paginação)
 INSERIR = """
-    INSERT INTO artigo (titulo, resumo, conteudo, status, usuario_id, categoria_id)
-    VALUES (?, ?, ?, ?, ?, ?)
+    INSERT INTO artigo (titulo, resumo, conteudo, status, usuario_id, categoria_id, data_publicacao)
+    VALUES (?, ?, ?, ?, ?, ?, CASE WHEN ?4 = 'Publicado' THEN CURRENT_TIMESTAMP END)
 """
 
 # Atualiza um artigo existente
 ALTERAR = """
     UPDATE artigo
-    SET titulo=?, resumo=?, conteudo=?, status=?, categoria_id=?, data_atualizacao=CURRENT_TIMESTAMP
+    SET titulo=?, resumo=?, conteudo=?, status=?, categoria_id=?, data_atualizacao=CURRENT_TIMESTAMP,
+        data_publicacao=CASE WHEN ?4 = 'Publicado' THEN COALESCE(data_publicacao, CURRENT_TIMESTAMP)
+                             ELSE data_publicacao END
     WHERE id=?
 """
 
+# Preenche data_publicacao de artigos publicados antes dela ser obrigatória
+PREENCHER_DATA_PUBLICACAO = """
+    UPDATE artigo
+    SET data_publicacao = COALESCE(data_atualizacao, data_cadastro)
+    WHERE status = 'Publicado' AND data_publicacao IS NULL
+"""
+
 # Atualiza status do artigo
 ALTERAR_STATUS = """
     UPDATE artigo
@@ -67,28 +77,45 @@ OBTER_POR_USUARIO = """
     ORDER BY a.data_cadastro DESC
 """
 
-# Busca artigos publicados (para exibição pública)
-OBTER_PUBLICADOS = """
-    SELECT a.id, a.titulo, a.resumo, a.conteudo, a.status, a.usuario_id, a.categoria_id,
-           a.qtde_visualizacoes, a.data_cadastro, a.data_atualizacao, a.data_publicacao,
-           u.nome as usuario_nome, c.nome as categoria_nome
+# Colunas das listagens: sem o conteúdo completo, apenas um trecho inicial
+# para quando o artigo não tem resumo
+_COLUNAS_RESUMO = """
+    a.id, a.titulo, a.resumo, substr(a.conteudo, 1, 300) as conteudo, a.status,
+    a.usuario_id, a.categoria_id, a.qtde_visualizacoes, a.data_cadastro,
+    a.data_atualizacao, a.data_publicacao,
+    u.nome as usuario_nome, c.nome as categoria_nome
+"""
+
+# Primeira página de artigos publicados (paginação por cursor em data_publicacao, id)
+OBTER_PUBLICADOS_PAGINA = f"""
+    SELECT {_COLUNAS_RESUMO}
     FROM artigo a
     LEFT JOIN usuario u ON a.usuario_id = u.id
     LEFT JOIN categoria c ON a.categoria_id = c.id
     WHERE a.status = 'Publicado'
-    ORDER BY a.data_publicacao DESC
+    ORDER BY a.data_publicacao DESC, a.id DESC
+    LIMIT ?
+"""
+
+# Página seguinte: artigos publicados depois do cursor (data_publicacao, id)
+OBTER_PUBLICADOS_PAGINA_APOS = f"""
+    SELECT {_COLUNAS_RESUMO}
+    FROM artigo a
+    LEFT JOIN usuario u ON a.usuario_id = u.id
+    LEFT JOIN categoria c ON a.categoria_id = c.id
+    WHERE a.status = 'Publicado' AND (a.data_publicacao, a.id) < (?, ?)
+    ORDER BY a.data_publicacao DESC, a.id DESC
+    LIMIT ?
 """
 
 # Busca os últimos N artigos publicados
-OBTER_ULTIMOS_PUBLICADOS = """
-    SELECT a.id, a.titulo, a.resumo, a.conteudo, a.status, a.usuario_id, a.categoria_id,
-           a.qtde_visualizacoes, a.data_cadastro, a.data_atualizacao, a.data_publicacao,
-           u.nome as usuario_nome, c.nome as categoria_nome
+OBTER_ULTIMOS_PUBLICADOS = f"""
+    SELECT {_COLUNAS_RESUMO}
     FROM artigo a
     LEFT JOIN usuario u ON a.usuario_id = u.id
     LEFT JOIN categoria c ON a.categoria_id = c.id
     WHERE a.status = 'Publicado'
-    ORDER BY a.data_publicacao DESC
+    ORDER BY a.data_publicacao DESC, a.id DESC
     LIMIT ?
 """
 
@@ -103,28 +130,99 @@ OBTER_POR_ID = """
     WHERE a.id = ?
 """
 
-# Busca artigos por título (busca parcial)
-BUSCAR_POR_TITULO = """
+# Índice de busca textual (FTS5) sobre titulo/resumo/conteudo.
+# Tabela de conteúdo externo: o texto fica apenas em artigo, o índice guarda só os termos.
+CRIAR_TABELA_BUSCA = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS artigo_busca USING fts5(
+        titulo,
+        resumo,
+        conteudo,
+        content='artigo',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+"""
+
+# Triggers que mantêm o índice sincronizado com a tabela artigo
+CRIAR_TRIGGER_BUSCA_INSERIR = """
+    CREATE TRIGGER IF NOT EXISTS artigo_busca_ai AFTER INSERT ON artigo BEGIN
+        INSERT INTO artigo_busca (rowid, titulo, resumo, conteudo)
+        VALUES (new.id, new.titulo, new.resumo, new.conteudo);
+    END
+"""
+
+CRIAR_TRIGGER_BUSCA_EXCLUIR = """
+    CREATE TRIGGER IF NOT EXISTS artigo_busca_ad AFTER DELETE ON artigo BEGIN
+        INSERT INTO artigo_busca (artigo_busca, rowid, titulo, resumo, conteudo)
+        VALUES ('delete', old.id, old.titulo, old.resumo, old.conteudo);
+    END
+"""
+
+# Só reindexa quando o texto muda (não a cada visualização ou troca de status)
+CRIAR_TRIGGER_BUSCA_ALTERAR = """
+    CREATE TRIGGER IF NOT EXISTS artigo_busca_au AFTER UPDATE OF titulo, resumo, conteudo ON artigo BEGIN
+        INSERT INTO artigo_busca (artigo_busca, rowid, titulo, resumo, conteudo)
+        VALUES ('delete', old.id, old.titulo, old.resumo, old.conteudo);
+        INSERT INTO artigo_busca (rowid, titulo, resumo, conteudo)
+        VALUES (new.id, new.titulo, new.resumo, new.conteudo);
+    END
+"""
+
+# Verifica se o índice de busca já existe
+VERIFICAR_TABELA_BUSCA_EXISTE = """
+    SELECT name FROM sqlite_master WHERE type='table' AND name='artigo_busca'
+"""
+
+# Reconstrói o índice de busca a partir da tabela artigo
+RECONSTRUIR_INDICE_BUSCA = """
+    INSERT INTO artigo_busca (artigo_busca) VALUES ('rebuild')
+"""
+
+# Busca textual em artigos publicados, ordenada por relevância (bm25).
+# Pesos: titulo 10, resumo 5, conteudo 1. O trecho usa char(2)/char(3) como
+# marcadores de destaque, convertidos em HTML no repositório.
+BUSCAR_TEXTO = """
     SELECT a.id, a.titulo, a.resumo, a.conteudo, a.status, a.usuario_id, a.categoria_id,
            a.qtde_visualizacoes, a.data_cadastro, a.data_atualizacao, a.data_publicacao,
-           u.nome as usuario_nome, c.nome as categoria_nome
-    FROM artigo a
+           u.nome as usuario_nome, c.nome as categoria_nome,
+           snippet(artigo_busca, -1, char(2), char(3), '…', 24) as trecho
+    FROM artigo_busca
+    JOIN artigo a ON a.id = artigo_busca.rowid
     LEFT JOIN usuario u ON a.usuario_id = u.id
     LEFT JOIN categoria c ON a.categoria_id = c.id
-    WHERE a.status = 'Publicado' AND a.titulo LIKE ?
-    ORDER BY a.data_publicacao DESC
+    WHERE artigo_busca MATCH ? AND a.status = 'Publicado'
+    ORDER BY bm25(artigo_busca, 10.0, 5.0, 1.0)
+    LIMIT ? OFFSET ?
 """
 
-# Busca artigos por categoria
-OBTER_POR_CATEGORIA = """
-    SELECT a.id, a.titulo, a.resumo, a.conteudo, a.status, a.usuario_id, a.categoria_id,
-           a.qtde_visualizacoes, a.data_cadastro, a.data_atualizacao, a.data_publicacao,
-           u.nome as usuario_nome, c.nome as categoria_nome
+# Conta os resultados da busca textual (para paginação)
+CONTAR_BUSCA_TEXTO = """
+    SELECT COUNT(*) as quantidade
+    FROM artigo_busca
+    JOIN artigo a ON a.id = artigo_busca.rowid
+    WHERE artigo_busca MATCH ? AND a.status = 'Publicado'
+"""
+
+# Primeira página de artigos publicados de uma categoria
+OBTER_POR_CATEGORIA_PAGINA = f"""
+    SELECT {_COLUNAS_RESUMO}
     FROM artigo a
     LEFT JOIN usuario u ON a.usuario_id = u.id
     LEFT JOIN categoria c ON a.categoria_id = c.id
     WHERE a.status = 'Publicado' AND a.categoria_id = ?
-    ORDER BY a.data_publicacao DESC
+    ORDER BY a.data_publicacao DESC, a.id DESC
+    LIMIT ?
+"""
+
+# Página seguinte de artigos publicados de uma categoria
+OBTER_POR_CATEGORIA_PAGINA_APOS = f"""
+    SELECT {_COLUNAS_RESUMO}
+    FROM artigo a
+    LEFT JOIN usuario u ON a.usuario_id = u.id
+    LEFT JOIN categoria c ON a.categoria_id = c.id
+    WHERE a.status = 'Publicado' AND a.categoria_id = ? AND (a.data_publicacao, a.id) < (?, ?)
+    ORDER BY a.data_publicacao DESC, a.id DESC
+    LIMIT ?
 """
 
 # Incrementa visualizações
@@ -132,6 +230,66 @@ INCREMENTAR_VISUALIZACOES = """
     UPDATE artigo SET qtde_visualizacoes = qtde_visualizacoes + 1 WHERE id = ?
 """
 
+# Soma visualizações acumuladas (usado com executemany: (quantidade, id))
+SOMAR_VISUALIZACOES = """
+    UPDATE artigo SET qtde_visualizacoes = qtde_visualizacoes + ? WHERE id = ?
+"""
+
+# Versão de um artigo publicado (validadores HTTP de /artigos/ler/{id}):
+# última modificação do artigo e do autor e da categoria exibidos na página
+OBTER_VERSAO_PUBLICADO = """
+    SELECT COALESCE(a.data_atualizacao, a.data_publicacao, a.data_cadastro) as "ultima_modificacao [timestamp]",
+           COALESCE(u.data_atualizacao, u.data_cadastro) as "modificacao_autor [timestamp]",
+           COALESCE(c.data_atualizacao, c.data_cadastro) as "modificacao_categoria [timestamp]"
+    FROM artigo a
+    LEFT JOIN usuario u ON a.usuario_id = u.id
+    LEFT JOIN categoria c ON a.categoria_id = c.id
+    WHERE a.id = ? AND a.status = 'Publicado'
+"""
+
+# Versão do conjunto de artigos (validadores HTTP das listagens): qualquer
+# inserção, alteração ou troca de status muda a data máxima; exclusões mudam a contagem
+OBTER_VERSAO_ARTIGOS = """
+    SELECT MAX(COALESCE(data_atualizacao, data_publicacao, data_cadastro)) as "ultima_modificacao [timestamp]",
+           COUNT(*) as quantidade
+    FROM artigo
+"""
+
+# Versão do conteúdo público, compartilhada pelos workers: os gatilhos abaixo
+# incrementam o contador a cada alteração em artigos, categorias ou no nome de
+# usuários (autores), e cada processo compara o valor para saber quando
+# descartar seu cache de páginas. Contar visualizações não muda a versão.
+CRIAR_TABELA_VERSAO_CONTEUDO = """
+    CREATE TABLE IF NOT EXISTS conteudo_publico_versao (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        versao INTEGER NOT NULL
+    )
+"""
+
+INICIALIZAR_VERSAO_CONTEUDO = "INSERT OR IGNORE INTO conteudo_publico_versao (id, versao) VALUES (1, 0)"
+
+_INCREMENTAR_VERSAO_CONTEUDO = "UPDATE conteudo_publico_versao SET versao = versao + 1 WHERE id = 1;"
+
+CRIAR_GATILHOS_VERSAO_CONTEUDO = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_conteudo_versao_{nome} {evento} BEGIN
+        {_INCREMENTAR_VERSAO_CONTEUDO}
+    END
+    """
+    for nome, evento in (
+        ("artigo_inserir", "AFTER INSERT ON artigo"),
+        ("artigo_excluir", "AFTER DELETE ON artigo"),
+        ("artigo_alterar",
+         "AFTER UPDATE OF titulo, resumo, conteudo, status, usuario_id, categoria_id, data_publicacao ON artigo"),
+        ("categoria_inserir", "AFTER INSERT ON categoria"),
+        ("categoria_excluir", "AFTER DELETE ON categoria"),
+        ("categoria_alterar", "AFTER UPDATE ON categoria"),
+        ("usuario_alterar", "AFTER UPDATE OF nome ON usuario"),
+    )
+]
+
+OBTER_VERSAO_CONTEUDO = "SELECT versao FROM conteudo_publico_versao WHERE id = 1"
+
 # Conta quantidade de artigos
 OBTER_QUANTIDADE = """
     SELECT COUNT(*) as quantidade FROM artigo
@@ -49,3 +49,10 @@ OBTER_POR_NOME = """
     FROM categoria
     WHERE nome=?
 """
+
+# Versão do conjunto de categorias (validadores HTTP das páginas que as exibem)
+OBTER_VERSAO = """
+    SELECT MAX(COALESCE(data_atualizacao, data_cadastro)) as "ultima_modificacao [timestamp]",
+           COUNT(*) as quantidade
+    FROM categoria
+"""
@@ -57,6 +57,17 @@ ORDER BY id DESC
 LIMIT 1
 """
 
+# Mensagens das salas do usuário com id maior que o último recebido
+# (reenvio após reconexão do SSE via Last-Event-ID)
+LISTAR_APOS_ID_POR_USUARIO = """
+SELECT m.id, m.sala_id, m.usuario_id, m.mensagem, m.data_envio, m.lida_em
+FROM chat_mensagem m
+INNER JOIN chat_participante cp ON cp.sala_id = m.sala_id
+WHERE cp.usuario_id = ? AND m.id > ?
+ORDER BY m.id ASC
+LIMIT ?
+"""
+
 EXCLUIR = """
 DELETE FROM chat_mensagem
 WHERE id = ?
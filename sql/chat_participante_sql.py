@@ -8,55 +8,103 @@ CREATE TABLE IF NOT EXISTS chat_participante (
     sala_id TEXT NOT NULL,
     usuario_id INTEGER NOT NULL,
     ultima_leitura TIMESTAMP,
+    qtde_nao_lidas INTEGER NOT NULL DEFAULT 0,
     PRIMARY KEY (sala_id, usuario_id),
     FOREIGN KEY (sala_id) REFERENCES chat_sala(id) ON DELETE CASCADE,
     FOREIGN KEY (usuario_id) REFERENCES usuario(id) ON DELETE CASCADE
 )
 """
 
+# Migração: bancos criados antes do contador desnormalizado de não lidas
+OBTER_COLUNAS = """
+PRAGMA table_info(chat_participante)
+"""
+
+ADICIONAR_COLUNA_QTDE_NAO_LIDAS = """
+ALTER TABLE chat_participante
+ADD COLUMN qtde_nao_lidas INTEGER NOT NULL DEFAULT 0
+"""
+
 INSERIR = """
 INSERT INTO chat_participante (sala_id, usuario_id, ultima_leitura)
 VALUES (?, ?, ?)
 """
 
 OBTER_POR_SALA_E_USUARIO = """
-SELECT sala_id, usuario_id, ultima_leitura[timestamp]
+SELECT sala_id, usuario_id, ultima_leitura[timestamp], qtde_nao_lidas
 FROM chat_participante
 WHERE sala_id = ? AND usuario_id = ?
 """
 
 LISTAR_POR_SALA = """
-SELECT sala_id, usuario_id, ultima_leitura[timestamp]
+SELECT sala_id, usuario_id, ultima_leitura[timestamp], qtde_nao_lidas
 FROM chat_participante
 WHERE sala_id = ?
 """
 
 LISTAR_POR_USUARIO = """
-SELECT sala_id, usuario_id, ultima_leitura[timestamp]
+SELECT sala_id, usuario_id, ultima_leitura[timestamp], qtde_nao_lidas
 FROM chat_participante
 WHERE usuario_id = ?
 """
 
 ATUALIZAR_ULTIMA_LEITURA = """
 UPDATE chat_participante
-SET ultima_leitura = ?
+SET ultima_leitura = ?, qtde_nao_lidas = 0
 WHERE sala_id = ? AND usuario_id = ?
 """
 
+# Incrementa o contador dos demais participantes ao inserir uma mensagem
+INCREMENTAR_NAO_LIDAS = """
+UPDATE chat_participante
+SET qtde_nao_lidas = qtde_nao_lidas + 1
+WHERE sala_id = ? AND usuario_id != ?
+"""
+
+# Decrementa o contador de quem ainda não leu uma mensagem que será excluída
+DECREMENTAR_NAO_LIDAS_MENSAGEM = """
+UPDATE chat_participante
+SET qtde_nao_lidas = MAX(qtde_nao_lidas - 1, 0)
+WHERE EXISTS (
+    SELECT 1
+    FROM chat_mensagem m
+    WHERE m.id = ?
+      AND m.sala_id = chat_participante.sala_id
+      AND m.usuario_id != chat_participante.usuario_id
+      AND (chat_participante.ultima_leitura IS NULL OR chat_participante.ultima_leitura < m.data_envio)
+)
+"""
+
 CONTAR_MENSAGENS_NAO_LIDAS = """
-SELECT COUNT(*) as total
-FROM chat_mensagem m
-WHERE m.sala_id = ?
-  AND m.usuario_id != ?
-  AND (
-    (SELECT cp.ultima_leitura
-     FROM chat_participante cp
-     WHERE cp.sala_id = m.sala_id AND cp.usuario_id = ?) IS NULL
-    OR
-    (SELECT cp.ultima_leitura
-     FROM chat_participante cp
-     WHERE cp.sala_id = m.sala_id AND cp.usuario_id = ?) < m.data_envio
-  )
+SELECT qtde_nao_lidas as total
+FROM chat_participante
+WHERE sala_id = ? AND usuario_id = ?
+"""
+
+CONTAR_NAO_LIDAS_TOTAL = """
+SELECT COALESCE(SUM(qtde_nao_lidas), 0) as total
+FROM chat_participante
+WHERE usuario_id = ?
+"""
+
+# Subquery que recalcula as não lidas a partir das mensagens (fonte da verdade)
+_CALCULAR_NAO_LIDAS = """
+    SELECT COUNT(*)
+    FROM chat_mensagem m
+    WHERE m.sala_id = chat_participante.sala_id
+      AND m.usuario_id != chat_participante.usuario_id
+      AND (chat_participante.ultima_leitura IS NULL OR chat_participante.ultima_leitura < m.data_envio)
+"""
+
+RECONSTRUIR_NAO_LIDAS = f"""
+UPDATE chat_participante
+SET qtde_nao_lidas = ({_CALCULAR_NAO_LIDAS})
+"""
+
+LISTAR_NAO_LIDAS_INCONSISTENTES = f"""
+SELECT sala_id, usuario_id, qtde_nao_lidas, ({_CALCULAR_NAO_LIDAS}) as qtde_calculada
+FROM chat_participante
+WHERE qtde_nao_lidas != ({_CALCULAR_NAO_LIDAS})
 """
 
 EXCLUIR = """
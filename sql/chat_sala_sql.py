@@ -28,6 +28,33 @@ SET ultima_atividade = ?
 WHERE id = ?
 """
 
+# Lista as conversas de um usuário em uma única query, ordenadas por atividade
+# (com o id da sala como desempate, para a paginação ser estável).
+# A paginação é aplicada antes de buscar a última mensagem, que assim só é
+# consultada para as salas da página.
+LISTAR_CONVERSAS_POR_USUARIO = """
+WITH pagina AS (
+    SELECT s.id AS sala_id, s.ultima_atividade, cp.qtde_nao_lidas,
+           op.usuario_id AS outro_usuario_id
+    FROM chat_participante cp
+    INNER JOIN chat_sala s ON s.id = cp.sala_id
+    INNER JOIN chat_participante op ON op.sala_id = cp.sala_id AND op.usuario_id != cp.usuario_id
+    WHERE cp.usuario_id = ?
+    ORDER BY s.ultima_atividade DESC, s.id DESC
+    LIMIT ? OFFSET ?
+)
+SELECT p.sala_id, p.ultima_atividade,
+       u.id AS outro_usuario_id, u.nome AS outro_usuario_nome, u.email AS outro_usuario_email,
+       m.id AS mensagem_id, m.usuario_id AS mensagem_usuario_id, m.mensagem,
+       m.data_envio, m.lida_em, p.qtde_nao_lidas AS nao_lidas
+FROM pagina p
+INNER JOIN usuario u ON u.id = p.outro_usuario_id
+LEFT JOIN chat_mensagem m ON m.id = (
+    SELECT MAX(id) FROM chat_mensagem WHERE sala_id = p.sala_id
+)
+ORDER BY p.ultima_atividade DESC, p.sala_id DESC
+"""
+
 EXCLUIR = """
 DELETE FROM chat_sala
 WHERE id = ?
@@ -13,4 +13,45 @@ OBTER_POR_CHAVE = "SELECT * FROM configuracao WHERE chave = ?"
 
 OBTER_TODOS = "SELECT * FROM configuracao ORDER BY chave"
 
+# Chaves passadas como array JSON (uma única query para qualquer quantidade)
+OBTER_POR_CHAVES = "SELECT * FROM configuracao WHERE chave IN (SELECT value FROM json_each(?))"
+
 ATUALIZAR = "UPDATE configuracao SET valor = ? WHERE chave = ?"
+
+# Versão das configurações, compartilhada pelos workers: os gatilhos abaixo
+# incrementam o contador a cada alteração na tabela configuracao, e cada
+# processo compara o valor para saber quando recarregar seu cache
+CRIAR_TABELA_VERSAO = """
+CREATE TABLE IF NOT EXISTS configuracao_versao (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    versao INTEGER NOT NULL
+)
+"""
+
+INICIALIZAR_VERSAO = "INSERT OR IGNORE INTO configuracao_versao (id, versao) VALUES (1, 0)"
+
+CRIAR_GATILHO_VERSAO_INSERIR = """
+CREATE TRIGGER IF NOT EXISTS trg_configuracao_versao_inserir
+AFTER INSERT ON configuracao
+BEGIN
+    UPDATE configuracao_versao SET versao = versao + 1 WHERE id = 1;
+END
+"""
+
+CRIAR_GATILHO_VERSAO_ATUALIZAR = """
+CREATE TRIGGER IF NOT EXISTS trg_configuracao_versao_atualizar
+AFTER UPDATE ON configuracao
+BEGIN
+    UPDATE configuracao_versao SET versao = versao + 1 WHERE id = 1;
+END
+"""
+
+CRIAR_GATILHO_VERSAO_EXCLUIR = """
+CREATE TRIGGER IF NOT EXISTS trg_configuracao_versao_excluir
+AFTER DELETE ON configuracao
+BEGIN
+    UPDATE configuracao_versao SET versao = versao + 1 WHERE id = 1;
+END
+"""
+
+OBTER_VERSAO = "SELECT versao FROM configuracao_versao WHERE id = 1"
@@ -41,6 +41,26 @@ CREATE INDEX IF NOT EXISTS idx_chat_participante_usuario_id
 ON chat_participante(usuario_id)
 """
 
+# Índices da tabela artigo
+# Parciais (só publicados) e na mesma ordem da paginação por cursor
+# (data_publicacao DESC, id DESC): a listagem lê só as linhas da página
+CRIAR_INDICE_ARTIGO_PUBLICADOS = """
+CREATE INDEX IF NOT EXISTS idx_artigo_publicados
+ON artigo(data_publicacao DESC, id DESC)
+WHERE status = 'Publicado'
+"""
+
+CRIAR_INDICE_ARTIGO_CATEGORIA_PUBLICADOS = """
+CREATE INDEX IF NOT EXISTS idx_artigo_categoria_publicados
+ON artigo(categoria_id, data_publicacao DESC, id DESC)
+WHERE status = 'Publicado'
+"""
+
+CRIAR_INDICE_ARTIGO_USUARIO = """
+CREATE INDEX IF NOT EXISTS idx_artigo_usuario_id
+ON artigo(usuario_id, data_cadastro DESC)
+"""
+
 # Lista de todos os índices para criação
 TODOS_INDICES = [
     # Usuario
@@ -54,4 +74,8 @@ TODOS_INDICES = [
     # Chat
     CRIAR_INDICE_CHAT_MENSAGEM_SALA,
     CRIAR_INDICE_CHAT_PARTICIPANTE_USUARIO,
+    # Artigo
+    CRIAR_INDICE_ARTIGO_PUBLICADOS,
+    CRIAR_INDICE_ARTIGO_CATEGORIA_PUBLICADOS,
+    CRIAR_INDICE_ARTIGO_USUARIO,
 ]
@@ -0,0 +1,44 @@
+# Tentativas registradas pelos rate limiters com armazenamento SQLite
+# (banco próprio, compartilhado entre os workers do mesmo host)
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS rate_limit_tentativa (
+    limiter TEXT NOT NULL,
+    identificador TEXT NOT NULL,
+    instante REAL NOT NULL
+)
+"""
+
+CRIAR_INDICE_IDENTIFICADOR = """
+CREATE INDEX IF NOT EXISTS idx_rate_limit_tentativa_identificador
+ON rate_limit_tentativa(limiter, identificador, instante)
+"""
+
+CRIAR_INDICE_INSTANTE = """
+CREATE INDEX IF NOT EXISTS idx_rate_limit_tentativa_instante
+ON rate_limit_tentativa(limiter, instante)
+"""
+
+INICIAR_TRANSACAO_ESCRITA = "BEGIN IMMEDIATE"
+
+INSERIR = "INSERT INTO rate_limit_tentativa (limiter, identificador, instante) VALUES (?, ?, ?)"
+
+EXCLUIR_EXPIRADAS_IDENTIFICADOR = """
+DELETE FROM rate_limit_tentativa
+WHERE limiter = ? AND identificador = ? AND instante <= ?
+"""
+
+EXCLUIR_EXPIRADAS = "DELETE FROM rate_limit_tentativa WHERE limiter = ? AND instante <= ?"
+
+EXCLUIR_IDENTIFICADOR = "DELETE FROM rate_limit_tentativa WHERE limiter = ? AND identificador = ?"
+
+EXCLUIR_TODAS = "DELETE FROM rate_limit_tentativa WHERE limiter = ?"
+
+CONTAR_VALIDAS = """
+SELECT COUNT(*), MIN(instante) FROM rate_limit_tentativa
+WHERE limiter = ? AND identificador = ? AND instante > ?
+"""
+
+OBTER_ESTATISTICAS = """
+SELECT COUNT(DISTINCT identificador), COUNT(*) FROM rate_limit_tentativa
+WHERE limiter = ?
+"""
@@ -19,6 +19,9 @@ _test_db.close()
 os.environ['DATABASE_PATH'] = _TEST_DB_PATH
 os.environ['RESEND_API_KEY'] = ''
 os.environ['LOG_LEVEL'] = 'ERROR'
+os.environ['BACKUP_AUTOMATICO_INTERVALO_HORAS'] = '0'
+os.environ['CONFIG_SINCRONIZACAO_SEGUNDOS'] = '0'
+os.environ['CACHE_PAGINAS_SINCRONIZACAO_SEGUNDOS'] = '0'
 
 # ============================================================
 # Agora sim, importar o resto (db_util já lerá o valor correto)
@@ -40,11 +43,14 @@ def setup_test_database():
     """
     yield _TEST_DB_PATH
 
-    # Limpar: remover arquivo de banco após todos os testes
-    try:
-        os.unlink(_TEST_DB_PATH)
-    except Exception:
-        pass
+    # Limpar: fechar conexões do pool e remover arquivos do banco (incluindo -wal/-shm)
+    from util.db_util import fechar_pool
+    fechar_pool()
+    for sufixo in ("", "-wal", "-shm"):
+        try:
+            os.unlink(_TEST_DB_PATH + sufixo)
+        except Exception:
+            pass
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -115,6 +121,20 @@ def limpar_config_cache():
     config.limpar()
 
 
+@pytest.fixture(scope="function", autouse=True)
+def limpar_cache_paginas():
+    """Limpa o cache de páginas públicas antes de cada teste para evitar interferência"""
+    from util.cache_paginas import cache_paginas
+
+    # Limpar antes do teste
+    cache_paginas.limpar()
+
+    yield
+
+    # Limpar depois do teste também
+    cache_paginas.limpar()
+
+
 @pytest.fixture(scope="function", autouse=True)
 def limpar_chat_manager():
     """Limpa o gerenciador de chat antes de cada teste para evitar interferência"""
@@ -36,6 +36,8 @@ def criar_tabelas_integracao():
         chat_sala_repo,
         chat_participante_repo,
         chat_mensagem_repo,
+        categoria_repo,
+        artigo_repo,
     )
 
     # Criar tabelas na ordem correta (respeitando dependencias)
@@ -43,9 +45,11 @@ def criar_tabelas_integracao():
     configuracao_repo.criar_tabela()
     chamado_repo.criar_tabela()
     chamado_interacao_repo.criar_tabela()
-    indices_repo.criar_indices()
     chat_sala_repo.criar_tabela()
     chat_participante_repo.criar_tabela()
     chat_mensagem_repo.criar_tabela()
+    categoria_repo.criar_tabela()
+    artigo_repo.criar_tabela()
+    indices_repo.criar_indices()
 
     yield
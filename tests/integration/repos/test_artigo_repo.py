@@ -0,0 +1,242 @@
+"""
+Testes de integração para a busca textual de repo/artigo_repo.py.
+
+Usam o banco de testes real, com o índice FTS5 mantido por triggers.
+"""
+import pytest
+
+from model.artigo_model import Artigo, StatusArtigo
+from model.usuario_model import Usuario
+from repo import artigo_repo, usuario_repo
+from util.db_util import obter_conexao
+from util.perfis import Perfil
+from util.security import criar_hash_senha
+
+
+@pytest.fixture
+def autor_id():
+    """Cria um autor e remove os artigos dele ao final (usuario é limpo pelo conftest)."""
+    usuario = Usuario(
+        id=0,
+        nome="Autor Busca",
+        email="autor_busca@example.com",
+        senha=criar_hash_senha("Senha@123"),
+        perfil=Perfil.AUTOR.value
+    )
+    usuario_id = usuario_repo.inserir(usuario)
+    yield usuario_id
+    with obter_conexao() as conn:
+        conn.execute("DELETE FROM artigo WHERE usuario_id = ?", (usuario_id,))
+
+
+def _criar_artigo(autor_id: int, titulo: str, resumo: str = "", conteudo: str = "",
+                  status: str = StatusArtigo.PUBLICADO.value) -> int:
+    artigo = Artigo(
+        titulo=titulo,
+        resumo=resumo,
+        conteudo=conteudo,
+        status=status,
+        usuario_id=autor_id,
+        categoria_id=None,
+    )
+    return artigo_repo.inserir(artigo)
+
+
+class TestArtigoRepoBuscar:
+    """Testes para buscar e contar_busca."""
+
+    def test_busca_em_titulo_resumo_e_conteudo(self, autor_id):
+        """Deve encontrar o termo em qualquer um dos campos indexados."""
+        id_titulo = _criar_artigo(autor_id, "Guia de xilofones")
+        id_resumo = _criar_artigo(autor_id, "Outro", resumo="Tudo sobre xilofones")
+        id_conteudo = _criar_artigo(autor_id, "Mais um", conteudo="Texto longo citando xilofones")
+
+        ids = {artigo.id for artigo in artigo_repo.buscar("xilofones")}
+
+        assert ids == {id_titulo, id_resumo, id_conteudo}
+        assert artigo_repo.contar_busca("xilofones") == 3
+
+    def test_titulo_tem_mais_relevancia(self, autor_id):
+        """Artigo com o termo no título deve vir antes do que só o cita no conteúdo."""
+        id_conteudo = _criar_artigo(autor_id, "Receitas", conteudo="uma nota sobre quasares")
+        id_titulo = _criar_artigo(autor_id, "Quasares explicados")
+
+        resultado = artigo_repo.buscar("quasares")
+
+        assert [artigo.id for artigo in resultado] == [id_titulo, id_conteudo]
+
+    def test_ignora_rascunhos(self, autor_id):
+        """Não deve retornar artigos não publicados."""
+        _criar_artigo(autor_id, "Rascunho sobre nebulosas", status=StatusArtigo.RASCUNHO.value)
+
+        assert artigo_repo.buscar("nebulosas") == []
+        assert artigo_repo.contar_busca("nebulosas") == 0
+
+    def test_indice_acompanha_alteracao_e_exclusao(self, autor_id):
+        """Alterar e excluir devem refletir no índice."""
+        artigo_id = _criar_artigo(autor_id, "Sobre ornitorrincos")
+        artigo = artigo_repo.obter_por_id(artigo_id)
+        artigo.titulo = "Sobre equidnas"
+        artigo_repo.alterar(artigo)
+
+        assert artigo_repo.buscar("ornitorrincos") == []
+        assert [a.id for a in artigo_repo.buscar("equidnas")] == [artigo_id]
+
+        artigo_repo.excluir(artigo_id)
+        assert artigo_repo.buscar("equidnas") == []
+
+    def test_trecho_destacado_e_escapado(self, autor_id):
+        """O trecho deve destacar o termo e escapar o HTML do conteúdo."""
+        _criar_artigo(autor_id, "Artigo", conteudo="<b>negrito</b> e manguezais")
+
+        artigo = artigo_repo.buscar("manguezais")[0]
+
+        assert "<mark>manguezais</mark>" in artigo.trecho
+        assert "&lt;b&gt;" in artigo.trecho
+
+    def test_busca_prefixo_sem_acento_e_paginada(self, autor_id):
+        """Deve aceitar prefixos, ignorar acentos e paginar."""
+        for i in range(3):
+            _criar_artigo(autor_id, f"Programação funcional {i}")
+
+        assert artigo_repo.contar_busca("programacao") == 3
+        assert len(artigo_repo.buscar("progr", limite=2, offset=0)) == 2
+        assert len(artigo_repo.buscar("progr", limite=2, offset=2)) == 1
+
+    def test_termo_com_sintaxe_fts_nao_quebra(self, autor_id):
+        """Aspas e operadores digitados pelo usuário não devem gerar erro."""
+        _criar_artigo(autor_id, "Tutorial de SQL")
+
+        assert len(artigo_repo.buscar('"sql" (')) == 1
+        assert artigo_repo.buscar("***") == []
+
+    def test_reconstruir_indice(self, autor_id):
+        """Deve reconstruir o índice sem perder resultados."""
+        artigo_id = _criar_artigo(autor_id, "Sobre tardigrados")
+
+        assert artigo_repo.reconstruir_indice_busca() is True
+        assert [a.id for a in artigo_repo.buscar("tardigrados")] == [artigo_id]
+
+
+class TestArtigoRepoPaginacao:
+    """Testes para a paginação por cursor das listagens de publicados."""
+
+    def test_percorre_paginas_sem_repetir(self, autor_id):
+        """Deve percorrer todas as páginas em ordem, sem repetir artigos."""
+        ids = [_criar_artigo(autor_id, f"Paginado {i}") for i in range(5)]
+        _criar_artigo(autor_id, "Rascunho paginado", status=StatusArtigo.RASCUNHO.value)
+
+        vistos = []
+        cursor = None
+        while True:
+            artigos, cursor = artigo_repo.obter_publicados_paginado(limite=2, cursor=cursor)
+            vistos.extend(artigo.id for artigo in artigos)
+            if not cursor:
+                break
+
+        # Mesma data de publicação: desempate pelo id, do mais novo ao mais antigo
+        assert vistos == sorted(ids, reverse=True)
+
+    def test_ordena_por_data_publicacao(self, autor_id):
+        """Deve listar primeiro os publicados mais recentemente."""
+        antigo_id = _criar_artigo(autor_id, "Antigo")
+        novo_id = _criar_artigo(autor_id, "Novo")
+        with obter_conexao() as conn:
+            conn.execute("UPDATE artigo SET data_publicacao = '2020-01-01 00:00:00' WHERE id = ?", (novo_id,))
+            conn.execute("UPDATE artigo SET data_publicacao = '2019-01-01 00:00:00' WHERE id = ?", (antigo_id,))
+
+        primeira, cursor = artigo_repo.obter_publicados_paginado(limite=1)
+        segunda, fim = artigo_repo.obter_publicados_paginado(limite=1, cursor=cursor)
+
+        assert [a.id for a in primeira] == [novo_id]
+        assert [a.id for a in segunda] == [antigo_id]
+        assert fim is None
+
+    def test_por_categoria(self, autor_id):
+        """Deve paginar apenas os artigos da categoria."""
+        with obter_conexao() as conn:
+            categoria_id = conn.execute(
+                "INSERT INTO categoria (nome, descricao) VALUES ('Paginação', '')"
+            ).lastrowid
+        try:
+            ids = []
+            for i in range(3):
+                artigo = Artigo(titulo=f"Cat {i}", status=StatusArtigo.PUBLICADO.value,
+                                usuario_id=autor_id, categoria_id=categoria_id)
+                ids.append(artigo_repo.inserir(artigo))
+            _criar_artigo(autor_id, "Sem categoria")
+
+            pagina1, cursor = artigo_repo.obter_por_categoria_paginado(categoria_id, limite=2)
+            pagina2, fim = artigo_repo.obter_por_categoria_paginado(categoria_id, limite=2, cursor=cursor)
+
+            assert [a.id for a in pagina1 + pagina2] == sorted(ids, reverse=True)
+            assert fim is None
+        finally:
+            with obter_conexao() as conn:
+                conn.execute("DELETE FROM artigo WHERE categoria_id = ?", (categoria_id,))
+                conn.execute("DELETE FROM categoria WHERE id = ?", (categoria_id,))
+
+    def test_listagem_traz_apenas_trecho_do_conteudo(self, autor_id):
+        """A listagem não deve carregar o conteúdo completo."""
+        _criar_artigo(autor_id, "Longo", conteudo="x" * 5000)
+
+        artigos, _ = artigo_repo.obter_publicados_paginado()
+
+        assert len(artigos[0].conteudo) == 300
+
+    def test_cursor_invalido_volta_para_primeira_pagina(self, autor_id):
+        """Cursor malformado deve ser tratado como primeira página."""
+        artigo_id = _criar_artigo(autor_id, "Único")
+
+        artigos, _ = artigo_repo.obter_publicados_paginado(cursor="lixo")
+
+        assert [a.id for a in artigos] == [artigo_id]
+
+    def test_limite_maximo_de_pagina(self, autor_id):
+        """Limites acima do máximo devem ser reduzidos."""
+        for i in range(artigo_repo.LIMITE_MAXIMO_PAGINA + 1):
+            _criar_artigo(autor_id, f"Volume {i}")
+
+        artigos, cursor = artigo_repo.obter_publicados_paginado(limite=1000)
+
+        assert len(artigos) == artigo_repo.LIMITE_MAXIMO_PAGINA
+        assert cursor is not None
+
+    def test_consulta_usa_indice_de_publicados(self, autor_id):
+        """A primeira página deve ser lida pelo índice parcial de publicados."""
+        from sql.artigo_sql import OBTER_PUBLICADOS_PAGINA
+
+        with obter_conexao() as conn:
+            plano = conn.execute(f"EXPLAIN QUERY PLAN {OBTER_PUBLICADOS_PAGINA}", (10,)).fetchall()
+
+        detalhes = " ".join(row["detail"] for row in plano)
+        assert "idx_artigo_publicados" in detalhes
+        assert "TEMP B-TREE" not in detalhes
+
+
+class TestArtigoRepoVersaoConteudo:
+    """Testes para a versão do conteúdo público mantida por gatilhos."""
+
+    def test_alteracoes_incrementam_versao(self, autor_id):
+        """Inserir, alterar e excluir artigos deve mudar a versão."""
+        versao = artigo_repo.obter_versao_conteudo()
+        artigo_id = _criar_artigo(autor_id, "Versionado")
+        assert artigo_repo.obter_versao_conteudo() > versao
+
+        versao = artigo_repo.obter_versao_conteudo()
+        artigo_repo.alterar_status(artigo_id, StatusArtigo.PAUSADO.value)
+        assert artigo_repo.obter_versao_conteudo() > versao
+
+        versao = artigo_repo.obter_versao_conteudo()
+        usuario_repo.alterar(Usuario(id=autor_id, nome="Autor Renomeado", email="autor_busca@example.com",
+                                     senha="", perfil=Perfil.AUTOR.value))
+        assert artigo_repo.obter_versao_conteudo() > versao
+
+    def test_visualizacoes_nao_incrementam_versao(self, autor_id):
+        """Gravar visualizações não deve invalidar o cache dos outros workers."""
+        artigo_id = _criar_artigo(autor_id, "Muito visto")
+        versao = artigo_repo.obter_versao_conteudo()
+
+        artigo_repo.somar_visualizacoes({artigo_id: 5})
+
+        assert artigo_repo.obter_versao_conteudo() == versao
@@ -17,6 +17,7 @@ from repo import usuario_repo
 from model.usuario_model import Usuario
 from util.security import criar_hash_senha
 from util.perfis import Perfil
+from util.db_util import obter_conexao
 
 
 # =============================================================================
@@ -254,6 +255,99 @@ class TestChatSalaRepoExcluir:
         assert resultado is False
 
 
+class TestChatSalaRepoListarConversas:
+    """Testes para a função listar_conversas_por_usuario."""
+
+    def _criar_usuario(self, nome: str, email: str) -> int:
+        usuario = Usuario(
+            id=0,
+            nome=nome,
+            email=email,
+            senha=criar_hash_senha("Senha@123"),
+            perfil=Perfil.AUTOR.value
+        )
+        return usuario_repo.inserir(usuario)
+
+    def _criar_sala(self, usuario1_id: int, usuario2_id: int) -> str:
+        sala = chat_sala_repo.criar_ou_obter_sala(usuario1_id, usuario2_id)
+        chat_participante_repo.adicionar_participante(sala.id, usuario1_id)
+        chat_participante_repo.adicionar_participante(sala.id, usuario2_id)
+        return sala.id
+
+    def test_listar_conversas_sem_salas(self):
+        """Deve retornar lista vazia para usuário sem conversas."""
+        usuario_id = self._criar_usuario("Sem Conversas", "sem_conversas@example.com")
+
+        assert chat_sala_repo.listar_conversas_por_usuario(usuario_id) == []
+
+    def test_listar_conversas_com_ultima_mensagem_e_nao_lidas(self):
+        """Deve trazer outro usuário, última mensagem e não lidas."""
+        usuario1_id = self._criar_usuario("Conversa 1", "conversa1@example.com")
+        usuario2_id = self._criar_usuario("Conversa 2", "conversa2@example.com")
+        sala_id = self._criar_sala(usuario1_id, usuario2_id)
+
+        chat_mensagem_repo.inserir(sala_id, usuario2_id, "Oi")
+        chat_mensagem_repo.inserir(sala_id, usuario2_id, "Tudo bem?")
+
+        conversas = chat_sala_repo.listar_conversas_por_usuario(usuario1_id)
+
+        assert len(conversas) == 1
+        conversa = conversas[0]
+        assert conversa.sala_id == sala_id
+        assert conversa.outro_usuario_id == usuario2_id
+        assert conversa.outro_usuario_nome == "Conversa 2"
+        assert conversa.nao_lidas == 2
+        assert conversa.ultima_mensagem is not None
+        assert conversa.ultima_mensagem.mensagem == "Tudo bem?"
+        assert conversa.ultima_mensagem.data_envio is not None
+
+        # Para o remetente, nenhuma mensagem está pendente
+        conversas_remetente = chat_sala_repo.listar_conversas_por_usuario(usuario2_id)
+        assert conversas_remetente[0].nao_lidas == 0
+        assert conversas_remetente[0].outro_usuario_id == usuario1_id
+
+    def test_listar_conversas_ordenadas_e_paginadas(self):
+        """Deve ordenar por última atividade e aplicar limit/offset."""
+        usuario_id = self._criar_usuario("Central", "central@example.com")
+        outros_ids = [
+            self._criar_usuario(f"Contato {i}", f"contato{i}@example.com")
+            for i in range(3)
+        ]
+        salas = [self._criar_sala(usuario_id, outro_id) for outro_id in outros_ids]
+
+        # A primeira sala passa a ser a mais recente
+        chat_sala_repo.atualizar_ultima_atividade(salas[0])
+
+        conversas = chat_sala_repo.listar_conversas_por_usuario(usuario_id)
+        assert len(conversas) == 3
+        assert conversas[0].sala_id == salas[0]
+
+        pagina = chat_sala_repo.listar_conversas_por_usuario(usuario_id, limit=2, offset=2)
+        assert len(pagina) == 1
+        assert pagina[0].sala_id == conversas[2].sala_id
+
+    def test_listar_conversas_paginacao_estavel_com_empate(self):
+        """Salas com a mesma última atividade não devem se repetir entre páginas."""
+        usuario_id = self._criar_usuario("Empate", "empate@example.com")
+        salas = [
+            self._criar_sala(usuario_id, self._criar_usuario(f"Empate {i}", f"empate{i}@example.com"))
+            for i in range(4)
+        ]
+        with obter_conexao() as conn:
+            conn.execute(
+                "UPDATE chat_sala SET ultima_atividade = '2025-01-01 10:00:00' WHERE id IN (?, ?, ?, ?)",
+                salas
+            )
+
+        paginas = [
+            chat_sala_repo.listar_conversas_por_usuario(usuario_id, limit=2, offset=offset)
+            for offset in (0, 2)
+        ]
+
+        ids = [conversa.sala_id for pagina in paginas for conversa in pagina]
+        assert ids == sorted(salas, reverse=True)
+
+
 class TestChatSalaRepoCriarTabela:
     """Testes para a função criar_tabela."""
 
@@ -901,6 +995,85 @@ class TestChatParticipanteRepoContar:
         assert total >= 0  # Valor depende da implementação
 
 
+class TestChatParticipanteRepoContadorNaoLidas:
+    """Testes para o contador desnormalizado qtde_nao_lidas."""
+
+    def _criar_sala_com_participantes(self, prefixo: str):
+        ids = []
+        for i in (1, 2):
+            usuario = Usuario(
+                id=0,
+                nome=f"Usuario {prefixo} {i}",
+                email=f"{prefixo}{i}@example.com",
+                senha=criar_hash_senha("Senha@123"),
+                perfil=Perfil.AUTOR.value
+            )
+            ids.append(usuario_repo.inserir(usuario))
+        sala = chat_sala_repo.criar_ou_obter_sala(ids[0], ids[1])
+        chat_participante_repo.adicionar_participante(sala.id, ids[0])
+        chat_participante_repo.adicionar_participante(sala.id, ids[1])
+        return sala.id, ids[0], ids[1]
+
+    def test_inserir_mensagem_incrementa_apenas_destinatario(self):
+        """Deve incrementar o contador só de quem não enviou a mensagem."""
+        sala_id, remetente_id, destinatario_id = self._criar_sala_com_participantes("contador_inc")
+
+        chat_mensagem_repo.inserir(sala_id, remetente_id, "Msg 1")
+        chat_mensagem_repo.inserir(sala_id, remetente_id, "Msg 2")
+
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, destinatario_id) == 2
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, remetente_id) == 0
+
+    def test_atualizar_ultima_leitura_zera_contador(self):
+        """Deve zerar o contador ao registrar a leitura."""
+        sala_id, remetente_id, destinatario_id = self._criar_sala_com_participantes("contador_zerar")
+        chat_mensagem_repo.inserir(sala_id, remetente_id, "Msg")
+
+        chat_participante_repo.atualizar_ultima_leitura(sala_id, destinatario_id)
+
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, destinatario_id) == 0
+
+    def test_excluir_mensagem_nao_lida_decrementa(self):
+        """Deve decrementar o contador ao excluir mensagem ainda não lida."""
+        sala_id, remetente_id, destinatario_id = self._criar_sala_com_participantes("contador_dec")
+        mensagem = chat_mensagem_repo.inserir(sala_id, remetente_id, "Msg")
+        chat_mensagem_repo.inserir(sala_id, remetente_id, "Msg 2")
+
+        chat_mensagem_repo.excluir(mensagem.id)
+
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, destinatario_id) == 1
+
+    def test_contar_nao_lidas_total(self):
+        """Deve somar os contadores de todas as salas do usuário."""
+        sala_id, remetente_id, destinatario_id = self._criar_sala_com_participantes("contador_total")
+        chat_mensagem_repo.inserir(sala_id, remetente_id, "Msg 1")
+        chat_mensagem_repo.inserir(sala_id, remetente_id, "Msg 2")
+        chat_mensagem_repo.inserir(sala_id, destinatario_id, "Resposta")
+
+        assert chat_participante_repo.contar_nao_lidas_total(destinatario_id) == 2
+        assert chat_participante_repo.contar_nao_lidas_total(remetente_id) == 1
+
+    def test_reconstruir_contadores_corrige_divergencia(self):
+        """Deve detectar e corrigir contadores divergentes."""
+        sala_id, remetente_id, destinatario_id = self._criar_sala_com_participantes("contador_reconstruir")
+        chat_mensagem_repo.inserir(sala_id, remetente_id, "Msg")
+
+        with obter_conexao() as conn:
+            conn.execute(
+                "UPDATE chat_participante SET qtde_nao_lidas = 7 WHERE sala_id = ? AND usuario_id = ?",
+                (sala_id, destinatario_id)
+            )
+
+        inconsistentes = chat_participante_repo.listar_nao_lidas_inconsistentes()
+        assert len(inconsistentes) == 1
+        assert inconsistentes[0]["qtde_nao_lidas"] == 7
+        assert inconsistentes[0]["qtde_calculada"] == 1
+
+        assert chat_participante_repo.reconstruir_contadores_nao_lidas() == 1
+        assert chat_participante_repo.listar_nao_lidas_inconsistentes() == []
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, destinatario_id) == 1
+
+
 class TestChatParticipanteRepoExcluir:
     """Testes para a função excluir."""
 
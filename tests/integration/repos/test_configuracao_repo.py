@@ -232,6 +232,39 @@ class TestObterMultiplas:
         assert resultado == {}
 
 
+class TestVersaoConfiguracoes:
+    """Testes da versão das configurações (mantida por gatilhos)"""
+
+    @pytest.fixture(autouse=True)
+    def criar_versao(self, configuracao_db):
+        """Cria a tabela de versão e os gatilhos no banco de teste"""
+        configuracao_repo.criar_tabela()
+
+    def test_versao_inicial(self, configuracao_db):
+        """Tabela recém-criada deve começar na versão 0"""
+        assert configuracao_repo.obter_versao() == 0
+
+    def test_alteracoes_incrementam_versao(self, configuracao_db):
+        """Inserir, atualizar e excluir configurações deve incrementar a versão"""
+        with configuracao_repo.obter_conexao() as conn:
+            conn.execute("INSERT INTO configuracao (chave, valor) VALUES (?, ?)", ("tema", "claro"))
+        assert configuracao_repo.obter_versao() == 1
+
+        configuracao_repo.atualizar_multiplas({"tema": "escuro"})
+        assert configuracao_repo.obter_versao() == 2
+
+        with configuracao_repo.obter_conexao() as conn:
+            conn.execute("DELETE FROM configuracao WHERE chave = ?", ("tema",))
+        assert configuracao_repo.obter_versao() == 3
+
+    def test_leitura_nao_altera_versao(self, configuracao_db):
+        """Consultas não devem alterar a versão"""
+        configuracao_repo.obter_todos()
+        configuracao_repo.obter_multiplas(["x"])
+
+        assert configuracao_repo.obter_versao() == 0
+
+
 class TestAtualizar:
     """Testes para atualizar"""
 
@@ -5,6 +5,7 @@ Testa as operações CRUD e funções auxiliares do usuario_repo.
 """
 import pytest
 from datetime import timedelta
+from unittest.mock import patch
 
 from repo import usuario_repo
 from model.usuario_model import Usuario
@@ -31,6 +32,22 @@ class TestUsuarioRepoInserir:
         assert usuario_id is not None
         assert usuario_id > 0
 
+    def test_inserir_nao_cria_arquivo_de_foto(self, tmp_path):
+        """Cadastro não deve copiar a foto padrão (usuário usa a compartilhada)."""
+        usuario = Usuario(
+            id=0,
+            nome="Teste Sem Foto",
+            email="semfoto@example.com",
+            senha=criar_hash_senha("Senha@123"),
+            perfil=Perfil.AUTOR.value
+        )
+
+        with patch('util.foto_util.PASTA_FOTOS', tmp_path):
+            usuario_id = usuario_repo.inserir(usuario)
+
+        assert usuario_id is not None
+        assert list(tmp_path.iterdir()) == []
+
     def test_inserir_usuario_com_perfil_leitor(self):
         """Deve inserir usuário leitor corretamente."""
         usuario = Usuario(
@@ -225,6 +242,24 @@ class TestUsuarioRepoExcluir:
         usuario_excluido = usuario_repo.obter_por_id(usuario_id)
         assert usuario_excluido is None
 
+    def test_excluir_remove_foto_do_usuario(self, tmp_path):
+        """Excluir usuário deve remover a foto própria e as variantes."""
+        usuario = Usuario(
+            id=0,
+            nome="Teste Excluir Foto",
+            email="excluirfoto@example.com",
+            senha=criar_hash_senha("Senha@123"),
+            perfil=Perfil.AUTOR.value
+        )
+        usuario_id = usuario_repo.inserir(usuario)
+        (tmp_path / f"{usuario_id:06d}.jpg").write_bytes(b"foto")
+        (tmp_path / f"{usuario_id:06d}_48.webp").write_bytes(b"variante")
+
+        with patch('util.foto_util.PASTA_FOTOS', tmp_path):
+            assert usuario_repo.excluir(usuario_id) is True
+
+        assert list(tmp_path.iterdir()) == []
+
     def test_excluir_usuario_inexistente(self):
         """Deve retornar False quando usuário não existe."""
         resultado = usuario_repo.excluir(99999)
@@ -6,7 +6,7 @@ envio de mensagens, listagem e busca de usuários.
 """
 
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 
 class TestChatRoutes:
@@ -384,7 +384,7 @@ class TestChatRateLimiting:
 
         # Fazer muitas requisições
         with patch('routes.chat_routes.busca_usuarios_limiter') as mock_limiter:
-            mock_limiter.verificar.return_value = False
+            mock_limiter.verificar_async = AsyncMock(return_value=False)
 
             response = client.get("/chat/usuarios/buscar?q=teste", follow_redirects=False)
 
@@ -401,7 +401,7 @@ class TestChatRateLimiting:
         fazer_login("criador_rate@teste.com", "Teste@123")
 
         with patch('routes.chat_routes.chat_sala_limiter') as mock_limiter:
-            mock_limiter.verificar.return_value = False
+            mock_limiter.verificar_async = AsyncMock(return_value=False)
 
             response = client.post("/chat/salas", data={"outro_usuario_id": 999})
 
@@ -417,7 +417,7 @@ class TestChatRateLimiting:
         fazer_login("sender_rate@teste.com", "Teste@123")
 
         with patch('routes.chat_routes.chat_mensagem_limiter') as mock_limiter:
-            mock_limiter.verificar.return_value = False
+            mock_limiter.verificar_async = AsyncMock(return_value=False)
 
             response = client.post(
                 "/chat/mensagens",
@@ -436,7 +436,7 @@ class TestChatRateLimiting:
         fazer_login("listador_rate@teste.com", "Teste@123")
 
         with patch('routes.chat_routes.chat_listagem_limiter') as mock_limiter:
-            mock_limiter.verificar.return_value = False
+            mock_limiter.verificar_async = AsyncMock(return_value=False)
 
             response = client.get("/chat/conversas")
 
@@ -452,7 +452,7 @@ class TestChatRateLimiting:
         fazer_login("leitor_rate@teste.com", "Teste@123")
 
         with patch('routes.chat_routes.chat_listagem_limiter') as mock_limiter:
-            mock_limiter.verificar.return_value = False
+            mock_limiter.verificar_async = AsyncMock(return_value=False)
 
             response = client.get("/chat/mensagens/1_2")
 
@@ -712,3 +712,101 @@ class TestChatEnviarMensagemEdgeCases:
 
             # Deve retornar 400 Bad Request
             assert response.status_code == 400
+
+
+class TestChatStreamSSE:
+    """Testes para o gerador do stream SSE (lote, heartbeat e Last-Event-ID)"""
+
+    class _RequestFalso:
+        """Request mínimo com is_disconnected controlável"""
+
+        def __init__(self, desconectado: bool = False):
+            self.desconectado = desconectado
+
+        async def is_disconnected(self):
+            return self.desconectado
+
+    @staticmethod
+    def _evento(mensagem_id: int) -> dict:
+        return {
+            "tipo": "nova_mensagem",
+            "sala_id": "1_2",
+            "mensagem": {"id": mensagem_id, "sala_id": "1_2", "usuario_id": 1,
+                         "mensagem": f"msg {mensagem_id}", "data_envio": None, "lida_em": None},
+        }
+
+    async def test_eventos_na_fila_saem_em_uma_escrita(self):
+        """Eventos já disponíveis devem ser enviados juntos, com id da mensagem"""
+        import asyncio
+        from routes.chat_routes import _gerar_eventos_sse
+        from util.chat_manager import gerenciador_chat
+
+        gerador = _gerar_eventos_sse(self._RequestFalso(), 501, None)
+        proximo = asyncio.ensure_future(gerador.__anext__())
+        while not gerenciador_chat.esta_conectado(501):
+            await asyncio.sleep(0)
+
+        fila = gerenciador_chat._connections[501]
+        for mensagem_id in (1, 2, 3):
+            fila.put_nowait(self._evento(mensagem_id))
+        escrita = await proximo
+        await gerador.aclose()
+
+        assert escrita.count("data: ") == 3
+        assert escrita.startswith("id: 1\n")
+        assert "id: 3\n" in escrita
+        assert not gerenciador_chat.esta_conectado(501)
+
+    async def test_heartbeat_e_encerramento_sem_cliente(self):
+        """Sem eventos deve enviar heartbeat e encerrar se o cliente caiu"""
+        from routes.chat_routes import _gerar_eventos_sse
+
+        request = self._RequestFalso()
+        with patch("routes.chat_routes.CHAT_SSE_HEARTBEAT_SEGUNDOS", 0.01):
+            gerador = _gerar_eventos_sse(request, 502, None)
+            assert await gerador.__anext__() == ": heartbeat\n\n"
+
+            request.desconectado = True
+            with pytest.raises(StopAsyncIteration):
+                await gerador.__anext__()
+
+    async def test_reenvio_com_last_event_id(self, criar_usuario_direto):
+        """Deve reenviar mensagens posteriores ao Last-Event-ID sem duplicar"""
+        from repo import chat_sala_repo, chat_participante_repo, chat_mensagem_repo
+        from routes.chat_routes import _gerar_eventos_sse, _evento_nova_mensagem
+        from util.chat_manager import gerenciador_chat
+
+        usuario1_id = criar_usuario_direto("SSE Um", "sse1@teste.com", "Teste@123")
+        usuario2_id = criar_usuario_direto("SSE Dois", "sse2@teste.com", "Teste@123")
+        sala = chat_sala_repo.criar_ou_obter_sala(usuario1_id, usuario2_id)
+        chat_participante_repo.adicionar_participante(sala.id, usuario1_id)
+        chat_participante_repo.adicionar_participante(sala.id, usuario2_id)
+        recebida = chat_mensagem_repo.inserir(sala.id, usuario2_id, "já recebida")
+        perdida1 = chat_mensagem_repo.inserir(sala.id, usuario2_id, "perdida 1")
+        perdida2 = chat_mensagem_repo.inserir(sala.id, usuario2_id, "perdida 2")
+
+        gerador = _gerar_eventos_sse(self._RequestFalso(), usuario1_id, recebida.id)
+        reenvio = await gerador.__anext__()
+
+        # Evento também enfileirado pelo broadcast não deve ser enviado de novo
+        fila = gerenciador_chat._connections[usuario1_id]
+        fila.put_nowait(_evento_nova_mensagem(perdida2))
+        fila.put_nowait({"tipo": "atualizar_contador"})
+        seguinte = await gerador.__anext__()
+        await gerador.aclose()
+
+        assert f"id: {perdida1.id}\n" in reenvio
+        assert f"id: {perdida2.id}\n" in reenvio
+        assert f"id: {recebida.id}\n" not in reenvio
+        assert "perdida 2" not in seguinte
+        assert "atualizar_contador" in seguinte
+
+    def test_ler_last_event_id_invalido(self):
+        """Cabeçalho inválido deve ser ignorado"""
+        from routes.chat_routes import _ler_last_event_id
+
+        request = MagicMock()
+        request.headers = {"last-event-id": "abc"}
+        assert _ler_last_event_id(request) is None
+        request.headers = {"last-event-id": "42"}
+        assert _ler_last_event_id(request) == 42
@@ -5,7 +5,7 @@ Testa rate limiting e acesso às páginas de exemplos.
 """
 
 import pytest
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock
 
 
 class TestExamplesRateLimiting:
@@ -15,7 +15,7 @@ class TestExamplesRateLimiting:
     def mock_rate_limit_block(self):
         """Fixture para mockar rate limiter que bloqueia"""
         with patch('routes.examples_routes.examples_limiter') as mock_limiter:
-            mock_limiter.verificar.return_value = False
+            mock_limiter.verificar_async = AsyncMock(return_value=False)
             yield mock_limiter
 
     def test_rate_limit_index(self, client, mock_rate_limit_block):
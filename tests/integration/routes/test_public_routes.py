@@ -3,7 +3,7 @@ Testes de rotas públicas
 Testa páginas acessíveis sem autenticação (landing page, sobre, etc.)
 """
 from fastapi import status
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock
 import pytest
 
 
@@ -137,6 +137,17 @@ class TestHealthCheck:
         response = client.get("/health")
         assert response.status_code == status.HTTP_200_OK
 
+    def test_health_publico_sem_metricas(self, client):
+        """O /health público não deve expor métricas internas"""
+        response = client.get("/health")
+        assert response.json() == {"status": "healthy"}
+
+    def test_health_detalhes_requer_admin(self, client):
+        """As métricas detalhadas devem exigir login de administrador"""
+        response = client.get("/health/detalhes", follow_redirects=False)
+        assert response.status_code == status.HTTP_303_SEE_OTHER
+        assert "/login" in response.headers["location"]
+
 
 class TestErros:
     """Testes de páginas de erro"""
@@ -161,7 +172,7 @@ class TestPublicRateLimiting:
     def mock_rate_limit_block(self):
         """Fixture para mockar rate limiter que bloqueia"""
         with patch('routes.public_routes.public_limiter') as mock_limiter:
-            mock_limiter.verificar.return_value = False
+            mock_limiter.verificar_async = AsyncMock(return_value=False)
             yield mock_limiter
 
     def test_rate_limit_home(self, client, mock_rate_limit_block):
@@ -181,3 +192,195 @@ class TestPublicRateLimiting:
         response = client.get("/sobre")
 
         assert response.status_code == 429
+
+
+class TestCachePaginasPublicas:
+    """Testes do cache de páginas públicas renderizadas"""
+
+    def test_segunda_visita_anonima_vem_do_cache(self, client):
+        """A segunda visita anônima deve ser servida do cache"""
+        from util.cache_paginas import cache_paginas
+
+        primeira = client.get("/sobre")
+        segunda = client.get("/sobre")
+
+        assert segunda.status_code == status.HTTP_200_OK
+        assert segunda.text == primeira.text
+        estatisticas = cache_paginas.obter_estatisticas()
+        assert estatisticas["acertos"] == 1
+        assert estatisticas["falhas"] == 1
+
+    def test_usuario_logado_nao_usa_cache(self, autor_autenticado):
+        """Páginas de usuários logados não devem ser cacheadas"""
+        from util.cache_paginas import cache_paginas
+
+        autor_autenticado.get("/")
+        autor_autenticado.get("/")
+
+        estatisticas = cache_paginas.obter_estatisticas()
+        assert estatisticas["itens"] == 0
+        assert estatisticas["acertos"] == 0
+
+    def test_alterar_categoria_invalida_cache(self, client):
+        """Escrita em categorias deve invalidar as páginas em cache"""
+        from model.categoria_model import Categoria
+        from repo import categoria_repo
+        from util.cache_paginas import cache_paginas
+
+        client.get("/")
+        assert cache_paginas.obter_estatisticas()["itens"] == 1
+
+        categoria = categoria_repo.inserir(Categoria(id=0, nome="Cache Teste", descricao=""))
+        try:
+            assert cache_paginas.obter_estatisticas()["itens"] == 0
+            response = client.get("/")
+            assert "Cache Teste" in response.text
+        finally:
+            categoria_repo.excluir(categoria.id)
+
+    def test_health_expoe_estatisticas_do_cache(self, admin_autenticado):
+        """/health/detalhes deve incluir os contadores do cache para administradores"""
+        response = admin_autenticado.get("/health/detalhes")
+        assert "cache_paginas" in response.json()
+
+
+class TestGetCondicional:
+    """Testes de ETag / Last-Modified nas páginas públicas"""
+
+    @pytest.fixture
+    def artigo_publicado(self, criar_usuario_direto):
+        """Cria um artigo publicado e o remove ao final"""
+        from model.artigo_model import Artigo, StatusArtigo
+        from repo import artigo_repo
+        from util.db_util import obter_conexao
+
+        usuario_id = criar_usuario_direto("Autor Condicional", "autor_condicional@example.com", "Senha@123")
+        artigo_id = artigo_repo.inserir(Artigo(
+            titulo="Artigo condicional",
+            conteudo="Conteúdo",
+            status=StatusArtigo.PUBLICADO.value,
+            usuario_id=usuario_id,
+            categoria_id=None,
+        ))
+        yield artigo_id
+        with obter_conexao() as conn:
+            conn.execute("DELETE FROM artigo WHERE id = ?", (artigo_id,))
+
+    @pytest.mark.parametrize("url", ["/", "/artigos/"])
+    def test_listagem_responde_304_com_etag(self, client, artigo_publicado, url):
+        """Listagens devem responder 304 quando o ETag confere"""
+        response = client.get(url)
+        etag = response.headers["etag"]
+        assert response.status_code == status.HTTP_200_OK
+        assert "last-modified" in response.headers
+
+        condicional = client.get(url, headers={"If-None-Match": etag})
+
+        assert condicional.status_code == status.HTTP_304_NOT_MODIFIED
+        assert condicional.content == b""
+        assert condicional.headers["etag"] == etag
+
+    def test_artigo_responde_304_com_if_modified_since(self, client, artigo_publicado):
+        """Artigo deve responder 304 para If-Modified-Since atual"""
+        url = f"/artigos/ler/{artigo_publicado}"
+        response = client.get(url)
+        last_modified = response.headers["last-modified"]
+
+        condicional = client.get(url, headers={"If-Modified-Since": last_modified})
+        antigo = client.get(url, headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"})
+
+        assert condicional.status_code == status.HTTP_304_NOT_MODIFIED
+        assert antigo.status_code == status.HTTP_200_OK
+
+    def test_sem_validadores_com_mensagem_flash(self, autor_autenticado, artigo_publicado):
+        """Página que exibe mensagem flash não deve ser validada nem cacheada"""
+        response = autor_autenticado.get("/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "etag" not in response.headers
+
+    def test_alteracao_muda_etag(self, client, artigo_publicado):
+        """Alterar o artigo deve invalidar o ETag da listagem"""
+        from util.cache_paginas import cache_paginas
+        from util.db_util import obter_conexao
+
+        etag = client.get("/artigos/").headers["etag"]
+        with obter_conexao() as conn:
+            conn.execute(
+                "UPDATE artigo SET data_atualizacao = '2999-01-01 00:00:00' WHERE id = ?",
+                (artigo_publicado,)
+            )
+        cache_paginas.invalidar()
+
+        response = client.get("/artigos/", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+
+    def test_alteracao_em_outro_processo_nao_serve_pagina_em_cache(self, client, artigo_publicado):
+        """Página em cache de uma versão anterior não deve ser servida com o ETag novo"""
+        from util.db_util import obter_conexao
+
+        url = f"/artigos/ler/{artigo_publicado}"
+        etag = client.get(url).headers["etag"]
+        # Alteração feita por outro processo: o cache deste não é invalidado
+        with obter_conexao() as conn:
+            conn.execute(
+                "UPDATE artigo SET titulo = 'Artigo editado', data_atualizacao = '2999-01-01 00:00:00' "
+                "WHERE id = ?",
+                (artigo_publicado,)
+            )
+
+        response = client.get(url)
+
+        assert response.headers["etag"] != etag
+        assert "Artigo editado" in response.text
+
+    def test_alterar_autor_muda_etag_do_artigo(self, client, artigo_publicado):
+        """Renomear o autor deve mudar o ETag do artigo, que exibe o nome dele"""
+        from util.cache_paginas import cache_paginas
+        from util.db_util import obter_conexao
+
+        url = f"/artigos/ler/{artigo_publicado}"
+        etag = client.get(url).headers["etag"]
+        with obter_conexao() as conn:
+            conn.execute(
+                "UPDATE usuario SET nome = 'Autor Renomeado', data_atualizacao = '2999-01-01 00:00:00' "
+                "WHERE id = (SELECT usuario_id FROM artigo WHERE id = ?)",
+                (artigo_publicado,)
+            )
+
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+        assert cache_paginas.obter_estatisticas()["acertos"] == 0
+
+    def test_etag_depende_do_usuario(self, client, artigo_publicado, autor_autenticado):
+        """Usuário logado não deve reaproveitar o ETag da página anônima"""
+        from fastapi.testclient import TestClient
+        from main import app
+
+        anonimo = TestClient(app)
+        etag_anonimo = anonimo.get("/").headers["etag"]
+        # Primeira página após o login exibe a mensagem flash (sem validadores)
+        autor_autenticado.get("/")
+
+        response = autor_autenticado.get("/", headers={"If-None-Match": etag_anonimo})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag_anonimo
+
+    def test_troca_de_foto_muda_etag(self, autor_autenticado, artigo_publicado):
+        """Trocar a foto deve mudar o ETag, pois a navbar usa a URL versionada do avatar"""
+        autor_autenticado.get("/")  # consome a mensagem flash do login
+        etag = autor_autenticado.get("/").headers["etag"]
+
+        with patch(
+            'util.cache_http.obter_caminho_foto_usuario',
+            return_value="/static/img/usuarios/000001.jpg?v=2"
+        ):
+            response = autor_autenticado.get("/", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
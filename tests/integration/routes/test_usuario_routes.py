@@ -287,7 +287,7 @@ class TestAtualizarFoto:
         assert response.status_code == status.HTTP_303_SEE_OTHER
 
     def test_atualizar_foto_muito_grande(self, autor_autenticado):
-        """Deve rejeitar foto muito grande (>10MB)"""
+        """Deve rejeitar foto acima de foto_max_upload_bytes antes de decodificar"""
         foto_grande = "data:image/png;base64," + ("A" * 15 * 1024 * 1024)
 
         response = autor_autenticado.post("/usuario/perfil/atualizar-foto", data={
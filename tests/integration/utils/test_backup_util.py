@@ -4,6 +4,7 @@ Testes para o módulo util/backup_util.py
 Testa todas as funções de gerenciamento de backup do banco de dados.
 """
 
+import asyncio
 import pytest
 import sqlite3
 from pathlib import Path
@@ -26,6 +27,12 @@ from util.backup_util import (
     excluir_backup,
     obter_info_backup,
     obter_caminho_backup,
+    reconstruir_manifesto,
+    aplicar_retencao,
+    calcular_proxima_execucao_backup,
+    obter_estatisticas_backup_agendado,
+    tarefa_backup_agendado,
+    _executar_backup_agendado,
     BACKUP_DIR,
     BACKUP_FILENAME_PATTERN,
 )
@@ -154,6 +161,10 @@ class TestDetectarTipoBackup:
         """Deve detectar backup automático"""
         assert _detectar_tipo_backup("backup_auto_2025-01-15_10-30-00.db") == "automático"
 
+    def test_backup_seguranca(self):
+        """Deve detectar backup de segurança (criado antes de restaurar)"""
+        assert _detectar_tipo_backup("backup_seguranca_2025-01-15_10-30-00.db") == "segurança"
+
 
 class TestExtrairDataDoNome:
     """Testes para a função _extrair_data_do_nome"""
@@ -169,6 +180,11 @@ class TestExtrairDataDoNome:
         assert resultado.minute == 30
         assert resultado.second == 45
 
+    def test_extrair_data_backup_seguranca(self):
+        """Deve extrair data de nome de backup de segurança"""
+        resultado = _extrair_data_do_nome("backup_seguranca_2025-06-20_14-00-00.db")
+        assert resultado == datetime(2025, 6, 20, 14, 0, 0)
+
     def test_extrair_data_backup_automatico(self):
         """Deve extrair data de nome de backup automático"""
         resultado = _extrair_data_do_nome("backup_auto_2025-06-20_14-00-00.db")
@@ -301,6 +317,85 @@ class TestCriarBackup:
         backups = list(setup_backup_env['backup_dir'].glob("backup_auto_*.db"))
         assert len(backups) == 1
 
+    def test_criar_backup_em_passos_reporta_progresso(self, setup_backup_env):
+        """Deve copiar em vários passos, reportar progresso e manter o conteúdo"""
+        conn = sqlite3.connect(str(setup_backup_env['db_path']))
+        conn.execute("CREATE TABLE dados (id INTEGER PRIMARY KEY, texto TEXT)")
+        conn.executemany("INSERT INTO dados (texto) VALUES (?)", [("x" * 500,) for _ in range(200)])
+        conn.commit()
+        conn.close()
+
+        chamadas = []
+        with patch('util.backup_util.BACKUP_PAGINAS_POR_PASSO', 5), \
+             patch('util.backup_util.BACKUP_PAUSA_SEGUNDOS', 0):
+            sucesso, _ = criar_backup(progresso=lambda copiadas, total: chamadas.append((copiadas, total)))
+
+        assert sucesso is True
+        assert len(chamadas) > 1
+        assert chamadas[-1][0] == chamadas[-1][1]
+
+        backups = list(setup_backup_env['backup_dir'].glob("backup_*.db"))
+        conn = sqlite3.connect(str(backups[0]))
+        assert conn.execute("SELECT COUNT(*) FROM dados").fetchone()[0] == 200
+        conn.close()
+
+    def test_criar_backup_inclui_dados_do_wal(self, setup_backup_env):
+        """Deve incluir transações ainda não transferidas do WAL com o banco aberto"""
+        conn = sqlite3.connect(str(setup_backup_env['db_path']))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA wal_autocheckpoint=0")
+        conn.execute("INSERT INTO teste (id) VALUES (42)")
+        conn.commit()
+
+        try:
+            sucesso, _ = criar_backup()
+        finally:
+            conn.close()
+
+        assert sucesso is True
+        backups = list(setup_backup_env['backup_dir'].glob("backup_*.db"))
+        conn_backup = sqlite3.connect(str(backups[0]))
+        assert conn_backup.execute("SELECT id FROM teste").fetchone()[0] == 42
+        conn_backup.close()
+
+    def test_criar_backup_falha_nao_deixa_arquivo_parcial(self, setup_backup_env):
+        """Não deve deixar arquivo parcial quando a cópia falha"""
+        def falhar(copiadas, total):
+            raise sqlite3.OperationalError("disk I/O error")
+
+        with patch('util.backup_util.BACKUP_PAGINAS_POR_PASSO', 1), \
+             patch('util.backup_util.BACKUP_PAUSA_SEGUNDOS', 0):
+            sucesso, mensagem = criar_backup(progresso=falhar)
+
+        assert sucesso is False
+        assert "erro" in mensagem.lower()
+        assert list(setup_backup_env['backup_dir'].glob("backup_*")) == []
+
+    def test_criar_backup_em_andamento(self, setup_backup_env):
+        """Deve recusar um segundo backup enquanto outro está em andamento"""
+        from util.backup_util import _lock_backup
+
+        with _lock_backup:
+            sucesso, mensagem = criar_backup()
+
+        assert sucesso is False
+        assert "andamento" in mensagem.lower()
+        assert list(setup_backup_env['backup_dir'].glob("backup_*.db")) == []
+
+    def test_criar_backup_em_andamento_em_outro_worker(self, setup_backup_env):
+        """Deve recusar o backup enquanto outro processo detém o lock de backup"""
+        from util.backup_util import _abrir_lock_arquivo, LOCK_BACKUP_NOME
+
+        lock_outro_worker = _abrir_lock_arquivo(LOCK_BACKUP_NOME)
+        try:
+            sucesso, mensagem = criar_backup()
+        finally:
+            lock_outro_worker.close()
+
+        assert sucesso is False
+        assert "andamento" in mensagem.lower()
+        assert criar_backup()[0] is True
+
     def test_criar_backup_sem_banco(self):
         """Deve falhar se banco de dados não existir"""
         with patch('util.backup_util.DATABASE_PATH', '/caminho/inexistente/db.db'):
@@ -312,6 +407,277 @@ class TestCriarBackup:
                     assert "não encontrado" in mensagem.lower()
 
 
+class TestBackupComprimidoIncremental:
+    """Testes para backups comprimidos, incrementais e o manifesto"""
+
+    @pytest.fixture
+    def ambiente(self):
+        """Banco com dados suficientes para ocupar várias páginas"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            backup_dir = Path(temp_dir) / "backups"
+            db_path = Path(temp_dir) / "database.db"
+
+            conn = sqlite3.connect(str(db_path))
+            conn.execute("CREATE TABLE dados (id INTEGER PRIMARY KEY, texto TEXT)")
+            conn.executemany("INSERT INTO dados (texto) VALUES (?)", [("x" * 500,) for _ in range(500)])
+            conn.commit()
+            conn.close()
+
+            with patch('util.backup_util.BACKUP_DIR', backup_dir), \
+                 patch('util.backup_util.DATABASE_PATH', str(db_path)), \
+                 patch('util.backup_util.BACKUP_PAUSA_SEGUNDOS', 0):
+                yield {'backup_dir': backup_dir, 'db_path': db_path}
+
+    @staticmethod
+    def _contar_dados(db_path: Path) -> int:
+        conn = sqlite3.connect(str(db_path))
+        try:
+            return conn.execute("SELECT COUNT(*) FROM dados").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_backup_comprimido(self, ambiente):
+        """Deve gravar backup .db.gz menor que o banco quando a compressão está ativa"""
+        with patch('util.backup_util.BACKUP_COMPRIMIR', True):
+            sucesso, _ = criar_backup()
+
+        assert sucesso is True
+        backups = listar_backups()
+        assert len(backups) == 1
+        assert backups[0].nome_arquivo.endswith(".db.gz")
+        assert backups[0].comprimido is True
+        assert backups[0].tamanho_bytes < ambiente['db_path'].stat().st_size
+
+    def test_restaurar_backup_comprimido(self, ambiente):
+        """Deve restaurar backup comprimido sem deixar arquivos temporários"""
+        with patch('util.backup_util.BACKUP_COMPRIMIR', True):
+            criar_backup()
+        nome = listar_backups()[0].nome_arquivo
+
+        conn = sqlite3.connect(str(ambiente['db_path']))
+        conn.execute("DELETE FROM dados")
+        conn.commit()
+        conn.close()
+
+        sucesso, _, _ = restaurar_backup(nome, criar_backup_antes=False)
+
+        assert sucesso is True
+        assert self._contar_dados(ambiente['db_path']) == 500
+        assert not list(ambiente['backup_dir'].glob("*.restaurando"))
+
+    def test_incremental_guarda_paginas_alteradas(self, ambiente):
+        """Backup incremental deve conter apenas as páginas alteradas e restaurar o estado atual"""
+        criar_backup()
+        nome_completo = listar_backups()[0].nome_arquivo
+
+        conn = sqlite3.connect(str(ambiente['db_path']))
+        conn.execute("INSERT INTO dados (texto) VALUES ('novo')")
+        conn.commit()
+        conn.close()
+
+        with patch('util.backup_util.agora', return_value=datetime(2099, 1, 1, 10, 0, 0)):
+            sucesso, mensagem = criar_backup(incremental=True)
+
+        assert sucesso is True
+        assert "incremental" in mensagem
+        incremental = listar_backups()[0]
+        assert incremental.formato == "incremental"
+        assert incremental.base == nome_completo
+        assert incremental.tamanho_bytes < (ambiente['backup_dir'] / nome_completo).stat().st_size
+
+        conn = sqlite3.connect(str(ambiente['db_path']))
+        conn.execute("DELETE FROM dados")
+        conn.commit()
+        conn.close()
+
+        sucesso, _, _ = restaurar_backup(incremental.nome_arquivo, criar_backup_antes=False)
+
+        assert sucesso is True
+        assert self._contar_dados(ambiente['db_path']) == 501
+
+    def test_incremental_sem_completo_cria_completo(self, ambiente):
+        """Sem backup completo disponível, o incremental vira um backup completo"""
+        sucesso, _ = criar_backup(incremental=True)
+
+        assert sucesso is True
+        backups = listar_backups()
+        assert len(backups) == 1
+        assert backups[0].formato == "completo"
+
+    def test_nao_exclui_base_de_incremental(self, ambiente):
+        """Não deve excluir backup completo usado por incrementais"""
+        criar_backup()
+        nome_completo = listar_backups()[0].nome_arquivo
+        with patch('util.backup_util.agora', return_value=datetime(2099, 1, 1, 10, 0, 0)):
+            criar_backup(incremental=True)
+
+        sucesso, mensagem = excluir_backup(nome_completo)
+
+        assert sucesso is False
+        assert "incremental" in mensagem
+        assert (ambiente['backup_dir'] / nome_completo).exists()
+
+    def test_listagem_usa_manifesto(self, ambiente):
+        """Com manifesto existente, a listagem não deve inspecionar os arquivos"""
+        criar_backup()
+
+        with patch('util.backup_util._escanear_backups', side_effect=AssertionError("não deveria escanear")):
+            backups = listar_backups()
+
+        assert len(backups) == 1
+
+    def test_manifesto_corrompido_e_reconstruido(self, ambiente):
+        """Manifesto inválido deve ser reconstruído a partir dos arquivos"""
+        criar_backup()
+        (ambiente['backup_dir'] / "manifesto.json").write_text("{invalido", encoding="utf-8")
+
+        backups = listar_backups()
+
+        assert len(backups) == 1
+        assert reconstruir_manifesto() == 1
+
+
+class TestBackupAgendado:
+    """Testes para o agendamento de backups automáticos e a retenção"""
+
+    @pytest.fixture
+    def ambiente(self):
+        """Diretório de backups e banco temporários"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            backup_dir = Path(temp_dir) / "backups"
+            backup_dir.mkdir()
+            db_path = Path(temp_dir) / "database.db"
+
+            conn = sqlite3.connect(str(db_path))
+            conn.execute("CREATE TABLE dados (id INTEGER PRIMARY KEY, texto TEXT)")
+            conn.executemany("INSERT INTO dados (texto) VALUES (?)", [("x" * 500,) for _ in range(100)])
+            conn.commit()
+            conn.close()
+
+            with patch('util.backup_util.BACKUP_DIR', backup_dir), \
+                 patch('util.backup_util.DATABASE_PATH', str(db_path)), \
+                 patch('util.backup_util.BACKUP_PAUSA_SEGUNDOS', 0):
+                yield {'backup_dir': backup_dir, 'db_path': db_path}
+
+    def test_proxima_execucao_no_mesmo_dia(self):
+        """Antes do horário, a próxima execução é no mesmo dia"""
+        proxima = calcular_proxima_execucao_backup(datetime(2025, 1, 15, 2, 0), "03:00", 24)
+        assert proxima == datetime(2025, 1, 15, 3, 0)
+
+    def test_proxima_execucao_no_dia_seguinte(self):
+        """Depois do horário, a próxima execução é no dia seguinte"""
+        proxima = calcular_proxima_execucao_backup(datetime(2025, 1, 15, 10, 0), "03:00", 24)
+        assert proxima == datetime(2025, 1, 16, 3, 0)
+
+    def test_proxima_execucao_com_intervalo(self):
+        """Execuções se repetem a cada intervalo a partir do horário e nunca no instante atual"""
+        def proxima(hora: int) -> datetime:
+            return calcular_proxima_execucao_backup(datetime(2025, 1, 15, hora, 0), "03:00", 6)
+
+        assert proxima(10) == datetime(2025, 1, 15, 15, 0)
+        assert proxima(3) == datetime(2025, 1, 15, 9, 0)
+        assert proxima(1) == datetime(2025, 1, 15, 3, 0)
+
+    def test_horario_invalido(self):
+        """Horário fora do formato HH:MM deve gerar ValueError"""
+        with pytest.raises(ValueError):
+            calcular_proxima_execucao_backup(datetime(2025, 1, 15, 1, 0), "3h", 24)
+
+    async def test_tarefa_com_horario_invalido_encerra(self):
+        """A tarefa deve encerrar (sem travar) com horário inválido"""
+        await tarefa_backup_agendado("invalido", 24)
+
+    async def test_tarefa_so_executa_no_worker_lider(self, ambiente):
+        """Sem o lock do agendador (detido por outro worker), a execução deve ser pulada"""
+        from util.backup_util import _abrir_lock_arquivo, LOCK_AGENDADOR_NOME
+
+        lock_lider = _abrir_lock_arquivo(LOCK_AGENDADOR_NOME)
+        try:
+            with patch('util.backup_util.calcular_proxima_execucao_backup', return_value=datetime.now()), \
+                 patch('util.backup_util.agora', return_value=datetime.now()), \
+                 patch('util.backup_util._executar_backup_agendado') as mock_executar, \
+                 patch('util.backup_util.asyncio.sleep', side_effect=[None, None, asyncio.CancelledError]):
+                with pytest.raises(asyncio.CancelledError):
+                    await tarefa_backup_agendado("03:00", 24)
+        finally:
+            lock_lider.close()
+
+        mock_executar.assert_not_called()
+
+    def test_retencao_diaria_e_semanal(self, ambiente):
+        """Deve manter o último backup de cada dia/semana e preservar backups manuais"""
+        backup_dir = ambiente['backup_dir']
+        for dia in range(6, 20):
+            for hora in (10, 20):
+                (backup_dir / f"backup_auto_2025-01-{dia:02d}_{hora}-00-00.db").touch()
+        (backup_dir / "backup_2025-01-01_10-00-00.db").touch()
+
+        removidos = aplicar_retencao(diarios=3, semanais=2)
+
+        restantes = sorted(b.nome_arquivo for b in listar_backups())
+        assert restantes == [
+            "backup_2025-01-01_10-00-00.db",
+            "backup_auto_2025-01-12_20-00-00.db",
+            "backup_auto_2025-01-17_20-00-00.db",
+            "backup_auto_2025-01-18_20-00-00.db",
+            "backup_auto_2025-01-19_20-00-00.db",
+        ]
+        assert len(removidos) == 24
+        assert sorted(p.name for p in backup_dir.glob("backup_*")) == restantes
+
+    def test_retencao_preserva_backups_de_seguranca(self, ambiente):
+        """Backups de segurança criados antes de restaurações não entram na retenção"""
+        backup_dir = ambiente['backup_dir']
+        for dia in range(10, 15):
+            (backup_dir / f"backup_auto_2025-01-{dia:02d}_10-00-00.db").touch()
+        (backup_dir / "backup_seguranca_2025-01-11_12-00-00.db").touch()
+
+        removidos = aplicar_retencao(diarios=1, semanais=0)
+
+        assert len(removidos) == 4
+        assert sorted(b.nome_arquivo for b in listar_backups()) == [
+            "backup_auto_2025-01-14_10-00-00.db",
+            "backup_seguranca_2025-01-11_12-00-00.db",
+        ]
+
+    async def test_tarefa_continua_apos_erro_inesperado(self, ambiente):
+        """Um erro inesperado na execução deve ser registrado sem encerrar o agendamento"""
+        with patch('util.backup_util.calcular_proxima_execucao_backup', return_value=datetime.now()), \
+             patch('util.backup_util.agora', return_value=datetime.now()), \
+             patch('util.backup_util._executar_backup_agendado', side_effect=RuntimeError("falha")) as mock_executar, \
+             patch('util.backup_util.asyncio.sleep', side_effect=[None, None, None, asyncio.CancelledError]):
+            with pytest.raises(asyncio.CancelledError):
+                await tarefa_backup_agendado("03:00", 24)
+
+        assert mock_executar.call_count == 3
+
+    def test_retencao_preserva_base_de_incremental(self, ambiente):
+        """A base de um incremental mantido não pode ser removida"""
+        with patch('util.backup_util.agora', return_value=datetime(2025, 1, 13, 3, 0)):
+            criar_backup(automatico=True)
+        with patch('util.backup_util.agora', return_value=datetime(2025, 1, 15, 3, 0)):
+            criar_backup(automatico=True, incremental=True)
+
+        removidos = aplicar_retencao(diarios=1, semanais=0)
+
+        assert removidos == []
+        assert len(listar_backups()) == 2
+
+    def test_execucao_agendada_registra_estatisticas(self, ambiente):
+        """Execução agendada deve criar backup automático e registrar duração e tamanho"""
+        _executar_backup_agendado()
+
+        estatisticas = obter_estatisticas_backup_agendado()
+        assert estatisticas["sucesso"] is True
+        assert estatisticas["tamanho_bytes"] > 0
+        assert estatisticas["duracao_segundos"] >= 0
+        assert estatisticas["ultima_execucao"] is not None
+
+        backups = listar_backups()
+        assert len(backups) == 1
+        assert backups[0].tipo == "automático"
+
+
 class TestListarBackups:
     """Testes para a função listar_backups"""
 
@@ -590,9 +956,8 @@ class TestRestaurarBackup:
         sucesso, _, backup_seguranca = restaurar_backup(nome, criar_backup_antes=True)
 
         assert sucesso is True
-        # Deve ter criado um backup automático
-        if backup_seguranca:
-            assert "_auto_" in backup_seguranca
+        assert backup_seguranca.startswith("backup_seguranca_")
+        assert obter_info_backup(backup_seguranca).tipo == "segurança"
 
     def test_restaurar_sem_backup_seguranca(self, setup_restauracao):
         """Pode restaurar sem criar backup de segurança"""
@@ -712,7 +1077,7 @@ class TestBackupErrosIO:
 
             with patch('util.backup_util.BACKUP_DIR', backup_dir):
                 with patch('util.backup_util.DATABASE_PATH', str(db_path)):
-                    with patch('shutil.copy2', side_effect=OSError("Permission denied")):
+                    with patch('util.backup_util._copiar_banco_online', side_effect=OSError("Permission denied")):
                         sucesso, mensagem = criar_backup()
 
                         assert sucesso is False
@@ -720,7 +1085,8 @@ class TestBackupErrosIO:
 
     def test_listar_backups_oserror_diretorio(self):
         """Deve retornar lista vazia em erro de diretório"""
-        with patch('util.backup_util.BACKUP_DIR') as mock_dir:
+        with patch('util.backup_util.BACKUP_DIR') as mock_dir, \
+             patch('util.backup_util._abrir_lock_arquivo'):
             mock_dir.exists.return_value = True
             mock_dir.glob.side_effect = OSError("Permission denied")
 
@@ -0,0 +1,136 @@
+"""
+Testes para o módulo util/cache_http.py
+
+Testa a versão memorizada das listagens, a sincronização do cache de
+páginas entre workers e o cache imutável das fotos de usuário versionadas
+servidas por ArquivosEstaticos.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from util import cache_http
+from util.cache_http import (
+    ArquivosEstaticos, CACHE_CONTROL_IMUTAVEL, _obter_versao_listagem, tarefa_sincronizar_paginas
+)
+from util.cache_paginas import cache_paginas
+
+
+@pytest.fixture
+def cliente_estaticos(tmp_path):
+    """App mínima servindo tmp_path em /static, com a pasta de fotos em img/usuarios"""
+    pasta_fotos = tmp_path / "img" / "usuarios"
+    pasta_fotos.mkdir(parents=True)
+    (pasta_fotos / "000001.jpg").write_bytes(b"foto")
+    (tmp_path / "img" / "user.jpg").write_bytes(b"padrao")
+    (tmp_path / "app.css").write_text("body {}")
+
+    app = FastAPI()
+    app.mount("/static", ArquivosEstaticos(directory=tmp_path), name="static")
+
+    with patch('util.cache_http.PASTA_FOTOS', pasta_fotos), \
+            patch('util.cache_http.FOTO_DEFAULT', tmp_path / "img" / "user.jpg"):
+        yield TestClient(app)
+
+
+class TestVersaoListagem:
+    """Testes da versão das listagens usada no ETag"""
+
+    @pytest.fixture(autouse=True)
+    def sem_versao_memorizada(self):
+        cache_http._versao_listagem = None
+        yield
+        cache_http._versao_listagem = None
+
+    @pytest.fixture
+    def repos(self):
+        with patch('util.cache_http.artigo_repo') as artigo_repo, \
+                patch('util.cache_http.categoria_repo') as categoria_repo, \
+                patch.object(cache_paginas, 'ttl_segundos', 60):
+            artigo_repo.obter_versao.return_value = (None, 3)
+            categoria_repo.obter_versao.return_value = (None, 2)
+            yield artigo_repo, categoria_repo
+
+    async def test_memoriza_ate_invalidar(self, repos):
+        """Requisições seguidas não devem consultar o banco até a próxima invalidação"""
+        artigo_repo, categoria_repo = repos
+
+        assert await _obter_versao_listagem() == (None, 3, 2)
+        artigo_repo.obter_versao.return_value = (None, 4)
+        assert await _obter_versao_listagem() == (None, 3, 2)
+        assert artigo_repo.obter_versao.call_count == 1
+
+        cache_paginas.invalidar()
+
+        assert await _obter_versao_listagem() == (None, 4, 2)
+        assert categoria_repo.obter_versao.call_count == 2
+
+    async def test_expira_apos_ttl(self, repos):
+        """Sem invalidação local, a versão deve ser reconsultada após o TTL"""
+        artigo_repo, _ = repos
+        cache_paginas.ttl_segundos = 0
+
+        await _obter_versao_listagem()
+        await _obter_versao_listagem()
+
+        assert artigo_repo.obter_versao.call_count == 2
+
+
+class TestSincronizarPaginas:
+    """Testes da tarefa que propaga alterações de outros workers"""
+
+    async def test_descarta_cache_quando_versao_muda(self):
+        """A tarefa deve invalidar o cache local quando a versão do banco muda"""
+        chamadas = 0
+
+        async def parar_na_segunda_espera(_):
+            nonlocal chamadas
+            chamadas += 1
+            if chamadas == 2:
+                raise asyncio.CancelledError
+
+        with patch('util.cache_http.artigo_repo') as artigo_repo, \
+                patch('util.cache_http.asyncio.sleep', side_effect=parar_na_segunda_espera), \
+                patch.object(cache_paginas, 'sincronizar_com_banco', return_value=True) as sincronizar:
+            artigo_repo.obter_versao_conteudo.side_effect = [1, 2]
+            with pytest.raises(asyncio.CancelledError):
+                await tarefa_sincronizar_paginas(5)
+
+        assert [c.args for c in sincronizar.call_args_list] == [(1,), (2,)]
+
+
+class TestArquivosEstaticos:
+    """Testes para ArquivosEstaticos"""
+
+    def test_foto_versionada_imutavel(self, cliente_estaticos):
+        """Foto com ?v= deve ser servida com cache longo e imutável"""
+        response = cliente_estaticos.get("/static/img/usuarios/000001.jpg?v=abc")
+
+        assert response.status_code == 200
+        assert response.content == b"foto"
+        assert response.headers["cache-control"] == CACHE_CONTROL_IMUTAVEL
+
+    def test_foto_padrao_versionada_imutavel(self, cliente_estaticos):
+        """A foto padrão compartilhada também deve ser imutável quando versionada"""
+        response = cliente_estaticos.get("/static/img/user.jpg?v=abc")
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == CACHE_CONTROL_IMUTAVEL
+
+    def test_foto_sem_versao_mantem_padrao(self, cliente_estaticos):
+        """Foto sem versão (link antigo) não deve ser marcada como imutável"""
+        response = cliente_estaticos.get("/static/img/usuarios/000001.jpg")
+
+        assert response.status_code == 200
+        assert "immutable" not in response.headers.get("cache-control", "")
+
+    def test_outros_arquivos_nao_afetados(self, cliente_estaticos):
+        """Demais arquivos estáticos não devem ser marcados, mesmo com ?v="""
+        response = cliente_estaticos.get("/static/app.css?v=1")
+
+        assert response.status_code == 200
+        assert "immutable" not in response.headers.get("cache-control", "")
@@ -0,0 +1,131 @@
+"""
+Testes para o cache de páginas públicas (util/cache_paginas.py).
+"""
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi.responses import HTMLResponse
+
+from util.cache_paginas import CachePaginas
+
+
+def _requisicao(caminho: str = "/", query: str = "", sessao: dict = None, metodo: str = "GET"):
+    """Cria um objeto com os atributos de Request usados pelo cache."""
+    return SimpleNamespace(
+        method=metodo,
+        session=sessao if sessao is not None else {},
+        url=SimpleNamespace(path=caminho, query=query),
+    )
+
+
+class TestCachePaginas:
+    """Testes para CachePaginas"""
+
+    def test_guarda_e_devolve_pagina(self):
+        """Deve devolver o mesmo HTML guardado"""
+        cache = CachePaginas(ttl_segundos=60, max_itens=10)
+        request = _requisicao("/sobre")
+
+        assert cache.obter_resposta(request) is None
+        cache.guardar_resposta(request, HTMLResponse("<p>sobre</p>"))
+        resposta = cache.obter_resposta(request)
+
+        assert resposta.body == b"<p>sobre</p>"
+        assert cache.obter_estatisticas()["acertos"] == 1
+
+    def test_query_string_faz_parte_da_chave(self):
+        """Páginas com query diferente não devem se misturar"""
+        cache = CachePaginas(ttl_segundos=60, max_itens=10)
+        cache.guardar_resposta(_requisicao("/artigos/", "categoria=1"), HTMLResponse("1"))
+
+        assert cache.obter_resposta(_requisicao("/artigos/", "categoria=2")) is None
+
+    def test_expira_apos_ttl(self):
+        """Páginas expiradas não devem ser servidas"""
+        cache = CachePaginas(ttl_segundos=60, max_itens=10)
+        request = _requisicao()
+        with patch("util.cache_paginas.time.monotonic", return_value=1000.0):
+            cache.guardar_resposta(request, HTMLResponse("x"))
+        with patch("util.cache_paginas.time.monotonic", return_value=1061.0):
+            assert cache.obter_resposta(request) is None
+
+        assert cache.obter_estatisticas()["itens"] == 0
+
+    def test_etag_diferente_e_tratado_como_ausencia(self):
+        """Página guardada com outro ETag não deve ser servida com os validadores atuais"""
+        cache = CachePaginas(ttl_segundos=60, max_itens=10)
+        request = _requisicao("/artigos/ler/1")
+        cache.guardar_resposta(request, HTMLResponse("antiga"), 'W/"v1"')
+
+        assert cache.obter_resposta(request, 'W/"v2"') is None
+        assert cache.obter_resposta(request, 'W/"v1"') is None  # descartada na leitura anterior
+        assert cache.obter_estatisticas()["itens"] == 0
+
+    def test_remove_menos_usada_ao_exceder_maximo(self):
+        """Deve descartar a página menos usada quando cheio"""
+        cache = CachePaginas(ttl_segundos=60, max_itens=2)
+        for caminho in ("/a", "/b"):
+            cache.guardar_resposta(_requisicao(caminho), HTMLResponse(caminho))
+        cache.obter_resposta(_requisicao("/a"))
+        cache.guardar_resposta(_requisicao("/c"), HTMLResponse("/c"))
+
+        assert cache.obter_resposta(_requisicao("/b")) is None
+        assert cache.obter_resposta(_requisicao("/a")) is not None
+
+    def test_nao_cacheia_sessao_com_usuario_ou_mensagens(self):
+        """Sessões com usuário logado ou mensagens flash não usam o cache"""
+        cache = CachePaginas(ttl_segundos=60, max_itens=10)
+        logado = _requisicao(sessao={"usuario_logado": {"id": 1}})
+        com_mensagem = _requisicao(sessao={"mensagens": [{"texto": "oi"}]})
+
+        cache.guardar_resposta(logado, HTMLResponse("x"))
+        cache.guardar_resposta(com_mensagem, HTMLResponse("x"))
+
+        assert cache.obter_estatisticas()["itens"] == 0
+
+    def test_nao_cacheia_respostas_de_erro(self):
+        """Somente respostas 200 devem ser guardadas"""
+        cache = CachePaginas(ttl_segundos=60, max_itens=10)
+        cache.guardar_resposta(_requisicao(), HTMLResponse("erro", status_code=429))
+
+        assert cache.obter_estatisticas()["itens"] == 0
+
+    def test_ttl_zero_desativa(self):
+        """TTL 0 deve desativar o cache"""
+        cache = CachePaginas(ttl_segundos=0, max_itens=10)
+        request = _requisicao()
+        cache.guardar_resposta(request, HTMLResponse("x"))
+
+        assert cache.obter_resposta(request) is None
+        assert cache.obter_estatisticas()["falhas"] == 0
+
+    def test_invalidar(self):
+        """invalidar deve descartar todas as páginas"""
+        cache = CachePaginas(ttl_segundos=60, max_itens=10)
+        cache.guardar_resposta(_requisicao(), HTMLResponse("x"))
+
+        cache.invalidar()
+
+        assert cache.obter_resposta(_requisicao()) is None
+        assert cache.obter_estatisticas()["invalidacoes"] == 1
+
+    def test_invalidar_incrementa_versao(self):
+        """invalidar deve mudar a versão do conteúdo usada nos ETags"""
+        cache = CachePaginas(ttl_segundos=60, max_itens=10)
+        versao = cache.obter_versao()
+
+        cache.invalidar()
+
+        assert cache.obter_versao() == versao + 1
+
+    def test_sincronizar_invalida_quando_versao_do_banco_muda(self):
+        """Alteração feita por outro processo (versão do banco) deve descartar as páginas"""
+        cache = CachePaginas(ttl_segundos=60, max_itens=10)
+        cache.guardar_resposta(_requisicao(), HTMLResponse("x"))
+
+        assert cache.sincronizar_com_banco(7) is False  # primeira leitura só registra
+        assert cache.sincronizar_com_banco(7) is False
+        assert cache.obter_estatisticas()["itens"] == 1
+
+        assert cache.sincronizar_com_banco(8) is True
+        assert cache.obter_estatisticas()["itens"] == 0
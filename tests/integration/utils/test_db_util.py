@@ -82,6 +82,228 @@ class TestObterConexao:
                         raise RuntimeError("Erro de teste")
 
 
+class TestPoolConexoes:
+    """Testes para o pool de conexões PoolConexoes"""
+
+    def test_reutiliza_conexao(self):
+        """Conexão devolvida deve ser reaproveitada no próximo uso"""
+        from util.db_util import PoolConexoes
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pool = PoolConexoes(os.path.join(temp_dir, "test.db"), tamanho_maximo=2)
+
+            conn1 = pool.obter()
+            pool.devolver(conn1)
+            conn2 = pool.obter()
+            pool.devolver(conn2)
+
+            assert conn1 is conn2
+            stats = pool.obter_estatisticas()
+            assert stats["checkouts"] == 2
+            assert stats["conexoes_abertas"] == 1
+            pool.fechar_todas()
+
+    def test_timeout_quando_pool_esgotado(self):
+        """Deve lançar OperationalError se não houver conexão livre no timeout"""
+        from util.db_util import PoolConexoes
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pool = PoolConexoes(os.path.join(temp_dir, "test.db"), tamanho_maximo=1, timeout=0.05)
+
+            conn = pool.obter()
+            with pytest.raises(sqlite3.OperationalError, match="Timeout"):
+                pool.obter()
+
+            pool.devolver(conn)
+            assert pool.obter_estatisticas()["timeouts"] == 1
+            pool.fechar_todas()
+
+    def test_substitui_conexao_quebrada(self):
+        """Health check deve descartar conexão fechada e criar uma nova"""
+        from util.db_util import PoolConexoes
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pool = PoolConexoes(os.path.join(temp_dir, "test.db"), tamanho_maximo=1)
+
+            conn1 = pool.obter()
+            pool.devolver(conn1)
+            conn1.close()
+
+            conn2 = pool.obter()
+            assert conn2 is not conn1
+            assert conn2.execute("SELECT 1").fetchone()[0] == 1
+            assert pool.obter_estatisticas()["conexoes_descartadas"] == 1
+            pool.devolver(conn2)
+            pool.fechar_todas()
+
+    def test_devolver_desfaz_transacao_pendente(self):
+        """Transação não finalizada deve ser desfeita ao devolver a conexão"""
+        from util.db_util import PoolConexoes
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pool = PoolConexoes(os.path.join(temp_dir, "test.db"), tamanho_maximo=1)
+
+            conn = pool.obter()
+            conn.execute("CREATE TABLE test (id INTEGER PRIMARY KEY)")
+            conn.commit()
+            conn.execute("INSERT INTO test VALUES (1)")
+            pool.devolver(conn)
+
+            conn = pool.obter()
+            assert conn.execute("SELECT COUNT(*) FROM test").fetchone()[0] == 0
+            pool.devolver(conn)
+            pool.fechar_todas()
+
+
+class TestPragmas:
+    """Testes para o perfil de PRAGMAs aplicado às conexões"""
+
+    def test_aplica_pragmas_na_conexao(self):
+        """Pool deve aplicar os PRAGMAs configurados em cada nova conexão"""
+        from util.db_util import PoolConexoes
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pool = PoolConexoes(
+                os.path.join(temp_dir, "test.db"),
+                pragmas={"journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 1234}
+            )
+
+            conn = pool.obter()
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+            pool.devolver(conn)
+            pool.fechar_todas()
+
+    def test_checkpoint_wal(self):
+        """Checkpoint deve retornar resultado quando o banco está em WAL"""
+        from util.db_util import executar_checkpoint_wal, obter_conexao
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "test.db")
+
+            with patch('util.db_util.DATABASE_PATH', db_path):
+                with obter_conexao() as conn:
+                    conn.execute("PRAGMA journal_mode = WAL")
+                    conn.execute("CREATE TABLE test (id INTEGER PRIMARY KEY)")
+                    conn.execute("INSERT INTO test VALUES (1)")
+
+                resultado = executar_checkpoint_wal("TRUNCATE")
+
+            assert resultado is not None
+            assert resultado[0] == 0  # não ocupado
+
+
+class TestExecutorRepositorios:
+    """Testes para a execução de repositórios fora do event loop"""
+
+    async def test_executa_em_thread_dedicada(self):
+        """Função deve rodar em thread do pool, com argumentos e retorno preservados"""
+        import threading
+        from util.db_util import ExecutorRepositorios
+
+        executor = ExecutorRepositorios(max_threads=1)
+
+        def funcao(a, b=0):
+            return threading.current_thread().name, a + b
+
+        try:
+            nome_thread, resultado = await executor.executar(funcao, 1, b=2)
+        finally:
+            executor.encerrar()
+
+        assert nome_thread.startswith("repo")
+        assert resultado == 3
+
+    async def test_nao_bloqueia_event_loop(self):
+        """Enquanto a consulta executa, outras corrotinas devem continuar rodando"""
+        import asyncio
+        import time
+        from util.db_util import ExecutorRepositorios
+
+        executor = ExecutorRepositorios(max_threads=1)
+        ticks = 0
+
+        async def contar_ticks():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        contador = asyncio.create_task(contar_ticks())
+        try:
+            await executor.executar(time.sleep, 0.2)
+        finally:
+            contador.cancel()
+            executor.encerrar()
+
+        assert ticks >= 5
+
+    async def test_metricas_por_funcao_e_consultas_lentas(self):
+        """Deve registrar chamadas por função e contar as que excedem o limite"""
+        import time
+        from util.db_util import ExecutorRepositorios
+
+        executor = ExecutorRepositorios(max_threads=2, consulta_lenta_ms=30)
+
+        def obter_rapido():
+            return 1
+
+        def obter_lento():
+            time.sleep(0.05)
+
+        try:
+            await executor.executar(obter_rapido)
+            await executor.executar(obter_rapido)
+            with patch('util.db_util.logger') as mock_logger:
+                await executor.executar(obter_lento)
+        finally:
+            executor.encerrar()
+
+        stats = executor.obter_estatisticas()
+        funcoes = stats["funcoes"]
+        assert stats["chamadas"] == 3
+        assert stats["consultas_lentas"] == 1
+        assert funcoes["test_db_util.obter_rapido"]["chamadas"] == 2
+        assert funcoes["test_db_util.obter_lento"]["tempo_maximo_ms"] >= 30
+        # Ordenadas por tempo total: a lenta aparece primeiro
+        assert list(funcoes)[0] == "test_db_util.obter_lento"
+        mock_logger.warning.assert_called_once()
+
+    async def test_excecao_propagada_e_registrada(self):
+        """Erros do repositório devem chegar ao chamador e contar nas métricas"""
+        from util.db_util import ExecutorRepositorios
+
+        executor = ExecutorRepositorios(max_threads=1)
+
+        def falhar():
+            raise sqlite3.OperationalError("database is locked")
+
+        try:
+            with pytest.raises(sqlite3.OperationalError, match="database is locked"):
+                await executor.executar(falhar)
+        finally:
+            executor.encerrar()
+
+        assert executor.obter_estatisticas()["chamadas"] == 1
+
+    async def test_executar_repo_respeita_patch_no_modulo(self):
+        """Função resolvida na chamada permite substituir o repositório nos testes"""
+        from repo import categoria_repo
+        from util.db_util import executar_repo
+
+        with patch('repo.categoria_repo.obter_todos', return_value=["mock"]):
+            assert await executar_repo(categoria_repo.obter_todos) == ["mock"]
+
+    def test_max_threads_invalido(self):
+        """max_threads deve ser positivo"""
+        from util.db_util import ExecutorRepositorios
+
+        with pytest.raises(ValueError, match="max_threads deve ser positivo"):
+            ExecutorRepositorios(max_threads=0)
+
+
 class TestAdaptarDatetime:
     """Testes para a função adaptar_datetime"""
 
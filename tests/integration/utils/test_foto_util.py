@@ -16,10 +16,15 @@ import io
 from util.foto_util import (
     obter_caminho_foto_usuario,
     obter_path_absoluto_foto,
-    criar_foto_padrao_usuario,
+    remover_foto_usuario,
+    remover_copias_foto_padrao,
     salvar_foto_cropada_usuario,
     foto_existe,
     obter_tamanho_foto,
+    obter_caminho_avatar_usuario,
+    gerar_variantes_fotos_existentes,
+    executar_processamento_foto,
+    encerrar_processamento_fotos,
     PASTA_FOTOS,
     FOTO_DEFAULT
 )
@@ -28,22 +33,37 @@ from util.foto_util import (
 class TestObterCaminhoFotoUsuario:
     """Testes para a função obter_caminho_foto_usuario()"""
 
-    def test_id_1_retorna_caminho_correto(self):
+    @pytest.fixture
+    def pasta_fotos(self, tmp_path):
+        pasta = tmp_path / "usuarios"
+        pasta.mkdir()
+        with patch('util.foto_util.PASTA_FOTOS', pasta):
+            yield pasta
+
+    def test_id_1_retorna_caminho_correto(self, pasta_fotos):
         """ID 1 deve retornar caminho com zeros à esquerda"""
+        (pasta_fotos / "000001.jpg").write_bytes(b"fake")
         resultado = obter_caminho_foto_usuario(1)
         assert "000001.jpg" in resultado
         assert resultado.startswith("/")
 
-    def test_id_grande_retorna_caminho_correto(self):
+    def test_id_grande_retorna_caminho_correto(self, pasta_fotos):
         """ID grande deve formatar corretamente"""
+        (pasta_fotos / "123456.jpg").write_bytes(b"fake")
         resultado = obter_caminho_foto_usuario(123456)
         assert "123456.jpg" in resultado
 
-    def test_caminho_inclui_pasta(self):
+    def test_caminho_inclui_pasta(self, pasta_fotos):
         """Caminho deve incluir pasta de usuários"""
+        (pasta_fotos / "000001.jpg").write_bytes(b"fake")
         resultado = obter_caminho_foto_usuario(1)
         assert "usuarios" in resultado
 
+    def test_sem_foto_propria_usa_foto_padrao(self, pasta_fotos):
+        """Usuário sem foto própria deve apontar para a foto padrão compartilhada"""
+        resultado = obter_caminho_foto_usuario(1)
+        assert resultado.startswith(f"/{FOTO_DEFAULT.as_posix()}?v=")
+
 
 class TestObterPathAbsolutoFoto:
     """Testes para a função obter_path_absoluto_foto()"""
@@ -65,46 +85,60 @@ class TestObterPathAbsolutoFoto:
         assert resultado is not None
 
 
-class TestCriarFotoPadraoUsuario:
-    """Testes para a função criar_foto_padrao_usuario()"""
+class TestRemoverFotoUsuario:
+    """Testes para a função remover_foto_usuario()"""
 
-    def test_cria_foto_quando_padrao_existe(self):
-        """Deve criar cópia da foto padrão quando existe"""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Criar arquivo fake de foto padrão
-            foto_padrao = Path(tmpdir) / "user.jpg"
-            foto_padrao.write_bytes(b"fake image data")
+    def test_remove_foto_e_variantes(self, tmp_path):
+        """Deve remover a foto própria e todas as variantes, mantendo as de outros usuários"""
+        for nome in ("000001.jpg", "000001.webp", "000001_48.jpg", "000001_128.webp", "000002.jpg"):
+            (tmp_path / nome).write_bytes(b"fake")
 
-            pasta_fotos = Path(tmpdir) / "usuarios"
+        with patch('util.foto_util.PASTA_FOTOS', tmp_path):
+            assert remover_foto_usuario(1) is True
+            assert foto_existe(1) is False
 
-            with patch('util.foto_util.FOTO_DEFAULT', foto_padrao):
-                with patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
-                    resultado = criar_foto_padrao_usuario(1)
+        assert [p.name for p in tmp_path.iterdir()] == ["000002.jpg"]
 
-                    assert resultado is True
-                    assert (pasta_fotos / "000001.jpg").exists()
+    def test_sem_foto_retorna_true(self, tmp_path):
+        """Usuário sem foto própria não é erro"""
+        with patch('util.foto_util.PASTA_FOTOS', tmp_path):
+            assert remover_foto_usuario(1) is True
 
-    def test_retorna_false_quando_padrao_nao_existe(self):
-        """Deve retornar False quando foto padrão não existe"""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            foto_inexistente = Path(tmpdir) / "nao_existe.jpg"
+    def test_retorna_false_em_erro_io(self):
+        """Deve retornar False em erro de I/O"""
+        with patch('util.foto_util._remover_variantes', side_effect=OSError("Permission denied")):
+            assert remover_foto_usuario(1) is False
 
-            with patch('util.foto_util.FOTO_DEFAULT', foto_inexistente):
-                resultado = criar_foto_padrao_usuario(1)
 
-                assert resultado is False
+class TestRemoverCopiasFotoPadrao:
+    """Testes para a função remover_copias_foto_padrao()"""
 
-    def test_retorna_false_em_erro_io(self):
-        """Deve retornar False em erro de I/O"""
-        with patch('util.foto_util.FOTO_DEFAULT') as mock_default:
-            mock_default.exists.return_value = True
+    def test_remove_apenas_copias_identicas(self, tmp_path):
+        """Deve remover as cópias da foto padrão e manter as fotos personalizadas"""
+        foto_padrao = tmp_path / "user.jpg"
+        foto_padrao.write_bytes(b"foto padrao")
+        pasta_fotos = tmp_path / "usuarios"
+        pasta_fotos.mkdir()
+        (pasta_fotos / "000001.jpg").write_bytes(b"foto padrao")
+        (pasta_fotos / "000001_48.jpg").write_bytes(b"variante")
+        (pasta_fotos / "000002.jpg").write_bytes(b"foto propria")
+        (pasta_fotos / "000003.jpg").write_bytes(b"foto padraX")  # mesmo tamanho, conteúdo diferente
 
-            with patch('util.foto_util.obter_path_absoluto_foto') as mock_path:
-                mock_path.side_effect = OSError("Permission denied")
+        with patch('util.foto_util.FOTO_DEFAULT', foto_padrao), \
+                patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
+            assert remover_copias_foto_padrao() == 1
 
-                resultado = criar_foto_padrao_usuario(1)
+        assert sorted(p.name for p in pasta_fotos.iterdir()) == ["000002.jpg", "000003.jpg"]
 
-                assert resultado is False
+    def test_sem_foto_padrao_nao_remove(self, tmp_path):
+        """Sem o arquivo padrão, nada deve ser removido"""
+        (tmp_path / "000001.jpg").write_bytes(b"foto")
+
+        with patch('util.foto_util.FOTO_DEFAULT', tmp_path / "nao_existe.jpg"), \
+                patch('util.foto_util.PASTA_FOTOS', tmp_path):
+            assert remover_copias_foto_padrao() == 0
+
+        assert (tmp_path / "000001.jpg").exists()
 
 
 class TestSalvarFotoCropadaUsuario:
@@ -195,6 +229,84 @@ class TestSalvarFotoCropadaUsuario:
                     assert saved_img.width <= 50
                     assert saved_img.height <= 50
 
+    def test_gera_variantes_na_mesma_decodificacao(self):
+        """Deve salvar a foto e as variantes JPEG/WebP a partir de uma única imagem"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pasta_fotos = Path(tmpdir) / "usuarios"
+
+            with patch('util.foto_util.PASTA_FOTOS', pasta_fotos), \
+                    patch('util.foto_util.FOTO_VARIANTES_TAMANHOS', (20, 40)), \
+                    patch('util.foto_util.FOTO_WEBP', True):
+                base64_img = self._criar_imagem_base64("RGB", (100, 50))
+
+                with patch('util.foto_util.Image.open', wraps=Image.open) as mock_open:
+                    resultado = salvar_foto_cropada_usuario(1, base64_img)
+
+            assert resultado is True
+            assert mock_open.call_count == 1
+            assert Image.open(pasta_fotos / "000001.jpg").size == (100, 50)
+            assert Image.open(pasta_fotos / "000001.webp").format == "WEBP"
+            assert Image.open(pasta_fotos / "000001_40.jpg").size == (40, 20)
+            assert Image.open(pasta_fotos / "000001_20.jpg").size == (20, 10)
+            assert Image.open(pasta_fotos / "000001_20.webp").size == (20, 10)
+
+    def test_sem_webp_remove_variantes_antigas(self):
+        """Com WebP desabilitado, variantes de uploads anteriores não devem permanecer"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pasta_fotos = Path(tmpdir) / "usuarios"
+            pasta_fotos.mkdir()
+            (pasta_fotos / "000001.webp").write_bytes(b"antiga")
+            (pasta_fotos / "000001_96.webp").write_bytes(b"antiga")
+
+            with patch('util.foto_util.PASTA_FOTOS', pasta_fotos), \
+                    patch('util.foto_util.FOTO_VARIANTES_TAMANHOS', (20,)), \
+                    patch('util.foto_util.FOTO_WEBP', False):
+                resultado = salvar_foto_cropada_usuario(1, self._criar_imagem_base64("RGB"))
+
+            assert resultado is True
+            assert sorted(p.name for p in pasta_fotos.iterdir()) == ["000001.jpg", "000001_20.jpg"]
+
+    def test_jpeg_grande_reduzido_na_decodificacao(self):
+        """JPEG muito maior que o limite deve ser reduzido pelo decodificador (draft)"""
+        from util.foto_util import _abrir_imagem
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (1600, 1600), color="red").save(buffer, format="JPEG")
+
+        imagem = _abrir_imagem(buffer.getvalue(), 100)
+
+        # Escala 1/8 do decodificador: menor redução que ainda cobre 100px
+        assert imagem.size == (200, 200)
+
+    def test_jpeg_grande_salvo_no_limite(self):
+        """JPEG grande deve ser salvo com o lado igual ao limite configurado"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pasta_fotos = Path(tmpdir) / "usuarios"
+
+            with patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
+                with patch('util.foto_util.config') as mock_config:
+                    mock_config.obter_int.return_value = 100
+                    base64_img = self._criar_imagem_base64("RGB", (1600, 1600))
+
+                    resultado = salvar_foto_cropada_usuario(1, base64_img)
+
+                assert resultado is True
+                assert Image.open(pasta_fotos / "000001.jpg").size == (100, 100)
+
+    def test_rejeita_imagem_acima_do_limite_de_pixels(self):
+        """Dimensões do cabeçalho acima do limite devem ser rejeitadas sem salvar"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pasta_fotos = Path(tmpdir) / "usuarios"
+
+            with patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
+                with patch('util.foto_util.FOTO_MAX_PIXELS', 100 * 100 - 1):
+                    base64_img = self._criar_imagem_base64("RGB", (100, 100))
+
+                    resultado = salvar_foto_cropada_usuario(1, base64_img)
+
+                assert resultado is False
+                assert not (pasta_fotos / "000001.jpg").exists()
+
     def test_retorna_false_base64_invalido(self):
         """Deve retornar False para base64 inválido"""
         resultado = salvar_foto_cropada_usuario(1, "isso não é base64 válido!!!")
@@ -211,6 +323,134 @@ class TestSalvarFotoCropadaUsuario:
         assert resultado is False
 
 
+class TestObterCaminhoAvatarUsuario:
+    """Testes para a função obter_caminho_avatar_usuario()"""
+
+    @pytest.fixture
+    def pasta_fotos(self, tmp_path):
+        pasta = tmp_path / "usuarios"
+        pasta.mkdir()
+        with patch('util.foto_util.PASTA_FOTOS', pasta), \
+                patch('util.foto_util.FOTO_VARIANTES_TAMANHOS', (48, 128)), \
+                patch('util.foto_util.FOTO_WEBP', True):
+            yield pasta
+
+    def test_menor_variante_que_cobre_o_tamanho(self, pasta_fotos):
+        """Deve escolher a menor variante com lado maior ou igual ao exibido, em WebP"""
+        for nome in ("000001.jpg", "000001_48.jpg", "000001_48.webp", "000001_128.webp"):
+            (pasta_fotos / nome).write_bytes(b"fake")
+
+        assert "/000001_48.webp?v=" in obter_caminho_avatar_usuario(1, 40)
+        assert "/000001_128.webp?v=" in obter_caminho_avatar_usuario(1, 100)
+
+    def test_jpeg_quando_nao_ha_webp(self, pasta_fotos):
+        """Sem a variante WebP, deve usar a variante JPEG do mesmo tamanho"""
+        (pasta_fotos / "000001.jpg").write_bytes(b"fake")
+        (pasta_fotos / "000001_48.jpg").write_bytes(b"fake")
+
+        assert "/000001_48.jpg?v=" in obter_caminho_avatar_usuario(1, 32)
+
+    def test_foto_completa_sem_variantes(self, pasta_fotos):
+        """Sem variantes (foto antiga ou padrão), ou tamanho acima delas, usa a foto completa"""
+        (pasta_fotos / "000001.jpg").write_bytes(b"fake")
+
+        assert "/000001.jpg?v=" in obter_caminho_avatar_usuario(1, 40)
+        assert "/000001.jpg?v=" in obter_caminho_avatar_usuario(1, 500)
+
+    def test_versao_muda_quando_foto_muda(self, pasta_fotos):
+        """A versão da URL deve acompanhar a modificação do arquivo"""
+        foto = pasta_fotos / "000001.jpg"
+        foto.write_bytes(b"fake")
+        os.utime(foto, ns=(1_000_000_000, 1_000_000_000))
+        antes = obter_caminho_foto_usuario(1)
+
+        os.utime(foto, ns=(2_000_000_000, 2_000_000_000))
+
+        assert obter_caminho_foto_usuario(1) != antes
+        assert obter_caminho_foto_usuario(1).endswith("000001.jpg?v=" + format(2_000_000_000, "x"))
+
+    def test_sem_foto_propria_usa_foto_padrao(self, pasta_fotos, tmp_path):
+        """Sem foto própria, qualquer tamanho deve apontar para a foto padrão versionada"""
+        foto_padrao = tmp_path / "user.jpg"
+        foto_padrao.write_bytes(b"padrao")
+
+        with patch('util.foto_util.FOTO_DEFAULT', foto_padrao):
+            resultado = obter_caminho_avatar_usuario(1, 40)
+
+        assert resultado.startswith(f"/{foto_padrao.as_posix()}?v=")
+
+
+class TestGerarVariantesFotosExistentes:
+    """Testes para a função gerar_variantes_fotos_existentes()"""
+
+    @pytest.fixture
+    def pasta_fotos(self, tmp_path):
+        pasta = tmp_path / "usuarios"
+        pasta.mkdir()
+        with patch('util.foto_util.PASTA_FOTOS', pasta), \
+                patch('util.foto_util.FOTO_VARIANTES_TAMANHOS', (20,)), \
+                patch('util.foto_util.FOTO_WEBP', True):
+            yield pasta
+
+    def test_gera_variantes_sem_regravar_original(self, pasta_fotos):
+        """Deve gerar as variantes faltantes mantendo a foto completa intacta"""
+        Image.new("RGB", (100, 100), color="blue").save(pasta_fotos / "000001.jpg", format="JPEG")
+        original = (pasta_fotos / "000001.jpg").read_bytes()
+
+        assert gerar_variantes_fotos_existentes() == (1, 0)
+
+        assert (pasta_fotos / "000001.jpg").read_bytes() == original
+        assert (pasta_fotos / "000001.webp").exists()
+        assert Image.open(pasta_fotos / "000001_20.jpg").size == (20, 20)
+        assert (pasta_fotos / "000001_20.webp").exists()
+
+    def test_ignora_fotos_completas_exceto_com_forcar(self, pasta_fotos):
+        """Fotos que já têm todas as variantes só são reprocessadas com forcar"""
+        Image.new("RGB", (100, 100)).save(pasta_fotos / "000001.jpg", format="JPEG")
+        gerar_variantes_fotos_existentes()
+
+        assert gerar_variantes_fotos_existentes() == (0, 0)
+        assert gerar_variantes_fotos_existentes(forcar=True) == (1, 0)
+
+    def test_conta_erros(self, pasta_fotos):
+        """Arquivo inválido deve ser contado como erro sem interromper as demais"""
+        (pasta_fotos / "000001.jpg").write_bytes(b"nao e imagem")
+        Image.new("RGB", (100, 100)).save(pasta_fotos / "000002.jpg", format="JPEG")
+
+        assert gerar_variantes_fotos_existentes() == (1, 1)
+        assert (pasta_fotos / "000002_20.jpg").exists()
+
+
+class TestExecutarProcessamentoFoto:
+    """Testes para o pool de processamento de imagens"""
+
+    async def test_executa_fora_do_event_loop(self):
+        """Função deve rodar em thread do pool de fotos, com o retorno preservado"""
+        import threading
+
+        def funcao(valor):
+            return threading.current_thread().name, valor * 2
+
+        try:
+            nome_thread, resultado = await executar_processamento_foto(funcao, 21)
+        finally:
+            encerrar_processamento_fotos()
+
+        assert nome_thread.startswith("fotos")
+        assert resultado == 42
+
+    async def test_excecao_propagada(self):
+        """Erros da função devem chegar ao chamador"""
+        def falhar():
+            raise OSError("Disk full")
+
+        try:
+            with pytest.raises(OSError, match="Disk full"):
+                await executar_processamento_foto(falhar)
+        finally:
+            encerrar_processamento_fotos()
+
+
 class TestFotoExiste:
     """Testes para a função foto_existe()"""
 
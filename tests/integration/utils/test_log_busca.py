@@ -0,0 +1,228 @@
+"""
+Testes para o módulo util/log_busca.py
+
+Testa a leitura em fluxo dos logs, os filtros, a paginação por cursor
+e o índice auxiliar por hora/nível.
+"""
+import json
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from util import log_busca
+from util.log_busca import FiltroLog, buscar_logs, obter_indice
+
+
+DIA = date(2025, 1, 15)
+
+
+def _linha(hora: int, nivel: str, mensagem: str, dia: date = DIA) -> str:
+    return f"{dia.isoformat()} {hora:02d}:00:00 - root - {nivel} - {mensagem}\n"
+
+
+@pytest.fixture
+def diretorio_logs(tmp_path):
+    """Diretório de logs temporário com um arquivo para DIA"""
+    linhas = [
+        _linha(8, "INFO", "Usuário 5 fez login"),
+        _linha(8, "DEBUG", "detalhe interno"),
+        _linha(9, "ERROR", "Falha ao enviar e-mail"),
+        "Traceback (most recent call last):\n",
+        "  ValueError: endereço inválido\n",
+        _linha(10, "INFO", "Artigo publicado por admin 7"),
+        _linha(10, "WARNING", "Rate limit excedido"),
+        _linha(11, "INFO", "Usuário 55 fez logout"),
+    ]
+    (tmp_path / f"app.{DIA.strftime('%Y.%m.%d')}.log").write_text("".join(linhas), encoding="utf-8")
+
+    with patch.object(log_busca, "DIRETORIO_LOGS", tmp_path):
+        yield tmp_path
+
+
+def _filtro(**kwargs) -> FiltroLog:
+    return FiltroLog(data_inicio=kwargs.pop("data_inicio", DIA), data_fim=kwargs.pop("data_fim", DIA), **kwargs)
+
+
+class TestBuscarLogs:
+    """Testes de filtros da busca"""
+
+    def test_todos(self, diretorio_logs):
+        """Sem filtros deve retornar todas as entradas em ordem"""
+        resultado = buscar_logs(_filtro())
+
+        assert len(resultado.entradas) == 6
+        assert "fez login" in resultado.entradas[0]
+        assert resultado.proximo_cursor is None
+        assert resultado.mensagem_erro is None
+
+    def test_nivel_inclui_linhas_de_continuacao(self, diretorio_logs):
+        """Entrada de ERROR deve incluir o traceback que a segue"""
+        resultado = buscar_logs(_filtro(nivel="ERROR"))
+
+        assert len(resultado.entradas) == 1
+        assert "Traceback" in resultado.entradas[0]
+        assert "endereço inválido" in resultado.entradas[0]
+
+    def test_intervalo_de_horas(self, diretorio_logs):
+        """Deve retornar apenas entradas dentro do intervalo de horas"""
+        resultado = buscar_logs(_filtro(hora_inicio=9, hora_fim=10))
+
+        assert len(resultado.entradas) == 3
+        assert all(" 09:" in e or " 10:" in e for e in resultado.entradas)
+
+    def test_texto_sem_diferenciar_maiusculas(self, diretorio_logs):
+        """Filtro de texto não deve diferenciar maiúsculas"""
+        resultado = buscar_logs(_filtro(texto="RATE LIMIT"))
+
+        assert len(resultado.entradas) == 1
+        assert "WARNING" in resultado.entradas[0]
+
+    def test_usuario(self, diretorio_logs):
+        """Filtro de usuário deve casar o ID exato"""
+        resultado = buscar_logs(_filtro(usuario_id=5))
+        assert len(resultado.entradas) == 1
+        assert "Usuário 5 " in resultado.entradas[0]
+
+        resultado = buscar_logs(_filtro(usuario_id=7))
+        assert len(resultado.entradas) == 1
+        assert "admin 7" in resultado.entradas[0]
+
+    def test_sem_arquivo(self, tmp_path):
+        """Período sem arquivos deve retornar mensagem"""
+        with patch.object(log_busca, "DIRETORIO_LOGS", tmp_path):
+            resultado = buscar_logs(_filtro(data_inicio=date(2000, 1, 1), data_fim=date(2000, 1, 1)))
+
+        assert resultado.entradas == []
+        assert "nenhum arquivo" in resultado.mensagem_erro.lower()
+
+    def test_periodo_com_varios_arquivos(self, diretorio_logs):
+        """Deve buscar em todos os arquivos do período, ignorando dias sem log"""
+        outro_dia = date(2025, 1, 17)
+        (diretorio_logs / f"app.{outro_dia.strftime('%Y.%m.%d')}.log").write_text(
+            _linha(12, "ERROR", "erro de outro dia", outro_dia), encoding="utf-8"
+        )
+
+        resultado = buscar_logs(_filtro(data_fim=outro_dia, nivel="ERROR"))
+
+        assert resultado.arquivos_encontrados == 2
+        assert len(resultado.entradas) == 2
+        assert "erro de outro dia" in resultado.entradas[1]
+
+
+class TestPaginacaoLogs:
+    """Testes da paginação por cursor"""
+
+    def test_paginas_sem_repeticao(self, diretorio_logs):
+        """Percorrer as páginas deve retornar todas as entradas uma única vez"""
+        outro_dia = date(2025, 1, 16)
+        (diretorio_logs / f"app.{outro_dia.strftime('%Y.%m.%d')}.log").write_text(
+            _linha(1, "INFO", "a", outro_dia) + _linha(2, "INFO", "b", outro_dia), encoding="utf-8"
+        )
+        filtro = _filtro(data_fim=outro_dia)
+
+        entradas = []
+        cursor = None
+        paginas = 0
+        while True:
+            resultado = buscar_logs(filtro, cursor, limite=3)
+            entradas.extend(resultado.entradas)
+            paginas += 1
+            cursor = resultado.proximo_cursor
+            if not cursor:
+                break
+
+        assert paginas == 3
+        assert entradas == buscar_logs(filtro, limite=100).entradas
+        assert len(entradas) == 8
+
+    def test_cursor_invalido_reinicia(self, diretorio_logs):
+        """Cursor inválido deve ser ignorado (primeira página)"""
+        resultado = buscar_logs(_filtro(), "invalido")
+        assert len(resultado.entradas) == 6
+
+
+class TestIndiceLog:
+    """Testes do índice auxiliar por hora e nível"""
+
+    def test_indice_por_hora_e_nivel(self, diretorio_logs):
+        """Índice deve registrar offset inicial e contagem por nível de cada hora"""
+        arquivo = diretorio_logs / f"app.{DIA.strftime('%Y.%m.%d')}.log"
+
+        indice = obter_indice(arquivo)
+
+        assert indice["tamanho"] == arquivo.stat().st_size
+        assert indice["horas"]["08"]["offset"] == 0
+        assert indice["horas"]["08"]["niveis"] == {"INFO": 1, "DEBUG": 1}
+        assert indice["horas"]["09"]["niveis"] == {"ERROR": 1}
+        assert (diretorio_logs / ".indices" / f"{arquivo.name}.json").exists()
+
+    def test_indice_incremental(self, diretorio_logs):
+        """Linhas acrescentadas devem ser indexadas sem reler o início do arquivo"""
+        arquivo = diretorio_logs / f"app.{DIA.strftime('%Y.%m.%d')}.log"
+        obter_indice(arquivo)
+
+        with open(arquivo, "a", encoding="utf-8") as f:
+            f.write(_linha(11, "ERROR", "novo erro"))
+            f.write("linha incompleta sem quebra")
+
+        indice = obter_indice(arquivo)
+
+        assert indice["horas"]["11"]["niveis"] == {"INFO": 1, "ERROR": 1}
+        # A linha incompleta fica para a próxima atualização
+        assert indice["tamanho"] < arquivo.stat().st_size
+
+    def test_nivel_ausente_nao_le_arquivo(self, diretorio_logs):
+        """Sem entradas do nível no índice, o arquivo não deve ser lido"""
+        obter_indice(diretorio_logs / f"app.{DIA.strftime('%Y.%m.%d')}.log")
+
+        with patch.object(log_busca, "_iterar_entradas") as mock_iterar:
+            resultado = buscar_logs(_filtro(nivel="CRITICAL"))
+
+        assert resultado.entradas == []
+        mock_iterar.assert_not_called()
+
+    def test_indice_refeito_se_arquivo_diminuir(self, diretorio_logs):
+        """Arquivo truncado/recriado deve gerar um índice novo"""
+        arquivo = diretorio_logs / f"app.{DIA.strftime('%Y.%m.%d')}.log"
+        obter_indice(arquivo)
+
+        arquivo.write_text(_linha(23, "INFO", "recriado"), encoding="utf-8")
+        indice = obter_indice(arquivo)
+
+        assert list(indice["horas"]) == ["23"]
+
+    def test_indice_corrompido_refeito(self, diretorio_logs):
+        """Índice inválido deve ser reconstruído"""
+        arquivo = diretorio_logs / f"app.{DIA.strftime('%Y.%m.%d')}.log"
+        caminho_indice = diretorio_logs / ".indices" / f"{arquivo.name}.json"
+        caminho_indice.parent.mkdir()
+        caminho_indice.write_text("{invalido", encoding="utf-8")
+
+        indice = obter_indice(arquivo)
+
+        assert indice["tamanho"] == arquivo.stat().st_size
+        assert json.loads(caminho_indice.read_text(encoding="utf-8"))["tamanho"] == indice["tamanho"]
+
+
+class TestLogsJSON:
+    """Testes da busca em arquivos no formato JSON"""
+
+    def test_busca_em_log_json(self, tmp_path):
+        """Deve indexar e filtrar linhas JSON por hora, nível e usuário"""
+        linhas = [
+            '{"timestamp": "2025-01-15 08:00:00", "nivel": "INFO", "logger": "root", "mensagem": "início"}\n',
+            '{"timestamp": "2025-01-15 09:30:00", "nivel": "ERROR", "logger": "routes.x", '
+            '"mensagem": "falhou", "usuario_id": 12, "excecao": "Traceback..."}\n',
+        ]
+        (tmp_path / f"app.{DIA.strftime('%Y.%m.%d')}.log").write_text("".join(linhas), encoding="utf-8")
+
+        with patch.object(log_busca, "DIRETORIO_LOGS", tmp_path):
+            indice = obter_indice(tmp_path / f"app.{DIA.strftime('%Y.%m.%d')}.log")
+            por_nivel = buscar_logs(_filtro(nivel="ERROR"))
+            por_usuario = buscar_logs(_filtro(usuario_id=12))
+
+        assert indice["horas"]["09"]["niveis"] == {"ERROR": 1}
+        assert len(por_nivel.entradas) == 1
+        assert "falhou" in por_nivel.entradas[0]
+        assert por_usuario.entradas == por_nivel.entradas
@@ -173,3 +173,142 @@ class TestLoggerGlobal:
         from util.logger_config import logger
 
         assert isinstance(logger, logging.Logger)
+
+
+def _criar_registro(msg="mensagem %s", args=("x",), nivel=logging.INFO, exc_info=None, **extra):
+    registro = logging.LogRecord(
+        name="teste.modulo", level=nivel, pathname=__file__, lineno=10,
+        msg=msg, args=args, exc_info=exc_info
+    )
+    registro.__dict__.update(extra)
+    return registro
+
+
+class TestFormatadorJSON:
+    """Testes para o formato de log JSON"""
+
+    def test_campos_basicos(self):
+        """Deve gerar uma linha JSON com timestamp e nível primeiro"""
+        import json
+        from util.logger_config import FormatadorJSON
+
+        linha = FormatadorJSON().format(_criar_registro())
+        dados = json.loads(linha)
+
+        assert list(dados)[:2] == ["timestamp", "nivel"]
+        assert dados["nivel"] == "INFO"
+        assert dados["logger"] == "teste.modulo"
+        assert dados["mensagem"] == "mensagem x"
+        assert "\n" not in linha
+
+    def test_campos_extra_e_excecao(self):
+        """Campos de extra= e o traceback devem entrar no JSON"""
+        import json
+        import sys
+        from util.logger_config import FormatadorJSON
+
+        try:
+            raise ValueError("falhou")
+        except ValueError:
+            registro = _criar_registro(exc_info=sys.exc_info(), usuario_id=7)
+
+        dados = json.loads(FormatadorJSON().format(registro))
+
+        assert dados["usuario_id"] == 7
+        assert "ValueError: falhou" in dados["excecao"]
+
+    def test_criar_formatador(self):
+        """criar_formatador deve escolher o formato pelo nome"""
+        from util.logger_config import criar_formatador, FormatadorJSON
+
+        assert isinstance(criar_formatador("json"), FormatadorJSON)
+        assert not isinstance(criar_formatador("texto"), FormatadorJSON)
+
+
+class TestManipuladorFila:
+    """Testes para o handler de fila e o listener"""
+
+    def test_prepare_interpola_e_preserva_traceback(self):
+        """prepare deve interpolar argumentos e manter o traceback como texto"""
+        import queue
+        import sys
+        from util.logger_config import ManipuladorFila
+
+        try:
+            raise RuntimeError("erro")
+        except RuntimeError:
+            registro = _criar_registro(exc_info=sys.exc_info())
+
+        preparado = ManipuladorFila(queue.SimpleQueue()).prepare(registro)
+
+        assert preparado.msg == "mensagem x"
+        assert preparado.args is None
+        assert preparado.exc_info is None
+        assert "RuntimeError: erro" in preparado.exc_text
+        # O registro original não deve ser alterado
+        assert registro.args == ("x",)
+
+    def test_listener_grava_fora_da_thread(self):
+        """Entradas enfileiradas devem ser gravadas pelo listener"""
+        import queue
+        import threading
+        from logging.handlers import QueueListener
+        from util.logger_config import ManipuladorFila, criar_formatador
+
+        threads = []
+
+        class HandlerMemoria(logging.Handler):
+            def __init__(self):
+                super().__init__()
+                self.linhas = []
+
+            def emit(self, record):
+                threads.append(threading.current_thread())
+                self.linhas.append(self.format(record))
+
+        destino = HandlerMemoria()
+        destino.setFormatter(criar_formatador("texto"))
+        fila = queue.SimpleQueue()
+        listener = QueueListener(fila, destino)
+        listener.start()
+
+        logger_teste = logging.getLogger("teste.fila")
+        logger_teste.propagate = False
+        manipulador = ManipuladorFila(fila)
+        logger_teste.addHandler(manipulador)
+        try:
+            logger_teste.warning("usuário %s", 3)
+        finally:
+            logger_teste.removeHandler(manipulador)
+            listener.stop()
+
+        assert len(destino.linhas) == 1
+        assert "teste.fila - WARNING - usuário 3" in destino.linhas[0]
+        assert threads[0] is not threading.current_thread()
+
+
+class TestNiveisModulos:
+    """Testes para níveis de log por módulo"""
+
+    def test_aplicar_niveis(self):
+        """Deve aplicar níveis válidos e ignorar entradas inválidas"""
+        from util.logger_config import aplicar_niveis_modulos
+
+        aplicados = aplicar_niveis_modulos("teste.a=WARNING, teste.b=debug,invalido,teste.c=NADA")
+
+        try:
+            assert aplicados == {"teste.a": logging.WARNING, "teste.b": logging.DEBUG}
+            assert logging.getLogger("teste.a").level == logging.WARNING
+            assert logging.getLogger("teste.b").level == logging.DEBUG
+        finally:
+            logging.getLogger("teste.a").setLevel(logging.NOTSET)
+            logging.getLogger("teste.b").setLevel(logging.NOTSET)
+
+    def test_obter_logger_propaga_para_raiz(self):
+        """Logger de módulo deve propagar para os handlers da raiz"""
+        from util.logger_config import obter_logger
+
+        logger_modulo = obter_logger("util.exemplo")
+
+        assert logger_modulo.name == "util.exemplo"
+        assert logger_modulo.propagate is True
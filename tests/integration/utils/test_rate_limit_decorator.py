@@ -105,7 +105,7 @@ class TestAplicarRateLimit:
     def limiter_permissivo(self):
         """Cria rate limiter que sempre permite"""
         limiter = MagicMock(spec=RateLimiter)
-        limiter.verificar.return_value = True
+        limiter.verificar_async.return_value = True
         limiter.nome = "test_limiter"
         limiter.janela_minutos = 5
         return limiter
@@ -114,7 +114,7 @@ class TestAplicarRateLimit:
     def limiter_bloqueador(self):
         """Cria rate limiter que sempre bloqueia"""
         limiter = MagicMock(spec=RateLimiter)
-        limiter.verificar.return_value = False
+        limiter.verificar_async.return_value = False
         limiter.nome = "test_limiter"
         limiter.janela_minutos = 5
         return limiter
@@ -256,7 +256,7 @@ class TestAplicarRateLimitAsync:
     def limiter_bloqueador(self):
         """Cria rate limiter que sempre bloqueia"""
         limiter = MagicMock(spec=RateLimiter)
-        limiter.verificar.return_value = False
+        limiter.verificar_async.return_value = False
         limiter.nome = "test_limiter"
         limiter.janela_minutos = 5
         return limiter
@@ -155,20 +155,48 @@ class TestFormatarHora:
 class TestFotoUsuario:
     """Testes para a função foto_usuario()"""
 
-    def test_id_1_formata_corretamente(self):
+    @pytest.fixture
+    def pasta_fotos(self, tmp_path):
+        pasta = tmp_path / "usuarios"
+        pasta.mkdir()
+        with patch('util.foto_util.PASTA_FOTOS', pasta):
+            yield pasta
+
+    def test_id_1_formata_corretamente(self, pasta_fotos):
         """ID 1 deve formatar para 000001.jpg"""
+        (pasta_fotos / "000001.jpg").write_bytes(b"fake")
         resultado = foto_usuario(1)
-        assert resultado == "/static/img/usuarios/000001.jpg"
+        assert "/000001.jpg?v=" in resultado
 
-    def test_id_grande_formata_corretamente(self):
+    def test_id_grande_formata_corretamente(self, pasta_fotos):
         """ID grande deve formatar com zeros à esquerda"""
+        (pasta_fotos / "012345.jpg").write_bytes(b"fake")
         resultado = foto_usuario(12345)
-        assert resultado == "/static/img/usuarios/012345.jpg"
+        assert "/012345.jpg?v=" in resultado
 
-    def test_id_com_6_digitos(self):
+    def test_id_com_6_digitos(self, pasta_fotos):
         """ID com 6 dígitos deve formatar sem zeros extras"""
+        (pasta_fotos / "999999.jpg").write_bytes(b"fake")
         resultado = foto_usuario(999999)
-        assert resultado == "/static/img/usuarios/999999.jpg"
+        assert "/999999.jpg?v=" in resultado
+
+    def test_sem_foto_propria_usa_foto_padrao(self, pasta_fotos):
+        """Usuário sem foto própria deve usar a foto padrão compartilhada"""
+        resultado = foto_usuario(1)
+        assert resultado.startswith("/static/img/user.jpg")
+
+    def test_tamanho_escolhe_variante(self, tmp_path):
+        """Com tamanho, deve apontar para a variante versionada adequada"""
+        pasta = tmp_path / "usuarios"
+        pasta.mkdir()
+        (pasta / "000001_48.jpg").write_bytes(b"fake")
+
+        with patch('util.foto_util.PASTA_FOTOS', pasta), \
+                patch('util.foto_util.FOTO_VARIANTES_TAMANHOS', (48,)), \
+                patch('util.foto_util.FOTO_WEBP', False):
+            resultado = foto_usuario(1, 32)
+
+        assert "/000001_48.jpg?v=" in resultado
 
 
 class TestCsrfInput:
@@ -0,0 +1,127 @@
+"""
+Testes para o contador de visualizações em lote (util/visualizacoes_util.py).
+"""
+import pytest
+from unittest.mock import patch
+
+from model.artigo_model import Artigo, StatusArtigo
+from model.usuario_model import Usuario
+from repo import artigo_repo, usuario_repo
+from util.db_util import executar_repo, obter_conexao
+from util.perfis import Perfil
+from util.security import criar_hash_senha
+from util.visualizacoes_util import (
+    ContadorVisualizacoes,
+    marcar_visto_na_sessao,
+    MAX_VISTOS_SESSAO,
+)
+
+
+@pytest.fixture
+def artigo_id():
+    """Cria um artigo publicado e o remove ao final."""
+    usuario = Usuario(
+        id=0,
+        nome="Autor Visualizacoes",
+        email="autor_visualizacoes@example.com",
+        senha=criar_hash_senha("Senha@123"),
+        perfil=Perfil.AUTOR.value
+    )
+    usuario_id = usuario_repo.inserir(usuario)
+    artigo = Artigo(titulo="Artigo visto", status=StatusArtigo.PUBLICADO.value,
+                    usuario_id=usuario_id, categoria_id=None)
+    id_criado = artigo_repo.inserir(artigo)
+    yield id_criado
+    with obter_conexao() as conn:
+        conn.execute("DELETE FROM artigo WHERE id = ?", (id_criado,))
+
+
+def _visualizacoes(artigo_id: int) -> int:
+    artigo = artigo_repo.obter_por_id(artigo_id)
+    assert artigo is not None
+    return artigo.qtde_visualizacoes
+
+
+class TestContadorVisualizacoes:
+    """Testes para ContadorVisualizacoes."""
+
+    def test_registrar_nao_grava_imediatamente(self, artigo_id):
+        """Visualizações ficam em memória até a gravação."""
+        contador = ContadorVisualizacoes(limite_gravacao=100)
+
+        contador.registrar(artigo_id)
+        contador.registrar(artigo_id)
+
+        assert contador.pendentes(artigo_id) == 2
+        assert _visualizacoes(artigo_id) == 0
+
+    def test_gravar_soma_em_lote(self, artigo_id):
+        """Deve gravar todas as visualizações acumuladas de uma vez."""
+        contador = ContadorVisualizacoes(limite_gravacao=100)
+        for _ in range(3):
+            contador.registrar(artigo_id)
+
+        assert contador.gravar() == 3
+        assert _visualizacoes(artigo_id) == 3
+        assert contador.pendentes(artigo_id) == 0
+        assert contador.gravar() == 0
+
+    def test_limite_dispara_gravacao(self, artigo_id):
+        """Ao atingir o limite, o lote deve ser gravado."""
+        contador = ContadorVisualizacoes(limite_gravacao=2)
+
+        contador.registrar(artigo_id)
+        contador.registrar(artigo_id)
+
+        assert _visualizacoes(artigo_id) == 2
+        assert contador.pendentes(artigo_id) == 0
+
+    async def test_limite_no_event_loop_grava_fora_do_loop(self, artigo_id):
+        """No event loop, o limite deve agendar a gravação em vez de gravar na hora."""
+        contador = ContadorVisualizacoes(limite_gravacao=2)
+
+        with patch("util.visualizacoes_util.executar_repo", wraps=executar_repo) as mock_executar:
+            contador.registrar(artigo_id)
+            contador.registrar(artigo_id)
+            contador.registrar(artigo_id)
+            tarefa = contador._gravacao_agendada
+
+            assert _visualizacoes(artigo_id) == 0
+            await tarefa
+
+        mock_executar.assert_called_once_with(contador.gravar)
+        assert _visualizacoes(artigo_id) == 3
+        assert contador._gravacao_agendada is None
+
+    def test_falha_na_gravacao_mantem_pendentes(self, artigo_id):
+        """Se a gravação falhar, as visualizações devem continuar pendentes."""
+        contador = ContadorVisualizacoes(limite_gravacao=100)
+        contador.registrar(artigo_id)
+
+        with patch("util.visualizacoes_util.artigo_repo.somar_visualizacoes", return_value=False):
+            assert contador.gravar() == 0
+
+        assert contador.pendentes(artigo_id) == 1
+        assert contador.gravar() == 1
+        assert _visualizacoes(artigo_id) == 1
+
+
+class TestMarcarVistoNaSessao:
+    """Testes para a deduplicação por sessão."""
+
+    def test_primeira_visualizacao(self):
+        """Deve contar só a primeira visualização do artigo na sessão."""
+        sessao = {}
+
+        assert marcar_visto_na_sessao(sessao, 1) is True
+        assert marcar_visto_na_sessao(sessao, 1) is False
+        assert marcar_visto_na_sessao(sessao, 2) is True
+
+    def test_limita_artigos_lembrados(self):
+        """A sessão deve guardar no máximo MAX_VISTOS_SESSAO artigos."""
+        sessao = {}
+        for i in range(MAX_VISTOS_SESSAO + 10):
+            marcar_visto_na_sessao(sessao, i)
+
+        assert len(sessao["artigos_vistos"]) == MAX_VISTOS_SESSAO
+        assert marcar_visto_na_sessao(sessao, 0) is True
@@ -28,7 +28,7 @@ class TestConfigCacheObter:
             resultado = ConfigCache.obter("chave_teste", "padrao")
 
             # Não deve chamar o repo, pois está no cache
-            mock_repo.obter_por_chave.assert_not_called()
+            mock_repo.obter_multiplas.assert_not_called()
             assert resultado == "valor_cacheado"
 
     def test_obter_valor_do_banco(self):
@@ -37,11 +37,11 @@ class TestConfigCacheObter:
         mock_config.valor = "valor_do_banco"
 
         with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.return_value = mock_config
+            mock_repo.obter_multiplas.return_value = {"chave_nova": mock_config}
 
             resultado = ConfigCache.obter("chave_nova", "padrao")
 
-            mock_repo.obter_por_chave.assert_called_once_with("chave_nova")
+            mock_repo.obter_multiplas.assert_called_once_with(["chave_nova"])
             assert resultado == "valor_do_banco"
             # Deve ter sido cacheado
             assert ConfigCache._cache["chave_nova"] == "valor_do_banco"
@@ -49,7 +49,7 @@ class TestConfigCacheObter:
     def test_obter_retorna_padrao_quando_nao_existe(self):
         """Quando configuração não existe no banco, retorna padrão"""
         with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.return_value = None
+            mock_repo.obter_multiplas.side_effect = lambda chaves: dict.fromkeys(chaves)
 
             resultado = ConfigCache.obter("chave_inexistente", "valor_padrao")
 
@@ -60,7 +60,7 @@ class TestConfigCacheObter:
     def test_obter_sqlite_error_retorna_padrao(self):
         """Em caso de sqlite3.Error, retorna padrão sem crashar"""
         with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.side_effect = sqlite3.Error("Erro de banco")
+            mock_repo.obter_multiplas.side_effect = sqlite3.Error("Erro de banco")
 
             with patch('util.config_cache.logger') as mock_logger:
                 resultado = ConfigCache.obter("chave_erro", "padrao_erro")
@@ -72,7 +72,7 @@ class TestConfigCacheObter:
     def test_obter_exception_generica_retorna_padrao(self):
         """Em caso de Exception genérica, retorna padrão e loga como crítico"""
         with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.side_effect = Exception("Erro inesperado")
+            mock_repo.obter_multiplas.side_effect = Exception("Erro inesperado")
 
             with patch('util.config_cache.logger') as mock_logger:
                 resultado = ConfigCache.obter("chave_critica", "padrao_critico")
@@ -101,7 +101,7 @@ class TestConfigCacheObterInt:
     def test_obter_int_usa_padrao_quando_nao_existe(self):
         """Deve usar padrão quando chave não existe"""
         with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.return_value = None
+            mock_repo.obter_multiplas.side_effect = lambda chaves: dict.fromkeys(chaves)
 
             resultado = ConfigCache.obter_int("inexistente", 100)
 
@@ -236,7 +236,7 @@ class TestConfigCacheObterMultiplos:
     def test_obter_multiplos_usa_padroes(self):
         """Deve usar padrões quando configs não existem"""
         with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.return_value = None
+            mock_repo.obter_multiplas.side_effect = lambda chaves: dict.fromkeys(chaves)
 
             resultado = ConfigCache.obter_multiplos(
                 ["nova1", "nova2"],
@@ -304,6 +304,221 @@ class TestConfigCacheLimpar:
         assert len(ConfigCache._cache) == 3
 
 
+class TestConfigCacheVersao:
+    """Testes da versão usada para detectar mudanças de configuração"""
+
+    def setup_method(self):
+        """Limpa o cache antes de cada teste"""
+        ConfigCache.limpar()
+
+    def test_limpar_incrementa_versao(self):
+        """limpar() e limpar_chave() devem gerar nova versão"""
+        versao = ConfigCache.obter_versao()
+
+        ConfigCache.limpar()
+        assert ConfigCache.obter_versao() == versao + 1
+
+        ConfigCache.limpar_chave("qualquer")
+        assert ConfigCache.obter_versao() == versao + 2
+
+    def test_leitura_nao_altera_versao(self):
+        """Leituras bem-sucedidas não devem mudar a versão"""
+        ConfigCache._cache["chave"] = "valor"
+        versao = ConfigCache.obter_versao()
+
+        ConfigCache.obter("chave", "padrao")
+
+        assert ConfigCache.obter_versao() == versao
+
+    def test_erro_no_banco_incrementa_versao(self):
+        """Padrão não cacheado por erro deve gerar nova versão (dependentes tentam de novo)"""
+        versao = ConfigCache.obter_versao()
+
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_multiplas.side_effect = sqlite3.Error("indisponível")
+            ConfigCache.obter("chave_erro", "padrao")
+
+        assert ConfigCache.obter_versao() == versao + 1
+
+
+class TestConfigCacheSnapshot:
+    """Testes da pré-carga, do snapshot imutável e das métricas"""
+
+    def setup_method(self):
+        """Limpa o cache antes de cada teste"""
+        ConfigCache.limpar()
+
+    @staticmethod
+    def _config(chave, valor):
+        mock_config = MagicMock()
+        mock_config.chave = chave
+        mock_config.valor = valor
+        return mock_config
+
+    def test_carregar_todas_em_uma_query(self):
+        """Pré-carga deve guardar todas as linhas e evitar consultas posteriores"""
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_todos.return_value = [self._config("a", "1"), self._config("b", "2")]
+
+            assert ConfigCache.carregar_todas() == 2
+            assert ConfigCache.obter("a") == "1"
+            assert ConfigCache.obter_int("b", 0) == 2
+
+            mock_repo.obter_todos.assert_called_once()
+            mock_repo.obter_multiplas.assert_not_called()
+
+    def test_obter_multiplos_agrupa_faltas(self):
+        """Chaves ausentes devem ser buscadas em uma única chamada ao repo"""
+        ConfigCache._cache["cacheada"] = "x"
+
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_multiplas.return_value = {"nova1": self._config("nova1", "v1"), "nova2": None}
+
+            resultado = ConfigCache.obter_multiplos(["nova1", "cacheada", "nova2"], ["p1", "p2", "p3"])
+
+            mock_repo.obter_multiplas.assert_called_once_with(["nova1", "nova2"])
+        assert list(resultado.items()) == [("nova1", "v1"), ("cacheada", "x"), ("nova2", "p3")]
+        assert ConfigCache._cache["nova2"] == "p3"
+
+    def test_snapshot_publicado_nao_e_alterado(self):
+        """Escritas devem trocar o snapshot, sem alterar o dicionário já publicado"""
+        ConfigCache._cache = {"a": "1", "b": "2"}
+        snapshot_anterior = ConfigCache._cache
+
+        ConfigCache.limpar_chave("a")
+
+        assert snapshot_anterior == {"a": "1", "b": "2"}
+        assert ConfigCache._cache == {"b": "2"}
+
+    def test_valores_lidos_antes_de_limpar_sao_descartados(self):
+        """Se o cache for limpo durante a consulta, o resultado não deve ser guardado"""
+        def consulta_com_limpeza(chaves):
+            ConfigCache.limpar()  # Admin salvou configurações durante a consulta
+            return {"chave": self._config("chave", "antigo")}
+
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_multiplas.side_effect = consulta_com_limpeza
+            assert ConfigCache.obter("chave", "padrao") == "antigo"
+
+        assert "chave" not in ConfigCache._cache
+
+    def test_estatisticas(self):
+        """Deve contar acertos, faltas e consultas ao banco"""
+        ConfigCache._cache["a"] = "1"
+        antes = ConfigCache.obter_estatisticas()
+
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_multiplas.side_effect = lambda chaves: dict.fromkeys(chaves)
+            ConfigCache.obter("a")
+            ConfigCache.obter("b", "padrao")
+            ConfigCache.obter("b", "padrao")
+
+        depois = ConfigCache.obter_estatisticas()
+        assert depois["acertos"] - antes["acertos"] == 2
+        assert depois["falhas"] - antes["falhas"] == 1
+        assert depois["consultas_banco"] - antes["consultas_banco"] == 1
+        assert depois["itens"] == 2
+
+
+class TestConfigCacheSincronizacao:
+    """Testes da sincronização entre processos pela versão no banco"""
+
+    def setup_method(self):
+        """Limpa o cache antes de cada teste"""
+        ConfigCache.limpar()
+        ConfigCache._versao_banco = None
+
+    @staticmethod
+    def _config(chave, valor):
+        mock_config = MagicMock()
+        mock_config.chave = chave
+        mock_config.valor = valor
+        return mock_config
+
+    def test_recarrega_quando_versao_muda(self):
+        """Versão diferente no banco deve recarregar todo o cache de uma vez"""
+        ConfigCache._cache = {"tema": "claro", "removida": "x"}
+        ConfigCache._versao_banco = 3
+        versao_local = ConfigCache.obter_versao()
+
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_versao.return_value = 4
+            mock_repo.obter_todos.return_value = [self._config("tema", "escuro")]
+
+            assert ConfigCache.sincronizar_com_banco() is True
+
+        assert ConfigCache._cache == {"tema": "escuro"}
+        assert ConfigCache._versao_banco == 4
+        # Dependentes (ex: DynamicRateLimiter) devem perceber a mudança
+        assert ConfigCache.obter_versao() == versao_local + 1
+
+    def test_nao_recarrega_sem_mudanca(self):
+        """Mesma versão no banco deve custar apenas a consulta da versão"""
+        ConfigCache._cache = {"tema": "claro"}
+        ConfigCache._versao_banco = 7
+
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_versao.return_value = 7
+
+            assert ConfigCache.sincronizar_com_banco() is False
+            mock_repo.obter_todos.assert_not_called()
+
+        assert ConfigCache._cache == {"tema": "claro"}
+
+    def test_erro_no_banco_mantem_cache(self):
+        """Falha ao consultar a versão não deve alterar o cache"""
+        ConfigCache._cache = {"tema": "claro"}
+
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_versao.side_effect = sqlite3.Error("bloqueado")
+            with patch('util.config_cache.logger'):
+                assert ConfigCache.sincronizar_com_banco() is False
+
+        assert ConfigCache._cache == {"tema": "claro"}
+
+    def test_carregar_todas_registra_versao(self):
+        """A pré-carga deve guardar a versão do banco que refletiu"""
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_versao.return_value = 12
+            mock_repo.obter_todos.return_value = []
+
+            ConfigCache.carregar_todas()
+
+        assert ConfigCache._versao_banco == 12
+
+    def test_alteracao_em_outro_processo(self, tmp_path):
+        """Alteração gravada por outra conexão (outro worker) deve ser detectada"""
+        from repo import configuracao_repo
+
+        caminho = str(tmp_path / "config.db")
+        conn = sqlite3.connect(caminho)
+        conn.row_factory = sqlite3.Row
+
+        from contextlib import contextmanager
+
+        @contextmanager
+        def conexao_teste():
+            yield conn
+            conn.commit()
+
+        with patch.object(configuracao_repo, 'obter_conexao', conexao_teste):
+            configuracao_repo.criar_tabela()
+            conn.execute("INSERT INTO configuracao (chave, valor) VALUES ('tema', 'claro')")
+            conn.commit()
+            ConfigCache.carregar_todas()
+            assert ConfigCache.obter("tema") == "claro"
+
+            # Outro processo altera o banco diretamente
+            outro = sqlite3.connect(caminho)
+            outro.execute("UPDATE configuracao SET valor = 'escuro' WHERE chave = 'tema'")
+            outro.commit()
+            outro.close()
+
+            assert ConfigCache.sincronizar_com_banco() is True
+            assert ConfigCache.obter("tema") == "escuro"
+        conn.close()
+
+
 class TestConfigCacheThreadSafety:
     """Testes de thread-safety (básicos)"""
 
@@ -339,6 +554,6 @@ class TestConfigInstanciaGlobal:
 
         # Deve funcionar sem erro
         with patch('util.config_cache.configuracao_repo') as mock_repo:
-            mock_repo.obter_por_chave.return_value = None
+            mock_repo.obter_multiplas.side_effect = lambda chaves: dict.fromkeys(chaves)
             resultado = config.obter("teste", "valor_teste")
             assert resultado == "valor_teste"
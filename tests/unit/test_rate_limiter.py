@@ -18,6 +18,11 @@ from util.rate_limiter import (
     obter_identificador_cliente,
     com_rate_limit
 )
+from util import rate_limit_armazenamento
+from util.db_util import executar_repo
+from util.rate_limit_armazenamento import (
+    ArmazenamentoMemoria, ArmazenamentoRateLimit, ArmazenamentoSQLite, criar_armazenamento
+)
 
 
 class TestRateLimiter:
@@ -122,8 +127,8 @@ class TestRateLimiter:
 
         limiter.limpar("192.168.1.1")
 
-        assert "192.168.1.1" not in limiter.tentativas
-        assert "192.168.1.2" in limiter.tentativas
+        assert "192.168.1.1" not in limiter.armazenamento.tentativas
+        assert "192.168.1.2" in limiter.armazenamento.tentativas
 
     def test_limpar_todos(self):
         """Deve limpar todos os identificadores"""
@@ -135,7 +140,7 @@ class TestRateLimiter:
 
         limiter.limpar()
 
-        assert len(limiter.tentativas) == 0
+        assert len(limiter.armazenamento.tentativas) == 0
 
     def test_limpar_identificador_inexistente(self):
         """Limpar identificador inexistente não deve causar erro"""
@@ -334,6 +339,31 @@ class TestDynamicRateLimiter:
                 limiter.obter_tempo_reset("192.168.1.1")
                 mock_atualizar.assert_called_once()
 
+    def test_nao_rele_config_sem_mudanca(self):
+        """Sem mudança de versão, verificar() não deve consultar o config_cache"""
+        with patch('util.rate_limiter.config') as mock_config:
+            mock_config.obter_int.side_effect = lambda k, d: d
+            mock_config.obter_versao.return_value = 1
+
+            limiter = DynamicRateLimiter(
+                chave_max="teste_max",
+                chave_minutos="teste_minutos",
+                nome="teste_versao"
+            )
+            limiter.verificar("192.168.1.1")
+            mock_config.obter_int.reset_mock()
+
+            for _ in range(3):
+                limiter.verificar("192.168.1.1")
+            mock_config.obter_int.assert_not_called()
+
+            # Configurações salvas pelo admin: nova versão
+            mock_config.obter_versao.return_value = 2
+            mock_config.obter_int.side_effect = lambda k, d: 1 if k == "teste_max" else d
+            with patch('util.rate_limiter.logger'):
+                assert limiter.verificar("192.168.1.1") is False
+            assert limiter.max_tentativas == 1
+
     def test_repr(self):
         """Deve ter representação string correta"""
         with patch('util.rate_limiter.config') as mock_config:
@@ -474,13 +504,245 @@ class TestRegistroLimiters:
         limiter1.verificar("192.168.1.1")
         limiter2.verificar("192.168.1.2")
 
-        assert len(limiter1.tentativas) > 0
-        assert len(limiter2.tentativas) > 0
+        assert len(limiter1.armazenamento.tentativas) > 0
+        assert len(limiter2.armazenamento.tentativas) > 0
 
         registro.limpar_todos()
 
-        assert len(limiter1.tentativas) == 0
-        assert len(limiter2.tentativas) == 0
+        assert len(limiter1.armazenamento.tentativas) == 0
+        assert len(limiter2.armazenamento.tentativas) == 0
+
+
+class TestArmazenamentoLimitado:
+    """Testes do armazenamento limitado (janela, varredura e LRU)"""
+
+    def test_tentativas_expiram_com_a_janela(self):
+        """Tentativas fora da janela devem liberar o identificador"""
+        limiter = RateLimiter(max_tentativas=2, janela_minutos=1, nome="janela")
+
+        with patch("util.rate_limit_armazenamento.time.monotonic", return_value=1000.0):
+            assert limiter.verificar("ip") is True
+            assert limiter.verificar("ip") is True
+            with patch("util.rate_limiter.logger"):
+                assert limiter.verificar("ip") is False
+            assert limiter.obter_tempo_reset("ip") == timedelta(minutes=1)
+
+        with patch("util.rate_limit_armazenamento.time.monotonic", return_value=1060.0):
+            assert limiter.obter_tentativas_restantes("ip") == 2
+            assert limiter.verificar("ip") is True
+
+    def test_consultas_nao_criam_identificadores(self):
+        """Consultar restantes/reset não deve guardar identificadores novos"""
+        limiter = RateLimiter(max_tentativas=3, janela_minutos=1, nome="consulta")
+
+        assert limiter.obter_tentativas_restantes("novo") == 3
+        assert limiter.obter_tempo_reset("novo") is None
+        assert len(limiter.armazenamento.tentativas) == 0
+
+    def test_despejo_lru_acima_do_maximo(self):
+        """Acima de max_identificadores, o identificador menos recente sai"""
+        limiter = RateLimiter(
+            max_tentativas=5, janela_minutos=1, nome="lru",
+            armazenamento=ArmazenamentoMemoria(max_identificadores=2)
+        )
+
+        limiter.verificar("a")
+        limiter.verificar("b")
+        limiter.verificar("a")  # "a" passa a ser o mais recente
+        limiter.verificar("c")
+
+        assert list(limiter.armazenamento.tentativas) == ["a", "c"]
+        assert limiter.armazenamento.obter_estatisticas()["despejos_lru"] == 1
+
+    def test_varredura_remove_inativos(self):
+        """A varredura periódica deve remover identificadores sem tentativas na janela"""
+        limiter = RateLimiter(
+            max_tentativas=5, janela_minutos=1, nome="varredura",
+            armazenamento=ArmazenamentoMemoria(intervalo_varredura_segundos=30)
+        )
+
+        proxima_varredura = limiter.armazenamento._proxima_varredura
+        with patch("util.rate_limit_armazenamento.time.monotonic", return_value=proxima_varredura):
+            for i in range(3):
+                limiter.verificar(f"10.0.0.{i}")
+
+        proxima_varredura = limiter.armazenamento._proxima_varredura
+        with patch("util.rate_limit_armazenamento.time.monotonic", return_value=proxima_varredura + 60):
+            limiter.verificar("10.0.0.99")
+
+        assert list(limiter.armazenamento.tentativas) == ["10.0.0.99"]
+        assert limiter.armazenamento.obter_estatisticas()["removidos_varredura"] == 3
+
+    def test_registros_limitados_a_max_tentativas(self):
+        """Cada identificador guarda no máximo max_tentativas timestamps"""
+        limiter = RateLimiter(max_tentativas=3, janela_minutos=1, nome="limitado")
+
+        with patch("util.rate_limiter.logger"):
+            for _ in range(50):
+                limiter.verificar("ip")
+
+        assert limiter.armazenamento.obter_estatisticas()["timestamps_armazenados"] == 3
+
+    def test_max_identificadores_invalido(self):
+        """max_identificadores deve ser positivo"""
+        with pytest.raises(ValueError, match="max_identificadores deve ser positivo"):
+            ArmazenamentoMemoria(max_identificadores=0)
+
+    def test_estatisticas_de_memoria_no_registro(self):
+        """O registry deve incluir o uso de memória de cada limiter"""
+        registro = RegistroLimiters()
+        limiter = RateLimiter(max_tentativas=5, janela_minutos=1, nome="memoria")
+        registro.registrar(limiter)
+        limiter.verificar("192.168.1.1")
+
+        stats = registro.obter_estatisticas()
+        dados = stats["limiters"]["memoria"]
+
+        assert dados["identificadores_ativos"] == 1
+        assert dados["timestamps_armazenados"] == 1
+        assert dados["memoria_estimada_bytes"] > 0
+        assert stats["memoria_estimada_total_bytes"] == dados["memoria_estimada_bytes"]
+
+
+def _tentar_em_outro_processo(caminho: str, tentativas: int) -> int:
+    """Simula um worker: registra tentativas no banco compartilhado e conta as aceitas"""
+    limiter = RateLimiter(
+        max_tentativas=15, janela_minutos=1, nome="workers",
+        armazenamento=ArmazenamentoSQLite("workers", caminho)
+    )
+    with patch("util.rate_limiter.logger"):
+        return sum(limiter.verificar("10.0.0.1") for _ in range(tentativas))
+
+
+class TestArmazenamentoSQLite:
+    """Testes do armazenamento compartilhado entre processos (SQLite)"""
+
+    @pytest.fixture
+    def caminho(self, tmp_path):
+        return str(tmp_path / "rate_limit.db")
+
+    def _criar_limiter(self, caminho, nome="sqlite", max_tentativas=3):
+        return RateLimiter(
+            max_tentativas=max_tentativas, janela_minutos=1, nome=nome,
+            armazenamento=ArmazenamentoSQLite(nome, caminho)
+        )
+
+    def test_limite_compartilhado_entre_instancias(self, caminho):
+        """Duas instâncias (workers) do mesmo limiter devem somar as tentativas"""
+        worker_a = self._criar_limiter(caminho)
+        worker_b = self._criar_limiter(caminho)
+
+        assert worker_a.verificar("ip") is True
+        assert worker_b.verificar("ip") is True
+        assert worker_a.verificar("ip") is True
+        with patch("util.rate_limiter.logger"):
+            assert worker_b.verificar("ip") is False
+        assert worker_a.obter_tentativas_restantes("ip") == 0
+        assert worker_b.obter_tempo_reset("ip") is not None
+
+    def test_limite_atomico_entre_processos(self, caminho):
+        """Processos concorrentes nunca devem aceitar mais que o limite"""
+        import multiprocessing
+
+        # O banco é aberto só nos processos filhos (conexões não sobrevivem a fork)
+        with multiprocessing.get_context("fork").Pool(4) as pool:
+            aceitas = pool.starmap(_tentar_em_outro_processo, [(caminho, 10)] * 4)
+
+        assert sum(aceitas) == 15
+
+    def test_limiters_isolados(self, caminho):
+        """Limiters com nomes diferentes não compartilham tentativas"""
+        login = self._criar_limiter(caminho, nome="login", max_tentativas=1)
+        cadastro = self._criar_limiter(caminho, nome="cadastro", max_tentativas=1)
+
+        assert login.verificar("ip") is True
+        assert cadastro.verificar("ip") is True
+
+    def test_tentativas_expiram(self, caminho):
+        """Tentativas fora da janela não devem contar"""
+        limiter = self._criar_limiter(caminho, max_tentativas=1)
+
+        with patch("util.rate_limit_armazenamento.time.time", return_value=1000.0):
+            assert limiter.verificar("ip") is True
+            with patch("util.rate_limiter.logger"):
+                assert limiter.verificar("ip") is False
+
+        with patch("util.rate_limit_armazenamento.time.time", return_value=1060.0):
+            assert limiter.verificar("ip") is True
+
+    def test_limpar_e_estatisticas(self, caminho):
+        """limpar deve apagar as linhas do limiter e as estatísticas refletir o banco"""
+        limiter = self._criar_limiter(caminho)
+        limiter.verificar("a")
+        limiter.verificar("b")
+
+        stats = limiter.armazenamento.obter_estatisticas()
+        assert stats["armazenamento"] == "sqlite"
+        assert stats["identificadores_ativos"] == 2
+
+        limiter.limpar("a")
+        assert limiter.armazenamento.obter_estatisticas()["identificadores_ativos"] == 1
+        limiter.limpar()
+        assert limiter.armazenamento.obter_estatisticas()["timestamps_armazenados"] == 0
+
+    def test_falha_no_banco_permite_requisicao(self, caminho):
+        """Erro no SQLite não deve bloquear a requisição"""
+        import sqlite3
+
+        limiter = self._criar_limiter(caminho)
+        with patch.object(limiter.armazenamento, "_executar", side_effect=sqlite3.OperationalError("locked")):
+            with patch("util.rate_limit_armazenamento.logger") as mock_logger:
+                assert limiter.verificar("ip") is True
+                mock_logger.error.assert_called_once()
+
+    async def test_verificar_async_fora_do_event_loop(self, caminho):
+        """Com SQLite, verificar_async deve rodar a verificação no pool de repositórios"""
+        limiter = self._criar_limiter(caminho, max_tentativas=1)
+
+        with patch("util.rate_limiter.executar_repo", wraps=executar_repo) as mock_executar:
+            assert await limiter.verificar_async("ip") is True
+            with patch("util.rate_limiter.logger"):
+                assert await limiter.verificar_async("ip") is False
+
+        assert mock_executar.call_count == 2
+
+    async def test_verificar_async_em_memoria_roda_direto(self):
+        """Em memória, verificar_async não deve usar o pool de repositórios"""
+        limiter = RateLimiter(max_tentativas=1, janela_minutos=1, nome="memoria_async",
+                              armazenamento=ArmazenamentoMemoria())
+
+        with patch("util.rate_limiter.executar_repo") as mock_executar:
+            assert await limiter.verificar_async("ip") is True
+
+        mock_executar.assert_not_called()
+
+    def test_fechar_pools(self, caminho):
+        """fechar_pools deve fechar as conexões e permitir recriar o pool depois"""
+        limiter = self._criar_limiter(caminho)
+        limiter.verificar("ip")
+        assert caminho in rate_limit_armazenamento._pools
+
+        rate_limit_armazenamento.fechar_pools()
+
+        assert rate_limit_armazenamento._pools == {}
+        assert limiter.verificar("ip") is True
+        assert limiter.obter_tentativas_restantes("ip") == 1
+
+    def test_armazenamento_incompleto_falha_ao_instanciar(self):
+        """Implementação sem todos os métodos da interface não deve ser instanciável"""
+        class ArmazenamentoIncompleto(ArmazenamentoRateLimit):
+            def registrar_tentativa(self, identificador, max_tentativas, janela_segundos):
+                return True, 0
+
+        with pytest.raises(TypeError):
+            ArmazenamentoIncompleto()
+
+    def test_criar_armazenamento(self):
+        """criar_armazenamento deve escolher a implementação pelo tipo"""
+        assert isinstance(criar_armazenamento("x", "sqlite"), ArmazenamentoSQLite)
+        assert isinstance(criar_armazenamento("x", "memoria"), ArmazenamentoMemoria)
+        with patch("util.rate_limit_armazenamento.logger"):
+            assert isinstance(criar_armazenamento("x", "redis"), ArmazenamentoMemoria)
 
 
 class TestDecoratorComRateLimit:
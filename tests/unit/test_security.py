@@ -0,0 +1,126 @@
+"""
+Testes para o módulo util/security.py
+
+Testa o serviço de hash de senhas executado fora do event loop.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from util.security import ServicoHashSenha, criar_hash_senha_async, verificar_senha_async
+
+
+class TestServicoHashSenha:
+    """Testes para ServicoHashSenha"""
+
+    async def test_hash_e_verificacao_async(self):
+        """Hash criado no pool deve ser verificado corretamente"""
+        senha_hash = await criar_hash_senha_async("Senha@123")
+
+        assert await verificar_senha_async("Senha@123", senha_hash) is True
+        assert await verificar_senha_async("Outra@123", senha_hash) is False
+
+    async def test_nao_bloqueia_event_loop(self):
+        """Enquanto o hash executa, outras corrotinas devem continuar rodando"""
+        servico = ServicoHashSenha(max_concorrentes=1)
+        ticks = 0
+
+        async def contar_ticks():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        contador = asyncio.create_task(contar_ticks())
+        try:
+            await servico._executar(time.sleep, 0.2)
+        finally:
+            contador.cancel()
+            servico.encerrar()
+
+        assert ticks >= 5
+
+    async def test_limite_de_concorrencia_e_tempo_de_fila(self):
+        """Pedidos acima do limite devem aguardar na fila, e a espera ser medida"""
+        servico = ServicoHashSenha(max_concorrentes=2)
+        simultaneos = 0
+        maximo_simultaneos = 0
+        lock = threading.Lock()
+
+        def trabalho():
+            nonlocal simultaneos, maximo_simultaneos
+            with lock:
+                simultaneos += 1
+                maximo_simultaneos = max(maximo_simultaneos, simultaneos)
+            time.sleep(0.05)
+            with lock:
+                simultaneos -= 1
+
+        try:
+            await asyncio.gather(*(servico._executar(trabalho) for _ in range(6)))
+        finally:
+            servico.encerrar()
+
+        stats = servico.obter_estatisticas()
+        assert maximo_simultaneos == 2
+        assert stats["execucoes"] == 6
+        assert stats["aguardando"] == 0
+        assert stats["em_execucao"] == 0
+        assert stats["tempo_fila_maximo_ms"] >= 40
+
+    async def test_cancelar_pedido_na_fila_libera_contagem(self):
+        """Pedido cancelado antes de executar não deve ficar contado como aguardando"""
+        servico = ServicoHashSenha(max_concorrentes=1)
+        liberar = threading.Event()
+
+        try:
+            ocupando = asyncio.create_task(servico._executar(liberar.wait, 5))
+            await asyncio.sleep(0.05)
+            na_fila = asyncio.create_task(servico.criar_hash("Senha@123"))
+            await asyncio.sleep(0.05)
+            assert servico.obter_estatisticas()["aguardando"] == 1
+
+            na_fila.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await na_fila
+            liberar.set()
+            await ocupando
+        finally:
+            liberar.set()
+            servico.encerrar()
+
+        stats = servico.obter_estatisticas()
+        assert stats["aguardando"] == 0
+        assert stats["execucoes"] == 1
+
+    async def test_excecao_propagada(self):
+        """Erros da função devem chegar ao chamador sem corromper as métricas"""
+        servico = ServicoHashSenha(max_concorrentes=1)
+
+        def falhar():
+            raise ValueError("hash inválido")
+
+        try:
+            with pytest.raises(ValueError, match="hash inválido"):
+                await servico._executar(falhar)
+        finally:
+            servico.encerrar()
+
+        assert servico.obter_estatisticas()["em_execucao"] == 0
+
+    async def test_encerrar_e_reutilizar(self):
+        """Após encerrar, um novo uso deve recriar o pool"""
+        servico = ServicoHashSenha(max_concorrentes=1)
+        await servico._executar(time.sleep, 0)
+        servico.encerrar()
+
+        assert await servico._executar(lambda: 42) == 42
+        servico.encerrar()
+
+    def test_max_concorrentes_invalido(self):
+        """max_concorrentes deve ser positivo"""
+        with pytest.raises(ValueError, match="max_concorrentes deve ser positivo"):
+            ServicoHashSenha(max_concorrentes=0)
@@ -3,15 +3,45 @@ Módulo de gerenciamento de backups do banco de dados SQLite.
 
 Fornece funções para criar, listar, restaurar e excluir backups do banco de dados.
 Os backups são armazenados no diretório 'backups/' com nomenclatura padronizada.
+
+Formatos de backup:
+- ``.db``: cópia completa do banco, sem compressão
+- ``.db.gz``: cópia completa comprimida com gzip
+- ``.inc.gz``: incremental, apenas as páginas alteradas desde o último backup
+  completo (comprimido com gzip). Depende do backup completo de origem.
+
+O arquivo ``manifesto.json`` indexa os backups existentes, de modo que a
+listagem não precisa inspecionar cada arquivo.
 """
+import asyncio
+import gzip
+import json
 import shutil
 import sqlite3
+import struct
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
-from typing import Optional, List
-from dataclasses import dataclass
-
-from util.config import DATABASE_PATH
+from datetime import datetime, timedelta
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional, List
+from dataclasses import dataclass, asdict
+
+try:
+    import fcntl
+except ImportError:  # Windows: apenas os locks de cada processo
+    fcntl = None
+
+from util.config import (
+    DATABASE_PATH,
+    BACKUP_PAGINAS_POR_PASSO,
+    BACKUP_PAUSA_SEGUNDOS,
+    BACKUP_COMPRIMIR,
+    BACKUP_AUTOMATICO_INCREMENTAL,
+    BACKUP_RETENCAO_DIARIOS,
+    BACKUP_RETENCAO_SEMANAIS,
+)
+from util.db_util import fechar_pool
 from util.logger_config import logger
 from util.datetime_util import agora
 
@@ -22,10 +52,45 @@ BACKUP_DIR = Path("backups")
 # Formato do nome do arquivo de backup
 BACKUP_FILENAME_FORMAT = "backup_%Y-%m-%d_%H-%M-%S.db"
 BACKUP_AUTO_FILENAME_FORMAT = "backup_auto_%Y-%m-%d_%H-%M-%S.db"
+# Backup de segurança criado antes de uma restauração (fora da retenção)
+BACKUP_SEGURANCA_FILENAME_FORMAT = "backup_seguranca_%Y-%m-%d_%H-%M-%S.db"
 
 # Padrão para validação de nomes de arquivo de backup
 BACKUP_FILENAME_PATTERN = "backup_"
 
+# Extensões dos formatos de backup
+EXTENSAO_COMPLETO = ".db"
+EXTENSAO_COMPRIMIDO = ".db.gz"
+EXTENSAO_INCREMENTAL = ".inc.gz"
+EXTENSOES_BACKUP = (EXTENSAO_COMPLETO, EXTENSAO_COMPRIMIDO, EXTENSAO_INCREMENTAL)
+
+# Sufixo do arquivo enquanto o backup está sendo copiado
+BACKUP_SUFIXO_PARCIAL = ".parcial"
+
+# Índice dos backups existentes
+MANIFESTO_NOME = "manifesto.json"
+
+# Cabeçalho do formato incremental: assinatura, tamanho da página,
+# total de páginas e tamanho do nome do backup base (seguido do nome)
+INCREMENTAL_ASSINATURA = b"BSINC1\n"
+_INCREMENTAL_CABECALHO = struct.Struct(">IIH")
+_INCREMENTAL_PAGINA = struct.Struct(">I")
+
+# Tamanho dos blocos lidos/escritos ao (des)comprimir
+TAMANHO_BLOCO = 1024 * 1024
+
+# Impede dois backups simultâneos (ex: manual + automático antes de restaurar)
+_lock_backup = threading.Lock()
+
+# Serializa leituras e gravações do manifesto
+_lock_manifesto = threading.Lock()
+
+# Arquivos de lock (fcntl.flock) que estendem os locks acima a todos os
+# workers, e que elegem o worker que executa o backup agendado
+LOCK_BACKUP_NOME = ".backup.lock"
+LOCK_MANIFESTO_NOME = ".manifesto.lock"
+LOCK_AGENDADOR_NOME = ".agendador.lock"
+
 
 @dataclass
 class BackupInfo:
@@ -35,7 +100,10 @@ class BackupInfo:
     data_criacao: datetime
     tamanho_bytes: int
     tamanho_formatado: str
-    tipo: str  # "manual" ou "automático"
+    tipo: str  # "manual", "automático" ou "segurança"
+    formato: str = "completo"  # "completo" ou "incremental"
+    comprimido: bool = False
+    base: Optional[str] = None  # backup completo de origem (incrementais)
 
 
 def _formatar_tamanho(bytes: int) -> str:
@@ -79,7 +147,7 @@ def _validar_nome_arquivo(nome_arquivo: str) -> bool:
         return False
 
     # Verificar extensão
-    if not nome_arquivo.endswith(".db"):
+    if not nome_arquivo.endswith(EXTENSOES_BACKUP):
         logger.warning(f"Extensão de arquivo de backup inválida: {nome_arquivo}")
         return False
 
@@ -93,17 +161,80 @@ def _garantir_diretorio_backup() -> None:
         logger.info(f"Diretório de backups criado: {BACKUP_DIR}")
 
 
+def _abrir_lock_arquivo(nome: str, bloquear: bool = True) -> Optional[BinaryIO]:
+    """
+    Adquire um lock exclusivo entre processos no diretório de backups
+
+    O lock dura enquanto o arquivo retornado estiver aberto. Sem fcntl
+    (Windows), o arquivo é retornado sem lock.
+
+    Args:
+        nome: Nome do arquivo de lock
+        bloquear: Se False, não espera o lock ficar livre
+
+    Returns:
+        Arquivo de lock aberto ou None se outro processo detém o lock
+    """
+    _garantir_diretorio_backup()
+    arquivo = (BACKUP_DIR / nome).open("a+b")
+    if fcntl is None:
+        return arquivo
+    try:
+        fcntl.flock(arquivo, fcntl.LOCK_EX if bloquear else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        arquivo.close()
+        return None
+    return arquivo
+
+
+@contextmanager
+def _travar_manifesto() -> Iterator[None]:
+    """Serializa o acesso ao manifesto entre threads e entre workers"""
+    with _lock_manifesto:
+        arquivo = _abrir_lock_arquivo(LOCK_MANIFESTO_NOME)
+        try:
+            yield
+        finally:
+            if arquivo is not None:
+                arquivo.close()
+
+
 def _detectar_tipo_backup(nome_arquivo: str) -> str:
     """
-    Detecta se um backup é manual ou automático pelo nome
+    Detecta o tipo de um backup pelo nome
 
     Args:
         nome_arquivo: Nome do arquivo de backup
 
     Returns:
-        "automático" se contém "_auto_", "manual" caso contrário
+        "automático" se contém "_auto_", "segurança" se contém "_seguranca_",
+        "manual" caso contrário
     """
-    return "automático" if "_auto_" in nome_arquivo else "manual"
+    if "_auto_" in nome_arquivo:
+        return "automático"
+    if "_seguranca_" in nome_arquivo:
+        return "segurança"
+    return "manual"
+
+
+def _remover_extensao(nome_arquivo: str) -> str:
+    """Remove do nome a extensão de backup (.db, .db.gz ou .inc.gz)"""
+    for extensao in EXTENSOES_BACKUP:
+        if nome_arquivo.endswith(extensao):
+            return nome_arquivo[:-len(extensao)]
+    return nome_arquivo
+
+
+def _detectar_formato_backup(nome_arquivo: str) -> tuple[str, bool]:
+    """
+    Detecta o formato de um backup pela extensão
+
+    Returns:
+        Tupla (formato: "completo" ou "incremental", comprimido: bool)
+    """
+    if nome_arquivo.endswith(EXTENSAO_INCREMENTAL):
+        return "incremental", True
+    return "completo", nome_arquivo.endswith(EXTENSAO_COMPRIMIDO)
 
 
 def _extrair_data_do_nome(nome_arquivo: str) -> Optional[datetime]:
@@ -117,8 +248,13 @@ def _extrair_data_do_nome(nome_arquivo: str) -> Optional[datetime]:
         Objeto datetime ou None se não conseguir extrair
     """
     try:
-        # Remover prefixo "backup_" ou "backup_auto_" e sufixo ".db"
-        data_str = nome_arquivo.replace("backup_auto_", "").replace("backup_", "").replace(".db", "")
+        # Remover prefixo ("backup_", "backup_auto_" ou "backup_seguranca_") e a extensão
+        data_str = (
+            _remover_extensao(nome_arquivo)
+            .replace("backup_auto_", "")
+            .replace("backup_seguranca_", "")
+            .replace("backup_", "")
+        )
         # Converter para datetime
         return datetime.strptime(data_str, "%Y-%m-%d_%H-%M-%S")
     except ValueError:
@@ -188,18 +324,425 @@ def _verificar_database_pos_restauracao() -> bool:
     return valido
 
 
-def criar_backup(automatico: bool = False) -> tuple[bool, str]:
+def _copiar_banco_sqlite(origem: Path, destino: Path) -> None:
+    """
+    Copia o conteúdo de um banco SQLite para outro usando a API de backup do SQLite.
+
+    Diferente de copiar o arquivo, funciona com o banco em modo WAL e com
+    outras conexões abertas no destino.
+
+    Args:
+        origem: Banco de origem
+        destino: Banco de destino (conteúdo é substituído)
+    """
+    conn_origem = sqlite3.connect(str(origem))
+    conn_destino = sqlite3.connect(str(destino))
+    try:
+        conn_origem.backup(conn_destino)
+    finally:
+        conn_destino.close()
+        conn_origem.close()
+
+
+def _copiar_banco_online(
+    origem: Path,
+    destino: Path,
+    paginas_por_passo: int,
+    pausa_segundos: float,
+    progresso: Optional[Callable[[int, int], None]] = None,
+) -> None:
+    """
+    Copia o banco em uso para um arquivo novo usando a API de backup em passos.
+
+    A cada passo são copiadas `paginas_por_passo` páginas e o lock de leitura
+    é liberado durante a pausa, permitindo que as requisições continuem
+    escrevendo. Se o banco for alterado por outra conexão no meio da cópia,
+    o SQLite reinicia o backup no passo seguinte, garantindo um snapshot
+    consistente. O conteúdo do WAL é incluído, dispensando checkpoint.
+
+    A cópia é feita em um arquivo temporário renomeado ao final, de modo que
+    um backup interrompido nunca aparece na listagem.
+
+    Args:
+        origem: Banco de origem (pode estar em uso)
+        destino: Caminho final do arquivo de backup
+        paginas_por_passo: Páginas copiadas por passo (-1 ou 0 copia tudo de uma vez)
+        pausa_segundos: Pausa entre os passos
+        progresso: Callback opcional chamado com (paginas_copiadas, total_paginas)
+    """
+    caminho_parcial = destino.with_name(destino.name + BACKUP_SUFIXO_PARCIAL)
+    ultimo_percentual = [-1]
+
+    def _ao_progredir(status: int, restantes: int, total: int) -> None:
+        copiadas = total - restantes
+        if progresso:
+            progresso(copiadas, total)
+        percentual = (copiadas * 100 // total) if total else 100
+        # Registrar no log apenas a cada 10% para não poluir
+        if percentual // 10 != ultimo_percentual[0] // 10:
+            ultimo_percentual[0] = percentual
+            logger.debug(f"Backup {destino.name}: {copiadas}/{total} páginas ({percentual}%)")
+
+    conn_origem = sqlite3.connect(str(origem))
+    try:
+        conn_destino = sqlite3.connect(str(caminho_parcial))
+        try:
+            conn_origem.backup(
+                conn_destino,
+                pages=paginas_por_passo if paginas_por_passo > 0 else -1,
+                progress=_ao_progredir,
+                sleep=pausa_segundos,
+            )
+        finally:
+            conn_destino.close()
+        caminho_parcial.replace(destino)
+    except BaseException:
+        caminho_parcial.unlink(missing_ok=True)
+        raise
+    finally:
+        conn_origem.close()
+
+
+def _abrir_backup_completo(caminho: Path) -> BinaryIO:
+    """Abre um backup completo para leitura sequencial (descomprimindo se necessário)"""
+    if caminho.name.endswith(EXTENSAO_COMPRIMIDO):
+        return gzip.open(caminho, "rb")
+    return open(caminho, "rb")
+
+
+def _comprimir_arquivo(origem: Path, destino: Path) -> None:
+    """Comprime um arquivo com gzip em blocos, sem carregá-lo inteiro na memória"""
+    caminho_parcial = destino.with_name(destino.name + BACKUP_SUFIXO_PARCIAL)
+    try:
+        with open(origem, "rb") as arquivo_origem, gzip.open(caminho_parcial, "wb") as arquivo_destino:
+            shutil.copyfileobj(arquivo_origem, arquivo_destino, TAMANHO_BLOCO)
+        caminho_parcial.replace(destino)
+    except BaseException:
+        caminho_parcial.unlink(missing_ok=True)
+        raise
+
+
+def _ler_tamanho_pagina(caminho: Path) -> int:
+    """Lê o tamanho de página do cabeçalho de um arquivo SQLite"""
+    with open(caminho, "rb") as arquivo:
+        cabecalho = arquivo.read(100)
+    if len(cabecalho) < 100 or not cabecalho.startswith(b"SQLite format 3\x00"):
+        raise ValueError(f"Arquivo não é um banco SQLite: {caminho.name}")
+    tamanho = int.from_bytes(cabecalho[16:18], "big")
+    # O valor 1 representa páginas de 65536 bytes
+    return 65536 if tamanho == 1 else tamanho
+
+
+def _ler_cabecalho_incremental(arquivo: BinaryIO) -> tuple[int, int, str]:
+    """
+    Lê o cabeçalho de um backup incremental já aberto
+
+    Returns:
+        Tupla (tamanho_pagina, total_paginas, nome_base)
+    """
+    if arquivo.read(len(INCREMENTAL_ASSINATURA)) != INCREMENTAL_ASSINATURA:
+        raise ValueError("Arquivo não é um backup incremental válido")
+    dados = arquivo.read(_INCREMENTAL_CABECALHO.size)
+    if len(dados) != _INCREMENTAL_CABECALHO.size:
+        raise ValueError("Cabeçalho de backup incremental truncado")
+    tamanho_pagina, total_paginas, tamanho_nome = _INCREMENTAL_CABECALHO.unpack(dados)
+    nome_base = arquivo.read(tamanho_nome).decode("utf-8")
+    return tamanho_pagina, total_paginas, nome_base
+
+
+def _gerar_incremental(snapshot: Path, base: Path, destino: Path) -> int:
+    """
+    Gera um backup incremental com as páginas de `snapshot` diferentes de `base`
+
+    Os dois arquivos são percorridos página a página, sem carregá-los na memória.
+
+    Args:
+        snapshot: Cópia consistente do banco atual (não comprimida)
+        base: Backup completo de referência (comprimido ou não)
+        destino: Caminho do arquivo incremental
+
+    Returns:
+        Quantidade de páginas gravadas no incremental
+
+    Raises:
+        ValueError: Se o tamanho de página do snapshot e da base forem diferentes
+    """
+    tamanho_pagina = _ler_tamanho_pagina(snapshot)
+    total_paginas = snapshot.stat().st_size // tamanho_pagina
+    nome_base = base.name.encode("utf-8")
+    caminho_parcial = destino.with_name(destino.name + BACKUP_SUFIXO_PARCIAL)
+    paginas_alteradas = 0
+
+    try:
+        with open(snapshot, "rb") as arquivo_snapshot, \
+                _abrir_backup_completo(base) as arquivo_base, \
+                gzip.open(caminho_parcial, "wb") as arquivo_destino:
+            arquivo_destino.write(INCREMENTAL_ASSINATURA)
+            arquivo_destino.write(_INCREMENTAL_CABECALHO.pack(tamanho_pagina, total_paginas, len(nome_base)))
+            arquivo_destino.write(nome_base)
+
+            for numero in range(1, total_paginas + 1):
+                pagina = arquivo_snapshot.read(tamanho_pagina)
+                pagina_base = arquivo_base.read(tamanho_pagina)
+
+                if numero == 1:
+                    tamanho_base = int.from_bytes(pagina_base[16:18], "big")
+                    if (65536 if tamanho_base == 1 else tamanho_base) != tamanho_pagina:
+                        raise ValueError("Tamanho de página diferente do backup base")
+
+                if pagina != pagina_base:
+                    arquivo_destino.write(_INCREMENTAL_PAGINA.pack(numero))
+                    arquivo_destino.write(pagina)
+                    paginas_alteradas += 1
+
+            # Página 0 marca o fim do arquivo
+            arquivo_destino.write(_INCREMENTAL_PAGINA.pack(0))
+
+        caminho_parcial.replace(destino)
+        return paginas_alteradas
+    except BaseException:
+        caminho_parcial.unlink(missing_ok=True)
+        raise
+
+
+def _aplicar_incremental(caminho: Path, destino: Path) -> None:
+    """
+    Reconstrói em `destino` o banco completo de um backup incremental
+
+    Descomprime o backup base para o destino e sobrescreve as páginas
+    alteradas, lendo ambos os arquivos em fluxo.
+
+    Raises:
+        FileNotFoundError: Se o backup base não existir mais
+        ValueError: Se o arquivo incremental estiver corrompido
+    """
+    with gzip.open(caminho, "rb") as arquivo_incremental:
+        tamanho_pagina, total_paginas, nome_base = _ler_cabecalho_incremental(arquivo_incremental)
+
+        caminho_base = BACKUP_DIR / nome_base
+        if not _validar_nome_arquivo(nome_base) or not caminho_base.exists():
+            raise FileNotFoundError(f"Backup base não encontrado: {nome_base}")
+
+        with _abrir_backup_completo(caminho_base) as arquivo_base, open(destino, "wb") as arquivo_destino:
+            shutil.copyfileobj(arquivo_base, arquivo_destino, TAMANHO_BLOCO)
+
+        with open(destino, "r+b") as arquivo_destino:
+            while True:
+                dados = arquivo_incremental.read(_INCREMENTAL_PAGINA.size)
+                if len(dados) != _INCREMENTAL_PAGINA.size:
+                    raise ValueError("Backup incremental truncado")
+                numero = _INCREMENTAL_PAGINA.unpack(dados)[0]
+                if numero == 0:
+                    break
+                pagina = arquivo_incremental.read(tamanho_pagina)
+                if len(pagina) != tamanho_pagina or numero > total_paginas:
+                    raise ValueError("Backup incremental corrompido")
+                arquivo_destino.seek((numero - 1) * tamanho_pagina)
+                arquivo_destino.write(pagina)
+            arquivo_destino.truncate(total_paginas * tamanho_pagina)
+
+
+@contextmanager
+def _materializar_backup(caminho: Path) -> Iterator[Path]:
+    """
+    Fornece um arquivo SQLite pronto para uso a partir de qualquer formato de backup
+
+    Backups completos sem compressão são usados diretamente; os demais são
+    reconstruídos em um arquivo temporário, removido ao sair do bloco.
+    """
+    formato, comprimido = _detectar_formato_backup(caminho.name)
+    if not comprimido:
+        yield caminho
+        return
+
+    caminho_temporario = caminho.with_name(caminho.name + ".restaurando")
+    try:
+        if formato == "incremental":
+            _aplicar_incremental(caminho, caminho_temporario)
+        else:
+            with gzip.open(caminho, "rb") as origem, open(caminho_temporario, "wb") as destino:
+                shutil.copyfileobj(origem, destino, TAMANHO_BLOCO)
+        yield caminho_temporario
+    finally:
+        caminho_temporario.unlink(missing_ok=True)
+
+
+def _criar_backup_info(caminho: Path, base: Optional[str] = None) -> BackupInfo:
+    """Monta o BackupInfo de um arquivo de backup existente"""
+    stat = caminho.stat()
+    data_criacao = _extrair_data_do_nome(caminho.name)
+
+    # Se não conseguiu extrair data do nome, usar data de modificação do arquivo
+    if data_criacao is None:
+        data_criacao = datetime.fromtimestamp(stat.st_mtime)
+
+    formato, comprimido = _detectar_formato_backup(caminho.name)
+    if formato == "incremental" and base is None:
+        with gzip.open(caminho, "rb") as arquivo:
+            _, _, base = _ler_cabecalho_incremental(arquivo)
+
+    return BackupInfo(
+        nome_arquivo=caminho.name,
+        caminho_completo=str(caminho),
+        data_criacao=data_criacao,
+        tamanho_bytes=stat.st_size,
+        tamanho_formatado=_formatar_tamanho(stat.st_size),
+        tipo=_detectar_tipo_backup(caminho.name),
+        formato=formato,
+        comprimido=comprimido,
+        base=base,
+    )
+
+
+def _escanear_backups() -> List[BackupInfo]:
+    """Lista os backups inspecionando cada arquivo do diretório"""
+    backups = []
+    for arquivo in BACKUP_DIR.glob("backup_*"):
+        if not arquivo.name.endswith(EXTENSOES_BACKUP):
+            continue
+        try:
+            backups.append(_criar_backup_info(arquivo))
+        except (OSError, ValueError, EOFError) as e:
+            logger.warning(f"Erro ao processar arquivo de backup {arquivo.name}: {str(e)}")
+            continue
+    return backups
+
+
+def _ler_manifesto() -> Optional[List[BackupInfo]]:
+    """
+    Lê o manifesto de backups
+
+    Returns:
+        Lista de BackupInfo ou None se o manifesto não existir ou estiver inválido
+    """
+    caminho = BACKUP_DIR / MANIFESTO_NOME
+    if not caminho.exists():
+        return None
+    try:
+        dados = json.loads(caminho.read_text(encoding="utf-8"))
+        backups = []
+        for item in dados["backups"]:
+            item["data_criacao"] = datetime.fromisoformat(item["data_criacao"])
+            item["caminho_completo"] = str(BACKUP_DIR / item["nome_arquivo"])
+            backups.append(BackupInfo(**item))
+        return backups
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Manifesto de backups inválido, será reconstruído: {e}")
+        return None
+
+
+def _salvar_manifesto(backups: List[BackupInfo]) -> None:
+    """Grava o manifesto de forma atômica (arquivo temporário + rename)"""
+    caminho = BACKUP_DIR / MANIFESTO_NOME
+    caminho_parcial = caminho.with_name(caminho.name + BACKUP_SUFIXO_PARCIAL)
+    itens = []
+    for backup in backups:
+        item = asdict(backup)
+        item.pop("caminho_completo")
+        item["data_criacao"] = backup.data_criacao.isoformat()
+        itens.append(item)
+    caminho_parcial.write_text(
+        json.dumps({"versao": 1, "backups": itens}, ensure_ascii=False, indent=2),
+        encoding="utf-8",
+    )
+    caminho_parcial.replace(caminho)
+
+
+def _carregar_backups() -> List[BackupInfo]:
+    """Retorna os backups do manifesto, reconstruindo-o se necessário (chamar com _travar_manifesto)"""
+    backups = _ler_manifesto()
+    if backups is None:
+        backups = _escanear_backups()
+        _salvar_manifesto(backups)
+    return backups
+
+
+def _registrar_no_manifesto(info: BackupInfo) -> None:
+    """Adiciona (ou substitui) um backup no manifesto"""
+    with _travar_manifesto():
+        backups = [b for b in _carregar_backups() if b.nome_arquivo != info.nome_arquivo]
+        backups.append(info)
+        _salvar_manifesto(backups)
+
+
+def _remover_do_manifesto(nome_arquivo: str) -> None:
+    """Remove um backup do manifesto"""
+    with _travar_manifesto():
+        backups = _carregar_backups()
+        _salvar_manifesto([b for b in backups if b.nome_arquivo != nome_arquivo])
+
+
+def _obter_ultimo_completo() -> Optional[Path]:
+    """Retorna o backup completo mais recente, base para novos incrementais"""
+    with _travar_manifesto():
+        backups = _carregar_backups()
+    completos = [b for b in backups if b.formato == "completo"]
+    for backup in sorted(completos, key=lambda b: b.data_criacao, reverse=True):
+        caminho = BACKUP_DIR / backup.nome_arquivo
+        if caminho.exists():
+            return caminho
+    return None
+
+
+def reconstruir_manifesto() -> int:
+    """
+    Reconstrói o manifesto inspecionando os arquivos do diretório de backups
+
+    Útil quando arquivos são copiados ou removidos manualmente.
+
+    Returns:
+        Quantidade de backups encontrados
+    """
+    _garantir_diretorio_backup()
+    with _travar_manifesto():
+        backups = _escanear_backups()
+        _salvar_manifesto(backups)
+    logger.info(f"Manifesto de backups reconstruído: {len(backups)} backup(s)")
+    return len(backups)
+
+
+def _criar_backup(
+    automatico: bool = False,
+    progresso: Optional[Callable[[int, int], None]] = None,
+    incremental: bool = False,
+    seguranca: bool = False,
+) -> tuple[bool, str, Optional[BackupInfo]]:
     """
     Cria um novo backup do banco de dados
 
+    O backup é feito com o banco em uso, em passos de BACKUP_PAGINAS_POR_PASSO
+    páginas (ver _copiar_banco_online). A função é bloqueante: em rotas
+    assíncronas, execute-a em thread separada (asyncio.to_thread).
+
+    Backups completos são comprimidos quando BACKUP_COMPRIMIR está ativo.
+    Um backup incremental guarda apenas as páginas alteradas desde o último
+    backup completo; sem backup completo disponível, é criado um completo.
+
     Args:
         automatico: Se True, cria backup automático (prefixo "backup_auto_"),
                    se False, cria backup manual (prefixo "backup_")
+        progresso: Callback opcional chamado com (paginas_copiadas, total_paginas)
+        incremental: Se True, grava apenas as páginas alteradas desde o último completo
+        seguranca: Se True, cria backup de segurança (prefixo "backup_seguranca_"),
+                   que a retenção dos backups automáticos não remove
 
     Returns:
-        Tupla (sucesso: bool, mensagem: str)
+        Tupla (sucesso: bool, mensagem: str, info: BackupInfo do backup criado ou None)
     """
+    mensagem_em_andamento = "Já existe um backup em andamento. Aguarde a conclusão."
+    if not _lock_backup.acquire(blocking=False):
+        logger.warning(mensagem_em_andamento)
+        return False, mensagem_em_andamento, None
+
+    caminho_snapshot = None
+    lock_arquivo = None
     try:
+        # Outro worker pode estar fazendo backup
+        lock_arquivo = _abrir_lock_arquivo(LOCK_BACKUP_NOME, bloquear=False)
+        if lock_arquivo is None:
+            logger.warning(mensagem_em_andamento)
+            return False, mensagem_em_andamento, None
+
         # Garantir que o diretório de backups existe
         _garantir_diretorio_backup()
 
@@ -208,36 +751,105 @@ def criar_backup(automatico: bool = False) -> tuple[bool, str]:
         if not db_path.exists():
             mensagem = f"Banco de dados não encontrado: {DATABASE_PATH}"
             logger.error(mensagem)
-            return False, mensagem
+            return False, mensagem, None
 
         # Gerar nome do arquivo de backup com timestamp
-        formato = BACKUP_AUTO_FILENAME_FORMAT if automatico else BACKUP_FILENAME_FORMAT
-        nome_backup = agora().strftime(formato)
-        caminho_backup = BACKUP_DIR / nome_backup
-
-        # Copiar arquivo do banco de dados
-        shutil.copy2(db_path, caminho_backup)
+        if seguranca:
+            formato = BACKUP_SEGURANCA_FILENAME_FORMAT
+        elif automatico:
+            formato = BACKUP_AUTO_FILENAME_FORMAT
+        else:
+            formato = BACKUP_FILENAME_FORMAT
+        nome_completo = agora().strftime(formato)
+        caminho_base = _obter_ultimo_completo() if incremental else None
 
-        # Obter tamanho do backup
-        tamanho = caminho_backup.stat().st_size
-        tamanho_formatado = _formatar_tamanho(tamanho)
+        if incremental and caminho_base is None:
+            logger.info("Nenhum backup completo disponível; criando backup completo")
 
-        tipo = "automático" if automatico else "manual"
-        mensagem = f"Backup {tipo} criado com sucesso: {nome_backup} ({tamanho_formatado})"
-        logger.info(mensagem)
+        if caminho_base is not None:
+            nome_backup = _remover_extensao(nome_completo) + EXTENSAO_INCREMENTAL
+        elif BACKUP_COMPRIMIR:
+            nome_backup = _remover_extensao(nome_completo) + EXTENSAO_COMPRIMIDO
+        else:
+            nome_backup = nome_completo
+        caminho_backup = BACKUP_DIR / nome_backup
 
-        return True, mensagem
+        # Copiar o banco em uso, em passos, sem bloquear as requisições.
+        # Para os formatos comprimidos, a cópia é um snapshot temporário.
+        inicio = time.monotonic()
+        if nome_backup == nome_completo:
+            caminho_snapshot = None
+            _copiar_banco_online(db_path, caminho_backup, BACKUP_PAGINAS_POR_PASSO, BACKUP_PAUSA_SEGUNDOS, progresso)
+        else:
+            caminho_snapshot = BACKUP_DIR / (nome_backup + ".snapshot")
+            _copiar_banco_online(db_path, caminho_snapshot, BACKUP_PAGINAS_POR_PASSO, BACKUP_PAUSA_SEGUNDOS, progresso)
 
-    except OSError as e:
+        detalhe = ""
+        base = None
+        if caminho_snapshot is not None and caminho_base is not None:
+            try:
+                paginas = _gerar_incremental(caminho_snapshot, caminho_base, caminho_backup)
+                base = caminho_base.name
+                detalhe = f", {paginas} página(s) alterada(s) desde {base}"
+            except ValueError as e:
+                logger.warning(f"Não foi possível gerar backup incremental ({e}); criando backup completo")
+                nome_backup = _remover_extensao(nome_completo) + EXTENSAO_COMPRIMIDO
+                caminho_backup = BACKUP_DIR / nome_backup
+                _comprimir_arquivo(caminho_snapshot, caminho_backup)
+        elif caminho_snapshot is not None:
+            _comprimir_arquivo(caminho_snapshot, caminho_backup)
+        duracao = time.monotonic() - inicio
+
+        info = _criar_backup_info(caminho_backup, base=base)
+        _registrar_no_manifesto(info)
+
+        tipo = "de segurança" if seguranca else "automático" if automatico else "manual"
+        descricao = f"{tipo} incremental" if info.formato == "incremental" else tipo
+        mensagem = f"Backup {descricao} criado com sucesso: {nome_backup} ({info.tamanho_formatado}{detalhe})"
+        logger.info(f"{mensagem} em {duracao:.1f}s")
+
+        return True, mensagem, info
+
+    except (OSError, sqlite3.Error, ValueError) as e:
         mensagem = f"Erro ao criar backup: {str(e)}"
         logger.error(mensagem)
-        return False, mensagem
+        return False, mensagem, None
+
+    finally:
+        if caminho_snapshot is not None:
+            caminho_snapshot.unlink(missing_ok=True)
+        if lock_arquivo is not None:
+            lock_arquivo.close()
+        _lock_backup.release()
+
+
+def criar_backup(
+    automatico: bool = False,
+    progresso: Optional[Callable[[int, int], None]] = None,
+    incremental: bool = False,
+) -> tuple[bool, str]:
+    """
+    Cria um novo backup do banco de dados (ver _criar_backup)
+
+    Args:
+        automatico: Se True, cria backup automático (prefixo "backup_auto_")
+        progresso: Callback opcional chamado com (paginas_copiadas, total_paginas)
+        incremental: Se True, grava apenas as páginas alteradas desde o último completo
+
+    Returns:
+        Tupla (sucesso: bool, mensagem: str)
+    """
+    sucesso, mensagem, _ = _criar_backup(automatico, progresso, incremental)
+    return sucesso, mensagem
 
 
 def listar_backups() -> List[BackupInfo]:
     """
     Lista todos os backups disponíveis
 
+    Os dados vêm do manifesto (uma única leitura de arquivo); se ele não
+    existir, é reconstruído a partir dos arquivos do diretório.
+
     Returns:
         Lista de objetos BackupInfo ordenados por data (mais recente primeiro)
     """
@@ -245,34 +857,8 @@ def listar_backups() -> List[BackupInfo]:
         # Garantir que o diretório existe
         _garantir_diretorio_backup()
 
-        backups = []
-
-        # Listar todos os arquivos .db no diretório de backups
-        for arquivo in BACKUP_DIR.glob("backup_*.db"):
-            try:
-                # Obter informações do arquivo
-                stat = arquivo.stat()
-                tamanho = stat.st_size
-                data_criacao = _extrair_data_do_nome(arquivo.name)
-
-                # Se não conseguiu extrair data do nome, usar data de modificação do arquivo
-                if data_criacao is None:
-                    data_criacao = datetime.fromtimestamp(stat.st_mtime)
-
-                # Detectar tipo do backup
-                tipo = _detectar_tipo_backup(arquivo.name)
-
-                backups.append(BackupInfo(
-                    nome_arquivo=arquivo.name,
-                    caminho_completo=str(arquivo),
-                    data_criacao=data_criacao,
-                    tamanho_bytes=tamanho,
-                    tamanho_formatado=_formatar_tamanho(tamanho),
-                    tipo=tipo
-                ))
-            except OSError as e:
-                logger.warning(f"Erro ao processar arquivo de backup {arquivo.name}: {str(e)}")
-                continue
+        with _travar_manifesto():
+            backups = _carregar_backups()
 
         # Ordenar por data (mais recente primeiro)
         backups.sort(key=lambda x: x.data_criacao, reverse=True)
@@ -290,8 +876,11 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
     Restaura um backup do banco de dados com validação de integridade
 
     IMPORTANTE: Esta operação sobrescreve o banco de dados atual!
-    Por padrão, cria um backup automático antes de restaurar e valida
-    a integridade do backup antes de aplicar.
+    Por padrão, cria um backup de segurança (prefixo "backup_seguranca_")
+    antes de restaurar e valida a integridade do backup antes de aplicar.
+
+    Backups comprimidos e incrementais são reconstruídos em fluxo para um
+    arquivo temporário (ver _materializar_backup) antes da validação.
 
     Args:
         nome_arquivo: Nome do arquivo de backup a restaurar
@@ -316,34 +905,35 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
             logger.error(mensagem)
             return False, mensagem, None
 
-        # VALIDAÇÃO DE INTEGRIDADE: Verificar se backup está íntegro
-        logger.info(f"Validando integridade do backup: {nome_arquivo}")
-        valido, msg_validacao = _validar_integridade_backup(caminho_backup)
-        if not valido:
-            mensagem = f"Backup corrompido ou inválido! {msg_validacao}. Restauração abortada."
-            logger.error(mensagem)
-            return False, mensagem, None
+        with _materializar_backup(caminho_backup) as caminho_restauracao:
+            # VALIDAÇÃO DE INTEGRIDADE: Verificar se backup está íntegro
+            logger.info(f"Validando integridade do backup: {nome_arquivo}")
+            valido, msg_validacao = _validar_integridade_backup(caminho_restauracao)
+            if not valido:
+                mensagem = f"Backup corrompido ou inválido! {msg_validacao}. Restauração abortada."
+                logger.error(mensagem)
+                return False, mensagem, None
 
-        logger.info(f"Validação de integridade OK: {nome_arquivo}")
-
-        # Criar backup de segurança do estado atual antes de restaurar
-        nome_backup_automatico = None
-        if criar_backup_antes:
-            sucesso, msg = criar_backup(automatico=True)
-            if sucesso:
-                # Obter o último backup criado (que acabamos de criar)
-                backups = listar_backups()
-                if backups and backups[0].tipo == "automático":
-                    nome_backup_automatico = backups[0].nome_arquivo
+            logger.info(f"Validação de integridade OK: {nome_arquivo}")
+
+            # Criar backup de segurança do estado atual antes de restaurar
+            nome_backup_automatico = None
+            if criar_backup_antes:
+                sucesso, msg, info_seguranca = _criar_backup(seguranca=True)
+                if sucesso and info_seguranca:
+                    nome_backup_automatico = info_seguranca.nome_arquivo
                     caminho_backup_seguranca = BACKUP_DIR / nome_backup_automatico
                     logger.info(f"Backup de segurança criado: {nome_backup_automatico}")
-            else:
-                logger.warning(f"Falha ao criar backup de segurança: {msg}")
-                # Continua mesmo se falhar o backup automático
+                else:
+                    logger.warning(f"Falha ao criar backup de segurança: {msg}")
+                    # Continua mesmo se falhar o backup automático
 
-        # Restaurar backup (copiar sobre o arquivo atual)
-        db_path = Path(DATABASE_PATH)
-        shutil.copy2(caminho_backup, db_path)
+            # Restaurar backup (substituir conteúdo do banco atual)
+            db_path = Path(DATABASE_PATH)
+            _copiar_banco_sqlite(caminho_restauracao, db_path)
+
+        # Descartar conexões ociosas do pool (estado do banco anterior)
+        fechar_pool()
 
         # VALIDAÇÃO PÓS-RESTAURAÇÃO: Verificar se banco restaurado está válido
         logger.info("Verificando integridade do banco após restauração...")
@@ -352,7 +942,9 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
             logger.error("Banco corrompido após restauração! Executando rollback...")
 
             if caminho_backup_seguranca and caminho_backup_seguranca.exists():
-                shutil.copy2(caminho_backup_seguranca, db_path)
+                with _materializar_backup(caminho_backup_seguranca) as caminho_seguranca:
+                    _copiar_banco_sqlite(caminho_seguranca, db_path)
+                fechar_pool()
                 mensagem = (
                     f"Restauração falhou! Banco revertido para estado anterior. "
                     f"Backup '{nome_arquivo}' pode estar corrompido."
@@ -372,7 +964,7 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
 
         return True, mensagem, nome_backup_automatico
 
-    except OSError as e:
+    except (OSError, sqlite3.Error, ValueError, EOFError) as e:
         mensagem = f"Erro ao restaurar backup: {str(e)}"
         logger.error(mensagem)
 
@@ -380,10 +972,12 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
         if caminho_backup_seguranca and caminho_backup_seguranca.exists():
             try:
                 db_path = Path(DATABASE_PATH)
-                shutil.copy2(caminho_backup_seguranca, db_path)
+                with _materializar_backup(caminho_backup_seguranca) as caminho_seguranca:
+                    _copiar_banco_sqlite(caminho_seguranca, db_path)
+                fechar_pool()
                 logger.info("Rollback executado com sucesso após exceção")
                 mensagem += " (Banco revertido para estado anterior)"
-            except OSError as rollback_error:
+            except (OSError, sqlite3.Error, ValueError, EOFError) as rollback_error:
                 logger.critical(f"Falha no rollback: {rollback_error}")
                 mensagem += " (CRÍTICO: Falha no rollback!)"
 
@@ -394,6 +988,9 @@ def excluir_backup(nome_arquivo: str) -> tuple[bool, str]:
     """
     Exclui um arquivo de backup
 
+    Backups completos que servem de base para incrementais não podem ser
+    excluídos enquanto os incrementais existirem.
+
     Args:
         nome_arquivo: Nome do arquivo de backup a excluir
 
@@ -414,8 +1011,21 @@ def excluir_backup(nome_arquivo: str) -> tuple[bool, str]:
             logger.error(mensagem)
             return False, mensagem
 
+        # Verificar se há incrementais dependentes
+        with _travar_manifesto():
+            backups = _carregar_backups()
+        dependentes = [b.nome_arquivo for b in backups if b.base == nome_arquivo]
+        if dependentes:
+            mensagem = (
+                f"Backup {nome_arquivo} é base de {len(dependentes)} backup(s) incremental(is). "
+                "Exclua-os primeiro."
+            )
+            logger.warning(mensagem)
+            return False, mensagem
+
         # Excluir arquivo
         caminho_backup.unlink()
+        _remover_do_manifesto(nome_arquivo)
 
         mensagem = f"Backup excluído com sucesso: {nome_arquivo}"
         logger.info(mensagem)
@@ -448,27 +1058,9 @@ def obter_info_backup(nome_arquivo: str) -> Optional[BackupInfo]:
         if not caminho_backup.exists():
             return None
 
-        # Obter informações do arquivo
-        stat = caminho_backup.stat()
-        tamanho = stat.st_size
-        data_criacao = _extrair_data_do_nome(nome_arquivo)
-
-        if data_criacao is None:
-            data_criacao = datetime.fromtimestamp(stat.st_mtime)
-
-        # Detectar tipo do backup
-        tipo = _detectar_tipo_backup(nome_arquivo)
-
-        return BackupInfo(
-            nome_arquivo=nome_arquivo,
-            caminho_completo=str(caminho_backup),
-            data_criacao=data_criacao,
-            tamanho_bytes=tamanho,
-            tamanho_formatado=_formatar_tamanho(tamanho),
-            tipo=tipo
-        )
+        return _criar_backup_info(caminho_backup)
 
-    except OSError as e:
+    except (OSError, ValueError, EOFError) as e:
         logger.error(f"Erro ao obter informações do backup {nome_arquivo}: {str(e)}")
         return None
 
@@ -492,3 +1084,172 @@ def obter_caminho_backup(nome_arquivo: str) -> Optional[Path]:
         return None
 
     return caminho
+
+
+# Resultado das execuções do backup agendado (exposto em /health/detalhes)
+_estatisticas_agendamento: Dict[str, Any] = {
+    "ultima_execucao": None,
+    "sucesso": None,
+    "mensagem": None,
+    "duracao_segundos": None,
+    "tamanho_bytes": None,
+    "backups_removidos": 0,
+    "proxima_execucao": None,
+}
+
+
+def aplicar_retencao(diarios: int, semanais: int) -> List[str]:
+    """
+    Remove backups automáticos fora da política de retenção
+
+    Mantém o backup automático mais recente de cada um dos últimos `diarios`
+    dias e de cada uma das últimas `semanais` semanas (ISO) que possuem
+    backups, além dos backups completos usados como base pelos mantidos.
+    Backups manuais e de segurança (criados antes de restaurações) nunca
+    são removidos.
+
+    Args:
+        diarios: Quantidade de dias com backup a manter
+        semanais: Quantidade de semanas com backup a manter
+
+    Returns:
+        Nomes dos backups removidos
+    """
+    with _travar_manifesto():
+        backups = _carregar_backups()
+
+    automaticos = sorted(
+        (b for b in backups if b.tipo == "automático"),
+        key=lambda b: b.data_criacao,
+        reverse=True,
+    )
+
+    manter = set()
+    dias_vistos = []
+    semanas_vistas = []
+    for backup in automaticos:
+        dia = backup.data_criacao.date()
+        semana = backup.data_criacao.isocalendar()[:2]
+        if dia not in dias_vistos and len(dias_vistos) < diarios:
+            dias_vistos.append(dia)
+            manter.add(backup.nome_arquivo)
+        if semana not in semanas_vistas and len(semanas_vistas) < semanais:
+            semanas_vistas.append(semana)
+            manter.add(backup.nome_arquivo)
+
+    # Incrementais mantidos dependem do seu backup completo
+    manter.update(b.base for b in automaticos if b.nome_arquivo in manter and b.base)
+
+    # Incrementais primeiro, para que suas bases possam ser excluídas em seguida
+    remover = [b for b in automaticos if b.nome_arquivo not in manter]
+    remover.sort(key=lambda b: b.formato != "incremental")
+
+    removidos = []
+    for backup in remover:
+        sucesso, mensagem = excluir_backup(backup.nome_arquivo)
+        if sucesso:
+            removidos.append(backup.nome_arquivo)
+        else:
+            logger.warning(f"Retenção: backup {backup.nome_arquivo} mantido ({mensagem})")
+
+    if removidos:
+        logger.info(f"Retenção de backups: {len(removidos)} backup(s) removido(s)")
+    return removidos
+
+
+def calcular_proxima_execucao_backup(referencia: datetime, horario: str, intervalo_horas: int) -> datetime:
+    """
+    Calcula o próximo horário de backup agendado
+
+    As execuções acontecem em `horario` (HH:MM) e a cada `intervalo_horas`
+    a partir dele, como em "0 3/6 * * *" no cron.
+
+    Args:
+        referencia: Momento atual (com timezone)
+        horario: Horário de referência no formato HH:MM
+        intervalo_horas: Intervalo entre execuções
+
+    Returns:
+        Próximo datetime de execução, sempre posterior a `referencia`
+
+    Raises:
+        ValueError: Se o horário for inválido
+    """
+    hora, minuto = (int(parte) for parte in horario.split(":"))
+    ancora = referencia.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+    intervalo = timedelta(hours=intervalo_horas)
+    passos = (referencia - ancora) // intervalo + 1
+    return ancora + passos * intervalo
+
+
+def _deve_criar_incremental() -> bool:
+    """Incrementais só são criados sobre um backup completo da semana atual"""
+    if not BACKUP_AUTOMATICO_INCREMENTAL:
+        return False
+    ultimo_completo = _obter_ultimo_completo()
+    if ultimo_completo is None:
+        return False
+    data_completo = _extrair_data_do_nome(ultimo_completo.name)
+    return data_completo is not None and data_completo.isocalendar()[:2] == agora().isocalendar()[:2]
+
+
+def _executar_backup_agendado() -> None:
+    """Cria o backup automático, aplica a retenção e atualiza as estatísticas"""
+    inicio = time.monotonic()
+    sucesso, mensagem, info = _criar_backup(automatico=True, incremental=_deve_criar_incremental())
+    removidos = aplicar_retencao(BACKUP_RETENCAO_DIARIOS, BACKUP_RETENCAO_SEMANAIS) if sucesso else []
+
+    _estatisticas_agendamento.update({
+        "ultima_execucao": agora().isoformat(),
+        "sucesso": sucesso,
+        "mensagem": mensagem,
+        "duracao_segundos": round(time.monotonic() - inicio, 3),
+        "tamanho_bytes": info.tamanho_bytes if info else None,
+        "backups_removidos": len(removidos),
+    })
+
+
+def obter_estatisticas_backup_agendado() -> dict:
+    """Retorna o resultado da última execução do backup agendado"""
+    return dict(_estatisticas_agendamento)
+
+
+async def tarefa_backup_agendado(horario: str, intervalo_horas: int) -> None:
+    """
+    Tarefa assíncrona que cria backups automáticos nos horários agendados.
+
+    O backup e a retenção rodam em thread separada para não bloquear o event
+    loop. Cada worker inicia a tarefa, mas só o que detém o lock do
+    agendador executa os backups; se ele encerrar, outro assume na execução
+    seguinte. Deve ser iniciada no startup da aplicação (lifespan) e
+    cancelada no shutdown.
+
+    Args:
+        horario: Horário de referência (HH:MM), de preferência fora do pico
+        intervalo_horas: Intervalo entre backups
+    """
+    try:
+        calcular_proxima_execucao_backup(agora(), horario, intervalo_horas)
+    except ValueError:
+        logger.error(f"Horário de backup agendado inválido: '{horario}' (use HH:MM). Agendamento desativado.")
+        return
+
+    lock_agendador = None
+    try:
+        while True:
+            proxima = calcular_proxima_execucao_backup(agora(), horario, intervalo_horas)
+            _estatisticas_agendamento["proxima_execucao"] = proxima.isoformat()
+            await asyncio.sleep(max(0.0, (proxima - agora()).total_seconds()))
+            try:
+                if lock_agendador is None:
+                    lock_agendador = _abrir_lock_arquivo(LOCK_AGENDADOR_NOME, bloquear=False)
+                if lock_agendador is None:
+                    logger.debug("Backup agendado executado por outro worker")
+                    continue
+                await asyncio.to_thread(_executar_backup_agendado)
+            except Exception as e:
+                # Um erro inesperado não pode encerrar o agendamento
+                logger.error(f"Erro no backup agendado: {e}")
+    finally:
+        if lock_agendador is not None:
+            lock_agendador.close()
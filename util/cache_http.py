@@ -0,0 +1,251 @@
+"""
+Validadores HTTP (ETag / Last-Modified) para GET condicional.
+
+As rotas calculam os validadores a partir das datas de atualização do
+conteúdo, respondem 304 antes de renderizar o template quando o navegador
+já tem a versão atual e anexam os cabeçalhos às respostas renderizadas.
+
+Também define tarefa_sincronizar_paginas, que propaga entre workers as
+alterações de conteúdo (ver util.cache_paginas), e ArquivosEstaticos, que serve as fotos de usuário versionadas
+(?v=...) com cache longo e imutável.
+"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from urllib.parse import parse_qs
+
+from fastapi import Request, status
+from fastapi.responses import Response
+from fastapi.staticfiles import StaticFiles
+
+from repo import artigo_repo, categoria_repo
+from util.cache_paginas import cache_paginas
+from util.db_util import executar_repo
+from util.foto_util import FOTO_DEFAULT, PASTA_FOTOS, obter_caminho_foto_usuario
+from util.logger_config import logger
+
+# Validadores de uma resposta: (etag, última modificação em UTC)
+Validadores = tuple[str, datetime]
+
+
+def _identificar_sessao(request: Request) -> str:
+    """
+    A página muda conforme o usuário logado, então ele entra no ETag.
+
+    A versão da foto dele também entra: a navbar usa a URL versionada (e
+    imutável) do avatar, que precisa mudar quando a foto é trocada.
+    """
+    usuario = request.session.get("usuario_logado")
+    if not usuario:
+        return "anonimo"
+    return f"usuario:{usuario['id']}:{obter_caminho_foto_usuario(usuario['id'])}"
+
+
+def criar_validadores(
+    request: Request,
+    ultima_modificacao: Optional[datetime],
+    *partes
+) -> Optional[Validadores]:
+    """
+    Calcula ETag e Last-Modified de uma página.
+
+    Args:
+        request: Requisição atual
+        ultima_modificacao: Data da última modificação do conteúdo exibido
+        *partes: Demais valores que identificam a versão (ex.: IDs, contagens)
+
+    Returns:
+        Tupla (etag, ultima_modificacao) ou None quando a página não deve ser
+        validada (mensagens flash pendentes ou conteúdo sem data)
+    """
+    if ultima_modificacao is None or request.session.get("mensagens"):
+        return None
+
+    if ultima_modificacao.tzinfo is None:
+        ultima_modificacao = ultima_modificacao.replace(tzinfo=timezone.utc)
+    ultima_modificacao = ultima_modificacao.astimezone(timezone.utc).replace(microsecond=0)
+
+    assinatura = "|".join(
+        str(parte) for parte in (ultima_modificacao.isoformat(), _identificar_sessao(request), *partes)
+    )
+    etag = 'W/"' + hashlib.sha1(assinatura.encode()).hexdigest()[:20] + '"'
+    return etag, ultima_modificacao
+
+
+# Versão da listagem memorizada:
+# (versão do cache de páginas, expira em, última modificação, qtde artigos, qtde categorias)
+_versao_listagem: Optional[tuple[int, float, Optional[datetime], int, int]] = None
+
+
+async def _obter_versao_listagem() -> tuple[Optional[datetime], int, int]:
+    """
+    Versão do conjunto de artigos e categorias, memorizada em memória.
+
+    As duas consultas de agregação só são refeitas (fora do event loop)
+    quando o cache de páginas é invalidado pelos repositórios ou quando a
+    memória expira após o TTL do cache de páginas, o que limita a
+    defasagem de alterações feitas por outro worker ao mesmo prazo das
+    páginas em cache.
+    """
+    global _versao_listagem
+    versao_cache = cache_paginas.obter_versao()
+    memorizada = _versao_listagem
+    if memorizada and memorizada[0] == versao_cache and memorizada[1] > time.monotonic():
+        return memorizada[2:]
+
+    data_artigos, qtde_artigos = await executar_repo(artigo_repo.obter_versao)
+    data_categorias, qtde_categorias = await executar_repo(categoria_repo.obter_versao)
+    datas = [data for data in (data_artigos, data_categorias) if data is not None]
+    ultima_modificacao = max(datas) if datas else None
+    _versao_listagem = (
+        versao_cache,
+        time.monotonic() + cache_paginas.ttl_segundos,
+        ultima_modificacao,
+        qtde_artigos,
+        qtde_categorias,
+    )
+    return ultima_modificacao, qtde_artigos, qtde_categorias
+
+
+async def criar_validadores_listagem(request: Request) -> Optional[Validadores]:
+    """
+    Validadores das páginas que listam artigos e categorias (home e /artigos/).
+
+    A versão combina a última modificação e a quantidade de artigos e de
+    categorias (ver _obter_versao_listagem; sem consultas na maioria das
+    requisições).
+    """
+    ultima_modificacao, qtde_artigos, qtde_categorias = await _obter_versao_listagem()
+    return criar_validadores(request, ultima_modificacao, qtde_artigos, qtde_categorias)
+
+
+async def tarefa_sincronizar_paginas(intervalo_segundos: int) -> None:
+    """
+    Tarefa assíncrona que descarta o cache de páginas quando o conteúdo muda no banco.
+
+    Cada worker tem o seu cache de páginas (e a versão da listagem
+    memorizada, que acompanha as invalidações). A versão do conteúdo no
+    banco é lida logo no início e depois a cada intervalo, fora do event
+    loop. Deve ser iniciada no startup da aplicação (lifespan) e cancelada
+    no shutdown.
+
+    Args:
+        intervalo_segundos: Intervalo entre verificações da versão
+    """
+    while True:
+        try:
+            versao_banco = await executar_repo(artigo_repo.obter_versao_conteudo)
+        except sqlite3.Error as e:
+            logger.warning("Erro ao verificar versão do conteúdo público: %s", e)
+        else:
+            if cache_paginas.sincronizar_com_banco(versao_banco):
+                logger.info("Conteúdo público alterado no banco (versão %s); cache de páginas descartado",
+                            versao_banco)
+        await asyncio.sleep(intervalo_segundos)
+
+
+def obter_etag(validadores: Optional[Validadores]) -> Optional[str]:
+    """ETag dos validadores (ou None), usado como versão da página no cache de páginas."""
+    return validadores[0] if validadores else None
+
+
+def _cabecalhos(validadores: Validadores) -> dict[str, str]:
+    etag, ultima_modificacao = validadores
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(ultima_modificacao, usegmt=True),
+        # Sempre revalidar: o conteúdo pode mudar a qualquer momento
+        "Cache-Control": "private, no-cache",
+        "Vary": "Cookie",
+    }
+
+
+def _etag_confere(if_none_match: str, etag: str) -> bool:
+    """Comparação fraca de ETags (RFC 9110), aceitando lista e '*'."""
+    if if_none_match.strip() == "*":
+        return True
+    opaco = etag.removeprefix("W/")
+    return any(
+        candidato.strip().removeprefix("W/") == opaco
+        for candidato in if_none_match.split(",")
+    )
+
+
+def responder_nao_modificado(
+    request: Request,
+    validadores: Optional[Validadores]
+) -> Optional[Response]:
+    """
+    Responde 304 se o navegador já tem a versão atual da página.
+
+    If-None-Match tem precedência sobre If-Modified-Since.
+
+    Returns:
+        Resposta 304 ou None se a página precisa ser renderizada
+    """
+    if validadores is None:
+        return None
+    etag, ultima_modificacao = validadores
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        nao_modificado = _etag_confere(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        if not if_modified_since:
+            return None
+        try:
+            data_cliente = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+        if data_cliente.tzinfo is None:
+            data_cliente = data_cliente.replace(tzinfo=timezone.utc)
+        nao_modificado = ultima_modificacao <= data_cliente
+
+    if not nao_modificado:
+        return None
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_cabecalhos(validadores))
+
+
+def aplicar_validadores(resposta: Response, validadores: Optional[Validadores]) -> Response:
+    """
+    Anexa ETag, Last-Modified e Cache-Control a uma resposta 200.
+
+    Returns:
+        A mesma resposta recebida
+    """
+    if validadores is not None and resposta.status_code == status.HTTP_200_OK:
+        resposta.headers.update(_cabecalhos(validadores))
+    return resposta
+
+
+# Cache-Control de arquivos cuja URL muda junto com o conteúdo
+CACHE_CONTROL_IMUTAVEL = "public, max-age=31536000, immutable"
+
+
+class ArquivosEstaticos(StaticFiles):
+    """
+    StaticFiles com cache imutável para as fotos de usuário versionadas
+    (incluindo a foto padrão compartilhada).
+
+    As URLs geradas por util.foto_util levam a versão do arquivo na query
+    string (?v=...) e mudam quando a foto é substituída, então o navegador
+    pode guardá-las por um ano sem revalidar. Requisições sem versão (links
+    antigos) mantêm o comportamento padrão, com revalidação por ETag.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code=200) -> Response:
+        resposta = super().file_response(full_path, stat_result, scope, status_code)
+        versionada = "v" in parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        foto = (
+            os.path.dirname(full_path) == os.path.realpath(PASTA_FOTOS)
+            or full_path == os.path.realpath(FOTO_DEFAULT)
+        )
+        if versionada and foto:
+            resposta.headers["Cache-Control"] = CACHE_CONTROL_IMUTAVEL
+        return resposta
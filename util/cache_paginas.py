@@ -0,0 +1,189 @@
+"""
+Cache em memória de páginas públicas renderizadas.
+
+Guarda o HTML de páginas servidas a visitantes anônimos (home, sobre,
+listagens e artigos) por um TTL e é invalidado explicitamente pelos
+repositórios quando artigos ou categorias mudam.
+
+A invalidação pelos repositórios vale só para o processo que fez a
+alteração. Com vários workers, os demais descobrem a mudança pela versão do
+conteúdo guardada no banco (incrementada por gatilhos), verificada a cada
+CACHE_PAGINAS_SINCRONIZACAO_SEGUNDOS por tarefa_sincronizar_paginas
+(util.cache_http); até lá podem servir a página anterior. Com a verificação
+desativada, a defasagem chega ao TTL das páginas.
+
+Cada página pode ser guardada com o ETag calculado pela rota; uma leitura
+com ETag diferente é tratada como ausência, para que uma página defasada
+nunca seja servida com os validadores da versão atual.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse, Response
+
+from util.config import CACHE_PAGINAS_TTL_SEGUNDOS, CACHE_PAGINAS_MAX_ITENS
+
+
+class CachePaginas:
+    """
+    Cache LRU com TTL de respostas HTML.
+
+    Thread-safe: utiliza Lock para sincronização de acesso ao cache.
+    """
+
+    def __init__(self, ttl_segundos: int = CACHE_PAGINAS_TTL_SEGUNDOS,
+                 max_itens: int = CACHE_PAGINAS_MAX_ITENS):
+        """
+        Args:
+            ttl_segundos: Tempo de vida de cada página (0 desativa o cache)
+            max_itens: Máximo de páginas guardadas (as menos usadas saem primeiro)
+        """
+        self.ttl_segundos = ttl_segundos
+        self.max_itens = max_itens
+        self._itens: "OrderedDict[str, tuple[float, bytes, Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._acertos = 0
+        self._falhas = 0
+        self._invalidacoes = 0
+        self._versao = 0
+        # Versão do conteúdo no banco refletida no cache (None: desconhecida)
+        self._versao_banco: Optional[int] = None
+
+    @staticmethod
+    def pode_usar_cache(request: Request) -> bool:
+        """
+        Indica se a requisição pode ler/gravar no cache.
+
+        Só visitantes anônimos sem mensagens flash pendentes recebem a
+        página compartilhada; qualquer outro caso é renderizado na hora.
+        """
+        if request.method != "GET":
+            return False
+        sessao = request.session
+        return not sessao.get("usuario_logado") and not sessao.get("mensagens")
+
+    @staticmethod
+    def _chave(request: Request) -> str:
+        """Chave do cache: caminho + query string."""
+        return f"{request.url.path}?{request.url.query}"
+
+    def obter_resposta(self, request: Request, etag: Optional[str] = None) -> Optional[Response]:
+        """
+        Retorna a página em cache para a requisição, se houver.
+
+        Args:
+            request: Requisição atual
+            etag: ETag atual da página; a página guardada com outro ETag é descartada
+
+        Returns:
+            HTMLResponse com a página em cache ou None (não cacheável, ausente,
+            expirada ou de outra versão)
+        """
+        if self.ttl_segundos <= 0 or not self.pode_usar_cache(request):
+            return None
+
+        chave = self._chave(request)
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None or item[0] < time.monotonic() or item[2] != etag:
+                if item is not None:
+                    del self._itens[chave]
+                self._falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self._acertos += 1
+            conteudo = item[1]
+
+        return HTMLResponse(content=conteudo)
+
+    def guardar_resposta(
+        self,
+        request: Request,
+        resposta: Response,
+        etag: Optional[str] = None
+    ) -> Response:
+        """
+        Guarda a página renderizada (se cacheável) e a devolve sem alterações.
+
+        Args:
+            request: Requisição atendida
+            resposta: Resposta renderizada (TemplateResponse)
+            etag: ETag da versão renderizada (ver obter_resposta)
+
+        Returns:
+            A mesma resposta recebida
+        """
+        if (
+            self.ttl_segundos <= 0
+            or resposta.status_code != 200
+            or not self.pode_usar_cache(request)
+        ):
+            return resposta
+
+        chave = self._chave(request)
+        with self._lock:
+            self._itens[chave] = (time.monotonic() + self.ttl_segundos, bytes(resposta.body), etag)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+        return resposta
+
+    def invalidar(self) -> None:
+        """Descarta todas as páginas em cache."""
+        with self._lock:
+            self._itens.clear()
+            self._invalidacoes += 1
+            self._versao += 1
+
+    def sincronizar_com_banco(self, versao_banco: int) -> bool:
+        """
+        Descarta as páginas se o conteúdo mudou no banco desde a última verificação.
+
+        Args:
+            versao_banco: Versão atual do conteúdo público no banco
+
+        Returns:
+            True se o cache foi invalidado
+        """
+        anterior, self._versao_banco = self._versao_banco, versao_banco
+        if anterior is None or anterior == versao_banco:
+            return False
+        self.invalidar()
+        return True
+
+    def obter_versao(self) -> int:
+        """
+        Retorna a versão do conteúdo público neste processo.
+
+        Incrementada a cada invalidação (e limpeza); lida sem lock.
+        """
+        return self._versao
+
+    def obter_estatisticas(self) -> dict:
+        """Retorna contadores de uso do cache."""
+        with self._lock:
+            total = self._acertos + self._falhas
+            return {
+                "itens": len(self._itens),
+                "acertos": self._acertos,
+                "falhas": self._falhas,
+                "taxa_acerto": round(self._acertos / total, 3) if total else 0.0,
+                "invalidacoes": self._invalidacoes,
+            }
+
+    def limpar(self) -> None:
+        """Descarta páginas e zera os contadores (útil em testes)."""
+        with self._lock:
+            self._itens.clear()
+            self._acertos = 0
+            self._falhas = 0
+            self._invalidacoes = 0
+            self._versao += 1
+
+
+# Instância global do cache
+cache_paginas = CachePaginas()
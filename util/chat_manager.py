@@ -4,7 +4,9 @@ Mantém conexões ativas e faz broadcast de mensagens para usuários conectados.
 """
 import asyncio
 from typing import Dict, Set
-from util.logger_config import logger
+from util.logger_config import obter_logger
+
+logger = obter_logger(__name__)
 
 
 class GerenciadorChat:
@@ -37,8 +39,8 @@ class GerenciadorChat:
         self._active_connections.add(usuario_id)
 
         logger.info(
-            f"[GerenciadorChat] Usuário {usuario_id} conectado. "
-            f"Total conexões: {len(self._active_connections)}"
+            "[GerenciadorChat] Usuário %s conectado. Total conexões: %s",
+            usuario_id, len(self._active_connections)
         )
 
         return queue
@@ -57,8 +59,8 @@ class GerenciadorChat:
             self._active_connections.remove(usuario_id)
 
         logger.info(
-            f"[GerenciadorChat] Usuário {usuario_id} desconectado. "
-            f"Total conexões: {len(self._active_connections)}"
+            "[GerenciadorChat] Usuário %s desconectado. Total conexões: %s",
+            usuario_id, len(self._active_connections)
         )
 
     async def broadcast_para_sala(self, sala_id: str, mensagem_dict: dict):
@@ -72,23 +74,23 @@ class GerenciadorChat:
         # Extrair IDs dos usuários do sala_id
         partes = sala_id.split("_")
         if len(partes) != 2:
-            logger.error(f"[ChatManager] sala_id inválido: {sala_id}")
+            logger.error("[ChatManager] sala_id inválido: %s", sala_id)
             return
 
         try:
             usuario1_id = int(partes[0])
             usuario2_id = int(partes[1])
         except ValueError:
-            logger.error(f"[ChatManager] Erro ao parsear IDs do sala_id: {sala_id}")
+            logger.error("[ChatManager] Erro ao parsear IDs do sala_id: %s", sala_id)
             return
 
         # Enviar para cada participante se estiver conectado
         for usuario_id in [usuario1_id, usuario2_id]:
             if usuario_id in self._connections:
                 await self._connections[usuario_id].put(mensagem_dict)
-                logger.debug(f"[ChatManager] Mensagem enviada para usuário {usuario_id} via SSE")
+                logger.debug("[ChatManager] Mensagem enviada para usuário %s via SSE", usuario_id)
             else:
-                logger.debug(f"[ChatManager] Usuário {usuario_id} não está conectado (não receberá via SSE)")
+                logger.debug("[ChatManager] Usuário %s não está conectado (não receberá via SSE)", usuario_id)
 
     def esta_conectado(self, usuario_id: int) -> bool:
         """
@@ -42,10 +42,103 @@ if RUNNING_MODE_CHECK.lower() != "development":
 
 # === Configurações do Banco de Dados ===
 DATABASE_PATH = os.getenv("DATABASE_PATH", "database.db")
+# Pool de conexões SQLite (conexões reaproveitadas entre requisições)
+DB_POOL_TAMANHO = int(os.getenv("DB_POOL_TAMANHO", "5"))
+DB_POOL_TIMEOUT_SEGUNDOS = float(os.getenv("DB_POOL_TIMEOUT_SEGUNDOS", "10"))
+# Threads dedicadas às chamadas de repositório feitas pelas rotas async
+# (executar_repo); acima do tamanho do pool, threads ficariam esperando conexão
+DB_EXECUTOR_THREADS = int(os.getenv("DB_EXECUTOR_THREADS", os.getenv("DB_POOL_TAMANHO", "5")))
+# Chamadas de repositório mais lentas que isto são registradas no log (0 desativa)
+DB_CONSULTA_LENTA_MS = int(os.getenv("DB_CONSULTA_LENTA_MS", "200"))
+
+# Perfis de PRAGMAs aplicados a cada conexão SQLite
+# - desempenho: WAL (leitores não bloqueiam escritores), sync NORMAL, mmap e cache maiores
+# - compatibilidade: rollback journal tradicional com sync FULL
+DB_PRAGMA_PERFIS = {
+    "desempenho": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,  # 256 MB
+        "cache_size": -20000,  # ~20 MB (valor negativo = KiB)
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,  # ms
+    },
+    "compatibilidade": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+}
+DB_PRAGMA_PERFIL = os.getenv("DB_PRAGMA_PERFIL", "desempenho")
+if DB_PRAGMA_PERFIL not in DB_PRAGMA_PERFIS:
+    raise ValueError(
+        f"DB_PRAGMA_PERFIL inválido: '{DB_PRAGMA_PERFIL}'. "
+        f"Opções: {', '.join(DB_PRAGMA_PERFIS)}"
+    )
+
+# PRAGMAs efetivos: perfil selecionado + sobrescritas individuais do .env
+DB_PRAGMAS = dict(DB_PRAGMA_PERFIS[DB_PRAGMA_PERFIL])
+for _pragma in ("journal_mode", "synchronous", "mmap_size", "cache_size", "temp_store", "busy_timeout"):
+    _valor = os.getenv(f"DB_PRAGMA_{_pragma.upper()}")
+    if _valor:
+        DB_PRAGMAS[_pragma] = _valor
+
+# Intervalo do checkpoint periódico do WAL (0 desativa)
+DB_WAL_CHECKPOINT_SEGUNDOS = int(os.getenv("DB_WAL_CHECKPOINT_SEGUNDOS", "300"))
+
+# === Cache de Configurações ===
+# Intervalo da verificação da versão das configurações no banco (0 desativa).
+# Com vários workers, alterações salvas em um processo chegam aos demais neste prazo
+CONFIG_SINCRONIZACAO_SEGUNDOS = int(os.getenv("CONFIG_SINCRONIZACAO_SEGUNDOS", "5"))
+
+# === Contador de Visualizações de Artigos ===
+# As visualizações ficam em memória e são gravadas em lote:
+# a cada N segundos (0 desativa a tarefa periódica) ou ao acumular N visualizações
+VISUALIZACOES_FLUSH_SEGUNDOS = int(os.getenv("VISUALIZACOES_FLUSH_SEGUNDOS", "30"))
+VISUALIZACOES_FLUSH_LIMITE = int(os.getenv("VISUALIZACOES_FLUSH_LIMITE", "500"))
+# Conta no máximo uma visualização por artigo em cada sessão
+VISUALIZACOES_DEDUP_SESSAO = os.getenv("VISUALIZACOES_DEDUP_SESSAO", "False").lower() == "true"
+
+# === Chat (SSE) ===
+# Intervalo do comentário de heartbeat enviado em streams ociosos
+CHAT_SSE_HEARTBEAT_SEGUNDOS = float(os.getenv("CHAT_SSE_HEARTBEAT_SEGUNDOS", "15"))
+# Máximo de mensagens reenviadas ao reconectar com Last-Event-ID
+CHAT_SSE_MAX_REENVIO = int(os.getenv("CHAT_SSE_MAX_REENVIO", "200"))
+
+# === Cache de Páginas Públicas ===
+# Páginas renderizadas para visitantes anônimos (0 desativa o cache)
+CACHE_PAGINAS_TTL_SEGUNDOS = int(os.getenv("CACHE_PAGINAS_TTL_SEGUNDOS", "60"))
+CACHE_PAGINAS_MAX_ITENS = int(os.getenv("CACHE_PAGINAS_MAX_ITENS", "500"))
+# Intervalo da verificação da versão do conteúdo no banco (0 desativa).
+# Com vários workers, a invalidação é local: alterações feitas em um processo
+# chegam aos demais neste prazo (ou, com a verificação desativada, no TTL)
+CACHE_PAGINAS_SINCRONIZACAO_SEGUNDOS = int(os.getenv("CACHE_PAGINAS_SINCRONIZACAO_SEGUNDOS", "5"))
+
+# === Backup ===
+# O backup copia o banco em uso em passos de N páginas (0 copia tudo de uma vez),
+# pausando entre os passos para não bloquear as requisições
+BACKUP_PAGINAS_POR_PASSO = int(os.getenv("BACKUP_PAGINAS_POR_PASSO", "256"))
+BACKUP_PAUSA_SEGUNDOS = float(os.getenv("BACKUP_PAUSA_SEGUNDOS", "0.05"))
+# Grava backups completos comprimidos com gzip (.db.gz)
+BACKUP_COMPRIMIR = os.getenv("BACKUP_COMPRIMIR", "False").lower() == "true"
+# Backup automático agendado: a partir de HH:MM, a cada N horas (0 desativa)
+BACKUP_AUTOMATICO_HORARIO = os.getenv("BACKUP_AUTOMATICO_HORARIO", "03:00")
+BACKUP_AUTOMATICO_INTERVALO_HORAS = int(os.getenv("BACKUP_AUTOMATICO_INTERVALO_HORAS", "24"))
+# Cria incrementais sobre o backup completo da semana (o primeiro da semana é completo)
+BACKUP_AUTOMATICO_INCREMENTAL = os.getenv("BACKUP_AUTOMATICO_INCREMENTAL", "False").lower() == "true"
+# Retenção de backups automáticos: último de cada dia / semana
+BACKUP_RETENCAO_DIARIOS = int(os.getenv("BACKUP_RETENCAO_DIARIOS", "7"))
+BACKUP_RETENCAO_SEMANAIS = int(os.getenv("BACKUP_RETENCAO_SEMANAIS", "4"))
 
 # === Configurações de Logging ===
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "30"))
+# Formato das linhas de log: "texto" ou "json" (uma linha JSON por entrada)
+LOG_FORMATO = os.getenv("LOG_FORMATO", "texto").lower()
+# Grava os logs em thread separada (QueueHandler/QueueListener)
+LOG_ASSINCRONO = os.getenv("LOG_ASSINCRONO", "True").lower() == "true"
+# Níveis por módulo, ex: "util.rate_limiter=WARNING,uvicorn.access=WARNING"
+LOG_NIVEIS_MODULOS = os.getenv("LOG_NIVEIS_MODULOS", "")
 
 # === Configurações de Email (Resend.com) ===
 RESEND_API_KEY = os.getenv("RESEND_API_KEY", "")
@@ -65,10 +158,23 @@ IS_DEVELOPMENT = RUNNING_MODE.lower() == "development"
 FOTO_PERFIL_TAMANHO_MAX = int(os.getenv("FOTO_PERFIL_TAMANHO_MAX", "256"))
 # Tamanho máximo em bytes (5MB)
 FOTO_MAX_UPLOAD_BYTES = int(os.getenv("FOTO_MAX_UPLOAD_BYTES", str(5 * 1024 * 1024)))
+# Limite de pixels (largura x altura) lido do cabeçalho, antes de decodificar a imagem
+FOTO_MAX_PIXELS = int(os.getenv("FOTO_MAX_PIXELS", str(25_000_000)))
+# Lados (px) das variantes geradas junto com a foto (avatares do chat, navbar, etc.)
+FOTO_VARIANTES_TAMANHOS = tuple(sorted({
+    int(tamanho) for tamanho in os.getenv("FOTO_VARIANTES_TAMANHOS", "48,128").split(",") if tamanho.strip()
+}))
+# Gerar também versões WebP (servidas no lugar do JPEG quando existirem)
+FOTO_WEBP = os.getenv("FOTO_WEBP", "True").lower() == "true"
+# Threads dedicadas ao processamento de imagens (fora do event loop)
+FOTO_PROCESSAMENTO_THREADS = int(os.getenv("FOTO_PROCESSAMENTO_THREADS", "2"))
 
 # === Configurações de Senha ===
 PASSWORD_MIN_LENGTH = int(os.getenv("PASSWORD_MIN_LENGTH", "8"))
 PASSWORD_MAX_LENGTH = int(os.getenv("PASSWORD_MAX_LENGTH", "128"))
+# Hashes bcrypt (~100-300ms de CPU cada) rodam em um pool próprio de threads,
+# fora do event loop; este é o máximo de hashes/verificações simultâneos
+SENHA_HASH_MAX_CONCORRENTES = int(os.getenv("SENHA_HASH_MAX_CONCORRENTES", "2"))
 
 # === Configurações de UI (Frontend) ===
 TOAST_AUTO_HIDE_DELAY_MS = int(os.getenv("TOAST_AUTO_HIDE_DELAY_MS", "5000"))
@@ -134,6 +240,17 @@ RATE_LIMIT_PUBLIC_MINUTOS = int(os.getenv("RATE_LIMIT_PUBLIC_MINUTOS", "1"))
 RATE_LIMIT_EXAMPLES_MAX = int(os.getenv("RATE_LIMIT_EXAMPLES_MAX", "100"))
 RATE_LIMIT_EXAMPLES_MINUTOS = int(os.getenv("RATE_LIMIT_EXAMPLES_MINUTOS", "1"))
 
+# Armazenamento dos limiters
+# Máximo de identificadores (IPs) por limiter; os menos recentes são descartados
+RATE_LIMIT_MAX_IDENTIFICADORES = int(os.getenv("RATE_LIMIT_MAX_IDENTIFICADORES", "10000"))
+# Intervalo entre varreduras de identificadores inativos
+RATE_LIMIT_VARREDURA_SEGUNDOS = int(os.getenv("RATE_LIMIT_VARREDURA_SEGUNDOS", "60"))
+# Onde os limiters guardam as tentativas:
+# - memoria: no próprio processo (padrão; cada worker tem seus próprios contadores)
+# - sqlite: em um banco compartilhado pelos workers do mesmo host
+RATE_LIMIT_ARMAZENAMENTO = os.getenv("RATE_LIMIT_ARMAZENAMENTO", "memoria").lower()
+RATE_LIMIT_SQLITE_CAMINHO = os.getenv("RATE_LIMIT_SQLITE_CAMINHO", "rate_limit.db")
+
 # === Versão da Aplicação ===
 VERSION = "1.0.0"
 
@@ -1,26 +1,162 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import asyncio
 import sqlite3
 import threading
 from repo import configuracao_repo
 from util.logger_config import logger
 
 
+# Marca de chave ausente no snapshot (distingue de valores guardados)
+_AUSENTE = object()
+
+
 class ConfigCache:
     """
     Cache de configurações do sistema para melhor performance.
 
-    Thread-safe: utiliza RLock para sincronização de acesso ao cache
-    em ambientes multi-thread.
+    Leituras sem lock: _cache é um snapshot que nunca é alterado depois de
+    publicado. Quem precisa incluir valores cria uma cópia, altera a cópia
+    e troca a referência (atribuição atômica) sob o RLock, que serializa
+    apenas as escritas. Consultas ao banco são feitas fora do lock, e as
+    chaves ausentes de uma leitura são buscadas em uma única query.
+
+    No startup, carregar_todas() preenche o cache com todas as linhas da
+    tabela configuracao, de forma que as leituras seguintes custem apenas
+    um acesso ao dicionário.
+
+    Mantém também uma versão, incrementada sempre que o cache é limpo.
+    Quem deriva valores das configurações (ex: DynamicRateLimiter) compara
+    a versão, lida sem lock, e só relê as chaves quando ela muda.
+
+    Com vários workers, cada processo tem o seu cache: a tarefa
+    tarefa_sincronizar_configuracoes compara periodicamente a versão das
+    configurações no banco e recarrega o cache quando outro processo as altera.
     """
     _cache: Dict[str, Any] = {}
     _lock: threading.RLock = threading.RLock()
+    _versao: int = 0
+    # Versão das configurações no banco refletida no cache (None: desconhecida)
+    _versao_banco: Optional[int] = None
+
+    # Métricas (incrementadas sem lock: valores aproximados sob concorrência)
+    _acertos: int = 0
+    _falhas: int = 0
+    _consultas_banco: int = 0
+
+    @classmethod
+    def _publicar(cls, valores: Dict[str, str], versao: int) -> None:
+        """
+        Publica um novo snapshot com os valores incluídos.
+
+        Se o cache foi limpo durante a consulta ao banco (versão diferente),
+        os valores lidos podem estar desatualizados e não são guardados.
+        """
+        with cls._lock:
+            if cls._versao != versao:
+                return
+            snapshot = dict(cls._cache)
+            snapshot.update(valores)
+            cls._cache = snapshot
+
+    @classmethod
+    def _carregar(cls, padroes: Dict[str, str]) -> Dict[str, str]:
+        """
+        Busca no banco, em uma única query, as chaves ausentes do cache.
+
+        Chaves que não existem no banco são guardadas com o valor padrão.
+
+        Args:
+            padroes: Dicionário {chave: valor padrão}
+
+        Returns:
+            Dicionário {chave: valor}; em caso de erro, os padrões (não cacheados)
+        """
+        versao = cls._versao
+        cls._consultas_banco += 1
+        try:
+            encontradas = configuracao_repo.obter_multiplas(list(padroes))
+
+        except sqlite3.Error as e:
+            logger.error("Erro ao buscar configuração '%s' do banco: %s", ", ".join(padroes), e)
+            # Padrão não cacheado: nova versão para que dependentes tentem de novo
+            with cls._lock:
+                cls._versao += 1
+            # Retorna padrão em vez de crashar a aplicação
+            return dict(padroes)
+
+        except Exception as e:
+            logger.critical("Erro crítico ao acessar configuração '%s': %s", ", ".join(padroes), e)
+            with cls._lock:
+                cls._versao += 1
+            # Ainda retorna padrão, mas loga como crítico
+            return dict(padroes)
+
+        valores = {
+            chave: cfg.valor if (cfg := encontradas.get(chave)) else padrao
+            for chave, padrao in padroes.items()
+        }
+        cls._publicar(valores, versao)
+        return valores
+
+    @classmethod
+    def carregar_todas(cls) -> int:
+        """
+        Pré-carrega todas as configurações do banco em uma única query.
+
+        Deve ser chamado no startup, depois da migração das configurações.
+
+        Returns:
+            Quantidade de configurações carregadas (0 em caso de erro)
+        """
+        versao = cls._versao
+        cls._consultas_banco += 1
+        try:
+            versao_banco = configuracao_repo.obter_versao()
+            todas = configuracao_repo.obter_todos()
+        except sqlite3.Error as e:
+            logger.error("Erro ao pré-carregar configurações do banco: %s", e)
+            return 0
+
+        cls._publicar({c.chave: c.valor for c in todas}, versao)
+        cls._versao_banco = versao_banco
+        return len(todas)
+
+    @classmethod
+    def sincronizar_com_banco(cls) -> bool:
+        """
+        Recarrega o cache se as configurações mudaram no banco.
+
+        Cada processo (worker) tem o seu cache; a versão guardada no banco é
+        incrementada por gatilhos a cada alteração na tabela configuracao,
+        então mudanças salvas por qualquer worker são detectadas aqui. O
+        recarregamento lê todas as linhas em uma query e troca o snapshot
+        de uma vez, sem deixar o cache vazio entre a limpeza e a carga.
+
+        Returns:
+            True se o cache foi recarregado
+        """
+        try:
+            versao_banco = configuracao_repo.obter_versao()
+            if versao_banco == cls._versao_banco:
+                return False
+            cls._consultas_banco += 1
+            todas = configuracao_repo.obter_todos()
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao verificar versão das configurações: {e}")
+            return False
+
+        with cls._lock:
+            cls._cache = {c.chave: c.valor for c in todas}
+            cls._versao += 1
+            cls._versao_banco = versao_banco
+        return True
 
     @classmethod
     def obter(cls, chave: str, padrao: str = "") -> str:
         """
         Obtém configuração com cache e tratamento de erros.
 
-        Thread-safe: utiliza lock para sincronização.
+        Acertos são lidos do snapshot sem lock; faltas consultam o banco.
 
         Args:
             chave: Chave da configuração
@@ -32,30 +168,27 @@ class ConfigCache:
         Raises:
             Nenhuma exceção - retorna padrao em caso de erro
         """
-        with cls._lock:
-            # Retorna do cache se disponível
-            if chave in cls._cache:
-                return cls._cache[chave]
-
-            # Tenta buscar do banco com error handling
-            try:
-                config = configuracao_repo.obter_por_chave(chave)
-                if config:
-                    cls._cache[chave] = config.valor
-                    return config.valor
-                else:
-                    cls._cache[chave] = padrao
-                    return padrao
-
-            except sqlite3.Error as e:
-                logger.error(f"Erro ao buscar configuração '{chave}' do banco: {e}")
-                # Retorna padrão em vez de crashar a aplicação
-                return padrao
-
-            except Exception as e:
-                logger.critical(f"Erro crítico ao acessar configuração '{chave}': {e}")
-                # Ainda retorna padrão, mas loga como crítico
-                return padrao
+        valor = cls._cache.get(chave, _AUSENTE)
+        if valor is not _AUSENTE:
+            cls._acertos += 1
+            return valor
+
+        cls._falhas += 1
+        return cls._carregar({chave: padrao})[chave]
+
+    @classmethod
+    def obter_versao(cls) -> int:
+        """
+        Retorna a versão atual do cache.
+
+        A versão muda quando o cache é limpo (configurações alteradas) ou
+        quando uma leitura do banco falha. A leitura não usa o lock, para
+        poder ser feita a cada requisição sem disputa.
+
+        Returns:
+            Número da versão
+        """
+        return cls._versao
 
     @classmethod
     def obter_int(cls, chave: str, padrao: int) -> int:
@@ -129,6 +262,8 @@ class ConfigCache:
         """
         Obtém múltiplas configurações de uma vez para melhor performance
 
+        As chaves ausentes do cache são buscadas em uma única query.
+
         Args:
             chaves: Lista de chaves a buscar
             padroes: Lista de valores padrão correspondentes
@@ -143,11 +278,23 @@ class ConfigCache:
             logger.error("obter_multiplos: número de chaves diferente de padrões")
             return dict(zip(chaves, padroes))
 
+        snapshot = cls._cache
         resultado = {}
+        ausentes = {}
         for chave, padrao in zip(chaves, padroes):
-            resultado[chave] = cls.obter(chave, padrao)
+            valor = snapshot.get(chave, _AUSENTE)
+            if valor is _AUSENTE:
+                ausentes[chave] = padrao
+            else:
+                resultado[chave] = valor
+
+        cls._acertos += len(resultado)
+        if ausentes:
+            cls._falhas += len(ausentes)
+            resultado.update(cls._carregar(ausentes))
 
-        return resultado
+        # Manter a ordem das chaves solicitadas
+        return {chave: resultado[chave] for chave in chaves}
 
     @classmethod
     def limpar(cls):
@@ -158,6 +305,20 @@ class ConfigCache:
         """
         with cls._lock:
             cls._cache = {}
+            cls._versao += 1
+
+    @classmethod
+    def obter_estatisticas(cls) -> dict:
+        """Retorna contadores de uso do cache."""
+        total = cls._acertos + cls._falhas
+        return {
+            "itens": len(cls._cache),
+            "acertos": cls._acertos,
+            "falhas": cls._falhas,
+            "taxa_acerto": round(cls._acertos / total, 3) if total else 0.0,
+            "consultas_banco": cls._consultas_banco,
+            "versao": cls._versao,
+        }
 
     @classmethod
     def limpar_chave(cls, chave: str):
@@ -168,8 +329,30 @@ class ConfigCache:
         """
         with cls._lock:
             if chave in cls._cache:
-                del cls._cache[chave]
+                snapshot = dict(cls._cache)
+                del snapshot[chave]
+                cls._cache = snapshot
+            cls._versao += 1
 
 
 # Instância global para uso em toda a aplicação
 config = ConfigCache()
+
+
+async def tarefa_sincronizar_configuracoes(intervalo_segundos: int) -> None:
+    """
+    Tarefa assíncrona que recarrega o cache quando as configurações mudam no banco.
+
+    A verificação (uma query de uma linha) roda em thread separada para não
+    bloquear o event loop. Deve ser iniciada no startup da aplicação
+    (lifespan) e cancelada no shutdown.
+
+    Args:
+        intervalo_segundos: Intervalo entre verificações da versão
+    """
+    while True:
+        await asyncio.sleep(intervalo_segundos)
+        if await asyncio.to_thread(ConfigCache.sincronizar_com_banco):
+            logger.info(
+                f"Configurações alteradas no banco (versão {ConfigCache._versao_banco}); cache recarregado"
+            )
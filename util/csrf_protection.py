@@ -10,7 +10,9 @@ from fastapi import Request
 from fastapi.responses import Response
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from util.logger_config import logger
+from util.logger_config import obter_logger
+
+logger = obter_logger(__name__)
 
 
 # Nome da chave na sessão onde o token CSRF é armazenado
@@ -133,7 +135,7 @@ class MiddlewareProtecaoCSRF(BaseHTTPMiddleware):
         # A validação real será feita via dependency nos handlers
         if request.method in CSRF_PROTECTED_METHODS:
             if not esta_isento_csrf(request.url.path):
-                logger.debug(f"CSRF-protected request: {request.method} {request.url.path}")
+                logger.debug("CSRF-protected request: %s %s", request.method, request.url.path)
 
         # Continuar processamento normalmente
         response = await call_next(request)
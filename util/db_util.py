@@ -1,10 +1,22 @@
+import asyncio
 import sqlite3
 import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from datetime import datetime
+from typing import Callable, Dict, Optional, TypeVar
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 
+from util.config import (
+    DB_POOL_TAMANHO, DB_POOL_TIMEOUT_SEGUNDOS, DB_PRAGMAS,
+    DB_EXECUTOR_THREADS, DB_CONSULTA_LENTA_MS,
+)
+from util.logger_config import logger
+
 
 load_dotenv()
 
@@ -12,17 +24,446 @@ DATABASE_PATH = os.getenv('DATABASE_PATH', 'dados.db')
 TIMEZONE = os.getenv('TIMEZONE', 'America/Sao_Paulo')
 APP_TIMEZONE = ZoneInfo(TIMEZONE)
 
+T = TypeVar("T")
+
+
+class PoolConexoes:
+    """
+    Pool limitado de conexões SQLite reaproveitáveis.
+
+    Evita abrir e fechar uma conexão a cada query: as conexões são criadas
+    sob demanda até o tamanho máximo e devolvidas ao pool ao final de cada
+    uso. Antes de entregar uma conexão, o pool verifica se ela ainda está
+    saudável e a substitui caso contrário.
+
+    Thread-safe: cada conexão é usada por uma única thread por vez
+    (check_same_thread=False apenas permite que ela mude de thread entre usos).
+
+    Attributes:
+        caminho: Caminho do arquivo do banco de dados
+        tamanho_maximo: Número máximo de conexões abertas simultaneamente
+        timeout: Tempo máximo (segundos) de espera por uma conexão livre
+        pragmas: PRAGMAs aplicados a cada nova conexão (ex: journal_mode, synchronous)
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        tamanho_maximo: int = 5,
+        timeout: float = 10.0,
+        pragmas: Optional[dict] = None,
+    ):
+        if tamanho_maximo <= 0:
+            raise ValueError("tamanho_maximo deve ser positivo")
+
+        self.caminho = caminho
+        self.tamanho_maximo = tamanho_maximo
+        self.timeout = timeout
+        self.pragmas = pragmas or {}
+        self._disponiveis: queue.LifoQueue = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+        # Métricas
+        self._conexoes_criadas = 0
+        self._conexoes_descartadas = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._tempo_espera_total = 0.0
+        self._tempo_espera_maximo = 0.0
+
+    def _criar_conexao(self) -> sqlite3.Connection:
+        """Abre uma nova conexão configurada para uso pela aplicação"""
+        conn = sqlite3.connect(
+            self.caminho,
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            check_same_thread=False
+        )
+        conn.execute("PRAGMA foreign_keys = ON")
+        for nome, valor in self.pragmas.items():
+            conn.execute(f"PRAGMA {nome} = {valor}")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _conexao_saudavel(conn: sqlite3.Connection) -> bool:
+        """Verifica se a conexão ainda responde a queries"""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _descartar(self, conn: sqlite3.Connection) -> None:
+        """Fecha a conexão e libera sua vaga no pool"""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._conexoes_criadas -= 1
+            self._conexoes_descartadas += 1
+
+    def obter(self) -> sqlite3.Connection:
+        """
+        Retira uma conexão do pool (criando uma nova se houver vaga).
+
+        Returns:
+            Conexão SQLite pronta para uso
+
+        Raises:
+            sqlite3.OperationalError: Se nenhuma conexão ficar livre dentro do timeout
+        """
+        inicio = time.perf_counter()
+        conn = None
+
+        try:
+            conn = self._disponiveis.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                pode_criar = self._conexoes_criadas < self.tamanho_maximo
+                if pode_criar:
+                    self._conexoes_criadas += 1
+
+            if pode_criar:
+                try:
+                    conn = self._criar_conexao()
+                except sqlite3.Error:
+                    with self._lock:
+                        self._conexoes_criadas -= 1
+                    raise
+            else:
+                try:
+                    conn = self._disponiveis.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise sqlite3.OperationalError(
+                        f"Timeout ao aguardar conexão livre no pool ({self.timeout}s)"
+                    )
+
+        # Health check: substitui conexões quebradas por novas
+        if not self._conexao_saudavel(conn):
+            self._descartar(conn)
+            with self._lock:
+                self._conexoes_criadas += 1
+            try:
+                conn = self._criar_conexao()
+            except sqlite3.Error:
+                with self._lock:
+                    self._conexoes_criadas -= 1
+                raise
+
+        espera = time.perf_counter() - inicio
+        with self._lock:
+            self._checkouts += 1
+            self._tempo_espera_total += espera
+            self._tempo_espera_maximo = max(self._tempo_espera_maximo, espera)
+
+        return conn
+
+    def devolver(self, conn: sqlite3.Connection) -> None:
+        """
+        Devolve uma conexão ao pool.
+
+        Transações pendentes são desfeitas; conexões que não puderem ser
+        limpas são descartadas.
+        """
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._descartar(conn)
+            return
+
+        self._disponiveis.put_nowait(conn)
+
+    def fechar_todas(self) -> int:
+        """
+        Fecha todas as conexões ociosas do pool.
+
+        Conexões em uso no momento continuam válidas e voltam ao pool
+        normalmente quando devolvidas.
+
+        Returns:
+            Número de conexões fechadas
+        """
+        fechadas = 0
+        while True:
+            try:
+                conn = self._disponiveis.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            fechadas += 1
+
+        with self._lock:
+            self._conexoes_criadas -= fechadas
+
+        return fechadas
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna métricas de uso do pool.
+
+        Returns:
+            Dicionário com tamanho, conexões e tempos de espera (em ms)
+        """
+        with self._lock:
+            media_ms = (
+                (self._tempo_espera_total / self._checkouts) * 1000
+                if self._checkouts else 0.0
+            )
+            return {
+                "caminho": self.caminho,
+                "tamanho_maximo": self.tamanho_maximo,
+                "conexoes_abertas": self._conexoes_criadas,
+                "conexoes_disponiveis": self._disponiveis.qsize(),
+                "conexoes_descartadas": self._conexoes_descartadas,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "tempo_espera_medio_ms": round(media_ms, 3),
+                "tempo_espera_maximo_ms": round(self._tempo_espera_maximo * 1000, 3),
+            }
+
+
+# Pools por caminho de banco (permite trocar DATABASE_PATH em testes)
+_pools: Dict[str, PoolConexoes] = {}
+_pools_lock = threading.Lock()
+
+
+def obter_pool() -> PoolConexoes:
+    """Retorna o pool de conexões do banco configurado em DATABASE_PATH"""
+    caminho = DATABASE_PATH
+    pool = _pools.get(caminho)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(caminho)
+            if pool is None:
+                pool = PoolConexoes(caminho, DB_POOL_TAMANHO, DB_POOL_TIMEOUT_SEGUNDOS, DB_PRAGMAS)
+                _pools[caminho] = pool
+    return pool
+
+
+def fechar_pool() -> None:
+    """
+    Fecha as conexões ociosas de todos os pools.
+
+    Deve ser chamado quando o arquivo do banco é substituído
+    (ex: restauração de backup) ou no encerramento da aplicação.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.fechar_todas()
+
+
+def obter_estatisticas_pool() -> dict:
+    """Retorna as métricas do pool do banco configurado em DATABASE_PATH"""
+    return obter_pool().obter_estatisticas()
+
+
+# =============================================================================
+# Execução de repositórios fora do event loop
+# =============================================================================
+
+class ExecutorRepositorios:
+    """
+    Executa funções de repositório (síncronas) em threads dedicadas.
+
+    As rotas são async, mas os repositórios usam sqlite3, que bloqueia a
+    thread durante o I/O. Chamados diretamente, uma query lenta para o event
+    loop e atrasa todas as requisições e streams SSE do worker. Com
+    `await executar_repo(artigo_repo.obter_por_id, id)` a chamada roda em um
+    pool de threads próprio, separado do executor padrão do asyncio (usado
+    por backups e busca em logs).
+
+    Registra, por função, o número de chamadas e os tempos de execução,
+    além do tempo de espera na fila do pool.
+
+    Thread-safe: utiliza Lock para sincronização das métricas.
+    """
+
+    def __init__(self, max_threads: int = DB_EXECUTOR_THREADS, consulta_lenta_ms: int = DB_CONSULTA_LENTA_MS):
+        """
+        Args:
+            max_threads: Número de threads do pool
+            consulta_lenta_ms: Duração a partir da qual a chamada é registrada no log (0 desativa)
+        """
+        if max_threads <= 0:
+            raise ValueError("max_threads deve ser positivo")
+
+        self.max_threads = max_threads
+        self.consulta_lenta_ms = consulta_lenta_ms
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # Métricas: nome da função -> [chamadas, tempo total, tempo máximo]
+        self._consultas: Dict[str, list] = {}
+        self._tempo_fila_total = 0.0
+        self._tempo_fila_maximo = 0.0
+        self._consultas_lentas = 0
+
+    def _obter_executor(self) -> ThreadPoolExecutor:
+        """Cria o pool de threads no primeiro uso"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_threads, thread_name_prefix="repo"
+                    )
+        return self._executor
+
+    @staticmethod
+    def _nome_funcao(funcao: Callable) -> str:
+        """Nome usado nas métricas (ex: artigo_repo.obter_por_id)"""
+        modulo = getattr(funcao, "__module__", None) or ""
+        nome = getattr(funcao, "__name__", None) or type(funcao).__name__
+        return f"{modulo.rsplit('.', 1)[-1]}.{nome}" if modulo else nome
+
+    def _registrar(self, nome: str, espera: float, duracao: float) -> None:
+        """Acumula as métricas de uma chamada"""
+        with self._lock:
+            metricas = self._consultas.setdefault(nome, [0, 0.0, 0.0])
+            metricas[0] += 1
+            metricas[1] += duracao
+            metricas[2] = max(metricas[2], duracao)
+            self._tempo_fila_total += espera
+            self._tempo_fila_maximo = max(self._tempo_fila_maximo, espera)
+            lenta = self.consulta_lenta_ms > 0 and duracao * 1000 >= self.consulta_lenta_ms
+            if lenta:
+                self._consultas_lentas += 1
+        if lenta:
+            logger.warning(f"Chamada de repositório lenta: {nome} levou {duracao * 1000:.1f} ms")
+
+    async def executar(self, funcao: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Executa funcao(*args, **kwargs) no pool e aguarda o resultado.
+
+        Exceções da função são propagadas ao chamador.
+        """
+        nome = self._nome_funcao(funcao)
+        enfileirado = time.perf_counter()
+
+        def tarefa() -> T:
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                self._registrar(nome, inicio - enfileirado, time.perf_counter() - inicio)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._obter_executor(), tarefa)
+
+    def obter_estatisticas(self, limite: int = 10) -> dict:
+        """
+        Retorna métricas das chamadas de repositório.
+
+        Args:
+            limite: Quantidade de funções listadas (as de maior tempo total)
+
+        Returns:
+            Dicionário com totais, tempos de fila e as funções mais custosas (tempos em ms)
+        """
+        with self._lock:
+            chamadas = sum(m[0] for m in self._consultas.values())
+            mais_custosas = sorted(self._consultas.items(), key=lambda item: item[1][1], reverse=True)[:limite]
+            return {
+                "max_threads": self.max_threads,
+                "chamadas": chamadas,
+                "consultas_lentas": self._consultas_lentas,
+                "tempo_fila_medio_ms": round(self._tempo_fila_total / chamadas * 1000, 3) if chamadas else 0.0,
+                "tempo_fila_maximo_ms": round(self._tempo_fila_maximo * 1000, 3),
+                "funcoes": {
+                    nome: {
+                        "chamadas": m[0],
+                        "tempo_medio_ms": round(m[1] / m[0] * 1000, 3),
+                        "tempo_maximo_ms": round(m[2] * 1000, 3),
+                    }
+                    for nome, m in mais_custosas
+                },
+            }
+
+    def encerrar(self) -> None:
+        """Encerra o pool de threads (chamadas em andamento terminam normalmente)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+# Instância global do executor de repositórios
+executor_repositorios = ExecutorRepositorios()
+
+
+async def executar_repo(funcao: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Executa uma função de repositório fora do event loop.
+
+    Uso nas rotas async:
+        artigo = await executar_repo(artigo_repo.obter_por_id, id)
+
+    Args:
+        funcao: Função síncrona de repositório
+        *args, **kwargs: Argumentos repassados à função
+
+    Returns:
+        O retorno da função
+    """
+    return await executor_repositorios.executar(funcao, *args, **kwargs)
+
+
+def executar_checkpoint_wal(modo: str = "PASSIVE") -> Optional[tuple[int, int, int]]:
+    """
+    Executa checkpoint do WAL, transferindo páginas do arquivo -wal para o banco.
+
+    Sem checkpoints periódicos o arquivo -wal cresce indefinidamente sob
+    escrita contínua e as leituras ficam mais lentas.
+
+    Args:
+        modo: PASSIVE (não bloqueia), FULL, RESTART ou TRUNCATE
+
+    Returns:
+        Tupla (ocupado, paginas_wal, paginas_transferidas) ou None se o banco não usa WAL
+    """
+    with obter_conexao() as conn:
+        modo_journal = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if modo_journal.lower() != "wal":
+            return None
+        row = conn.execute(f"PRAGMA wal_checkpoint({modo})").fetchone()
+        return (row[0], row[1], row[2])
+
+
+async def tarefa_checkpoint_wal(intervalo_segundos: int) -> None:
+    """
+    Tarefa assíncrona que executa checkpoint do WAL periodicamente.
+
+    O checkpoint roda em thread separada para não bloquear o event loop.
+    Deve ser iniciada no startup da aplicação (lifespan) e cancelada no shutdown.
+
+    Args:
+        intervalo_segundos: Intervalo entre checkpoints
+    """
+    while True:
+        await asyncio.sleep(intervalo_segundos)
+        try:
+            resultado = await asyncio.to_thread(executar_checkpoint_wal)
+            if resultado:
+                logger.debug(
+                    "Checkpoint WAL executado (ocupado=%s, páginas WAL=%s, transferidas=%s)",
+                    *resultado
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao executar checkpoint do WAL: {e}")
+
 
 @contextmanager
 def obter_conexao():
-    """Context manager para conexão com banco de dados"""
-    registrar_adaptadores()
-    conn = sqlite3.connect(
-        DATABASE_PATH,
-        detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
-    )
-    conn.execute("PRAGMA foreign_keys = ON")
-    conn.row_factory = sqlite3.Row
+    """Context manager para conexão com banco de dados (obtida do pool)"""
+    pool = obter_pool()
+    conn = pool.obter()
     try:
         yield conn
         conn.commit()
@@ -30,7 +471,7 @@ def obter_conexao():
         conn.rollback()
         raise e
     finally:
-        conn.close()
+        pool.devolver(conn)
 
 
 def adaptar_datetime(dt: datetime) -> str:
@@ -92,3 +533,7 @@ def registrar_adaptadores() -> None:
     """Registra os adaptadores customizados para datetime no sqlite3"""
     sqlite3.register_adapter(datetime, adaptar_datetime)
     sqlite3.register_converter("TIMESTAMP", converter_datetime)
+
+
+# Adaptadores são globais no módulo sqlite3: basta registrá-los uma vez
+registrar_adaptadores()
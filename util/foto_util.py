@@ -2,21 +2,36 @@
 Utilitário para gerenciamento de fotos de usuários.
 
 Este módulo fornece funções para:
-- Obter caminhos de fotos de usuários (padrão: {id:06d}.jpg)
-- Criar foto padrão ao cadastrar usuário
-- Salvar foto cropada do upload
+- Obter caminhos de fotos de usuários (padrão: {id:06d}.jpg), versionados para cache longo
+- Escolher a variante de tamanho/formato adequada a cada exibição
+- Resolver usuários sem foto própria para a foto padrão compartilhada (user.jpg)
+- Salvar foto cropada do upload (foto e variantes em uma única decodificação)
+- Gerar variantes de fotos já existentes
+- Executar o processamento de imagens em um pool de threads, fora do event loop
+
+Arquivos de cada usuário com foto própria em static/img/usuarios:
+    {id:06d}.jpg         foto completa (limitada a foto_perfil_tamanho_max)
+    {id:06d}.webp        foto completa em WebP (se FOTO_WEBP)
+    {id:06d}_{n}.jpg     variante com lado n (FOTO_VARIANTES_TAMANHOS)
+    {id:06d}_{n}.webp    variante em WebP (se FOTO_WEBP)
 """
 
+import asyncio
 import base64
 import binascii
 import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Callable, List, Optional, Tuple, TypeVar
 
 from PIL import Image, UnidentifiedImageError
 
 from util.logger_config import logger
-from util.config import FOTO_PERFIL_TAMANHO_MAX
+from util.config import (
+    FOTO_PERFIL_TAMANHO_MAX, FOTO_MAX_PIXELS, FOTO_PROCESSAMENTO_THREADS,
+    FOTO_VARIANTES_TAMANHOS, FOTO_WEBP,
+)
 from util.config_cache import config
 
 
@@ -26,19 +41,114 @@ FOTO_DEFAULT = PASTA_FOTO_DEFAULT / "user.jpg"
 PASTA_FOTOS = PASTA_FOTO_DEFAULT / "usuarios"
 FORMATO_FOTO = "JPEG"
 QUALIDADE_FOTO = 90
+FORMATO_WEBP = "WEBP"
+QUALIDADE_WEBP = 80
+EXTENSAO_JPEG = "jpg"
+EXTENSAO_WEBP = "webp"
+# Fotos completas dos usuários ({id:06d}.jpg)
+PADRAO_ARQUIVO_FOTO = "[0-9]" * 6 + ".jpg"
+
+T = TypeVar("T")
+
+# Pool de processamento de imagens (criado no primeiro uso)
+_executor_fotos: Optional[ThreadPoolExecutor] = None
+_lock_executor = threading.Lock()
+
+
+def obter_path_variante(id: int, tamanho: Optional[int] = None, extensao: str = EXTENSAO_JPEG) -> Path:
+    """
+    Retorna o Path de uma variante da foto do usuário.
+
+    Args:
+        id: ID do usuário
+        tamanho: Lado da variante em pixels (None para a foto completa)
+        extensao: "jpg" ou "webp"
+
+    Returns:
+        Path do arquivo (ex: usuarios/000001.jpg, usuarios/000001_48.webp)
+    """
+    sufixo = f"_{tamanho}" if tamanho else ""
+    return PASTA_FOTOS / f"{id:06d}{sufixo}.{extensao}"
+
+
+def _listar_variantes(id: int) -> List[Path]:
+    """Variantes esperadas da foto do usuário (exceto a foto completa em JPEG)"""
+    extensoes = (EXTENSAO_JPEG, EXTENSAO_WEBP) if FOTO_WEBP else (EXTENSAO_JPEG,)
+    variantes = [obter_path_variante(id, None, EXTENSAO_WEBP)] if FOTO_WEBP else []
+    for tamanho in FOTO_VARIANTES_TAMANHOS:
+        variantes.extend(obter_path_variante(id, tamanho, extensao) for extensao in extensoes)
+    return variantes
+
+
+def _remover_variantes(id: int) -> None:
+    """Remove todas as variantes da foto do usuário, inclusive de tamanhos/formatos não mais configurados"""
+    if not PASTA_FOTOS.exists():
+        return
+    for caminho in PASTA_FOTOS.glob(f"{id:06d}_*"):
+        caminho.unlink(missing_ok=True)
+    obter_path_variante(id, None, EXTENSAO_WEBP).unlink(missing_ok=True)
+
+
+def _url_versionada(caminho: Path) -> Optional[str]:
+    """
+    URL pública do arquivo com a versão na query string, ou None se ele não existir.
+
+    A versão é o mtime do arquivo: muda sempre que a foto é substituída, o que
+    permite servir as fotos com Cache-Control immutable.
+    """
+    try:
+        versao = caminho.stat().st_mtime_ns
+    except OSError:
+        return None
+    return f"/{caminho.as_posix()}?v={versao:x}"
 
 
 def obter_caminho_foto_usuario(id: int) -> str:
     """
     Retorna o caminho absoluto da foto do usuário para uso em templates.
 
+    Usuários sem foto própria usam a foto padrão compartilhada (FOTO_DEFAULT).
+
+    Args:
+        id: ID do usuário
+
+    Returns:
+        String com caminho absoluto e versão (ex: /static/img/usuarios/000001.jpg?v=18c2...
+        ou /static/img/user.jpg?v=18c2...)
+    """
+    return (
+        _url_versionada(obter_path_variante(id))
+        or _url_versionada(FOTO_DEFAULT)
+        or f"/{FOTO_DEFAULT.as_posix()}"
+    )
+
+
+def obter_caminho_avatar_usuario(id: int, tamanho: Optional[int] = None) -> str:
+    """
+    Retorna o caminho da variante mais leve da foto adequada ao tamanho exibido.
+
+    Escolhe a menor variante com lado >= tamanho (ou a foto completa), em WebP
+    quando habilitado. Fotos sem variantes (enviadas antes da geração de
+    variantes) usam a foto completa em JPEG, e usuários sem foto própria, a
+    foto padrão.
+
     Args:
         id: ID do usuário
+        tamanho: Lado em pixels com que a foto será exibida (None para a foto completa)
 
     Returns:
-        String com caminho absoluto (ex: /static/img/usuarios/000001.jpg)
+        String com caminho absoluto e versão (ex: /static/img/usuarios/000001_48.webp?v=18c2...)
     """
-    return f"/{PASTA_FOTOS}/{id:06d}.jpg"
+    tamanhos: List[Optional[int]] = [t for t in FOTO_VARIANTES_TAMANHOS if tamanho and t >= tamanho][:1]
+    tamanhos.append(None)
+    extensoes = (EXTENSAO_WEBP, EXTENSAO_JPEG) if FOTO_WEBP else (EXTENSAO_JPEG,)
+
+    for tamanho_variante in tamanhos:
+        for extensao in extensoes:
+            url = _url_versionada(obter_path_variante(id, tamanho_variante, extensao))
+            if url:
+                return url
+    return obter_caminho_foto_usuario(id)
 
 
 def obter_path_absoluto_foto(id: int) -> Path:
@@ -55,44 +165,134 @@ def obter_path_absoluto_foto(id: int) -> Path:
     return PASTA_FOTOS / f"{id:06d}.jpg"
 
 
-def criar_foto_padrao_usuario(id: int) -> bool:
+def remover_foto_usuario(id: int) -> bool:
     """
-    Cria uma cópia da foto padrão para o usuário.
+    Remove a foto própria do usuário e todas as variantes.
 
-    Copia o arquivo user.jpg para {id:06d}.jpg quando um novo usuário é criado.
+    Sem foto própria, o usuário volta a exibir a foto padrão compartilhada:
+    não há cópia de user.jpg por usuário.
 
     Args:
         id: ID do usuário
 
     Returns:
-        True se criou com sucesso, False caso contrário
+        True se removeu (ou não havia foto), False em erro de I/O
     """
     try:
-        destino = obter_path_absoluto_foto(id)
+        _remover_variantes(id)
+        obter_path_variante(id).unlink(missing_ok=True)
+        return True
+    except OSError as e:
+        logger.error(f"Erro ao remover foto do usuário {id}: {e}")
+        return False
 
-        # Verificar se foto padrão existe
-        if not FOTO_DEFAULT.exists():
-            logger.warning(f"Foto padrão não encontrada em {FOTO_DEFAULT}")
-            return False
 
-        # Copiar foto padrão
-        with open(FOTO_DEFAULT, "rb") as f_origem:
-            with open(destino, "wb") as f_destino:
-                f_destino.write(f_origem.read())
+def remover_copias_foto_padrao() -> int:
+    """
+    Remove as cópias de user.jpg criadas por usuário em versões anteriores.
 
-        logger.info(f"Foto padrão criada para usuário ID: {id}")
-        return True
+    O cadastro copiava a foto padrão para {id:06d}.jpg. Fotos com conteúdo
+    idêntico ao de FOTO_DEFAULT são removidas (com as variantes), e esses
+    usuários passam a usar a foto padrão compartilhada.
 
-    except OSError as e:
-        logger.error(f"Erro ao criar foto padrão para usuário {id}: {e}")
-        return False
+    Returns:
+        Quantidade de cópias removidas
+    """
+    if not FOTO_DEFAULT.exists() or not PASTA_FOTOS.exists():
+        return 0
+
+    conteudo_padrao = FOTO_DEFAULT.read_bytes()
+    removidas = 0
+    for caminho in sorted(PASTA_FOTOS.glob(PADRAO_ARQUIVO_FOTO)):
+        try:
+            # Comparar o tamanho primeiro evita ler as fotos personalizadas
+            if caminho.stat().st_size != len(conteudo_padrao) or caminho.read_bytes() != conteudo_padrao:
+                continue
+        except OSError as e:
+            logger.error(f"Erro ao ler foto {caminho.name}: {e}")
+            continue
+        if remover_foto_usuario(int(caminho.stem)):
+            removidas += 1
+
+    logger.info(f"Cópias da foto padrão removidas: {removidas}")
+    return removidas
+
+
+def _abrir_imagem(dados: bytes, tamanho_max: int) -> Image.Image:
+    """
+    Abre a imagem validando as dimensões antes de decodificá-la.
+
+    Image.open lê apenas o cabeçalho; os pixels só são decodificados no
+    primeiro acesso. Imagens acima de FOTO_MAX_PIXELS são rejeitadas sem
+    decodificação. Para JPEG, draft() faz o decodificador já reduzir a imagem
+    (escala 1/2, 1/4 ou 1/8) quando ela é muito maior que o tamanho final.
+
+    Raises:
+        ValueError: Se a imagem exceder o limite de pixels
+    """
+    imagem = Image.open(io.BytesIO(dados))
+
+    largura, altura = imagem.size
+    if largura * altura > FOTO_MAX_PIXELS:
+        raise ValueError(f"Imagem com {largura}x{altura}px excede o limite de {FOTO_MAX_PIXELS} pixels")
+
+    imagem.draft("RGB", (tamanho_max, tamanho_max))
+    return imagem
+
+
+def _converter_para_rgb(imagem: Image.Image) -> Image.Image:
+    """Converte a imagem para RGB, aplicando fundo branco em imagens com transparência"""
+    if imagem.mode in ("RGBA", "LA", "P"):
+        # Criar fundo branco
+        fundo: Image.Image = Image.new("RGB", imagem.size, (255, 255, 255))
+        if imagem.mode == "P":
+            imagem = imagem.convert("RGBA")
+        fundo.paste(imagem, mask=imagem.split()[-1] if "A" in imagem.mode else None)
+        return fundo
+    if imagem.mode != "RGB":
+        return imagem.convert("RGB")
+    return imagem
+
+
+def _salvar_variantes(id: int, imagem: Image.Image, salvar_original: bool = True) -> None:
+    """
+    Salva a foto completa e as variantes a partir de uma imagem já decodificada.
+
+    As variantes são reduzidas em cadeia (da maior para a menor), cada uma a
+    partir da anterior. Variantes antigas são removidas antes, para que não
+    fiquem arquivos de tamanhos ou formatos que deixaram de ser configurados.
+
+    Args:
+        id: ID do usuário
+        imagem: Imagem RGB já limitada a foto_perfil_tamanho_max
+        salvar_original: False para manter o {id:06d}.jpg atual (geração de variantes de fotos existentes)
+    """
+    destino = obter_path_absoluto_foto(id)
+    _remover_variantes(id)
+
+    if salvar_original:
+        imagem.save(destino, format=FORMATO_FOTO, quality=QUALIDADE_FOTO, optimize=True)
+    if FOTO_WEBP:
+        imagem.save(obter_path_variante(id, None, EXTENSAO_WEBP), format=FORMATO_WEBP, quality=QUALIDADE_WEBP)
+
+    variante = imagem
+    for tamanho in sorted(FOTO_VARIANTES_TAMANHOS, reverse=True):
+        variante = variante.copy()
+        variante.thumbnail((tamanho, tamanho), Image.Resampling.LANCZOS)
+        variante.save(obter_path_variante(id, tamanho), format=FORMATO_FOTO, quality=QUALIDADE_FOTO)
+        if FOTO_WEBP:
+            variante.save(
+                obter_path_variante(id, tamanho, EXTENSAO_WEBP), format=FORMATO_WEBP, quality=QUALIDADE_WEBP
+            )
 
 
 def salvar_foto_cropada_usuario(id: int, conteudo_base64: str) -> bool:
     """
     Salva a foto cropada do usuário enviada do frontend.
 
-    Recebe imagem em base64, decodifica, processa e salva como JPG.
+    Recebe imagem em base64, decodifica uma única vez e salva a foto
+    (limitada a foto_perfil_tamanho_max) e todas as variantes de tamanho/formato.
+    Função bloqueante: em rotas async, use executar_processamento_foto.
 
     Args:
         id: ID do usuário
@@ -109,53 +309,112 @@ def salvar_foto_cropada_usuario(id: int, conteudo_base64: str) -> bool:
         # Decodificar base64
         image_data = base64.b64decode(conteudo_base64)
 
-        # Abrir imagem com Pillow
-        imagem = Image.open(io.BytesIO(image_data))
+        # Lê tamanho máximo do cache (database → .env)
+        tamanho_max = config.obter_int("foto_perfil_tamanho_max", FOTO_PERFIL_TAMANHO_MAX)
 
-        # Converter para RGB se necessário (remove canal alpha)
-        if imagem.mode in ("RGBA", "LA", "P"):
-            # Criar fundo branco
-            fundo: Image.Image = Image.new("RGB", imagem.size, (255, 255, 255))
-            if imagem.mode == "P":
-                imagem = imagem.convert("RGBA")
-            fundo.paste(imagem, mask=imagem.split()[-1] if "A" in imagem.mode else None)
-            imagem = fundo
-        elif imagem.mode != "RGB":
-            imagem = imagem.convert("RGB")
+        imagem = _converter_para_rgb(_abrir_imagem(image_data, tamanho_max))
 
         # Redimensionar se necessário (mantendo aspect ratio)
-        # Lê tamanho máximo do cache (database → .env)
-        tamanho_max = config.obter_int("foto_perfil_tamanho_max", FOTO_PERFIL_TAMANHO_MAX)
         if imagem.width > tamanho_max or imagem.height > tamanho_max:
             # thumbnail redimensiona mantendo aspect ratio
             imagem.thumbnail((tamanho_max, tamanho_max), Image.Resampling.LANCZOS)
             logger.info(f"Imagem redimensionada para {imagem.width}x{imagem.height}px (max: {tamanho_max}px)")
 
-        # Salvar como JPG
-        destino = obter_path_absoluto_foto(id)
-        imagem.save(destino, format=FORMATO_FOTO, quality=QUALIDADE_FOTO, optimize=True)
+        _salvar_variantes(id, imagem)
 
         logger.info(f"Foto cropada salva para usuário ID: {id}")
         return True
 
-    except (OSError, binascii.Error, UnidentifiedImageError, ValueError) as e:
+    except (OSError, binascii.Error, UnidentifiedImageError, ValueError, Image.DecompressionBombError) as e:
         # OSError: Erro de I/O ao salvar arquivo
         # binascii.Error: Erro ao decodificar base64
         # UnidentifiedImageError: Formato de imagem inválido ou não suportado
-        # ValueError: Erro ao processar dados da imagem
+        # ValueError: Erro ao processar dados da imagem ou limite de pixels excedido
+        # DecompressionBombError: Dimensões declaradas muito acima do limite do Pillow
         logger.error(f"Erro ao salvar foto cropada para usuário {id}: {e}")
         return False
 
 
+def gerar_variantes_fotos_existentes(forcar: bool = False) -> Tuple[int, int]:
+    """
+    Gera as variantes das fotos já salvas em PASTA_FOTOS.
+
+    Usada para fotos enviadas antes da geração de variantes ou após mudar
+    FOTO_VARIANTES_TAMANHOS/FOTO_WEBP. A foto completa em JPEG não é regravada.
+
+    Args:
+        forcar: Regerar mesmo as fotos que já têm todas as variantes
+
+    Returns:
+        Tupla (fotos processadas, fotos com erro)
+    """
+    processadas = 0
+    erros = 0
+    if not PASTA_FOTOS.exists():
+        return processadas, erros
+
+    for caminho in sorted(PASTA_FOTOS.glob(PADRAO_ARQUIVO_FOTO)):
+        id = int(caminho.stem)
+        if not forcar and all(variante.exists() for variante in _listar_variantes(id)):
+            continue
+        try:
+            with Image.open(caminho) as imagem:
+                _salvar_variantes(id, _converter_para_rgb(imagem), salvar_original=False)
+            processadas += 1
+        except (OSError, UnidentifiedImageError, ValueError, Image.DecompressionBombError) as e:
+            logger.error(f"Erro ao gerar variantes da foto do usuário {id}: {e}")
+            erros += 1
+
+    logger.info(f"Variantes de fotos geradas: {processadas} foto(s), {erros} erro(s)")
+    return processadas, erros
+
+
+def _obter_executor_fotos() -> ThreadPoolExecutor:
+    """Cria o pool de processamento de imagens no primeiro uso"""
+    global _executor_fotos
+    if _executor_fotos is None:
+        with _lock_executor:
+            if _executor_fotos is None:
+                _executor_fotos = ThreadPoolExecutor(
+                    max_workers=FOTO_PROCESSAMENTO_THREADS, thread_name_prefix="fotos"
+                )
+    return _executor_fotos
+
+
+async def executar_processamento_foto(funcao: Callable[..., T], *args) -> T:
+    """
+    Executa uma função de processamento de imagem fora do event loop.
+
+    Decodificar, redimensionar e comprimir uma foto leva dezenas a centenas de
+    milissegundos de CPU. O Pillow libera o GIL nessas etapas, então o pool
+    de threads próprio permite processar uploads em paralelo sem congelar as
+    demais requisições e sem ocupar as threads do banco.
+
+    Uso:
+        sucesso = await executar_processamento_foto(salvar_foto_cropada_usuario, id, foto_base64)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_obter_executor_fotos(), funcao, *args)
+
+
+def encerrar_processamento_fotos() -> None:
+    """Encerra o pool de processamento de imagens (tarefas em andamento terminam normalmente)"""
+    global _executor_fotos
+    with _lock_executor:
+        executor, _executor_fotos = _executor_fotos, None
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+
 def foto_existe(id: int) -> bool:
     """
-    Verifica se a foto do usuário existe no filesystem.
+    Verifica se o usuário tem foto própria no filesystem.
 
     Args:
         id: ID do usuário
 
     Returns:
-        True se a foto existe, False caso contrário
+        True se a foto existe, False caso contrário (usuário exibe a foto padrão)
     """
     return obter_path_absoluto_foto(id).exists()
 
@@ -168,7 +427,7 @@ def obter_tamanho_foto(id: int) -> Optional[int]:
         id: ID do usuário
 
     Returns:
-        Tamanho em bytes ou None se foto não existe
+        Tamanho em bytes ou None se o usuário não tem foto própria
     """
     path = obter_path_absoluto_foto(id)
     return path.stat().st_size if path.exists() else None
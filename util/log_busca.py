@@ -0,0 +1,314 @@
+"""
+Busca em arquivos de log para a auditoria administrativa.
+
+Os arquivos diários (logs/app.YYYY.MM.DD.log) são lidos em fluxo, entrada por
+entrada, sem carregar o arquivo na memória. Para cada arquivo é mantido um
+índice auxiliar (logs/.indices/<arquivo>.json) com o offset inicial de cada
+hora e a quantidade de entradas por nível, o que permite pular trechos que não
+podem conter resultados (ex: horas sem nenhum ERROR). O índice é atualizado
+de forma incremental, lendo apenas o que foi acrescentado ao arquivo.
+
+Uma entrada é a linha com timestamp seguida das linhas de continuação
+(ex: traceback de exceções). Arquivos no formato JSON (LOG_FORMATO=json)
+também são aceitos: cada linha é uma entrada.
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional
+
+from util.logger_config import logger
+
+
+# Diretório dos arquivos de log e dos índices
+DIRETORIO_LOGS = Path("logs")
+NOME_DIRETORIO_INDICES = ".indices"
+
+# Níveis aceitos no filtro ("TODOS" desativa o filtro)
+NIVEIS_LOG = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+# Entradas exibidas por página e período máximo de uma busca
+RESULTADOS_POR_PAGINA = 200
+MAX_DIAS_BUSCA = 31
+
+VERSAO_INDICE = 1
+
+_PADRAO_CABECALHO = re.compile(
+    rb"^\d{4}-\d{2}-\d{2} (\d{2}):\d{2}:\d{2} - .*? - (DEBUG|INFO|WARNING|ERROR|CRITICAL) - "
+)
+_PADRAO_CABECALHO_JSON = re.compile(
+    rb'^\{"timestamp": "\d{4}-\d{2}-\d{2} (\d{2}):\d{2}:\d{2}", "nivel": "(DEBUG|INFO|WARNING|ERROR|CRITICAL)"'
+)
+
+
+@dataclass
+class FiltroLog:
+    """Critérios de busca nos logs"""
+    data_inicio: date
+    data_fim: date
+    nivel: str = "TODOS"
+    hora_inicio: int = 0
+    hora_fim: int = 23
+    texto: str = ""
+    usuario_id: Optional[int] = None
+
+
+@dataclass
+class ResultadoBuscaLog:
+    """Página de resultados de uma busca nos logs"""
+    entradas: List[str] = field(default_factory=list)
+    proximo_cursor: Optional[str] = None
+    arquivos_encontrados: int = 0
+    mensagem_erro: Optional[str] = None
+
+
+def _caminho_log(dia: date) -> Path:
+    """Retorna o caminho do arquivo de log de um dia"""
+    return DIRETORIO_LOGS / f"app.{dia.strftime('%Y.%m.%d')}.log"
+
+
+def _caminho_indice(arquivo_log: Path) -> Path:
+    """Retorna o caminho do índice auxiliar de um arquivo de log"""
+    return arquivo_log.parent / NOME_DIRETORIO_INDICES / f"{arquivo_log.name}.json"
+
+
+def _ler_cabecalho(linha: bytes) -> Optional[tuple[str, str]]:
+    """Retorna (hora "HH", nivel) se a linha inicia uma entrada de log"""
+    cabecalho = _PADRAO_CABECALHO.match(linha) or _PADRAO_CABECALHO_JSON.match(linha)
+    if cabecalho:
+        return cabecalho.group(1).decode(), cabecalho.group(2).decode()
+    return None
+
+
+def _criar_padrao_usuario(usuario_id: int) -> re.Pattern:
+    """
+    Cria regex que identifica menções a um usuário nas mensagens de log
+
+    As mensagens seguem padrões como "admin 5", "usuário 5", "Usuário ID 5",
+    "usuario_id=5" e, em JSON, o campo extra "usuario_id": 5.
+    """
+    return re.compile(
+        rf"\b(?:admin|usu[aá]rio|autor|leitor|usuario_id)\"?\s*(?:id\s*)?[=:]?\s*{usuario_id}\b",
+        re.IGNORECASE,
+    )
+
+
+def _ler_indice(arquivo_log: Path) -> Optional[dict]:
+    """Lê o índice de um arquivo de log, ou None se ausente/inválido"""
+    caminho = _caminho_indice(arquivo_log)
+    if not caminho.exists():
+        return None
+    try:
+        indice = json.loads(caminho.read_text(encoding="utf-8"))
+        if indice.get("versao") != VERSAO_INDICE:
+            return None
+        return indice
+    except (OSError, ValueError) as e:
+        logger.warning(f"Índice de log inválido, será reconstruído: {caminho.name} ({e})")
+        return None
+
+
+def _salvar_indice(arquivo_log: Path, indice: dict) -> None:
+    """Grava o índice de forma atômica; falhas apenas desativam o reaproveitamento"""
+    caminho = _caminho_indice(arquivo_log)
+    try:
+        caminho.parent.mkdir(exist_ok=True)
+        caminho_parcial = caminho.with_name(caminho.name + ".parcial")
+        caminho_parcial.write_text(json.dumps(indice), encoding="utf-8")
+        caminho_parcial.replace(caminho)
+    except OSError as e:
+        logger.warning(f"Não foi possível gravar índice de log {caminho.name}: {e}")
+
+
+def obter_indice(arquivo_log: Path) -> dict:
+    """
+    Retorna o índice atualizado de um arquivo de log
+
+    Apenas as linhas acrescentadas desde a última atualização são lidas. Se o
+    arquivo diminuiu (foi truncado ou recriado), o índice é refeito.
+
+    Formato:
+        {"versao": 1, "tamanho": <bytes indexados>,
+         "horas": {"HH": {"offset": <byte inicial>, "niveis": {"INFO": n, ...}}}}
+    """
+    tamanho_arquivo = arquivo_log.stat().st_size
+    indice = _ler_indice(arquivo_log)
+    if indice is None or indice["tamanho"] > tamanho_arquivo:
+        indice = {"versao": VERSAO_INDICE, "tamanho": 0, "horas": {}}
+
+    if indice["tamanho"] == tamanho_arquivo:
+        return indice
+
+    horas = indice["horas"]
+    offset = indice["tamanho"]
+    with open(arquivo_log, "rb") as arquivo:
+        arquivo.seek(offset)
+        for linha in arquivo:
+            # Linha incompleta: o logger ainda está escrevendo
+            if not linha.endswith(b"\n"):
+                break
+            cabecalho = _ler_cabecalho(linha)
+            if cabecalho:
+                hora, nivel = cabecalho
+                if hora not in horas:
+                    horas[hora] = {"offset": offset, "niveis": {}}
+                niveis = horas[hora]["niveis"]
+                niveis[nivel] = niveis.get(nivel, 0) + 1
+            offset += len(linha)
+
+    indice["tamanho"] = offset
+    _salvar_indice(arquivo_log, indice)
+    return indice
+
+
+def _segmentos_relevantes(indice: dict, filtro: FiltroLog, offset_minimo: int) -> List[tuple[int, int]]:
+    """
+    Seleciona os trechos (offset_inicio, offset_fim) do arquivo que podem conter resultados
+
+    Horas fora do intervalo do filtro ou sem entradas do nível buscado são puladas.
+    """
+    ordenadas = sorted(indice["horas"].items(), key=lambda item: item[1]["offset"])
+    segmentos = []
+    for posicao, (hora, dados) in enumerate(ordenadas):
+        inicio = dados["offset"]
+        fim = ordenadas[posicao + 1][1]["offset"] if posicao + 1 < len(ordenadas) else indice["tamanho"]
+
+        if not filtro.hora_inicio <= int(hora) <= filtro.hora_fim:
+            continue
+        if filtro.nivel != "TODOS" and not dados["niveis"].get(filtro.nivel):
+            continue
+        if fim <= offset_minimo:
+            continue
+
+        inicio = max(inicio, offset_minimo)
+        # Juntar trechos contíguos para evitar seeks desnecessários
+        if segmentos and segmentos[-1][1] == inicio:
+            segmentos[-1] = (segmentos[-1][0], fim)
+        else:
+            segmentos.append((inicio, fim))
+    return segmentos
+
+
+def _iterar_entradas(arquivo: BinaryIO, inicio: int, fim: int) -> Iterator[tuple[int, str, str, str]]:
+    """
+    Percorre as entradas de um trecho do arquivo
+
+    Yields:
+        Tupla (offset, hora "HH", nivel, texto_da_entrada)
+    """
+    arquivo.seek(inicio)
+    offset = inicio
+    offset_atual = 0
+    hora = ""
+    nivel = ""
+    linhas: list[bytes] = []
+
+    while offset < fim:
+        linha = arquivo.readline()
+        if not linha:
+            break
+        cabecalho = _ler_cabecalho(linha)
+        if cabecalho:
+            if linhas:
+                yield offset_atual, hora, nivel, b"".join(linhas).decode("utf-8", errors="replace")
+            offset_atual, hora, nivel = offset, cabecalho[0], cabecalho[1]
+            linhas = [linha]
+        elif linhas:
+            linhas.append(linha)
+        offset += len(linha)
+
+    if linhas:
+        yield offset_atual, hora, nivel, b"".join(linhas).decode("utf-8", errors="replace")
+
+
+def _gerar_cursor(dia: date, offset: int) -> str:
+    """Cursor da próxima página: arquivo e offset da primeira entrada não exibida"""
+    return f"{dia.isoformat()}:{offset}"
+
+
+def _ler_cursor(cursor: str) -> Optional[tuple[date, int]]:
+    """Decodifica o cursor gerado por _gerar_cursor (None se inválido)"""
+    try:
+        data_str, offset_str = cursor.split(":")
+        return date.fromisoformat(data_str), int(offset_str)
+    except ValueError:
+        return None
+
+
+def buscar_logs(
+    filtro: FiltroLog,
+    cursor: Optional[str] = None,
+    limite: int = RESULTADOS_POR_PAGINA,
+) -> ResultadoBuscaLog:
+    """
+    Busca entradas de log no período do filtro, em ordem cronológica
+
+    A leitura é feita em fluxo e para ao completar a página; a página seguinte
+    é obtida passando o `proximo_cursor` do resultado. A função faz I/O
+    bloqueante: em rotas assíncronas, execute-a com asyncio.to_thread.
+
+    Args:
+        filtro: Critérios de busca
+        cursor: Cursor da página anterior (None para a primeira página)
+        limite: Quantidade máxima de entradas na página
+
+    Returns:
+        ResultadoBuscaLog com as entradas encontradas
+    """
+    resultado = ResultadoBuscaLog()
+    posicao = _ler_cursor(cursor) if cursor else None
+    texto = filtro.texto.casefold()
+    padrao_usuario = _criar_padrao_usuario(filtro.usuario_id) if filtro.usuario_id is not None else None
+
+    dia = filtro.data_inicio
+    try:
+        while dia <= filtro.data_fim:
+            dia_atual = dia
+            dia += timedelta(days=1)
+
+            if posicao and dia_atual < posicao[0]:
+                continue
+            arquivo_log = _caminho_log(dia_atual)
+            if not arquivo_log.exists():
+                continue
+            resultado.arquivos_encontrados += 1
+
+            offset_minimo = posicao[1] if posicao and dia_atual == posicao[0] else 0
+            indice = obter_indice(arquivo_log)
+            segmentos = _segmentos_relevantes(indice, filtro, offset_minimo)
+            if not segmentos:
+                continue
+
+            with open(arquivo_log, "rb") as arquivo:
+                for inicio, fim in segmentos:
+                    for offset, hora, nivel, entrada in _iterar_entradas(arquivo, inicio, fim):
+                        if filtro.nivel != "TODOS" and nivel != filtro.nivel:
+                            continue
+                        if not filtro.hora_inicio <= int(hora) <= filtro.hora_fim:
+                            continue
+                        if texto and texto not in entrada.casefold():
+                            continue
+                        if padrao_usuario and not padrao_usuario.search(entrada):
+                            continue
+
+                        if len(resultado.entradas) == limite:
+                            resultado.proximo_cursor = _gerar_cursor(dia_atual, offset)
+                            return resultado
+                        resultado.entradas.append(entrada)
+
+    except OSError as e:
+        logger.error(f"Erro ao ler arquivo de log: {str(e)}")
+        resultado.mensagem_erro = f"Erro ao ler arquivo de log: {str(e)}"
+        return resultado
+
+    if resultado.arquivos_encontrados == 0:
+        if filtro.data_inicio == filtro.data_fim:
+            resultado.mensagem_erro = f"Nenhum arquivo de log encontrado para a data {filtro.data_inicio.isoformat()}."
+        else:
+            resultado.mensagem_erro = (
+                f"Nenhum arquivo de log encontrado entre {filtro.data_inicio.isoformat()} "
+                f"e {filtro.data_fim.isoformat()}."
+            )
+    return resultado
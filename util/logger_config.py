@@ -2,17 +2,38 @@
 Módulo de configuração do sistema de logging.
 
 Implementa rotação diária de logs com retenção configurável via .env.
+
+Por padrão as mensagens são apenas enfileiradas pela thread da requisição
+(QueueHandler); a formatação e a escrita em arquivo/console acontecem em
+uma thread dedicada (QueueListener). Prefira o formato preguiçoso
+``logger.info("Usuário %s conectado", usuario_id)``: a mensagem só é montada
+se o nível estiver habilitado.
 """
 
+import atexit
+import copy
+import json
 import logging
-from logging.handlers import TimedRotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 import os
 from pathlib import Path
 import time
+from typing import Optional
 
-from util.config import LOG_LEVEL, LOG_RETENTION_DAYS
+from util.config import (
+    LOG_LEVEL, LOG_RETENTION_DAYS, LOG_FORMATO, LOG_ASSINCRONO, LOG_NIVEIS_MODULOS
+)
 from util.datetime_util import agora
 
+# Atributos padrão de LogRecord; os demais vêm de `extra=` e entram no JSON
+_ATRIBUTOS_PADRAO_REGISTRO = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime"}
+
+# Listener ativo quando LOG_ASSINCRONO está habilitado
+_listener: Optional[QueueListener] = None
+
 
 class DailyRotatingFileHandler(TimedRotatingFileHandler):
     """
@@ -58,6 +79,8 @@ class DailyRotatingFileHandler(TimedRotatingFileHandler):
         if self.backupCount > 0:
             for s in self.getFilesToDelete():
                 os.remove(s)
+                # Índice auxiliar usado pela busca da auditoria (util/log_busca.py)
+                Path(s).parent.joinpath(".indices", f"{Path(s).name}.json").unlink(missing_ok=True)
 
         # Atualizar próximo rollover
         currentTime = int(time.time())
@@ -71,6 +94,115 @@ class DailyRotatingFileHandler(TimedRotatingFileHandler):
             self.stream = self._open()
 
 
+class FormatadorJSON(logging.Formatter):
+    """
+    Formata cada entrada como uma linha JSON.
+
+    As chaves "timestamp" e "nivel" vêm sempre primeiro (usadas pela busca da
+    auditoria); campos passados via ``extra=`` são incluídos no objeto.
+    """
+
+    def __init__(self):
+        super().__init__(datefmt='%Y-%m-%d %H:%M:%S')
+
+    def format(self, record: logging.LogRecord) -> str:
+        dados = {
+            "timestamp": self.formatTime(record, self.datefmt),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensagem": record.getMessage(),
+            "modulo": record.module,
+            "linha": record.lineno,
+        }
+        for chave, valor in record.__dict__.items():
+            if chave not in _ATRIBUTOS_PADRAO_REGISTRO and not chave.startswith("_"):
+                dados[chave] = valor
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            dados["excecao"] = record.exc_text
+        if record.stack_info:
+            dados["pilha"] = self.formatStack(record.stack_info)
+
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class ManipuladorFila(QueueHandler):
+    """
+    QueueHandler que preserva os dados da entrada para o formatador do listener.
+
+    O QueueHandler padrão formata a mensagem (inclusive o traceback) na thread
+    da requisição e descarta exc_info. Aqui apenas os argumentos são
+    interpolados e o traceback vira texto (exc_text); timestamp, formato e
+    JSON ficam a cargo do formatador na thread do listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        registro = copy.copy(record)
+        registro.msg = registro.getMessage()
+        registro.args = None
+        if registro.exc_info:
+            if not registro.exc_text:
+                registro.exc_text = logging.Formatter().formatException(registro.exc_info)
+            registro.exc_info = None
+        return registro
+
+
+def criar_formatador(formato: str = LOG_FORMATO) -> logging.Formatter:
+    """Cria o formatador de acordo com LOG_FORMATO ("texto" ou "json")"""
+    if formato == "json":
+        return FormatadorJSON()
+    return logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+
+def aplicar_niveis_modulos(especificacao: str) -> dict[str, int]:
+    """
+    Aplica níveis de log por módulo
+
+    Args:
+        especificacao: Pares "modulo=NIVEL" separados por vírgula
+                       (ex: "util.rate_limiter=WARNING,uvicorn.access=ERROR")
+
+    Returns:
+        Dicionário {modulo: nivel} efetivamente aplicado
+    """
+    aplicados = {}
+    for item in especificacao.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        nome, _, nome_nivel = item.partition("=")
+        nivel = logging.getLevelName(nome_nivel.strip().upper())
+        if not nome.strip() or not isinstance(nivel, int):
+            logging.getLogger(__name__).warning("Nível de log por módulo inválido ignorado: %r", item)
+            continue
+        logging.getLogger(nome.strip()).setLevel(nivel)
+        aplicados[nome.strip()] = nivel
+    return aplicados
+
+
+def obter_logger(nome: str) -> logging.Logger:
+    """
+    Retorna o logger de um módulo (use ``obter_logger(__name__)``)
+
+    Os registros propagam para os handlers do logger raiz; o nível pode ser
+    ajustado por módulo em LOG_NIVEIS_MODULOS.
+    """
+    return logging.getLogger(nome)
+
+
+def encerrar_logger() -> None:
+    """Para o listener, gravando as entradas que ainda estão na fila"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def configurar_logger() -> logging.Logger:
     """
     Configura sistema de logging profissional com rotação diária.
@@ -78,17 +210,17 @@ def configurar_logger() -> logging.Logger:
     Configurações:
     - Rotação à meia-noite
     - Retenção de logs configurável via LOG_RETENTION_DAYS (padrão: 30 dias)
-    - Formato padronizado com timestamp
-    - Nível de log configurável via LOG_LEVEL
+    - Formato texto ou JSON (LOG_FORMATO)
+    - Escrita em thread separada via fila (LOG_ASSINCRONO)
+    - Nível de log configurável via LOG_LEVEL e por módulo via LOG_NIVEIS_MODULOS
 
     Returns:
         Logger configurado e pronto para uso
     """
+    global _listener
+
     # Configurar formato
-    formato = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    formato = criar_formatador()
 
     # Handler customizado que cria arquivos com data desde o início
     file_handler = DailyRotatingFileHandler(
@@ -106,8 +238,18 @@ def configurar_logger() -> logging.Logger:
     # Configurar logger raiz
     logger = logging.getLogger()
     logger.setLevel(getattr(logging, LOG_LEVEL.upper()))
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+
+    if LOG_ASSINCRONO:
+        fila = queue.SimpleQueue()
+        logger.addHandler(ManipuladorFila(fila))
+        _listener = QueueListener(fila, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(encerrar_logger)
+    else:
+        logger.addHandler(file_handler)
+        logger.addHandler(console_handler)
+
+    aplicar_niveis_modulos(LOG_NIVEIS_MODULOS)
 
     return logger
 
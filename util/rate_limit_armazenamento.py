@@ -0,0 +1,421 @@
+"""
+Armazenamento das tentativas registradas pelos rate limiters.
+
+Oferece duas implementações com a mesma interface:
+    - ArmazenamentoMemoria: tentativas no próprio processo (padrão)
+    - ArmazenamentoSQLite: tentativas em um banco SQLite compartilhado,
+      para que vários workers do uvicorn no mesmo host apliquem um limite único
+
+Ambas implementam janela deslizante: cada tentativa aceita guarda o instante
+em que ocorreu, e só contam as tentativas dentro da janela.
+"""
+
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Dict, Optional
+
+from sql.rate_limit_sql import (
+    CRIAR_TABELA,
+    CRIAR_INDICE_IDENTIFICADOR,
+    CRIAR_INDICE_INSTANTE,
+    INICIAR_TRANSACAO_ESCRITA,
+    INSERIR,
+    EXCLUIR_EXPIRADAS_IDENTIFICADOR,
+    EXCLUIR_EXPIRADAS,
+    EXCLUIR_IDENTIFICADOR,
+    EXCLUIR_TODAS,
+    CONTAR_VALIDAS,
+    OBTER_ESTATISTICAS,
+)
+from util.config import (
+    RATE_LIMIT_ARMAZENAMENTO,
+    RATE_LIMIT_MAX_IDENTIFICADORES,
+    RATE_LIMIT_SQLITE_CAMINHO,
+    RATE_LIMIT_VARREDURA_SEGUNDOS,
+)
+from util.db_util import PoolConexoes
+from util.logger_config import obter_logger
+
+logger = obter_logger(__name__)
+
+# Conexões do armazenamento SQLite: WAL para que um worker gravando não
+# bloqueie os demais por muito tempo, e busy_timeout para aguardar o lock
+PRAGMAS_SQLITE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": "5000",
+}
+
+
+class ArmazenamentoRateLimit(ABC):
+    """
+    Interface dos armazenamentos de tentativas.
+
+    Classe abstrata: uma implementação que não define todos os métodos
+    falha ao ser instanciada, e não na primeira requisição limitada.
+
+    Cada limiter possui sua própria instância. Os métodos recebem o limite e a
+    janela atuais porque o DynamicRateLimiter pode alterá-los a qualquer momento.
+    """
+
+    tipo = "base"
+    # Se True, as operações fazem I/O e devem rodar fora do event loop
+    bloqueante = False
+
+    @abstractmethod
+    def registrar_tentativa(self, identificador: str, max_tentativas: int, janela_segundos: float) -> tuple[bool, int]:
+        """
+        Verifica o limite e registra a tentativa em uma única operação atômica.
+
+        Returns:
+            Tupla (permitido, tentativas_na_janela antes desta tentativa)
+        """
+
+    @abstractmethod
+    def contar(self, identificador: str, janela_segundos: float) -> int:
+        """Retorna quantas tentativas do identificador estão na janela"""
+
+    @abstractmethod
+    def obter_segundos_reset(self, identificador: str, max_tentativas: int, janela_segundos: float) -> Optional[float]:
+        """Retorna segundos até o identificador ser liberado, ou None se não bloqueado"""
+
+    @abstractmethod
+    def limpar(self, identificador: Optional[str] = None) -> None:
+        """Remove as tentativas de um identificador (ou de todos, se None)"""
+
+    @abstractmethod
+    def obter_estatisticas(self) -> dict:
+        """Retorna uso do armazenamento (identificadores, timestamps e memória)"""
+
+
+class ArmazenamentoMemoria(ArmazenamentoRateLimit):
+    """
+    Armazenamento em memória, restrito ao processo atual.
+
+    Cada identificador guarda um deque com os instantes (time.monotonic)
+    das tentativas aceitas, limitado a max_tentativas itens; as tentativas
+    que saíram da janela são descartadas pela esquerda, em O(1) amortizado.
+    O armazenamento é limitado: identificadores inativos são removidos em
+    varreduras periódicas e, acima de max_identificadores, os menos
+    recentes são descartados (LRU).
+
+    Thread-safe: utiliza Lock para sincronização de acesso.
+
+    Attributes:
+        tentativas: Dict ordenado (LRU) de identificador -> deque de timestamps
+        max_identificadores: Máximo de identificadores guardados
+        intervalo_varredura_segundos: Intervalo entre varreduras de inativos
+    """
+
+    tipo = "memoria"
+
+    def __init__(
+        self,
+        max_identificadores: int = RATE_LIMIT_MAX_IDENTIFICADORES,
+        intervalo_varredura_segundos: int = RATE_LIMIT_VARREDURA_SEGUNDOS,
+    ):
+        if max_identificadores <= 0:
+            raise ValueError("max_identificadores deve ser positivo")
+
+        self.max_identificadores = max_identificadores
+        self.intervalo_varredura_segundos = intervalo_varredura_segundos
+        self.tentativas: "OrderedDict[str, deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._proxima_varredura = time.monotonic() + intervalo_varredura_segundos
+        self._despejos_lru = 0
+        self._removidos_varredura = 0
+
+    @staticmethod
+    def _descartar_expiradas(registros: "deque[float]", limite: float) -> None:
+        """Remove do início do deque as tentativas anteriores ao limite da janela"""
+        while registros and registros[0] <= limite:
+            registros.popleft()
+
+    def _varrer_se_necessario(self, momento_atual: float, janela_segundos: float) -> None:
+        """
+        Remove identificadores sem tentativas na janela atual.
+
+        Executada no máximo uma vez por intervalo_varredura_segundos, durante
+        um registro de tentativa (chamar com o lock adquirido).
+        """
+        if momento_atual < self._proxima_varredura:
+            return
+        self._proxima_varredura = momento_atual + self.intervalo_varredura_segundos
+
+        limite = momento_atual - janela_segundos
+        inativos = [
+            identificador for identificador, registros in self.tentativas.items()
+            if not registros or registros[-1] <= limite
+        ]
+        for identificador in inativos:
+            del self.tentativas[identificador]
+        if inativos:
+            self._removidos_varredura += len(inativos)
+            logger.debug("Rate limit: removidos %s identificadores inativos", len(inativos))
+
+    def _obter_registros(
+        self, identificador: str, momento_atual: float, janela_segundos: float
+    ) -> Optional["deque[float]"]:
+        """Retorna as tentativas válidas do identificador (None se não houver registro)"""
+        registros = self.tentativas.get(identificador)
+        if registros is not None:
+            self._descartar_expiradas(registros, momento_atual - janela_segundos)
+        return registros
+
+    def registrar_tentativa(self, identificador: str, max_tentativas: int, janela_segundos: float) -> tuple[bool, int]:
+        momento_atual = time.monotonic()
+
+        with self._lock:
+            self._varrer_se_necessario(momento_atual, janela_segundos)
+
+            registros = self._obter_registros(identificador, momento_atual, janela_segundos)
+            if registros is None:
+                registros = deque(maxlen=max_tentativas)
+                self.tentativas[identificador] = registros
+                while len(self.tentativas) > self.max_identificadores:
+                    self.tentativas.popitem(last=False)
+                    self._despejos_lru += 1
+            else:
+                self.tentativas.move_to_end(identificador)
+
+            quantidade = len(registros)
+            if quantidade >= max_tentativas:
+                return False, quantidade
+
+            if registros.maxlen != max_tentativas:
+                # Limite alterado em tempo de execução (DynamicRateLimiter)
+                registros = deque(registros, maxlen=max_tentativas)
+                self.tentativas[identificador] = registros
+            registros.append(momento_atual)
+            return True, quantidade
+
+    def contar(self, identificador: str, janela_segundos: float) -> int:
+        with self._lock:
+            registros = self._obter_registros(identificador, time.monotonic(), janela_segundos)
+            return len(registros) if registros else 0
+
+    def obter_segundos_reset(self, identificador: str, max_tentativas: int, janela_segundos: float) -> Optional[float]:
+        momento_atual = time.monotonic()
+
+        with self._lock:
+            registros = self._obter_registros(identificador, momento_atual, janela_segundos)
+            if not registros or len(registros) < max_tentativas:
+                return None
+            # Reset quando a tentativa mais antiga sair da janela
+            segundos = registros[0] + janela_segundos - momento_atual
+        return segundos if segundos > 0 else None
+
+    def limpar(self, identificador: Optional[str] = None) -> None:
+        with self._lock:
+            if identificador:
+                self.tentativas.pop(identificador, None)
+            else:
+                self.tentativas.clear()
+                self._despejos_lru = 0
+                self._removidos_varredura = 0
+
+    def obter_estatisticas(self) -> dict:
+        with self._lock:
+            timestamps = sum(len(registros) for registros in self.tentativas.values())
+            memoria = sys.getsizeof(self.tentativas) + sum(
+                sys.getsizeof(identificador) + sys.getsizeof(registros)
+                for identificador, registros in self.tentativas.items()
+            )
+            return {
+                "armazenamento": self.tipo,
+                "identificadores_ativos": len(self.tentativas),
+                "max_identificadores": self.max_identificadores,
+                "timestamps_armazenados": timestamps,
+                "memoria_estimada_bytes": memoria,
+                "despejos_lru": self._despejos_lru,
+                "removidos_varredura": self._removidos_varredura,
+            }
+
+
+# Pools por caminho do banco de rate limit (compartilhados entre os limiters do processo)
+_pools: Dict[str, PoolConexoes] = {}
+_pools_lock = threading.Lock()
+
+
+def _obter_pool(caminho: str) -> PoolConexoes:
+    """Retorna o pool do banco de rate limit, criando a tabela na primeira vez"""
+    pool = _pools.get(caminho)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(caminho)
+            if pool is None:
+                pool = PoolConexoes(caminho, tamanho_maximo=5, timeout=5.0, pragmas=PRAGMAS_SQLITE)
+                conn = pool.obter()
+                try:
+                    conn.execute(CRIAR_TABELA)
+                    conn.execute(CRIAR_INDICE_IDENTIFICADOR)
+                    conn.execute(CRIAR_INDICE_INSTANTE)
+                    conn.commit()
+                finally:
+                    pool.devolver(conn)
+                _pools[caminho] = pool
+    return pool
+
+
+def fechar_pools() -> None:
+    """
+    Fecha as conexões dos bancos de rate limit e descarta os pools.
+
+    Deve ser chamado no encerramento da aplicação; um novo uso recria o pool.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.fechar_todas()
+
+
+class ArmazenamentoSQLite(ArmazenamentoRateLimit):
+    """
+    Armazenamento em banco SQLite compartilhado entre processos.
+
+    Cada tentativa aceita é uma linha (limiter, identificador, instante), com
+    instante em time.time() para ser comparável entre processos. A verificação
+    e o registro ocorrem em uma transação BEGIN IMMEDIATE, que serializa os
+    workers: dois processos nunca aceitam juntos a última tentativa da janela.
+
+    Linhas expiradas do identificador são apagadas a cada tentativa, e as dos
+    demais identificadores em varreduras periódicas. Se o banco falhar (ex:
+    lock mantido além do busy_timeout), a requisição é permitida e o erro é
+    registrado no log, para que o rate limit não derrube a aplicação.
+
+    Attributes:
+        limiter: Nome do limiter (separa as tentativas de cada limiter no banco)
+        caminho: Caminho do arquivo do banco de rate limit
+    """
+
+    tipo = "sqlite"
+    bloqueante = True
+
+    def __init__(
+        self,
+        limiter: str,
+        caminho: str = RATE_LIMIT_SQLITE_CAMINHO,
+        intervalo_varredura_segundos: int = RATE_LIMIT_VARREDURA_SEGUNDOS,
+    ):
+        self.limiter = limiter
+        self.caminho = caminho
+        self.intervalo_varredura_segundos = intervalo_varredura_segundos
+        self._proxima_varredura = time.time() + intervalo_varredura_segundos
+        self._falhas = 0
+
+    def _executar(self, operacao):
+        """Executa operacao(conn) com uma conexão do pool, confirmando ao final"""
+        pool = _obter_pool(self.caminho)
+        conn = pool.obter()
+        try:
+            resultado = operacao(conn)
+            conn.commit()
+            return resultado
+        finally:
+            pool.devolver(conn)
+
+    def _registrar_falha(self, erro: sqlite3.Error) -> None:
+        self._falhas += 1
+        logger.error("Rate limit [%s]: erro no armazenamento SQLite: %s", self.limiter, erro)
+
+    def registrar_tentativa(self, identificador: str, max_tentativas: int, janela_segundos: float) -> tuple[bool, int]:
+        momento_atual = time.time()
+        limite = momento_atual - janela_segundos
+
+        def operacao(conn: sqlite3.Connection) -> tuple[bool, int]:
+            conn.execute(INICIAR_TRANSACAO_ESCRITA)
+            if momento_atual >= self._proxima_varredura:
+                self._proxima_varredura = momento_atual + self.intervalo_varredura_segundos
+                conn.execute(EXCLUIR_EXPIRADAS, (self.limiter, limite))
+            else:
+                conn.execute(EXCLUIR_EXPIRADAS_IDENTIFICADOR, (self.limiter, identificador, limite))
+            quantidade = conn.execute(CONTAR_VALIDAS, (self.limiter, identificador, limite)).fetchone()[0]
+            if quantidade >= max_tentativas:
+                return False, quantidade
+            conn.execute(INSERIR, (self.limiter, identificador, momento_atual))
+            return True, quantidade
+
+        try:
+            return self._executar(operacao)
+        except sqlite3.Error as e:
+            self._registrar_falha(e)
+            return True, 0
+
+    def contar(self, identificador: str, janela_segundos: float) -> int:
+        limite = time.time() - janela_segundos
+        try:
+            return self._executar(
+                lambda conn: conn.execute(CONTAR_VALIDAS, (self.limiter, identificador, limite)).fetchone()[0]
+            )
+        except sqlite3.Error as e:
+            self._registrar_falha(e)
+            return 0
+
+    def obter_segundos_reset(self, identificador: str, max_tentativas: int, janela_segundos: float) -> Optional[float]:
+        momento_atual = time.time()
+        try:
+            quantidade, mais_antiga = self._executar(
+                lambda conn: conn.execute(
+                    CONTAR_VALIDAS, (self.limiter, identificador, momento_atual - janela_segundos)
+                ).fetchone()
+            )
+        except sqlite3.Error as e:
+            self._registrar_falha(e)
+            return None
+
+        if quantidade < max_tentativas:
+            return None
+        segundos = mais_antiga + janela_segundos - momento_atual
+        return segundos if segundos > 0 else None
+
+    def limpar(self, identificador: Optional[str] = None) -> None:
+        try:
+            if identificador:
+                self._executar(lambda conn: conn.execute(EXCLUIR_IDENTIFICADOR, (self.limiter, identificador)))
+            else:
+                self._executar(lambda conn: conn.execute(EXCLUIR_TODAS, (self.limiter,)))
+                self._falhas = 0
+        except sqlite3.Error as e:
+            self._registrar_falha(e)
+
+    def obter_estatisticas(self) -> dict:
+        try:
+            identificadores, timestamps = self._executar(
+                lambda conn: conn.execute(OBTER_ESTATISTICAS, (self.limiter,)).fetchone()
+            )
+        except sqlite3.Error as e:
+            self._registrar_falha(e)
+            identificadores, timestamps = 0, 0
+
+        return {
+            "armazenamento": self.tipo,
+            "caminho": self.caminho,
+            "identificadores_ativos": identificadores,
+            "timestamps_armazenados": timestamps,
+            # As tentativas ficam em disco, fora da memória do processo
+            "memoria_estimada_bytes": 0,
+            "falhas": self._falhas,
+        }
+
+
+def criar_armazenamento(limiter: str, tipo: str = RATE_LIMIT_ARMAZENAMENTO) -> ArmazenamentoRateLimit:
+    """
+    Cria o armazenamento configurado em RATE_LIMIT_ARMAZENAMENTO.
+
+    Args:
+        limiter: Nome do limiter dono do armazenamento
+        tipo: "memoria" ou "sqlite" (valores desconhecidos usam memória)
+
+    Returns:
+        Instância de ArmazenamentoRateLimit
+    """
+    if tipo == "sqlite":
+        return ArmazenamentoSQLite(limiter)
+    if tipo != "memoria":
+        logger.warning("RATE_LIMIT_ARMAZENAMENTO inválido (%s); usando memória", tipo)
+    return ArmazenamentoMemoria()
@@ -18,7 +18,9 @@ from fastapi.responses import RedirectResponse
 
 from util.rate_limiter import RateLimiter
 from util.flash_messages import informar_erro
-from util.logger_config import logger
+from util.logger_config import obter_logger
+
+logger = obter_logger(__name__)
 
 
 def obter_identificador_cliente(request: Request) -> str:
@@ -97,7 +99,7 @@ def aplicar_rate_limit(
             ip = obter_identificador_cliente(request)
 
             # Verificar rate limit
-            if not limiter.verificar(ip):
+            if not await limiter.verificar_async(ip):
                 # Rate limit excedido - bloquear requisição
                 mensagem = mensagem_erro or mensagem_padrao
 
@@ -9,12 +9,14 @@ Oferece duas classes:
     - DynamicRateLimiter: Rate limiter dinâmico (lê valores do config_cache)
 """
 
-from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Optional
-from util.logger_config import logger
+from util.logger_config import obter_logger
 from util.config_cache import config
-from util.datetime_util import agora as obter_agora
+from util.db_util import executar_repo
+from util.rate_limit_armazenamento import ArmazenamentoRateLimit, criar_armazenamento
+
+logger = obter_logger(__name__)
 
 
 class RateLimiter:
@@ -24,10 +26,14 @@ class RateLimiter:
     Mantém registro de tentativas por identificador (geralmente IP)
     e bloqueia se exceder limite em janela de tempo.
 
+    As tentativas ficam em um armazenamento plugável (ver
+    util/rate_limit_armazenamento.py): em memória, por processo (padrão), ou
+    em SQLite, compartilhado entre os workers do mesmo host.
+
     Attributes:
         max_tentativas: Número máximo de tentativas permitidas
         janela: Timedelta representando janela de tempo
-        tentativas: Dict de identificador -> lista de timestamps
+        armazenamento: Onde as tentativas de cada identificador são guardadas
     """
 
     def __init__(
@@ -35,6 +41,7 @@ class RateLimiter:
         max_tentativas: int = 5,
         janela_minutos: int = 5,
         nome: str = "default",
+        armazenamento: Optional[ArmazenamentoRateLimit] = None,
     ):
         """
         Inicializa rate limiter.
@@ -42,7 +49,8 @@ class RateLimiter:
         Args:
             max_tentativas: Número máximo de tentativas na janela
             janela_minutos: Tamanho da janela em minutos
-            nome: Nome descritivo do limiter (para logs)
+            nome: Nome descritivo do limiter (para logs e armazenamento)
+            armazenamento: Armazenamento das tentativas (padrão: RATE_LIMIT_ARMAZENAMENTO)
         """
         if max_tentativas <= 0:
             raise ValueError("max_tentativas deve ser positivo")
@@ -53,14 +61,15 @@ class RateLimiter:
         self.janela = timedelta(minutes=janela_minutos)
         self.janela_minutos = janela_minutos
         self.nome = nome
-        self.tentativas: defaultdict[str, list[datetime]] = defaultdict(list)
+        self.armazenamento = armazenamento if armazenamento is not None else criar_armazenamento(nome)
 
     def verificar(self, identificador: str) -> bool:
         """
         Verifica se identificador está dentro do limite.
 
         Remove tentativas antigas da janela e verifica se está
-        abaixo do máximo. Se estiver, registra nova tentativa.
+        abaixo do máximo. Se estiver, registra nova tentativa
+        (verificação e registro são atômicos no armazenamento).
 
         Args:
             identificador: Identificador único (geralmente IP)
@@ -69,25 +78,35 @@ class RateLimiter:
             True se dentro do limite (permitido)
             False se excedeu limite (bloqueado)
         """
-        momento_atual = obter_agora()
-
-        # Limpar tentativas antigas (fora da janela)
-        self.tentativas[identificador] = [
-            t for t in self.tentativas[identificador] if momento_atual - t < self.janela
-        ]
+        permitido, quantidade = self.armazenamento.registrar_tentativa(
+            identificador, self.max_tentativas, self.janela.total_seconds()
+        )
 
-        # Verificar se excedeu limite
-        if len(self.tentativas[identificador]) >= self.max_tentativas:
+        if not permitido:
             logger.warning(
-                f"Rate limit excedido [{self.nome}] - "
-                f"Identificador: {identificador}, "
-                f"Tentativas: {len(self.tentativas[identificador])}/{self.max_tentativas}"
+                "Rate limit excedido [%s] - Identificador: %s, Tentativas: %s/%s",
+                self.nome, identificador, quantidade, self.max_tentativas
             )
-            return False
+        return permitido
+
+    async def verificar_async(self, identificador: str) -> bool:
+        """
+        Versão de verificar para rotas assíncronas.
 
-        # Registrar nova tentativa
-        self.tentativas[identificador].append(momento_atual)
-        return True
+        Com armazenamento bloqueante (SQLite), a verificação roda no pool de
+        repositórios (executar_repo), fora do event loop; em memória não há
+        I/O e ela roda direto.
+
+        Args:
+            identificador: Identificador único (geralmente IP)
+
+        Returns:
+            True se dentro do limite (permitido)
+            False se excedeu limite (bloqueado)
+        """
+        if self.armazenamento.bloqueante:
+            return await executar_repo(self.verificar, identificador)
+        return self.verificar(identificador)
 
     def limpar(self, identificador: Optional[str] = None) -> None:
         """
@@ -97,13 +116,11 @@ class RateLimiter:
             identificador: Se fornecido, limpa apenas este identificador.
                           Se None, limpa todos (útil para testes).
         """
+        self.armazenamento.limpar(identificador)
         if identificador:
-            if identificador in self.tentativas:
-                del self.tentativas[identificador]
-                logger.debug(f"Limpo rate limit para identificador: {identificador}")
+            logger.debug("Limpo rate limit para identificador: %s", identificador)
         else:
-            self.tentativas.clear()
-            logger.debug(f"Limpo todos os rate limits [{self.nome}]")
+            logger.debug("Limpo todos os rate limits [%s]", self.nome)
 
     def obter_tentativas_restantes(self, identificador: str) -> int:
         """
@@ -115,14 +132,7 @@ class RateLimiter:
         Returns:
             Número de tentativas restantes (0 se bloqueado)
         """
-        momento_atual = obter_agora()
-
-        # Limpar tentativas antigas
-        self.tentativas[identificador] = [
-            t for t in self.tentativas[identificador] if momento_atual - t < self.janela
-        ]
-
-        tentativas_atuais = len(self.tentativas[identificador])
+        tentativas_atuais = self.armazenamento.contar(identificador, self.janela.total_seconds())
         return max(0, self.max_tentativas - tentativas_atuais)
 
     def obter_tempo_reset(self, identificador: str) -> Optional[timedelta]:
@@ -135,24 +145,10 @@ class RateLimiter:
         Returns:
             Timedelta até reset, ou None se não bloqueado
         """
-        if identificador not in self.tentativas or not self.tentativas[identificador]:
-            return None
-
-        momento_atual = obter_agora()
-
-        # Limpar tentativas antigas
-        self.tentativas[identificador] = [
-            t for t in self.tentativas[identificador] if momento_atual - t < self.janela
-        ]
-
-        # Se ainda está bloqueado, calcular tempo até reset
-        if len(self.tentativas[identificador]) >= self.max_tentativas:
-            # Reset quando a tentativa mais antiga sair da janela
-            tentativa_mais_antiga = self.tentativas[identificador][0]
-            tempo_reset = (tentativa_mais_antiga + self.janela) - momento_atual
-            return tempo_reset if tempo_reset.total_seconds() > 0 else None
-
-        return None
+        segundos = self.armazenamento.obter_segundos_reset(
+            identificador, self.max_tentativas, self.janela.total_seconds()
+        )
+        return timedelta(seconds=segundos) if segundos is not None else None
 
     def __repr__(self) -> str:
         """Representação string do limiter."""
@@ -165,11 +161,13 @@ class RateLimiter:
 
 class DynamicRateLimiter(RateLimiter):
     """
-    Rate limiter dinâmico que busca valores do config_cache a cada verificação.
+    Rate limiter dinâmico que acompanha os valores do config_cache.
 
     Permite alteração de rate limits sem reiniciar o servidor. Os valores
     max_tentativas e janela_minutos são lidos do cache de configuração
-    usando as chaves fornecidas.
+    usando as chaves fornecidas, mas só quando a versão do cache muda
+    (configurações salvas pelo admin); nas demais verificações não há
+    nenhum acesso ao cache nem ao seu lock.
 
     Attributes:
         chave_max: Chave de configuração para max_tentativas
@@ -185,6 +183,7 @@ class DynamicRateLimiter(RateLimiter):
         padrao_max: int = 5,
         padrao_minutos: int = 5,
         nome: str = "dynamic",
+        armazenamento: Optional[ArmazenamentoRateLimit] = None,
     ):
         """
         Inicializa rate limiter dinâmico.
@@ -194,7 +193,8 @@ class DynamicRateLimiter(RateLimiter):
             chave_minutos: Chave de configuração para janela_minutos
             padrao_max: Valor padrão para max_tentativas
             padrao_minutos: Valor padrão para janela_minutos
-            nome: Nome descritivo do limiter (para logs)
+            nome: Nome descritivo do limiter (para logs e armazenamento)
+            armazenamento: Armazenamento das tentativas (padrão: RATE_LIMIT_ARMAZENAMENTO)
         """
         # Validar valores padrão
         if padrao_max <= 0:
@@ -214,41 +214,56 @@ class DynamicRateLimiter(RateLimiter):
         super().__init__(
             max_tentativas=max_tentativas,
             janela_minutos=janela_minutos,
-            nome=nome
+            nome=nome,
+            armazenamento=armazenamento,
         )
 
+        # Versão do config_cache dos valores atuais. Os limiters são criados na
+        # importação das rotas, antes da migração das configurações, então os
+        # valores são relidos na primeira verificação.
+        self._versao_config: Optional[int] = None
+
     def _atualizar_valores(self) -> None:
         """
         Atualiza valores de max_tentativas e janela_minutos do config_cache.
 
-        Chamado internamente antes de cada verificação para garantir
-        que está usando os valores mais recentes.
+        Chamado internamente quando a versão do config_cache muda (ver
+        _sincronizar_config). A versão é lida antes dos valores: se as
+        configurações mudarem durante a leitura, a próxima verificação relê.
         """
+        versao = config.obter_versao()
         max_tentativas = config.obter_int(self.chave_max, self.padrao_max)
         janela_minutos = config.obter_int(self.chave_minutos, self.padrao_minutos)
 
         # Atualizar apenas se mudou
         if max_tentativas != self.max_tentativas:
             logger.debug(
-                f"Rate limiter [{self.nome}] atualizou max_tentativas: "
-                f"{self.max_tentativas} -> {max_tentativas}"
+                "Rate limiter [%s] atualizou max_tentativas: %s -> %s",
+                self.nome, self.max_tentativas, max_tentativas
             )
             self.max_tentativas = max_tentativas
 
         if janela_minutos != self.janela_minutos:
             logger.debug(
-                f"Rate limiter [{self.nome}] atualizou janela_minutos: "
-                f"{self.janela_minutos} -> {janela_minutos}"
+                "Rate limiter [%s] atualizou janela_minutos: %s -> %s",
+                self.nome, self.janela_minutos, janela_minutos
             )
             self.janela_minutos = janela_minutos
             self.janela = timedelta(minutes=janela_minutos)
 
+        self._versao_config = versao
+
+    def _sincronizar_config(self) -> None:
+        """Relê os valores apenas se as configurações mudaram desde a última leitura."""
+        if config.obter_versao() != self._versao_config:
+            self._atualizar_valores()
+
     def verificar(self, identificador: str) -> bool:
         """
         Verifica se identificador está dentro do limite (com valores atualizados).
 
-        Atualiza valores do config_cache antes de verificar, garantindo
-        que mudanças em configurações sejam aplicadas imediatamente.
+        Se a versão do config_cache mudou, relê os valores antes de verificar,
+        garantindo que mudanças em configurações sejam aplicadas imediatamente.
 
         Args:
             identificador: Identificador único (geralmente IP)
@@ -257,8 +272,8 @@ class DynamicRateLimiter(RateLimiter):
             True se dentro do limite (permitido)
             False se excedeu limite (bloqueado)
         """
-        # Atualizar valores antes de verificar
-        self._atualizar_valores()
+        # Reler valores apenas se as configurações mudaram
+        self._sincronizar_config()
 
         # Usar lógica da classe pai
         return super().verificar(identificador)
@@ -273,7 +288,7 @@ class DynamicRateLimiter(RateLimiter):
         Returns:
             Número de tentativas restantes (0 se bloqueado)
         """
-        self._atualizar_valores()
+        self._sincronizar_config()
         return super().obter_tentativas_restantes(identificador)
 
     def obter_tempo_reset(self, identificador: str) -> Optional[timedelta]:
@@ -286,7 +301,7 @@ class DynamicRateLimiter(RateLimiter):
         Returns:
             Timedelta até reset, ou None se não bloqueado
         """
-        self._atualizar_valores()
+        self._sincronizar_config()
         return super().obter_tempo_reset(identificador)
 
     def __repr__(self) -> str:
@@ -341,7 +356,7 @@ class RegistroLimiters:
             limiter: Instância de RateLimiter ou DynamicRateLimiter
         """
         self._limiters[limiter.nome] = limiter
-        logger.debug(f"Rate limiter registrado: {limiter.nome}")
+        logger.debug("Rate limiter registrado: %s", limiter.nome)
 
     def obter(self, nome: str) -> Optional[RateLimiter]:
         """
@@ -369,10 +384,11 @@ class RegistroLimiters:
         Retorna estatísticas de todos os limiters.
 
         Returns:
-            Dict com total e detalhes de cada limiter
+            Dict com total e detalhes (limites e uso de memória) de cada limiter
         """
         stats = {
             "total_limiters": len(self._limiters),
+            "memoria_estimada_total_bytes": 0,
             "limiters": {}
         }
 
@@ -380,9 +396,10 @@ class RegistroLimiters:
             stats["limiters"][nome] = {
                 "max_tentativas": limiter.max_tentativas,
                 "janela_minutos": limiter.janela_minutos,
-                "identificadores_ativos": len(limiter.tentativas),
-                "tipo": "dinamico" if isinstance(limiter, DynamicRateLimiter) else "estatico"
+                "tipo": "dinamico" if isinstance(limiter, DynamicRateLimiter) else "estatico",
+                **limiter.armazenamento.obter_estatisticas(),
             }
+            stats["memoria_estimada_total_bytes"] += stats["limiters"][nome]["memoria_estimada_bytes"]
 
         return stats
 
@@ -455,7 +472,7 @@ def com_rate_limit(
 
             # Verificar rate limit
             ip = obter_identificador_cliente(request)
-            if not limiter.verificar(ip):
+            if not await limiter.verificar_async(ip):
                 logger.warning(
                     f"Rate limit excedido [{limiter.nome}] - IP: {ip}"
                 )
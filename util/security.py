@@ -1,10 +1,18 @@
 from passlib.context import CryptContext
+import asyncio
 import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Callable, Optional, TypeVar
+from util.config import SENHA_HASH_MAX_CONCORRENTES
 from util.datetime_util import agora
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
 
 def criar_hash_senha(senha: str) -> str:
     """Cria hash da senha"""
@@ -16,6 +24,148 @@ def verificar_senha(senha_plana: str, senha_hash: str) -> bool:
     return pwd_context.verify(senha_plana, senha_hash)
 
 
+class ServicoHashSenha:
+    """
+    Executa hashes bcrypt em um pool próprio de threads, fora do event loop.
+
+    Cada hash/verificação consome ~100-300ms de CPU; executado diretamente em
+    uma rota async, ele congela todas as requisições e streams SSE do worker.
+    O bcrypt libera o GIL durante o cálculo, então as threads rodam em
+    paralelo de fato. O pool é separado do executor padrão do asyncio para
+    que uma rajada de logins não ocupe as threads usadas por banco e backups.
+
+    O número de threads limita os hashes simultâneos; pedidos excedentes
+    aguardam na fila do pool, e o tempo de espera é medido.
+
+    Thread-safe: utiliza Lock para sincronização das métricas.
+    """
+
+    def __init__(self, max_concorrentes: int = SENHA_HASH_MAX_CONCORRENTES):
+        """
+        Args:
+            max_concorrentes: Máximo de hashes executados ao mesmo tempo
+        """
+        if max_concorrentes <= 0:
+            raise ValueError("max_concorrentes deve ser positivo")
+
+        self.max_concorrentes = max_concorrentes
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # Métricas
+        self._aguardando = 0
+        self._em_execucao = 0
+        self._execucoes = 0
+        self._tempo_fila_total = 0.0
+        self._tempo_fila_maximo = 0.0
+        self._tempo_execucao_total = 0.0
+
+    def _obter_executor(self) -> ThreadPoolExecutor:
+        """Cria o pool de threads no primeiro uso"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concorrentes, thread_name_prefix="hash-senha"
+                    )
+        return self._executor
+
+    async def _executar(self, funcao: Callable[..., T], *args) -> T:
+        """
+        Executa funcao(*args) no pool, registrando tempo de fila e de execução.
+
+        Se a requisição for cancelada enquanto o pedido aguarda na fila (ex.:
+        cliente desconectou), o pool descarta o pedido sem executá-lo; o
+        pedido sai da contagem de espera uma única vez, por quem chegar
+        primeiro (a thread que o executa ou o cancelamento).
+        """
+        enfileirado = time.perf_counter()
+        saiu_da_fila = False
+        with self._lock:
+            self._aguardando += 1
+
+        def sair_da_fila() -> None:
+            """Retira o pedido da contagem de espera (chamar com o lock adquirido)"""
+            nonlocal saiu_da_fila
+            if not saiu_da_fila:
+                saiu_da_fila = True
+                self._aguardando -= 1
+
+        def tarefa() -> T:
+            inicio = time.perf_counter()
+            espera = inicio - enfileirado
+            with self._lock:
+                sair_da_fila()
+                self._em_execucao += 1
+                self._tempo_fila_total += espera
+                self._tempo_fila_maximo = max(self._tempo_fila_maximo, espera)
+            try:
+                return funcao(*args)
+            finally:
+                with self._lock:
+                    self._em_execucao -= 1
+                    self._execucoes += 1
+                    self._tempo_execucao_total += time.perf_counter() - inicio
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._obter_executor(), tarefa)
+        except asyncio.CancelledError:
+            with self._lock:
+                sair_da_fila()
+            raise
+
+    async def criar_hash(self, senha: str) -> str:
+        """Cria hash da senha sem bloquear o event loop"""
+        return await self._executar(criar_hash_senha, senha)
+
+    async def verificar(self, senha_plana: str, senha_hash: str) -> bool:
+        """Verifica se senha corresponde ao hash sem bloquear o event loop"""
+        return await self._executar(verificar_senha, senha_plana, senha_hash)
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna métricas de uso do pool de hash.
+
+        Returns:
+            Dicionário com ocupação e tempos médios/máximos (em ms)
+        """
+        with self._lock:
+            execucoes = self._execucoes
+            fila_medio_ms = self._tempo_fila_total / execucoes * 1000 if execucoes else 0.0
+            execucao_medio_ms = self._tempo_execucao_total / execucoes * 1000 if execucoes else 0.0
+            return {
+                "max_concorrentes": self.max_concorrentes,
+                "em_execucao": self._em_execucao,
+                "aguardando": self._aguardando,
+                "execucoes": execucoes,
+                "tempo_fila_medio_ms": round(fila_medio_ms, 3),
+                "tempo_fila_maximo_ms": round(self._tempo_fila_maximo * 1000, 3),
+                "tempo_execucao_medio_ms": round(execucao_medio_ms, 3),
+            }
+
+    def encerrar(self) -> None:
+        """Encerra o pool de threads (hashes em andamento terminam normalmente)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+# Instância global do serviço de hash
+servico_hash_senha = ServicoHashSenha()
+
+
+async def criar_hash_senha_async(senha: str) -> str:
+    """Cria hash da senha no pool de hash (para uso em rotas async)"""
+    return await servico_hash_senha.criar_hash(senha)
+
+
+async def verificar_senha_async(senha_plana: str, senha_hash: str) -> bool:
+    """Verifica a senha no pool de hash (para uso em rotas async)"""
+    return await servico_hash_senha.verificar(senha_plana, senha_hash)
+
+
 def gerar_token_redefinicao() -> str:
     """Gera token seguro para redefinição de senha"""
     return secrets.token_urlsafe(32)
@@ -15,6 +15,7 @@ from util.flash_messages import obter_mensagens
 from util.config import APP_NAME, VERSION, TOAST_AUTO_HIDE_DELAY_MS
 from util.csrf_protection import obter_token_csrf, CSRF_FORM_FIELD
 from util.config_cache import config
+from util.foto_util import obter_caminho_avatar_usuario
 
 
 def formatar_data_br(
@@ -130,17 +131,20 @@ def formatar_hora(data: Union[datetime, None]) -> str:
     return ""
 
 
-def foto_usuario(id: int) -> str:
+def foto_usuario(id: int, tamanho: Optional[int] = None) -> str:
     """
     Retorna o caminho da foto do usuário para uso em templates.
 
+    Uso no template: {{ usuario.id|foto_usuario(32) }}
+
     Args:
         id: ID do usuário
+        tamanho: Lado em pixels com que a foto será exibida (escolhe a variante)
 
     Returns:
-        String com caminho da foto (ex: /static/img/usuarios/000001.jpg)
+        String com caminho versionado da foto (ex: /static/img/usuarios/000001_48.webp?v=18c2...)
     """
-    return f"/static/img/usuarios/{id:06d}.jpg"
+    return obter_caminho_avatar_usuario(id, tamanho)
 
 
 def csrf_input(request: Optional[Request] = None) -> str:
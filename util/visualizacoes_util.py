@@ -0,0 +1,154 @@
+"""
+Contador de visualizações de artigos com gravação em lote.
+
+Cada leitura de artigo apenas incrementa um contador em memória; as
+visualizações acumuladas são gravadas em uma única transação (executemany)
+periodicamente, ao atingir um limite ou no shutdown. Assim a leitura de um
+artigo não disputa o lock de escrita do SQLite.
+"""
+import asyncio
+import threading
+from typing import Dict, Optional
+
+from repo import artigo_repo
+from util.config import VISUALIZACOES_FLUSH_LIMITE
+from util.db_util import executar_repo
+from util.logger_config import logger
+
+# Chave da sessão com os artigos já contabilizados (deduplicação por sessão)
+CHAVE_SESSAO_VISTOS = "artigos_vistos"
+# Máximo de artigos lembrados por sessão (mantém o cookie pequeno)
+MAX_VISTOS_SESSAO = 100
+
+
+class ContadorVisualizacoes:
+    """
+    Agrega visualizações por artigo e as grava em lote.
+
+    Thread-safe: a gravação pode rodar em thread separada (asyncio.to_thread)
+    enquanto novas visualizações são registradas.
+    """
+
+    def __init__(self, limite_gravacao: int = VISUALIZACOES_FLUSH_LIMITE):
+        """
+        Args:
+            limite_gravacao: Total de visualizações pendentes que dispara a gravação
+        """
+        self.limite_gravacao = limite_gravacao
+        self._pendentes: Dict[int, int] = {}
+        self._total_pendente = 0
+        self._lock = threading.Lock()
+        self._gravacao_agendada: Optional[asyncio.Task] = None
+
+    def registrar(self, artigo_id: int) -> None:
+        """
+        Registra uma visualização. Agenda a gravação do lote se o limite for atingido.
+
+        Args:
+            artigo_id: ID do artigo visualizado
+        """
+        with self._lock:
+            self._pendentes[artigo_id] = self._pendentes.get(artigo_id, 0) + 1
+            self._total_pendente += 1
+            atingiu_limite = self._total_pendente >= self.limite_gravacao
+
+        if atingiu_limite and self._gravacao_agendada is None:
+            self._agendar_gravacao()
+
+    def _agendar_gravacao(self) -> None:
+        """
+        Grava o lote fora do event loop (pool de repositórios).
+
+        Chamado a partir das rotas, que rodam no event loop; sem loop em
+        execução (scripts, testes síncronos) grava na hora.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.gravar()
+            return
+
+        self._gravacao_agendada = loop.create_task(executar_repo(self.gravar))
+        self._gravacao_agendada.add_done_callback(self._gravacao_concluida)
+
+    def _gravacao_concluida(self, tarefa: asyncio.Task) -> None:
+        self._gravacao_agendada = None
+        if not tarefa.cancelled() and tarefa.exception():
+            logger.error(f"Erro ao gravar visualizações: {tarefa.exception()}")
+
+    def pendentes(self, artigo_id: int) -> int:
+        """Retorna as visualizações do artigo ainda não gravadas no banco."""
+        with self._lock:
+            return self._pendentes.get(artigo_id, 0)
+
+    def gravar(self) -> int:
+        """
+        Grava as visualizações pendentes no banco.
+
+        Em caso de falha as visualizações voltam para a fila e são
+        tentadas novamente na próxima gravação.
+
+        Returns:
+            Número de visualizações gravadas
+        """
+        with self._lock:
+            if not self._pendentes:
+                return 0
+            lote, self._pendentes = self._pendentes, {}
+            total = self._total_pendente
+            self._total_pendente = 0
+
+        if artigo_repo.somar_visualizacoes(lote):
+            logger.debug(f"{total} visualizações gravadas em {len(lote)} artigos")
+            return total
+
+        with self._lock:
+            for artigo_id, quantidade in lote.items():
+                self._pendentes[artigo_id] = self._pendentes.get(artigo_id, 0) + quantidade
+            self._total_pendente += total
+        logger.warning(f"Falha ao gravar {total} visualizações; serão tentadas novamente")
+        return 0
+
+    def limpar(self) -> None:
+        """Descarta as visualizações pendentes (útil em testes)."""
+        with self._lock:
+            self._pendentes = {}
+            self._total_pendente = 0
+
+
+def marcar_visto_na_sessao(sessao: dict, artigo_id: int) -> bool:
+    """
+    Marca o artigo como visto na sessão.
+
+    Args:
+        sessao: request.session
+        artigo_id: ID do artigo
+
+    Returns:
+        True se é a primeira visualização do artigo nesta sessão
+    """
+    vistos = sessao.get(CHAVE_SESSAO_VISTOS, [])
+    if artigo_id in vistos:
+        return False
+    vistos.append(artigo_id)
+    sessao[CHAVE_SESSAO_VISTOS] = vistos[-MAX_VISTOS_SESSAO:]
+    return True
+
+
+async def tarefa_gravar_visualizacoes(intervalo_segundos: int) -> None:
+    """
+    Tarefa assíncrona que grava as visualizações pendentes periodicamente.
+
+    A gravação roda em thread separada para não bloquear o event loop.
+    Deve ser iniciada no startup da aplicação (lifespan) e cancelada no shutdown.
+
+    Args:
+        intervalo_segundos: Intervalo entre gravações
+    """
+    while True:
+        await asyncio.sleep(intervalo_segundos)
+        await asyncio.to_thread(contador_visualizacoes.gravar)
+
+
+# Instância global do contador
+contador_visualizacoes = ContadorVisualizacoes()